@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TermIA - AI Load Generator
+Drives AIExecutor with N concurrent sessions, each with its own executor
+(and connection pool), and reports latency percentiles, throughput and
+errors. Without --url it starts a local MockAIServer with the requested
+behavior, so the whole run is offline.
+
+Usage:
+    python benchmarks/ai_load.py --sessions 16 --requests 50 --latency 0.2 --jitter 0.1
+    python benchmarks/ai_load.py --sessions 8 --stream --error-rate 0.05 --json load.json
+    python benchmarks/ai_load.py --url http://127.0.0.1:8765/v1/chat/completions
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+# Make the project root and src importable
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+
+from mock_ai_server import MockAIServer
+
+
+DEFAULT_QUESTION = "Qual a capital da França?"
+
+# Percentiles shown in the report
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Percentile of sorted values, interpolating linearly between ranks.
+
+    Args:
+        values: Values in ascending order
+        q: Percentile, 0 to 100
+
+    Returns:
+        The percentile (0.0 for no values)
+    """
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class LoadReport(NamedTuple):
+    """Outcome of a load run. Latencies are of successful requests, in seconds, sorted."""
+    sessions: int
+    requests: int
+    duration: float
+    latencies: List[float]
+    first_chunk: List[float]
+    errors: Dict[str, int]
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second."""
+        return self.succeeded / self.duration if self.duration > 0 else 0.0
+
+    def percentiles(self, values: Optional[Sequence[float]] = None) -> Dict[str, float]:
+        values = self.latencies if values is None else values
+        return {f"p{q}": percentile(values, q) for q in PERCENTILES}
+
+    def to_json(self) -> dict:
+        data = {
+            'sessions': self.sessions,
+            'requests': self.requests,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'duration': self.duration,
+            'throughput': self.throughput,
+            'latency': dict(self.percentiles(), mean=(sum(self.latencies) / len(self.latencies)
+                                                      if self.latencies else 0.0),
+                            max=max(self.latencies, default=0.0)),
+            'errors': self.errors,
+        }
+        if self.first_chunk:
+            data['first_chunk'] = self.percentiles(self.first_chunk)
+        return data
+
+    def format(self) -> str:
+        lines = [
+            f"{self.requests} requests from {self.sessions} sessions in {self.duration:.2f} s",
+            f"  succeeded: {self.succeeded}  failed: {self.failed}  "
+            f"throughput: {self.throughput:.1f} req/s",
+            "  latency:     " + '  '.join(f"{name} {value * 1000:.1f} ms"
+                                         for name, value in self.percentiles().items()),
+        ]
+        if self.first_chunk:
+            lines.append("  first chunk: " + '  '.join(
+                f"{name} {value * 1000:.1f} ms" for name, value in self.percentiles(self.first_chunk).items()))
+        for message, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            lines.append(f"  {count:5d} x {message}")
+        return '\n'.join(lines)
+
+
+def _error_kind(error: Exception) -> str:
+    # "AI API call failed after 3 attempts: Request timeout (attempt 3/3)" and
+    # the like are grouped by their first two parts
+    return ': '.join(str(error).split(': ')[:2]) or type(error).__name__
+
+
+def run_load(url: str, sessions: int = 8, requests_per_session: int = 20,
+             question: str = DEFAULT_QUESTION, stream: bool = False, timeout: float = 120,
+             max_retries: int = 3, executor_options: Optional[dict] = None) -> LoadReport:
+    """
+    Send ia ask requests from concurrent sessions.
+
+    Every session is a thread with its own AIExecutor (no response cache)
+    that sends its requests one after the other. Sessions start together.
+
+    Args:
+        url: API endpoint
+        sessions: Number of concurrent sessions
+        requests_per_session: Requests sent by each session
+        question: Question asked
+        stream: Use the streaming API (also measures time to the first chunk)
+        timeout: Per-request timeout of the executors
+        max_retries: Attempts per request of the executors
+        executor_options: Other AIExecutor arguments (backoff, circuit_breaker...);
+            by default the sessions share the process-wide breaker and retry budget
+
+    Returns:
+        Latency, throughput and error report
+    """
+    from ai_executor import AIExecutor
+
+    latencies: List[float] = []
+    first_chunk: List[float] = []
+    errors: Counter = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(sessions + 1)
+
+    def session():
+        with AIExecutor(api_url=url, timeout=timeout, max_retries=max_retries, cache=None,
+                        pool_size=1, **(executor_options or {})) as executor:
+            start.wait()
+            for _ in range(requests_per_session):
+                started = time.perf_counter()
+                first = None
+                try:
+                    if stream:
+                        for _line in executor.stream_ia_ask(question):
+                            if first is None:
+                                first = time.perf_counter() - started
+                    else:
+                        executor.execute_ia_ask(question)
+                except Exception as e:
+                    with lock:
+                        errors[_error_kind(e)] += 1
+                    continue
+                elapsed = time.perf_counter() - started
+                with lock:
+                    latencies.append(elapsed)
+                    if first is not None:
+                        first_chunk.append(first)
+
+    threads = [threading.Thread(target=session, daemon=True) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - began
+
+    return LoadReport(sessions, sessions * requests_per_session, duration,
+                      sorted(latencies), sorted(first_chunk), dict(errors))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test AIExecutor against the mock (or any) AI server.")
+    parser.add_argument('--url', help="API endpoint (default: start a local mock server)")
+    parser.add_argument('--sessions', type=int, default=8, help="concurrent sessions")
+    parser.add_argument('--requests', type=int, default=20, help="requests per session")
+    parser.add_argument('--question', default=DEFAULT_QUESTION)
+    parser.add_argument('--stream', action='store_true', help="use the streaming API")
+    parser.add_argument('--timeout', type=float, default=120, help="per-request timeout of the executors")
+    parser.add_argument('--max-retries', type=int, default=3, help="attempts per request")
+    parser.add_argument('--json', metavar='FILE', help="also write the report as JSON")
+    mock = parser.add_argument_group('local mock server (without --url)')
+    mock.add_argument('--latency', type=float, default=0.0)
+    mock.add_argument('--jitter', type=float, default=0.0)
+    mock.add_argument('--error-rate', type=float, default=0.0)
+    mock.add_argument('--error-status', type=int, default=500)
+    mock.add_argument('--timeout-rate', type=float, default=0.0)
+    mock.add_argument('--chunk-delay', type=float, default=0.0)
+    mock.add_argument('--replay', metavar='FILE', help="answer from a recording")
+    mock.add_argument('--seed', type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run the load test and print the report."""
+    args = parse_args(argv)
+    server = None
+    url = args.url
+    if url is None:
+        server = MockAIServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                              error_status=args.error_status, timeout_rate=args.timeout_rate,
+                              chunk_delay=args.chunk_delay, replay=args.replay, seed=args.seed).start()
+        url = server.url
+    try:
+        report = run_load(url, args.sessions, args.requests, args.question, args.stream,
+                          args.timeout, args.max_retries)
+    finally:
+        if server is not None:
+            server.stop()
+    print(report.format())
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report.to_json(), f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Benchmark Cases
+This module registers the benchmark cases of the suite: lexer and parser
+throughput, ls and cat on synthetic data, completion latency, markdown
+cleanup of large AI responses, and end-to-end process_command, with AI
+commands answered by the local mock server.
+"""
+
+import contextlib
+import io
+import os
+import sys
+from typing import Tuple
+
+# Make the project root and src importable
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT_DIR, os.path.join(ROOT_DIR, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from harness import Context, SkipBenchmark, Suite
+from mock_ai_server import DEFAULT_REPLY, MockAIServer
+
+
+suite = Suite()
+
+# Representative command lines, covering every command of the grammar
+COMMANDS = [
+    'ls', 'ls -la', 'ls -l /home/usuario', 'ls -lR --max-depth 2 .',
+    'ls -U --limit 100 --offset 200 /var/cache', 'cd ..', 'cd ~/projetos', 'pwd',
+    'mkdir -p projetos/2024/termia', 'cat README.md', 'cat -n app.log',
+    'ia ask "Qual é a capital da França?"', 'ia summarize "Lorem ipsum dolor sit amet" --length short',
+    'ia summarize --file artigo.txt --length medium', 'ia codeexplain src/*.py',
+    'ia translate "Hello World" --to pt', 'ia translate "Abrir" "Salvar" "Fechar" --to en',
+    'ia ask "Explique o que é um compilador" &', 'history 10', 'history search ls -la',
+    'help ls', 'jobs', 'jobs wait 1', 'clear',
+]
+
+# Entries of the synthetic directories listed by ls and completed by the completer
+TREE_SIZES = {'10k': 10000, '100k': 100000}
+
+# Size of the file read by cat, and of the AI response cleaned by _clean_markdown
+CAT_FILE_SIZE = 32 * 1024 * 1024
+MARKDOWN_SIZE = 256 * 1024
+
+
+def _quiet(func):
+    """Wrap func so that what it prints is discarded."""
+    sink = io.StringIO()
+
+    def run():
+        with contextlib.redirect_stdout(sink):
+            func()
+        sink.seek(0)
+        sink.truncate()
+    return run
+
+
+def _make_tree(context: Context, name: str, entries: int) -> str:
+    """Create a directory with `entries` entries (one in ten is a subdirectory)."""
+    root = context.path(name)
+    os.makedirs(root)
+    for i in range(entries):
+        path = os.path.join(root, f"file_{i:06d}.txt" if i % 10 else f"dir_{i:06d}")
+        if i % 10:
+            with open(path, 'w') as f:
+                f.write('x' * (i % 64))
+        else:
+            os.mkdir(path)
+    return root
+
+
+def _tree(context: Context, label: str) -> Tuple[str, int]:
+    entries = context.size(TREE_SIZES[label])
+    root = context.shared(f'tree_{label}', lambda: _make_tree(context, f'tree_{label}', entries))
+    return root, entries
+
+
+def _executor(context: Context):
+    def create():
+        from executor import CommandExecutor
+        executor = CommandExecutor()
+        executor.execute_cd(context.workdir)
+        context.on_cleanup(executor.close)
+        return executor
+    return context.shared('executor', create)
+
+
+def _mock_server(context: Context) -> MockAIServer:
+    def create():
+        server = MockAIServer().start()
+        context.on_cleanup(server.stop)
+        return server
+    return context.shared('mock_server', create)
+
+
+def _terminal(context: Context):
+    def create():
+        from main import TermIA
+        from plugins import PluginManager
+        # No installed plugins and no response cache: measure TermIA itself
+        terminal = TermIA(enhanced_mode=False, plugins=PluginManager())
+        terminal.ai_config = {'api_url': _mock_server(context).url, 'stream': False,
+                              'cache': {'enabled': False}}
+        terminal.stream_ai = False
+        terminal.executor.execute_cd(context.workdir)
+        context.on_cleanup(terminal.close)
+        return terminal
+    return context.shared('terminal', create)
+
+
+# ==================== Lexer and Parser ====================
+
+@suite.benchmark('lexer.tokenize', unit='commands')
+def bench_lexer(context: Context):
+    from lexer import TermIALexer
+    lexer = TermIALexer()
+
+    def run():
+        for command in COMMANDS:
+            for _ in lexer.tokenize(command):
+                pass
+    return run, len(COMMANDS)
+
+
+@suite.benchmark('parser.parse', unit='commands')
+def bench_parser(context: Context):
+    from parser import TermIAParser
+    parser = TermIAParser()
+    for command in COMMANDS:
+        if parser.parse(command) is None:
+            raise ValueError(f"benchmark command does not parse: {command}")
+
+    def run():
+        for command in COMMANDS:
+            parser.parse(command)
+    return run, len(COMMANDS)
+
+
+# ==================== Executor ====================
+
+def _register_ls(label: str):
+    def setup_for(options):
+        def setup(context: Context):
+            root, entries = _tree(context, label)
+            executor = _executor(context)
+            return (lambda: executor.execute_ls(options=options, path=root)), entries
+        return setup
+
+    suite.benchmark(f'executor.ls_{label}', unit='entries')(setup_for(None))
+    suite.benchmark(f'executor.ls_{label}_long', unit='entries')(setup_for('-l'))
+    # -U reads the directory directly instead of going through the cache
+    suite.benchmark(f'executor.ls_{label}_unsorted', unit='entries')(setup_for('-U'))
+
+
+for _label in TREE_SIZES:
+    _register_ls(_label)
+
+
+@suite.benchmark('executor.cat_large', unit='bytes')
+def bench_cat(context: Context):
+    size = context.size(CAT_FILE_SIZE)
+    path = context.path('large.log')
+    line = 'INFO 2025-01-01 12:00:00 termia: processando comando ls -la\n'
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(line * (size // len(line) + 1))
+    executor = _executor(context)
+    return (lambda: executor.execute_cat(path)), os.path.getsize(path)
+
+
+# ==================== Completion ====================
+
+def _completer(context: Context):
+    try:
+        from prompt_toolkit.completion import CompleteEvent
+        from prompt_toolkit.document import Document
+        from enhanced_input import TermIACompleter
+    except ImportError as e:
+        raise SkipBenchmark(f"prompt_toolkit not installed: {e}")
+    completer = context.shared('completer', lambda: TermIACompleter(dir_cache=_executor(context).dir_cache))
+
+    def complete(text: str):
+        document = Document(text, len(text))
+        return lambda: list(completer.get_completions(document, CompleteEvent()))
+    return complete
+
+
+@suite.benchmark('completer.command')
+def bench_complete_command(context: Context):
+    return _completer(context)('h')
+
+
+def _register_completion(label: str):
+    @suite.benchmark(f'completer.path_{label}')
+    def setup(context: Context):
+        root, _ = _tree(context, label)
+        return _completer(context)(f'cat {root}/file_0001')
+
+
+for _label in TREE_SIZES:
+    _register_completion(_label)
+
+
+# ==================== AI ====================
+
+@suite.benchmark('ai.clean_markdown', unit='bytes')
+def bench_clean_markdown(context: Context):
+    from ai_executor import AIExecutor
+    executor = AIExecutor()
+    text = DEFAULT_REPLY * (context.size(MARKDOWN_SIZE) // len(DEFAULT_REPLY) + 1)
+    return (lambda: executor._clean_markdown(text)), len(text.encode('utf-8'))
+
+
+# ==================== End to end ====================
+
+def _register_e2e(name: str, command: str, prepare=None):
+    @suite.benchmark(f'e2e.{name}')
+    def setup(context: Context):
+        terminal = _terminal(context)
+        if prepare is not None:
+            prepare(context)
+
+        def run():
+            terminal.process_command(command)
+            # process_command keeps every line in the in-memory history
+            terminal.history.clear()
+        run = _quiet(run)
+        run()
+        if terminal.last_command_failed:
+            raise ValueError(f"benchmark command failed: {command}")
+        return run
+
+
+def _small_dir(context: Context):
+    context.shared('small_dir', lambda: _make_tree(context, 'small', 100))
+
+
+def _small_file(context: Context):
+    def create():
+        with open(context.path('small.txt'), 'w', encoding='utf-8') as f:
+            f.write('linha de texto\n' * 200)
+    context.shared('small_file', create)
+
+
+_register_e2e('pwd', 'pwd')
+_register_e2e('ls', 'ls -l small', _small_dir)
+_register_e2e('cat', 'cat small.txt', _small_file)
+_register_e2e('help', 'help ls')
+_register_e2e('ia_ask', 'ia ask "Qual a capital da França?"')
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Benchmark Harness
+This module implements the small timeit-based harness used by the benchmark
+suite. Cases are registered on a Suite with a decorator, timed with
+timeit.Timer (loop count calibrated per case, several samples each), and
+saved as JSON so that runs from different commits can be compared.
+"""
+
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Minimum duration of one timing sample, in seconds; the loop count of each
+# case is raised until a sample takes at least this long
+MIN_SAMPLE_TIME = 0.2
+
+# Timing samples taken per case
+DEFAULT_REPEAT = 5
+
+# A case is reported as a regression when its median is this much slower
+REGRESSION_THRESHOLD = 1.10
+
+# Increment whenever the results file format changes
+RESULTS_VERSION = 1
+
+
+class SkipBenchmark(Exception):
+    """Raised by a case setup when the case cannot run here (e.g. a missing dependency)."""
+    pass
+
+
+class BenchmarkResult(NamedTuple):
+    """Timings of one case."""
+    name: str
+    group: str
+    unit: str
+    ops: int
+    number: int
+    samples: List[float]
+
+    @property
+    def median(self) -> float:
+        """Median seconds per call."""
+        return statistics.median(self.samples)
+
+    @property
+    def best(self) -> float:
+        """Fastest seconds per call."""
+        return min(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Operations (units) per second, from the median."""
+        return self.ops / self.median if self.median > 0 else float('inf')
+
+    def to_json(self) -> dict:
+        data = self._asdict()
+        data.update(median=self.median, best=self.best, stdev=self.stdev,
+                    throughput=self.throughput)
+        return data
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'BenchmarkResult':
+        return cls(data['name'], data['group'], data['unit'], data['ops'],
+                   data['number'], list(data['samples']))
+
+
+class Comparison(NamedTuple):
+    """Median of a case in a baseline run and in the current run."""
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float('inf')
+
+
+class Context:
+    """
+    Resources shared by the cases of one run.
+
+    Cases create their data under workdir and register cleanups; scale
+    shrinks every data size (tests run the suite with a tiny scale). The
+    working directory is restored on close, since cases may cd into workdir.
+    """
+
+    def __init__(self, workdir: Optional[str] = None, scale: float = 1.0):
+        """
+        Initialize the context.
+
+        Args:
+            workdir: Directory for generated data (default: a new temporary directory)
+            scale: Factor applied to the data sizes requested through size()
+        """
+        self._own_workdir = workdir is None
+        self.workdir = workdir or tempfile.mkdtemp(prefix='termia-bench-')
+        self.scale = scale
+        self._cleanups: List[Callable[[], None]] = []
+        self._shared: Dict[str, Any] = {}
+        self._cwd = os.getcwd()
+
+    def shared(self, key: str, factory: Callable[[], Any]) -> Any:
+        """Return a value shared by several cases (test data, servers), creating it on first use."""
+        if key not in self._shared:
+            self._shared[key] = factory()
+        return self._shared[key]
+
+    def size(self, n: int) -> int:
+        """Scaled data size (at least 1)."""
+        return max(1, int(n * self.scale))
+
+    def path(self, *parts: str) -> str:
+        """Path under the work directory."""
+        return os.path.join(self.workdir, *parts)
+
+    def on_cleanup(self, func: Callable[[], None]):
+        """Call func when the run ends (in reverse registration order)."""
+        self._cleanups.append(func)
+
+    def close(self):
+        """Run the cleanups and remove the work directory if the context created it."""
+        while self._cleanups:
+            self._cleanups.pop()()
+        os.chdir(self._cwd)
+        if self._own_workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Case(NamedTuple):
+    """A registered benchmark: setup(context) returns the callable to time."""
+    name: str
+    group: str
+    unit: str
+    setup: Callable[[Context], Any]
+
+
+def time_call(func: Callable[[], Any], repeat: int = DEFAULT_REPEAT,
+              min_time: float = MIN_SAMPLE_TIME) -> Tuple[int, List[float]]:
+    """
+    Time a callable like timeit's command line.
+
+    The loop count grows (1, 2, 5, 10, 20, ...) until one sample takes
+    min_time; that calibration also warms caches up. Then `repeat`
+    samples are taken with that loop count.
+
+    Args:
+        func: Callable without arguments
+        repeat: Number of samples
+        min_time: Minimum seconds per sample (0 for a single call per sample)
+
+    Returns:
+        (calls per sample, seconds per call of each sample)
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    multipliers = (2, 2.5, 2)
+    step = 0
+    while timer.timeit(number) < min_time:
+        number = int(number * multipliers[step % 3])
+        step += 1
+    samples = [elapsed / number for elapsed in timer.repeat(repeat, number)]
+    return number, samples
+
+
+class Suite:
+    """Registry of benchmark cases."""
+
+    def __init__(self):
+        self.cases: Dict[str, Case] = {}
+
+    def benchmark(self, name: str, group: str = '', unit: str = 'calls') -> Callable:
+        """
+        Decorator that registers a case.
+
+        The decorated function receives the Context and returns either the
+        callable to time, or (callable, ops) when one call processes `ops`
+        units (commands, bytes, entries...), so throughput is reported in
+        units per second.
+
+        Args:
+            name: Unique case name (e.g. 'lexer.tokenize')
+            group: Group shown in reports
+            unit: Name of the unit counted by ops
+        """
+        def decorator(setup: Callable[[Context], Any]) -> Callable[[Context], Any]:
+            if name in self.cases:
+                raise ValueError(f"duplicate benchmark '{name}'")
+            self.cases[name] = Case(name, group or name.split('.')[0], unit, setup)
+            return setup
+        return decorator
+
+    def select(self, patterns: Sequence[str] = ()) -> List[Case]:
+        """Cases whose name matches any of the regular expressions (all if none)."""
+        regexes = [re.compile(pattern) for pattern in patterns]
+        return [case for case in self.cases.values()
+                if not regexes or any(regex.search(case.name) for regex in regexes)]
+
+    def run(self, context: Context, patterns: Sequence[str] = (), repeat: int = DEFAULT_REPEAT,
+            min_time: float = MIN_SAMPLE_TIME,
+            progress: Optional[Callable[[str], None]] = None) -> List[BenchmarkResult]:
+        """
+        Set up and time the selected cases.
+
+        Args:
+            context: Shared resources of the run
+            patterns: Regular expressions selecting cases by name
+            repeat: Samples per case
+            min_time: Minimum seconds per sample
+            progress: Called with a line of text as each case finishes or is skipped
+
+        Returns:
+            Results of the cases that ran
+        """
+        results = []
+        for case in self.select(patterns):
+            try:
+                prepared = case.setup(context)
+            except SkipBenchmark as e:
+                if progress:
+                    progress(f"{case.name}: skipped ({e})")
+                continue
+            func, ops = prepared if isinstance(prepared, tuple) else (prepared, 1)
+            number, samples = time_call(func, repeat, min_time)
+            result = BenchmarkResult(case.name, case.group, case.unit, ops, number, samples)
+            results.append(result)
+            if progress:
+                progress(format_result(result))
+        return results
+
+
+# ==================== Results ====================
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save_results(path: str, results: Iterable[BenchmarkResult], **metadata):
+    """
+    Write results as JSON, with the commit, interpreter and platform they were measured on.
+
+    Args:
+        path: Output file
+        results: Case results
+        **metadata: Extra fields stored with the run (e.g. scale)
+    """
+    data = {
+        'version': RESULTS_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'metadata': metadata,
+        'results': [result.to_json() for result in results],
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """
+    Read results written by save_results.
+
+    Raises:
+        ValueError: If the file is not a results file of this version
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != RESULTS_VERSION:
+        raise ValueError(f"{path}: unsupported results version {data.get('version')!r}")
+    return [BenchmarkResult.from_json(item) for item in data['results']]
+
+
+def compare(baseline: Iterable[BenchmarkResult], current: Iterable[BenchmarkResult]) -> List[Comparison]:
+    """Pair the medians of the cases present in both runs, in current-run order."""
+    old = {result.name: result.median for result in baseline}
+    return [Comparison(result.name, old[result.name], result.median)
+            for result in current if result.name in old]
+
+
+def regressions(comparisons: Iterable[Comparison],
+                threshold: float = REGRESSION_THRESHOLD) -> List[Comparison]:
+    """Cases at least `threshold` times slower than in the baseline."""
+    return [item for item in comparisons if item.ratio >= threshold]
+
+
+# ==================== Formatting ====================
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_result(result: BenchmarkResult) -> str:
+    """One report line: median, spread and throughput of a case."""
+    line = (f"{result.name:<32} {_format_seconds(result.median):>10} "
+            f"+- {_format_seconds(result.stdev):>9}")
+    if result.ops != 1 or result.unit != 'calls':
+        line += f"  {result.throughput:,.0f} {result.unit}/s"
+    return line
+
+
+def format_comparison(item: Comparison, threshold: float = REGRESSION_THRESHOLD) -> str:
+    """One comparison line, flagged when it is a regression."""
+    flag = '  REGRESSION' if item.ratio >= threshold else ''
+    return (f"{item.name:<32} {_format_seconds(item.baseline):>10} -> "
+            f"{_format_seconds(item.current):>10}  x{item.ratio:.2f}{flag}")
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Mock AI Server
+This module implements a local stand-in for the chat completions API used by
+AIExecutor. It speaks the same form-encoded protocol (messages, max_tokens,
+temperature, stream) and can simulate latency, server errors, requests that
+never get an answer, and streamed (server-sent events) responses. In record
+mode it forwards requests to the real API and saves the answers; in replay
+mode it answers from a recording, so sessions can be reproduced offline.
+
+Usage:
+    python benchmarks/mock_ai_server.py --port 8765 --latency 0.2 --error-rate 0.05
+    python benchmarks/mock_ai_server.py --record session.jsonl --upstream https://api.ninja-apps.work/v1/chat/completions
+    python benchmarks/mock_ai_server.py --replay session.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+
+# Path served by the mock, same as the real API
+API_PATH = '/v1/chat/completions'
+
+DEFAULT_REPLY = (
+    "## Resposta\n\n"
+    "Esta é uma resposta **simulada** do servidor local.\n\n"
+    "- item um\n- item dois\n\n"
+    "```python\nprint('ok')\n```\n"
+)
+
+# Seconds a simulated timeout keeps the request waiting before dropping it
+DEFAULT_HANG = 30.0
+
+# Characters per streamed chunk
+DEFAULT_CHUNK_SIZE = 16
+
+
+def request_key(messages: str, max_tokens: str, temperature: str) -> str:
+    """
+    Key identifying a request in a recording.
+
+    Args:
+        messages: The 'messages' form field (JSON)
+        max_tokens: The 'max_tokens' form field
+        temperature: The 'temperature' form field
+
+    Returns:
+        Canonical JSON of the decoded fields
+    """
+    return json.dumps([json.loads(messages), int(max_tokens), float(temperature)],
+                      sort_keys=True, ensure_ascii=False)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real API, so AIExecutor's connection pool is exercised
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY every
+    # response would wait for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server: 'MockAIServer' = self.server.mock
+        length = int(self.headers.get('Content-Length') or 0)
+        form = {name: values[0] for name, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+        try:
+            key = request_key(form['messages'], form.get('max_tokens', '500'),
+                              form.get('temperature', '0.7'))
+        except (KeyError, TypeError, ValueError):
+            self._send_json(400, {'error': {'message': 'invalid messages, max_tokens or temperature'}})
+            return
+
+        fate = server._next_fate()
+        if fate == 'timeout':
+            # Never answer: the client gives up on its own timeout
+            server._wait(server.hang)
+            self.close_connection = True
+            return
+        server._wait(server._latency())
+        if fate == 'error':
+            headers = {}
+            if server.retry_after is not None:
+                headers['Retry-After'] = str(server.retry_after)
+            self._send_json(server.error_status, {'error': {'message': 'simulated server error'}}, headers)
+            return
+
+        try:
+            content = server._content(key, form)
+        except LookupError as e:
+            self._send_json(404, {'error': {'message': str(e)}})
+            return
+        except Exception as e:
+            self._send_json(502, {'error': {'message': f"upstream failed: {e}"}})
+            return
+
+        if form.get('stream') == 'true':
+            self._send_stream(content, server)
+        else:
+            self._send_json(200, {'choices': [{'message': {'role': 'assistant', 'content': content}}]})
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, content: str, server: 'MockAIServer'):
+        # Server-sent events in HTTP/1.1 chunks, so the connection stays reusable
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        size = server.chunk_size
+        for start in range(0, len(content), size):
+            if start:
+                server._wait(server.chunk_delay)
+            event = {'choices': [{'delta': {'content': content[start:start + size]}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text: str):
+        data = text.encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockAIServer:
+    """
+    Local chat completions server running in a background thread.
+
+    Each request is, in this order: dropped without an answer (timeout_rate),
+    delayed by latency plus up to jitter seconds, answered with error_status
+    (error_rate), or answered with the reply, the recorded answer (replay)
+    or the upstream answer (record). Requests with stream=true get the
+    content as server-sent events.
+
+    Usage:
+        with MockAIServer(latency=0.05) as server:
+            executor = AIExecutor(api_url=server.url)
+    """
+
+    def __init__(self, reply: str = DEFAULT_REPLY, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, retry_after: Optional[float] = None,
+                 timeout_rate: float = 0.0, hang: float = DEFAULT_HANG,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, chunk_delay: float = 0.0,
+                 record: Optional[str] = None, upstream: Optional[str] = None,
+                 replay: Optional[str] = None, seed: Optional[int] = None):
+        """
+        Initialize the server (call start() or use it as a context manager).
+
+        Args:
+            reply: Content of every answer (without record or replay)
+            host: Interface to listen on
+            port: Port to listen on (0 for any free port)
+            latency: Seconds added before every answer
+            jitter: Up to this many extra seconds, uniformly distributed
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of simulated errors
+            retry_after: Retry-After header (seconds) sent with simulated errors
+            timeout_rate: Fraction of requests never answered
+            hang: Seconds an unanswered request is held before the connection is closed
+            chunk_size: Characters per streamed event
+            chunk_delay: Seconds between streamed events
+            record: File where answers from upstream are appended (JSON lines)
+            upstream: URL of the real API, required with record
+            replay: Recording to answer from; unknown requests get HTTP 404
+            seed: Seed of the random choices (errors, timeouts, jitter)
+        """
+        if record and not upstream:
+            raise ValueError("record mode needs an upstream URL")
+        if record and replay:
+            raise ValueError("record and replay are exclusive")
+        self.reply = reply
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_delay = chunk_delay
+        self.record = record
+        self.upstream = upstream
+        self.replay = replay
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self._random = random.Random(seed)
+        self._recording: Dict[str, str] = load_recording(replay) if replay else {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Endpoint URL to pass as AIExecutor's api_url."""
+        return f"http://{self.host}:{self.port}{API_PATH}"
+
+    def start(self) -> 'MockAIServer':
+        """Start listening; returns self."""
+        self._stopping.clear()
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server, releasing requests held by simulated timeouts."""
+        self._stopping.set()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # ==================== Request handling ====================
+
+    def _next_fate(self) -> str:
+        with self._lock:
+            self.requests += 1
+            draw = self._random.random()
+            if draw < self.timeout_rate:
+                self.timeouts += 1
+                return 'timeout'
+            if draw < self.timeout_rate + self.error_rate:
+                self.errors += 1
+                return 'error'
+            return 'ok'
+
+    def _latency(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.uniform(0, self.jitter)
+
+    def _wait(self, seconds: float):
+        if seconds > 0:
+            self._stopping.wait(seconds)
+
+    def _content(self, key: str, form: Dict[str, str]) -> str:
+        if self.replay:
+            try:
+                return self._recording[key]
+            except KeyError:
+                raise LookupError("request not found in the recording")
+        if self.record:
+            content = self._forward(form)
+            with self._lock:
+                self._recording[key] = content
+                with open(self.record, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'key': key, 'content': content}, ensure_ascii=False) + '\n')
+            return content
+        return self.reply
+
+    def _forward(self, form: Dict[str, str]) -> str:
+        # Streamed requests are recorded whole and streamed back locally
+        import requests
+        fields = {name: value for name, value in form.items() if name != 'stream'}
+        response = requests.post(self.upstream, data=fields, timeout=120)
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content']
+
+
+def load_recording(path: str) -> Dict[str, str]:
+    """
+    Read a recording written in record mode.
+
+    Args:
+        path: JSON lines file of {"key": ..., "content": ...}
+
+    Returns:
+        Request key -> answer (the last one recorded wins)
+    """
+    recording = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recording[entry['key']] = entry['content']
+    return recording
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local stand-in for the TermIA AI API.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--reply', default=DEFAULT_REPLY, help="content of every answer")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds before every answer")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction answered with an error")
+    parser.add_argument('--error-status', type=int, default=500, help="HTTP status of simulated errors")
+    parser.add_argument('--retry-after', type=float, help="Retry-After sent with simulated errors")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="fraction never answered")
+    parser.add_argument('--hang', type=float, default=DEFAULT_HANG,
+                        help="seconds an unanswered request is held")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="characters per streamed event")
+    parser.add_argument('--chunk-delay', type=float, default=0.0, help="seconds between streamed events")
+    parser.add_argument('--record', metavar='FILE', help="record upstream answers to FILE")
+    parser.add_argument('--upstream', metavar='URL', help="real API used in record mode")
+    parser.add_argument('--replay', metavar='FILE', help="answer from a recording")
+    parser.add_argument('--seed', type=int, help="seed of the random choices")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """Run the server in the foreground until interrupted."""
+    args = parse_args(argv)
+    try:
+        server = MockAIServer(
+            reply=args.reply, host=args.host, port=args.port, latency=args.latency,
+            jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status,
+            retry_after=args.retry_after, timeout_rate=args.timeout_rate, hang=args.hang,
+            chunk_size=args.chunk_size, chunk_delay=args.chunk_delay, record=args.record,
+            upstream=args.upstream, replay=args.replay, seed=args.seed
+        ).start()
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"Mock AI server listening on {server.url} (Ctrl+C to stop)")
+    print("Point TermIA at it with 'ai: {api_url: ...}' in config.yaml")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"\n{server.requests} requests, {server.errors} errors, {server.timeouts} timeouts")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TermIA - Benchmark Runner
+Runs the benchmark suite, saves the results as JSON and optionally compares
+them with an earlier run. Runs offline: AI commands go to a local mock server.
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # all cases
+    python benchmarks/run_benchmarks.py -k parser -k lexer  # cases matching a pattern
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<commit>.json
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from harness import (DEFAULT_REPEAT, MIN_SAMPLE_TIME, REGRESSION_THRESHOLD, Context, compare,
+                     format_comparison, load_results, regressions, save_results, _git_commit)
+from bench_termia import suite
+
+
+# Where results are written when no --output is given
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the TermIA benchmark suite.")
+    parser.add_argument('-k', dest='patterns', action='append', default=[], metavar='PATTERN',
+                        help="run only cases whose name matches this regular expression (repeatable)")
+    parser.add_argument('-o', '--output', help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='FILE', help="results file of a baseline run")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio reported as a regression (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="samples per case (default: %(default)s)")
+    parser.add_argument('--min-time', type=float, default=MIN_SAMPLE_TIME,
+                        help="minimum seconds per sample (default: %(default)s)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="factor applied to the data sizes (default: %(default)s)")
+    parser.add_argument('--list', action='store_true', help="list the cases and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Run the suite.
+
+    Returns:
+        Exit status: 1 if a case regressed against the baseline, 0 otherwise
+    """
+    args = parse_args(argv)
+    if args.list:
+        for case in suite.select(args.patterns):
+            print(case.name)
+        return 0
+
+    baseline = load_results(args.compare) if args.compare else None
+    with Context(scale=args.scale) as context:
+        results = suite.run(context, args.patterns, repeat=args.repeat, min_time=args.min_time,
+                            progress=print)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{_git_commit() or 'local'}.json")
+    save_results(output, results, scale=args.scale, repeat=args.repeat, min_time=args.min_time)
+    print(f"\nResults saved to {output}")
+
+    if baseline is None:
+        return 0
+    comparisons = compare(baseline, results)
+    print(f"\nCompared with {args.compare}:")
+    for item in comparisons:
+        print(format_comparison(item, args.threshold))
+    slower = regressions(comparisons, args.threshold)
+    if slower:
+        print(f"\n{len(slower)} case(s) at least {args.threshold:.2f}x slower")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
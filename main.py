@@ -6,6 +6,8 @@ Arquivo principal para executar o terminal.
 
 import sys
 import os
+import shutil
+import time
 
 # Garante que o diretório src está no path
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,11 +15,14 @@ src_dir = os.path.join(current_dir, 'src')
 if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
-# Imports do projeto
-from parser import TermIAParser
+# Imports do projeto. O parser (PLY), a IA (requests), os jobs (asyncio), o
+# prompt_toolkit e o índice do histórico são importados no primeiro uso, para
+# que o primeiro prompt apareça o quanto antes
 from executor import CommandExecutor, SecurityException
-from ai_executor import AIExecutor, AIException
-from enhanced_input import EnhancedInputHandler
+from command_registry import CommandRegistry
+from plugins import CommandPlugin, PluginManager
+from table_cache import default_cache_dir
+from command_metrics import MetricsRecorder
 import ast_nodes
 
 # Importa as classes AST explicitamente
@@ -30,46 +35,149 @@ IAAskCommand = ast_nodes.IAAskCommand
 IASummarizeCommand = ast_nodes.IASummarizeCommand
 IACodeExplainCommand = ast_nodes.IACodeExplainCommand
 IATranslateCommand = ast_nodes.IATranslateCommand
+IABatchTranslateCommand = ast_nodes.IABatchTranslateCommand
 HistoryCommand = ast_nodes.HistoryCommand
+HistorySearchCommand = ast_nodes.HistorySearchCommand
 ClearCommand = ast_nodes.ClearCommand
 HelpCommand = ast_nodes.HelpCommand
 ExitCommand = ast_nodes.ExitCommand
+JobsCommand = ast_nodes.JobsCommand
+StatsCommand = ast_nodes.StatsCommand
+BackgroundCommand = ast_nodes.BackgroundCommand
+OSCommand = ast_nodes.OSCommand
+
+# Cores vazias: usadas se colorama não estiver instalado ou no modo script
+class _PlainFore:
+    GREEN = ''
+    YELLOW = ''
+    RED = ''
+    CYAN = ''
+    MAGENTA = ''
+    BLUE = ''
+    RESET = ''
+
+
+class _PlainStyle:
+    BRIGHT = ''
+    RESET_ALL = ''
+
 
 try:
-    from colorama import init, Fore, Style
+    from colorama import init, deinit, Fore, Style
     init(autoreset=True)
     COLORS_AVAILABLE = True
 except ImportError:
     COLORS_AVAILABLE = False
-    # Fallback se colorama não estiver instalado
-    class Fore:
-        GREEN = ''
-        YELLOW = ''
-        RED = ''
-        CYAN = ''
-        MAGENTA = ''
-        BLUE = ''
-        RESET = ''
-    
-    class Style:
-        BRIGHT = ''
-        RESET_ALL = ''
+    Fore = _PlainFore
+    Style = _PlainStyle
+
+
+def disable_colors():
+    """
+    Desativa as cores do terminal.
+
+    Remove o wrapper do colorama em sys.stdout (que intercepta cada escrita)
+    e troca Fore/Style por versões vazias, para que a saída não tenha códigos ANSI.
+    """
+    global Fore, Style, COLORS_AVAILABLE
+    if COLORS_AVAILABLE:
+        deinit()
+        COLORS_AVAILABLE = False
+    Fore = _PlainFore
+    Style = _PlainStyle
+
+
+# Erros que cada comando de SO já descreve no formato do shell ("cd: x: Not a
+# directory"); os demais aparecem como "Erro ao executar <cmd>: ...". Nos
+# comandos de plugins valem todas as classes de SHELL_ERROR_CLASSES.
+SHELL_ERROR_CLASSES = (FileNotFoundError, FileExistsError, NotADirectoryError,
+                       IsADirectoryError, PermissionError)
+SHELL_STYLE_ERRORS = {
+    'ls': (FileNotFoundError, PermissionError),
+    'cd': (FileNotFoundError, NotADirectoryError, PermissionError),
+    'mkdir': (FileExistsError, PermissionError),
+    'cat': (FileNotFoundError, IsADirectoryError, PermissionError),
+}
+
+# Rótulos das etapas e dos contadores exibidos pelo comando stats
+STATS_STAGE_LABELS = {
+    'lex': 'lex',
+    'parse': 'parse',
+    'execute': 'exec',
+    'network': 'rede',
+    'render': 'saída',
+}
+STATS_COUNTER_LABELS = {
+    # Lidos de /proc/self/io: contam o processo inteiro, não só o comando
+    'read_syscalls': 'syscalls de leitura do processo',
+    'write_syscalls': 'syscalls de escrita do processo',
+    'read_bytes': 'bytes lidos pelo processo',
+    'written_bytes': 'bytes escritos pelo processo',
+    'output_chars': 'caracteres na saída',
+    'requests': 'requisições',
+    'retries': 'novas tentativas',
+    'request_bytes': 'bytes enviados',
+    'response_bytes': 'bytes recebidos',
+}
+
+
+def _with_ai_deadline(func):
+    """
+    Envolve a função de um comando de IA para que todas as suas requisições,
+    com novas tentativas e esperas, respeitem um único prazo (ai.deadline).
+
+    Args:
+        func: Função do comando, chamada como func(terminal, ast)
+
+    Returns:
+        Função com a mesma assinatura
+    """
+    def run(terminal, ast):
+        with terminal.ai_executor.deadline():
+            func(terminal, ast)
+    run.__name__ = func.__name__
+    run.__doc__ = func.__doc__
+    return run
 
 
 class TermIA:
     "Classe principal do TermIA."
     
-    def __init__(self, debug_mode=False, enhanced_mode=True):
-        "Inicializa o TermIA."
-        self.parser = TermIAParser()
+    def __init__(self, debug_mode=False, enhanced_mode=True, plugins=None):
+        """
+        Inicializa o TermIA.
+
+        Args:
+            debug_mode: Exibe tokens e AST de cada comando
+            enhanced_mode: Usa o prompt_toolkit (autocomplete, histórico)
+            plugins: PluginManager a usar (padrão: plugins instalados por entry points)
+        """
         self.executor = CommandExecutor()
-        self.ai_executor = AIExecutor()
+        self.plugins = plugins if plugins is not None else self._discover_plugins()
+        self.ai_config = self.executor.config.get('ai') or {}
+        self.stream_ai = self.ai_config.get('stream', True)
         self.enhanced_mode = enhanced_mode
 
+        # Métricas por comando (etapas, E/S e requisições), exibidas pelo 'stats'
+        metrics_config = self.executor.config.get('metrics') or {}
+        self.metrics = None
+        if metrics_config.get('enabled', True):
+            self.metrics = MetricsRecorder(capacity=metrics_config.get('capacity', 1000))
+        self.metrics_export_path = metrics_config.get('export_path')
+
+        # Parser, executor de IA e jobs são criados no primeiro uso
+        self._parser = None
+        self._ai_executor = None
+        self._jobs = None
+
         # Initialize enhanced input if available
         if enhanced_mode:
             try:
-                self.input_handler = EnhancedInputHandler('.termia_history')
+                from enhanced_input import EnhancedInputHandler
+                # O autocomplete usa o mesmo cache de diretórios do ls e do cd
+                self.input_handler = EnhancedInputHandler('.termia_history',
+                                                          dir_cache=self.executor.dir_cache,
+                                                          plugins=self.plugins)
                 self.history = []  # History managed by input handler
             except Exception as e:
                 print(f"{Fore.YELLOW}Warning: Enhanced mode failed, using basic input: {e}{Style.RESET_ALL}")
@@ -78,10 +186,91 @@ class TermIA:
         else:
             self.history = []
 
+        # Comandos executáveis, indexados pela classe do nó da AST
+        self.commands = self._create_command_registry()
+        # Os comandos de um plugin são registrados quando ele é carregado
+        self.plugins.on_load(self._register_plugin)
+
+        # Índice de busca do histórico do modo básico (criado na primeira busca)
+        self._history_index = None
+        self._history_indexed = 0
+
         self.running = True
         self.current_dir = os.getcwd()
         self.debug_mode = debug_mode
+        self.last_command_failed = False
     
+    def _discover_plugins(self) -> PluginManager:
+        """
+        Procura os plugins instalados (grupo de entry points 'termia.plugins').
+
+        As declarações ficam num manifesto junto das tabelas do parser, então
+        só a primeira execução após instalar ou remover pacotes importa os
+        plugins; nas demais eles são carregados no primeiro uso.
+
+        Returns:
+            Gerenciador de plugins
+        """
+        plugins_config = self.executor.config.get('plugins') or {}
+        manager = PluginManager(cache_dir=default_cache_dir(),
+                                disabled=plugins_config.get('disabled') or ())
+        if plugins_config.get('enabled', True):
+            manager.discover()
+        for error in manager.errors:
+            print(f"{Fore.YELLOW}Aviso: plugin ignorado: {error}{Style.RESET_ALL}")
+        return manager
+
+    def _register_plugin(self, plugin: CommandPlugin):
+        "Registra os comandos de um plugin recém-carregado."
+        for node_class, handler, name in plugin.commands():
+            self.commands.register(node_class, handler, name)
+
+    # ==================== Componentes criados no primeiro uso ====================
+
+    @property
+    def parser(self):
+        "Parser da linguagem (o PLY e as tabelas são carregados no primeiro comando)."
+        if self._parser is None:
+            from parser import TermIAParser
+            self._parser = TermIAParser(plugins=self.plugins)
+        return self._parser
+
+    @property
+    def ai_executor(self):
+        "Executor dos comandos de IA (requests é importado no primeiro comando ia)."
+        if self._ai_executor is None:
+            from ai_executor import DEFAULT_API_URL, AIExecutor, AIException
+            from ai_cache import create_response_cache
+            from ai_resilience import Backoff, circuit_breaker_for
+            config = self.ai_config
+            api_url = config.get('api_url') or DEFAULT_API_URL
+            self._ai_executor = AIExecutor(
+                api_url=api_url,
+                cache=create_response_cache(config.get('cache')),
+                timeout=config.get('timeout', 120),
+                max_retries=config.get('max_retries', 3),
+                deadline=config.get('deadline', 180.0),
+                backoff=Backoff(config.get('backoff_base', 0.5), config.get('backoff_max', 30.0)),
+                circuit_breaker=circuit_breaker_for(
+                    api_url, failure_threshold=config.get('breaker_threshold', 5),
+                    cooldown=config.get('breaker_cooldown', 30.0)),
+                pool_size=config.get('pool_size', 4),
+                idle_timeout=config.get('idle_timeout', 60.0),
+                summary_chunk_tokens=config.get('summary_chunk_tokens', 2000),
+                code_chunk_tokens=config.get('code_chunk_tokens', 1500)
+            )
+            # Só o executor de IA lança AIException
+            self.commands.register_error(AIException, lambda e, name: f"Erro de IA: {e}")
+        return self._ai_executor
+
+    @property
+    def jobs(self):
+        "Gerenciador dos comandos de IA em segundo plano (criado no primeiro uso)."
+        if self._jobs is None:
+            from ai_jobs import AIJobManager
+            self._jobs = AIJobManager(max_concurrency=self.ai_config.get('max_concurrency', 4))
+        return self._jobs
+
     def print_banner(self):
         "Imprime a logo bonita do shell."
         banner = f"""
@@ -164,7 +353,7 @@ class TermIA:
                 print(f"{Fore.GREEN}Comandos disponíveis:{Style.RESET_ALL}")
                 print(f"  • OS: {Fore.CYAN}ls, cd, mkdir, pwd, cat{Style.RESET_ALL}")
                 print(f"  • IA: {Fore.CYAN}ia ask, ia summarize, ia codeexplain, ia translate{Style.RESET_ALL}")
-                print(f"  • Controle: {Fore.CYAN}history, clear, help, exit{Style.RESET_ALL}")
+                print(f"  • Controle: {Fore.CYAN}history, clear, help, jobs, exit{Style.RESET_ALL}")
                 print(f"\n{Fore.YELLOW}Use 'help' para mais informações{Style.RESET_ALL}\n")
                 print(f"{Fore.RED}{'=' * 70}{Style.RESET_ALL}\n")
                 return True
@@ -184,34 +373,70 @@ class TermIA:
 
         return False
 
-    def process_command(self, command: str):
+    def _print_error(self, message: str):
+        """
+        Exibe uma mensagem de erro e marca o comando atual como falho.
+
+        Args:
+            message: Mensagem de erro
+        """
+        self.last_command_failed = True
+        print(f"{Fore.RED}{message}{Style.RESET_ALL}")
+
+    def process_command(self, command: str) -> bool:
         """
         Processa um comando usando o parser.
 
         Args:
             command: String com o comando a ser processado
+
+        Returns:
+            True se o comando foi executado sem erros, False caso contrário
         """
+        self.last_command_failed = False
+
         # Remove espaços extras
         command = command.strip()
 
         # Ignora linhas vazias
         if not command:
-            return
+            return True
 
         # Verifica comandos restritos ANTES de tentar fazer parsing
         if self._check_restricted_command(command):
-            return
+            return False
 
         # Adiciona ao histórico
         self.history.append(command)
 
-        # Faz parsing do comando
+        if self.metrics is None:
+            return self._parse_and_execute(command)
+        record = self.metrics.start(command)
+        ok = False
+        try:
+            ok = self._parse_and_execute(command, record)
+        finally:
+            self.metrics.finish(record, ok)
+        return ok
+
+    def _parse_and_execute(self, command: str, record=None) -> bool:
+        """
+        Faz o parsing do comando e o executa.
+
+        Args:
+            command: Comando sem espaços nas pontas
+            record: CommandRecord que recebe o tempo de cada etapa (ou None)
+
+        Returns:
+            True se o comando foi executado sem erros, False caso contrário
+        """
         try:
-            ast = self.parser.parse(command, debug=self.debug_mode)
+            ast = self.parser.parse(command, debug=self.debug_mode,
+                                    timings=record.stages if record is not None else None)
 
             if ast is None:
                 # O parser ja imprime o erro
-                return
+                return False
 
             # Exibe AST em modo debug
             if self.debug_mode:
@@ -223,103 +448,110 @@ class TermIA:
                 print()
 
             # Executa o comando baseado no tipo da AST
-            self.execute_ast(ast)
+            if record is None:
+                self.execute_ast(ast)
+            else:
+                record.name = self._command_name(ast)
+                # Chamadas de sistema e bytes lidos/escritos só nos comandos de SO
+                with self.metrics.measure(record, io=isinstance(ast, OSCommand)):
+                    self.execute_ast(ast)
 
         except Exception as e:
-            print(f"{Fore.RED}Erro ao processar comando: {e}{Style.RESET_ALL}")
+            self._print_error(f"Erro ao processar comando: {e}")
             if self.debug_mode:
                 import traceback
                 traceback.print_exc()
+
+        return not self.last_command_failed
+
+    def _command_name(self, ast) -> str:
+        "Nome do comando nas métricas (ex: 'ls', 'ia ask', 'ia ask &')."
+        if isinstance(ast, BackgroundCommand):
+            return f"{self._command_name(ast.command)} &"
+        handler = self.commands.get(type(ast))
+        return handler.name if handler is not None else type(ast).__name__
     
     def execute_ast(self, ast):
         """
         Executa um nó da AST.
-        
+
+        O comando é localizado no registro pela classe do nó, e qualquer
+        erro é exibido com a mensagem registrada para o tipo da exceção.
+
         Args:
             ast: Nó da AST a ser executado
         """
-        # Pega o nome da classe para comparação
-        class_name = type(ast).__name__
-        
-        # Comandos de controle já implementados 
-        if class_name == 'ExitCommand':
-            print(f"{Fore.YELLOW}Encerrando TermIA... Até logo!{Style.RESET_ALL}")
-            self.running = False
-            return
-        
-        elif class_name == 'ClearCommand':
-            os.system('clear' if os.name != 'nt' else 'cls')
-            return
-        
-        elif class_name == 'HistoryCommand':
-            self.show_history_ast(ast)
-            return
-        
-        elif class_name == 'HelpCommand':
-            self.show_help_ast(ast)
-            return
-        
-        # Comandos de SO
-        elif class_name == 'PwdCommand':
-            self.execute_pwd()
-            return
-
-        elif class_name == 'LSCommand':
-            self.execute_ls(ast)
-            return
-
-        elif class_name == 'CDCommand':
-            self.execute_cd(ast)
-            return
-
-        elif class_name == 'MkdirCommand':
-            self.execute_mkdir(ast)
+        handler = self.commands.get(type(ast))
+        if handler is None:
+            self._print_error(f"Erro: tipo de comando desconhecido: {type(ast).__name__}")
             return
+        try:
+            handler.func(self, ast)
+        except Exception as e:
+            self._print_error(self.commands.format_error(e, handler.name))
 
-        elif class_name == 'CatCommand':
-            self.execute_cat(ast)
-            return
-        
-        # Comandos de IA
-        elif class_name == 'IAAskCommand':
-            self.execute_ia_ask(ast)
-            return
+    def _create_command_registry(self) -> CommandRegistry:
+        """
+        Cria o registro com os comandos nativos e as mensagens de erro.
 
-        elif class_name == 'IASummarizeCommand':
-            self.execute_ia_summarize(ast)
-            return
+        Plugins e subclasses podem registrar novos nós da AST em
+        self.commands sem alterar execute_ast.
 
-        elif class_name == 'IACodeExplainCommand':
-            self.execute_ia_codeexplain(ast)
-            return
+        Returns:
+            Registro de comandos
+        """
+        registry = CommandRegistry()
+        cls = type(self)
+        builtin_commands = (
+            # Comandos de controle
+            (ExitCommand, cls.execute_exit, 'exit'),
+            (ClearCommand, cls.execute_clear, 'clear'),
+            (HistoryCommand, cls.show_history_ast, 'history'),
+            (HistorySearchCommand, cls.search_history_ast, 'history search'),
+            (HelpCommand, cls.show_help_ast, 'help'),
+            (JobsCommand, cls.execute_jobs, 'jobs'),
+            (StatsCommand, cls.execute_stats, 'stats'),
+            (BackgroundCommand, cls.execute_background, 'comando em segundo plano'),
+            # Comandos de SO
+            (PwdCommand, cls.execute_pwd, 'pwd'),
+            (LSCommand, cls.execute_ls, 'ls'),
+            (CDCommand, cls.execute_cd, 'cd'),
+            (MkdirCommand, cls.execute_mkdir, 'mkdir'),
+            (CatCommand, cls.execute_cat, 'cat'),
+            # Comandos de IA
+            (IAAskCommand, _with_ai_deadline(cls.execute_ia_ask), 'ia ask'),
+            (IASummarizeCommand, _with_ai_deadline(cls.execute_ia_summarize), 'ia summarize'),
+            (IACodeExplainCommand, _with_ai_deadline(cls.execute_ia_codeexplain), 'ia codeexplain'),
+            (IATranslateCommand, _with_ai_deadline(cls.execute_ia_translate), 'ia translate'),
+            (IABatchTranslateCommand, _with_ai_deadline(cls.execute_ia_batch_translate), 'ia translate'),
+        )
+        for node_class, func, name in builtin_commands:
+            registry.register(node_class, func, name)
+
+        # Mensagens de erro: vale a classe registrada mais próxima da exceção
+        registry.register_error(Exception, lambda e, name: f"Erro ao executar {name}: {e}")
+        shell_errors = {name: () for _, _, name in builtin_commands}
+        shell_errors.update(SHELL_STYLE_ERRORS)
+
+        def format_os_error(error: OSError, name: str) -> str:
+            # As mensagens do executor já seguem o formato do shell
+            if isinstance(error, shell_errors.get(name, SHELL_ERROR_CLASSES)):
+                return f"{error}"
+            return f"Erro ao executar {name}: {error}"
+
+        registry.register_error(OSError, format_os_error)
+        registry.register_error(SecurityException, lambda e, name: f"⚠ Erro de Segurança: {e}")
+        return registry
 
-        elif class_name == 'IATranslateCommand':
-            self.execute_ia_translate(ast)
-            return
-        
-        # Comando desconhecido
-        else:
-            print(f"{Fore.RED}Erro: tipo de comando desconhecido: {class_name}{Style.RESET_ALL}")
-    
     def show_history_ast(self, ast: HistoryCommand):
         "Mostra o histórico usando o nó AST."
         n = ast.count
 
-        # Get history from file if enhanced mode
+        # No modo enhanced, lê só os n últimos comandos (do banco, ou do fim
+        # do arquivo de histórico quando o banco não está disponível)
         if self.enhanced_mode:
             try:
-                with open('.termia_history', 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                # FileHistory format: lines with '+' prefix are commands, '#' are timestamps
-                all_history = []
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('+'):
-                        # Remove '+' prefix and add to history
-                        all_history.append(line[1:].strip())
-
-                history_to_show = all_history[-n:]
+                history_to_show = self.input_handler.last_commands(n)
             except Exception:
                 history_to_show = self.history[-n:]
         else:
@@ -330,6 +562,30 @@ class TermIA:
             print(f"{Fore.YELLOW}{i:3d}.{Style.RESET_ALL} {cmd}")
         print()
     
+    def search_history_ast(self, ast: HistorySearchCommand):
+        "Busca no histórico (aproximada, por trigramas) usando o nó AST."
+        if self.enhanced_mode:
+            matches = self.input_handler.rank_history(ast.query, ast.limit)
+        else:
+            # No modo básico o índice acompanha a lista em memória, cujo
+            # último item é a própria busca
+            if self._history_index is None:
+                from history_index import HistoryIndex
+                self._history_index = HistoryIndex()
+            indexed = max(len(self.history) - 1, self._history_indexed)
+            for command in self.history[self._history_indexed:indexed]:
+                self._history_index.add(command)
+            self._history_indexed = indexed
+            matches = self._history_index.search(ast.query, ast.limit)
+
+        if not matches:
+            print(f"{Fore.YELLOW}Nenhum comando encontrado para '{ast.query}'{Style.RESET_ALL}")
+            return
+        print(f"\n{Fore.CYAN}Histórico (busca por '{ast.query}'):{Style.RESET_ALL}")
+        for i, match in enumerate(matches, 1):
+            print(f"{Fore.YELLOW}{i:3d}.{Style.RESET_ALL} {match.command}")
+        print()
+
     def show_help_ast(self, ast: HelpCommand):
         "Mostra ajuda usando o nó AST."
         if ast.command is None:
@@ -342,18 +598,23 @@ class TermIA:
   cd [caminho]                   - Muda de diretório
   mkdir [-p] <dir>               - Cria diretório
   pwd                            - Mostra diretório atual
-  cat <arquivo>                  - Exibe conteúdo de arquivo
+  cat [-n] <arquivo>             - Exibe conteúdo de arquivo
 
 {Fore.YELLOW}Inteligência Artificial:{Style.RESET_ALL}
   ia ask "<pergunta>"            - Faz pergunta à IA (help ask)
   ia summarize "<texto>"         - Resume texto (help summarize)
-  ia codeexplain <arquivo>       - Explica código (help codeexplain)
+  ia summarize --file <arquivo>  - Resume arquivo, mesmo grande (help summarize)
+  ia codeexplain <arquivo|dir>   - Explica código (help codeexplain)
   ia translate "<texto>" --to pt - Traduz texto (help translate)
+  ia translate --file <arq> --to pt - Traduz cada linha do arquivo em lote
 
 {Fore.YELLOW}Controle:{Style.RESET_ALL}
   history [n]                    - Mostra histórico
+  history search <texto>         - Busca aproximada no histórico
   clear                          - Limpa tela
   help [comando]                 - Mostra ajuda detalhada
+  jobs [wait|cancel] [id]        - Gerencia comandos IA em segundo plano
+  stats [n|clear|--export <arq>] - Tempo gasto por etapa em cada comando
   exit                           - Sai do terminal
 
 {Fore.GREEN}Ajuda detalhada:{Style.RESET_ALL}
@@ -370,21 +631,28 @@ class TermIA:
   ia summarize "texto aqui" --length short
   ia codeexplain main.py
   ia translate "Hello" --to pt
+  ia ask "O que é um lexer?" &     (executa em segundo plano)
 
 {Fore.YELLOW}Nota:{Style.RESET_ALL}
   TermIA não suporta shell substitution $(cmd), pipes |, ou redirecionamento >
   Este é um terminal educacional focado em análise léxica e sintática
 """
             print(help_text)
+            plugin_commands = self.plugins.completions()
+            if plugin_commands:
+                print(f"{Fore.YELLOW}Plugins:{Style.RESET_ALL}")
+                for name, info in sorted(plugin_commands.items()):
+                    print(f"  {name:<30s} - {info.get('description', '')}")
+                print()
         else:
             # Ajuda específica
             cmd = ast.command
             helps = {
-                'ls': 'ls [opções] [caminho]\n  Lista arquivos e diretórios\n  Opções: -a (todos), -l (detalhado), -h (legível)',
+                'ls': 'ls [opções] [caminho]\n  Lista arquivos e diretórios\n  Opções: -a (todos), -l (detalhado), -h (legível), -R (recursivo), -U (sem ordenar)\n  --max-depth N: desce no máximo N níveis (implica -R)\n  --limit N / --offset M: mostra N entradas a partir da M-ésima\n  --pager: pausa a cada tela',
                 'cd': 'cd [caminho]\n  Muda o diretório de trabalho\n  Exemplos: cd .., cd ~, cd /home',
                 'mkdir': 'mkdir [-p] <diretório>\n  Cria um novo diretório\n  -p: cria diretórios pais se necessário',
                 'pwd': 'pwd\n  Mostra o diretório de trabalho atual',
-                'cat': 'cat <arquivo>\n  Exibe o conteúdo de um arquivo',
+                'cat': 'cat [-n] <arquivo>\n  Exibe o conteúdo de um arquivo\n  -n: numera as linhas\n  Arquivos binários mostram apenas o tamanho',
                 'ia': '''ia <subcomando>
   Comandos de IA disponíveis:
 
@@ -393,12 +661,14 @@ class TermIA:
     Exemplo: ia ask "O que é Python?"
 
   ia summarize "<texto>" [--length short|medium|long]
-    Resume um texto fornecido
+  ia summarize --file <arquivo> [--length short|medium|long]
+    Resume um texto fornecido ou o conteúdo de um arquivo
     Exemplo: ia summarize "texto longo aqui" --length short
 
-  ia codeexplain <arquivo>
-    Explica o código de um arquivo
+  ia codeexplain <arquivo|diretório|padrão>
+    Explica o código de um arquivo, de um diretório ou de um glob
     Exemplo: ia codeexplain main.py
+    Exemplo: ia codeexplain src/*.py
     NOTA: Requer um caminho de arquivo, não uma string
 
   ia translate "<texto>" --to <idioma>
@@ -406,10 +676,13 @@ class TermIA:
     Exemplo: ia translate "Hello world" --to pt
     Idiomas: pt, en, es, fr, de, it, ja, zh
 
+  ia translate "<texto1>" "<texto2>" ... --to <idioma>
+  ia translate --file <arquivo> --to <idioma>
+    Traduz vários textos (ou cada linha do arquivo) em lote
+
   IMPORTANTE:
     TermIA não suporta shell substitution como $(cat file)
-    Para resumir conteúdo de arquivo, use ia codeexplain
-    ou copie e cole o texto diretamente
+    Para resumir conteúdo de arquivo, use ia summarize --file
 
   Para ajuda detalhada: help ask, help summarize, etc.''',
                 # IA Subcommands
@@ -434,6 +707,7 @@ class TermIA:
   SINTAXE:
     ia summarize "<texto a resumir>"
     ia summarize "<texto a resumir>" --length <tamanho>
+    ia summarize --file <arquivo> [--length <tamanho>]
 
   OPÇÕES:
     --length short   - Resumo curto (2-3 frases)
@@ -444,26 +718,42 @@ class TermIA:
     ia summarize "Python é uma linguagem..." --length short
     ia summarize "Este texto fala sobre compiladores..."
 
+  TEXTOS GRANDES:
+    Textos e arquivos grandes são divididos em partes resumidas em
+    paralelo; os resumos parciais são então combinados. Ao resumir
+    de novo um arquivo com poucas alterações, as partes que não
+    mudaram vêm do cache.
+
   NOTAS:
     • O texto deve estar entre aspas
-    • Não use $(cat arquivo) - não é suportado
+    • Não use $(cat arquivo) - use --file arquivo
     • Para arquivos de código, use: ia codeexplain arquivo''',
-                'codeexplain': '''ia codeexplain <arquivo>
-  Explica o código de um arquivo
+                'codeexplain': '''ia codeexplain <arquivo|diretório|padrão>
+  Explica o código de um arquivo, de um diretório ou de um glob
 
   SINTAXE:
     ia codeexplain <caminho_do_arquivo>
+    ia codeexplain <diretório>
+    ia codeexplain <padrão com * ou ?>
 
   EXEMPLOS:
     ia codeexplain main.py
     ia codeexplain src/parser.py
     ia codeexplain ../outro_arquivo.py
+    ia codeexplain src
+    ia codeexplain src/*.py
+
+  ARQUIVOS GRANDES:
+    O código é dividido em partes nos limites de funções e classes
+    (Python via ast, outras linguagens por heurística). As partes são
+    explicadas em paralelo e as explicações combinadas. Partes que
+    não mudaram desde a última vez vêm do cache.
 
   NOTAS:
     • NÃO use aspas em volta do nome do arquivo
     • O arquivo deve existir no sistema
     • Suporta caminhos relativos e absolutos
-    • Código truncado em 2000 caracteres para evitar limites
+    • Diretórios incluem arquivos de código em subdiretórios (até 50)
     • Saída otimizada para terminal (sem markdown)
 
   ERROS COMUNS:
@@ -475,6 +765,13 @@ class TermIA:
 
   SINTAXE:
     ia translate "<texto a traduzir>" --to <código_idioma>
+    ia translate "<texto1>" "<texto2>" ... --to <código_idioma>
+    ia translate --file <arquivo> --to <código_idioma>
+
+  LOTE:
+    Vários textos, ou um arquivo com um texto por linha, são agrupados
+    em poucas requisições enviadas em paralelo. As traduções saem
+    uma por linha, na mesma ordem da entrada.
 
   IDIOMAS SUPORTADOS:
     pt - Português    en - Inglês      es - Espanhol
@@ -486,154 +783,480 @@ class TermIA:
     ia translate "Hello world" --to pt
     ia translate "Bom dia" --to en
     ia translate "Good morning" --to es
+    ia translate "Abrir" "Salvar" "Fechar" --to en
+    ia translate --file strings.txt --to pt
 
   NOTAS:
     • O texto deve estar entre aspas
     • O código do idioma usa 2 letras
     • Apenas a tradução é retornada (sem explicações)
     • Não suporta shell substitution $(cmd)''',
-                'history': 'history [n]\n  Mostra os últimos n comandos (padrão: 10)',
+                'history': '''history [n]
+history search <texto>
+  Mostra os últimos n comandos (padrão: 10)
+
+  BUSCA:
+    history search git commit  - Comandos parecidos com o texto
+    history search "ls -la"    - Aspas preservam o texto exato
+
+  NOTAS:
+    • Tolera pequenos erros de digitação
+    • Resultados ordenados por semelhança e por uso recente
+    • Comandos repetidos aparecem uma vez só''',
                 'clear': 'clear\n  Limpa a tela do terminal',
                 'help': 'help [comando]\n  Mostra ajuda geral ou sobre um comando específico\n  Também funciona com subcomandos: help ask, help translate',
-                'exit': 'exit\n  Encerra o TermIA'
+                'exit': 'exit\n  Encerra o TermIA',
+                'jobs': '''jobs [wait|cancel] [id]
+  Gerencia comandos de IA executados em segundo plano
+
+  SINTAXE:
+    ia <subcomando> ... &    - Executa o comando IA em segundo plano
+    jobs                     - Lista os jobs e seus estados
+    jobs wait [id]           - Aguarda um job (ou todos) e mostra o resultado
+    jobs cancel <id>         - Cancela um job em execução
+
+  EXEMPLOS:
+    ia ask "O que é um parser LALR?" &
+    ia codeexplain src/lexer.py &
+    jobs wait 1
+
+  NOTAS:
+    • O prompt continua livre enquanto a IA responde
+    • Resultados prontos são exibidos antes do próximo prompt
+    • O número de requisições simultâneas vem de ai.max_concurrency no config.yaml''',
+                'stats': '''stats [n | clear | --export <arquivo>]
+  Mostra quanto tempo os comandos gastam em cada etapa
+
+  SINTAXE:
+    stats                    - Resumo por comando: execuções, erros, p50/p95/máximo
+                               e a média de cada etapa
+    stats <n>                - Os últimos n comandos, com etapas e contadores
+    stats clear              - Apaga as métricas
+    stats --export <arquivo> - Grava as métricas no formato texto do Prometheus
+
+  ETAPAS (em ms):
+    lex      - Análise léxica
+    parse    - Análise sintática
+    exec     - Execução, sem a rede e a saída
+    rede     - Requisições à IA, inclusive esperas entre tentativas
+    saída    - Escrita do resultado no terminal
+
+  CONTADORES:
+    Comandos de SO: chamadas de sistema de leitura/escrita e bytes (Linux),
+                    do processo inteiro enquanto o comando roda, inclusive
+                    jobs de IA em segundo plano
+    Comandos de IA: requisições, novas tentativas e bytes enviados/recebidos
+
+  NOTAS:
+    • Ficam guardados os últimos metrics.capacity comandos (padrão: 1000)
+    • Com metrics.export_path no config.yaml, o arquivo é gravado ao sair'''
             }
             
             # Normalize command name (lowercase)
             cmd_lower = cmd.lower() if isinstance(cmd, str) else str(cmd).lower()
 
+            plugin_help = self.plugins.help_text(cmd_lower)
             if cmd_lower in helps:
                 print(f"\n{Fore.CYAN}{helps[cmd_lower]}{Style.RESET_ALL}\n")
+            elif plugin_help is not None:
+                print(f"\n{Fore.CYAN}{plugin_help}{Style.RESET_ALL}\n")
             else:
                 print(f"\n{Fore.RED}Comando '{cmd}' não encontrado{Style.RESET_ALL}")
                 print(f"\n{Fore.YELLOW}Comandos disponíveis:{Style.RESET_ALL}")
                 print(f"  OS: ls, cd, mkdir, pwd, cat")
                 print(f"  IA: ask, summarize, codeexplain, translate")
-                print(f"  Controle: history, clear, help, exit")
+                print(f"  Controle: history, clear, help, jobs, stats, exit")
                 print(f"\n{Fore.CYAN}Dica:{Style.RESET_ALL} Use 'help' para ver a lista completa")
                 print(f"{Fore.CYAN}      Para comandos IA: help ask, help translate, etc.{Style.RESET_ALL}\n")
 
     # ==================== Executores de Comandos do SO ====================
 
-    def execute_pwd(self):
+    def execute_exit(self, ast: ExitCommand):
+        """Encerra o TermIA."""
+        print(f"{Fore.YELLOW}Encerrando TermIA... Até logo!{Style.RESET_ALL}")
+        self.running = False
+
+    def execute_clear(self, ast: ClearCommand):
+        """Limpa a tela."""
+        os.system('clear' if os.name != 'nt' else 'cls')
+
+    def execute_pwd(self, ast: PwdCommand):
         """Executa o comando pwd."""
-        try:
-            result = self.executor.execute_pwd()
-            print(f"{Fore.CYAN}{result}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar pwd: {e}{Style.RESET_ALL}")
+        result = self.executor.execute_pwd()
+        print(f"{Fore.CYAN}{result}{Style.RESET_ALL}")
 
     def execute_ls(self, ast: LSCommand):
         """Executa o comando ls."""
+        # As linhas são impressas à medida que são geradas (-R, -U, --limit)
+        lines = self.executor.stream_ls(options=ast.options, path=ast.path,
+                                        max_depth=ast.max_depth, limit=ast.limit,
+                                        offset=ast.offset)
+        if ast.pager:
+            self._print_paged(lines)
+        else:
+            for line in lines:
+                print(line)
+
+    def _print_paged(self, lines):
+        """
+        Imprime linhas uma tela por vez (ls --pager).
+
+        Fora de um terminal interativo, imprime tudo sem pausar.
+
+        Args:
+            lines: Iterador de linhas; é fechado se o usuário sair antes do fim
+        """
+        if not (sys.stdin.isatty() and sys.stdout.isatty()):
+            for line in lines:
+                print(line)
+            return
+        page_size = max(shutil.get_terminal_size().lines - 1, 1)
+        shown = 0
         try:
-            result = self.executor.execute_ls(options=ast.options, path=ast.path)
-            print(result)
-        except SecurityException as e:
-            print(f"{Fore.RED}⚠ Erro de Segurança: {e}{Style.RESET_ALL}")
-        except FileNotFoundError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except PermissionError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar ls: {e}{Style.RESET_ALL}")
+            for line in lines:
+                print(line)
+                shown += 1
+                if shown < page_size:
+                    continue
+                try:
+                    answer = input(f"{Fore.YELLOW}-- mais -- (Enter: continuar, q: sair){Style.RESET_ALL} ")
+                except EOFError:
+                    break
+                if answer.strip().lower() == 'q':
+                    break
+                shown = 0
+        finally:
+            close = getattr(lines, 'close', None)
+            if close is not None:
+                close()
 
     def execute_cd(self, ast: CDCommand):
         """Executa o comando cd."""
-        try:
-            result = self.executor.execute_cd(path=ast.path)
-            # Atualiza o current_dir do TermIA também
-            self.current_dir = self.executor.current_dir
-            print(f"{Fore.GREEN}{result}{Style.RESET_ALL}")
-        except SecurityException as e:
-            print(f"{Fore.RED}⚠ Erro de Segurança: {e}{Style.RESET_ALL}")
-        except FileNotFoundError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except NotADirectoryError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except PermissionError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar cd: {e}{Style.RESET_ALL}")
+        result = self.executor.execute_cd(path=ast.path)
+        # Atualiza o current_dir do TermIA também
+        self.current_dir = self.executor.current_dir
+        print(f"{Fore.GREEN}{result}{Style.RESET_ALL}")
 
     def execute_mkdir(self, ast: MkdirCommand):
         """Executa o comando mkdir."""
-        try:
-            result = self.executor.execute_mkdir(path=ast.path, create_parents=ast.create_parents)
-            print(f"{Fore.GREEN}{result}{Style.RESET_ALL}")
-        except SecurityException as e:
-            print(f"{Fore.RED}⚠ Erro de Segurança: {e}{Style.RESET_ALL}")
-        except FileExistsError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except PermissionError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar mkdir: {e}{Style.RESET_ALL}")
+        result = self.executor.execute_mkdir(path=ast.path, create_parents=ast.create_parents)
+        print(f"{Fore.GREEN}{result}{Style.RESET_ALL}")
 
     def execute_cat(self, ast: CatCommand):
-        """Executa o comando cat."""
-        try:
-            result = self.executor.execute_cat(filepath=ast.filepath)
-            print(result)
-        except SecurityException as e:
-            print(f"{Fore.RED}⚠ Erro de Segurança: {e}{Style.RESET_ALL}")
-        except FileNotFoundError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except IsADirectoryError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except PermissionError as e:
-            print(f"{Fore.RED}{e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar cat: {e}{Style.RESET_ALL}")
+        """Executa o comando cat, copiando o arquivo para a saída em blocos."""
+        last = ''
+        for block in self.executor.stream_cat(filepath=ast.filepath, number_lines=ast.number_lines):
+            sys.stdout.write(block)
+            last = block
+        # Mantém o prompt em uma nova linha, como o print fazia
+        if not last.endswith('\n'):
+            sys.stdout.write('\n')
+        sys.stdout.flush()
 
     # ==================== Executores de Comandos de IA ====================
 
+    def _print_stream(self, lines, color: str = ''):
+        """
+        Imprime as linhas de uma resposta da IA assim que chegam.
+
+        Args:
+            lines: Iterável de linhas já sem markdown
+            color: Cor aplicada a cada linha
+        """
+        for line in lines:
+            print(f"{color}{line}{Style.RESET_ALL}", flush=True)
+
     def execute_ia_ask(self, ast: IAAskCommand):
         """Executa o comando ia ask."""
-        try:
-            print(f"{Fore.YELLOW}[IA] Processando pergunta...{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}[IA] Processando pergunta...{Style.RESET_ALL}")
+        if self.stream_ai:
+            self._print_stream(self.ai_executor.stream_ia_ask(ast.question), Fore.CYAN)
+        else:
             result = self.ai_executor.execute_ia_ask(ast.question)
             print(f"{Fore.CYAN}{result}{Style.RESET_ALL}")
-        except AIException as e:
-            print(f"{Fore.RED}Erro de IA: {e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar ia ask: {e}{Style.RESET_ALL}")
+
+    def _print_progress(self, stage: str, done: int, total: int):
+        """
+        Mostra o progresso de comandos de IA divididos em partes.
+
+        A linha é reescrita no lugar, então só aparece em terminais interativos.
+
+        Args:
+            stage: 'chunks' (resumo das partes), 'combine' (combinação dos resumos)
+                ou 'explain' (explicação das partes do código)
+            done: Partes concluídas
+            total: Total de partes
+        """
+        if not sys.stdout.isatty():
+            return
+        labels = {
+            'chunks': 'Resumindo partes',
+            'combine': 'Combinando resumos',
+            'explain': 'Analisando partes do codigo',
+        }
+        label = labels.get(stage, stage)
+        end = '\n' if done == total else ''
+        print(f"\r{Fore.YELLOW}[IA] {label}: {done}/{total}{Style.RESET_ALL}", end=end, flush=True)
 
     def execute_ia_summarize(self, ast: IASummarizeCommand):
-        """Executa o comando ia summarize."""
-        try:
+        """Executa o comando ia summarize (texto ou --file)."""
+        if ast.filepath:
+            print(f"{Fore.YELLOW}[IA] Resumindo '{ast.filepath}' (tamanho: {ast.length})...{Style.RESET_ALL}")
+            filepath = os.path.join(self.executor.current_dir, ast.filepath)
+            if self.stream_ai:
+                lines = self.ai_executor.stream_ia_summarize_file(filepath, ast.length, self._print_progress)
+            else:
+                result = self.ai_executor.execute_ia_summarize_file(filepath, ast.length, self._print_progress)
+        else:
             print(f"{Fore.YELLOW}[IA] Resumindo texto (tamanho: {ast.length})...{Style.RESET_ALL}")
-            result = self.ai_executor.execute_ia_summarize(ast.text, ast.length)
-            print(f"{Fore.CYAN}Resumo:{Style.RESET_ALL}")
+            if self.stream_ai:
+                lines = self.ai_executor.stream_ia_summarize(ast.text, ast.length, self._print_progress)
+            else:
+                result = self.ai_executor.execute_ia_summarize(ast.text, ast.length, self._print_progress)
+        print(f"{Fore.CYAN}Resumo:{Style.RESET_ALL}")
+        if self.stream_ai:
+            self._print_stream(lines)
+        else:
             print(f"{result}")
-        except AIException as e:
-            print(f"{Fore.RED}Erro de IA: {e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar ia summarize: {e}{Style.RESET_ALL}")
 
     def execute_ia_codeexplain(self, ast: IACodeExplainCommand):
         """Executa o comando ia codeexplain."""
-        try:
-            print(f"{Fore.YELLOW}[IA] Analisando codigo em '{ast.filepath}'...{Style.RESET_ALL}")
-            # Resolve path relative to executor's current dir
-            filepath = os.path.join(self.executor.current_dir, ast.filepath)
-            result = self.ai_executor.execute_ia_codeexplain(filepath)
+        print(f"{Fore.YELLOW}[IA] Analisando codigo em '{ast.filepath}'...{Style.RESET_ALL}")
+        # Resolve path relative to executor's current dir
+        filepath = os.path.join(self.executor.current_dir, ast.filepath)
+        if self.stream_ai:
+            lines = self.ai_executor.stream_ia_codeexplain(filepath, self._print_progress)
+            print(f"{Fore.CYAN}Explicacao do codigo:{Style.RESET_ALL}")
+            self._print_stream(lines)
+        else:
+            result = self.ai_executor.execute_ia_codeexplain(filepath, self._print_progress)
             print(f"{Fore.CYAN}Explicacao do codigo:{Style.RESET_ALL}")
             print(f"{result}")
-        except AIException as e:
-            print(f"{Fore.RED}Erro de IA: {e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar ia codeexplain: {e}{Style.RESET_ALL}")
 
     def execute_ia_translate(self, ast: IATranslateCommand):
         """Executa o comando ia translate."""
-        try:
-            print(f"{Fore.YELLOW}[IA] Traduzindo para {ast.target_language}...{Style.RESET_ALL}")
-            result = self.ai_executor.execute_ia_translate(ast.text, ast.target_language)
-            print(f"{Fore.CYAN}Traducao:{Style.RESET_ALL}")
-            print(f"{result}")
-        except AIException as e:
-            print(f"{Fore.RED}Erro de IA: {e}{Style.RESET_ALL}")
-        except Exception as e:
-            print(f"{Fore.RED}Erro ao executar ia translate: {e}{Style.RESET_ALL}")
+        print(f"{Fore.YELLOW}[IA] Traduzindo para {ast.target_language}...{Style.RESET_ALL}")
+        result = self.ai_executor.execute_ia_translate(ast.text, ast.target_language)
+        print(f"{Fore.CYAN}Traducao:{Style.RESET_ALL}")
+        print(f"{result}")
+
+    def _translate_batch(self, ast: IABatchTranslateCommand) -> list:
+        """Traduz os textos (ou as linhas do arquivo) de um comando em lote."""
+        if ast.filepath:
+            filepath = os.path.join(self.executor.current_dir, ast.filepath)
+            return self.ai_executor.execute_ia_translate_file(filepath, ast.target_language)
+        return self.ai_executor.execute_ia_translate_batch(ast.texts, ast.target_language)
+
+    def execute_ia_batch_translate(self, ast: IABatchTranslateCommand):
+        """Executa o comando ia translate em lote (vários textos ou --file)."""
+        source = f"'{ast.filepath}'" if ast.filepath else f"{len(ast.texts)} textos"
+        print(f"{Fore.YELLOW}[IA] Traduzindo {source} para {ast.target_language}...{Style.RESET_ALL}")
+        results = self._translate_batch(ast)
+        print(f"{Fore.CYAN}Traducoes:{Style.RESET_ALL}")
+        for result in results:
+            print(result)
+
+    # ==================== Jobs em Segundo Plano ====================
+
+    def execute_background(self, ast: BackgroundCommand):
+        """Executa um comando de IA em segundo plano (comando terminado em '&')."""
+        command = ast.command
+        if isinstance(command, IAAskCommand):
+            job = self._submit_ai_job(f'ia ask "{command.question}"',
+                                   self.ai_executor.execute_ia_ask, command.question)
+        elif isinstance(command, IASummarizeCommand) and command.filepath:
+            filepath = os.path.join(self.executor.current_dir, command.filepath)
+            job = self._submit_ai_job(f'ia summarize --file {command.filepath} --length {command.length}',
+                                   self.ai_executor.execute_ia_summarize_file, filepath, command.length)
+        elif isinstance(command, IASummarizeCommand):
+            job = self._submit_ai_job(f'ia summarize --length {command.length}',
+                                   self.ai_executor.execute_ia_summarize, command.text, command.length)
+        elif isinstance(command, IACodeExplainCommand):
+            filepath = os.path.join(self.executor.current_dir, command.filepath)
+            job = self._submit_ai_job(f'ia codeexplain {command.filepath}',
+                                   self.ai_executor.execute_ia_codeexplain, filepath)
+        elif isinstance(command, IABatchTranslateCommand):
+            source = command.filepath or f"{len(command.texts)} textos"
+            job = self._submit_ai_job(f'ia translate {source} --to {command.target_language}',
+                                   lambda: '\n'.join(self._translate_batch(command)))
+        elif isinstance(command, IATranslateCommand):
+            job = self._submit_ai_job(f'ia translate --to {command.target_language}',
+                                   self.ai_executor.execute_ia_translate,
+                                   command.text, command.target_language)
+        else:
+            self._print_error(f"Erro: '{type(command).__name__}' não pode ser executado em segundo plano")
+            return
+        print(f"{Fore.YELLOW}[{job.id}] {job.description}{Style.RESET_ALL}")
+
+    def _submit_ai_job(self, description: str, func, *args):
+        """
+        Inicia um job de IA com o prazo total de um comando (ai.deadline).
+
+        Args:
+            description: Texto exibido ao listar o job
+            func: Função que faz as requisições
+            *args: Argumentos de func
+
+        Returns:
+            O job criado
+        """
+        ai_executor = self.ai_executor
+
+        def run():
+            with ai_executor.deadline():
+                return func(*args)
+        return self.jobs.submit(description, run)
+
+    def execute_jobs(self, ast: JobsCommand):
+        """Executa o comando jobs (listar, aguardar ou cancelar)."""
+        from ai_jobs import AIJob
+        if ast.action == 'list':
+            self.show_jobs()
+        elif ast.action == 'wait':
+            ids = [ast.job_id] if ast.job_id is not None else [job.id for job in self.jobs.list_jobs()]
+            for job_id in ids:
+                try:
+                    job = self.jobs.wait(job_id)
+                except KeyError:
+                    self._print_error(f"Erro: job {job_id} não encontrado")
+                    continue
+                except KeyboardInterrupt:
+                    print(f"\n{Fore.YELLOW}Job {job_id} continua em segundo plano{Style.RESET_ALL}")
+                    return
+                if not job.reported:
+                    job.reported = True
+                    self._report_job(job)
+                if job.status == AIJob.FAILED:
+                    self.last_command_failed = True
+                self.jobs.forget(job.id)
+        elif ast.action == 'cancel':
+            if ast.job_id is None:
+                self._print_error("Erro: informe o job a cancelar. Uso: jobs cancel <id>")
+            else:
+                try:
+                    if self.jobs.cancel(ast.job_id):
+                        self.jobs.get(ast.job_id).reported = True
+                        print(f"{Fore.YELLOW}[{ast.job_id}] cancelado{Style.RESET_ALL}")
+                    else:
+                        print(f"{Fore.YELLOW}[{ast.job_id}] já havia terminado{Style.RESET_ALL}")
+                except KeyError:
+                    self._print_error(f"Erro: job {ast.job_id} não encontrado")
+        else:
+            self._print_error(f"Erro: ação desconhecida '{ast.action}'. Uso: jobs [wait|cancel] [id]")
+
+    def show_jobs(self):
+        """Lista os jobs em segundo plano e seus estados."""
+        jobs = self.jobs.list_jobs()
+        if not jobs:
+            print(f"{Fore.YELLOW}Nenhum job em segundo plano{Style.RESET_ALL}")
+            return
+        for job in jobs:
+            print(f"{Fore.YELLOW}[{job.id}]{Style.RESET_ALL} {job.status:<10s} "
+                  f"{job.elapsed:6.1f} s  {job.description}")
+
+    def _report_job(self, job: 'AIJob'):
+        """Exibe o resultado de um job terminado."""
+        from ai_jobs import AIJob
+        header = f"[{job.id}] {job.status}: {job.description} ({job.elapsed:.1f} s)"
+        if job.status == AIJob.DONE:
+            print(f"{Fore.GREEN}{header}{Style.RESET_ALL}")
+            print(f"{Fore.CYAN}{job.result}{Style.RESET_ALL}")
+        elif job.status == AIJob.FAILED:
+            print(f"{Fore.RED}{header}{Style.RESET_ALL}")
+            print(f"{Fore.RED}Erro de IA: {job.error}{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.YELLOW}{header}{Style.RESET_ALL}")
+
+    def report_finished_jobs(self):
+        """Exibe os jobs que terminaram desde o último prompt."""
+        if self._jobs is None:
+            return
+        for job in self.jobs.pop_unreported():
+            self._report_job(job)
+            self.jobs.forget(job.id)
+
+    # ==================== Métricas ====================
+
+    def execute_stats(self, ast: StatsCommand):
+        """Executa o comando stats (resumo, últimos comandos, limpar ou exportar)."""
+        if self.metrics is None:
+            self._print_error("Erro: métricas desativadas (metrics.enabled no config.yaml)")
+        elif ast.action == 'summary':
+            self.show_stats_summary()
+        elif ast.action == 'recent':
+            self.show_recent_stats(ast.count)
+        elif ast.action == 'clear':
+            self.metrics.clear()
+            print(f"{Fore.YELLOW}Métricas apagadas{Style.RESET_ALL}")
+        elif ast.action == 'export':
+            path = os.path.join(self.executor.current_dir, os.path.expanduser(ast.path))
+            self.export_metrics(path)
+            print(f"{Fore.GREEN}Métricas exportadas para {path}{Style.RESET_ALL}")
+        else:
+            self._print_error(f"Erro: ação desconhecida '{ast.action}'. "
+                              f"Uso: stats [n | clear | --export <arquivo>]")
+
+    def show_stats_summary(self):
+        """Mostra, por comando, execuções, erros, percentis do tempo total e a média de cada etapa."""
+        summaries = self.metrics.summary()
+        if not summaries:
+            print(f"{Fore.YELLOW}Nenhum comando medido ainda{Style.RESET_ALL}")
+            return
+        print(f"{Fore.CYAN}Últimos {len(self.metrics)} comandos (tempos em ms; etapas são médias):{Style.RESET_ALL}")
+        header = f"  {'comando':<22} {'n':>5} {'erros':>5} {'p50':>9} {'p95':>9} {'máx':>9} "
+        header += ' '.join(f"{label:>8}" for label in STATS_STAGE_LABELS.values())
+        print(f"{Fore.YELLOW}{header}{Style.RESET_ALL}")
+        for item in summaries:
+            line = (f"  {item.name:<22} {item.count:>5} {item.errors:>5} {item.p50 * 1000:>9.2f} "
+                    f"{item.p95 * 1000:>9.2f} {item.max * 1000:>9.2f} ")
+            line += ' '.join(f"{item.stages[stage] * 1000:>8.2f}" if stage in item.stages else f"{'-':>8}"
+                             for stage in STATS_STAGE_LABELS)
+            print(line)
+
+    def show_recent_stats(self, count: int):
+        """Mostra as etapas e os contadores dos últimos comandos."""
+        records = self.metrics.recent(count)
+        if not records:
+            print(f"{Fore.YELLOW}Nenhum comando medido ainda{Style.RESET_ALL}")
+            return
+        for record in records:
+            status = f"{Fore.GREEN}ok  {Style.RESET_ALL}" if record.ok else f"{Fore.RED}erro{Style.RESET_ALL}"
+            stages = '  '.join(f"{label} {record.stages[stage] * 1000:.2f}"
+                               for stage, label in STATS_STAGE_LABELS.items() if stage in record.stages)
+            print(f"  {record.total * 1000:>9.2f} ms {status} {record.line}")
+            print(f"               {stages}  cpu {record.cpu * 1000:.2f}")
+            counters = ', '.join(f"{STATS_COUNTER_LABELS.get(name, name)}: {value}"
+                                 for name, value in record.counters.items())
+            if counters:
+                print(f"               {counters}")
+
+    def export_metrics(self, path: str):
+        """
+        Grava as métricas no formato texto do Prometheus, com as do circuit
+        breaker da IA se ela já foi usada.
+
+        Args:
+            path: Arquivo de destino
+        """
+        resilience = self._ai_executor.resilience_stats() if self._ai_executor is not None else None
+        self.metrics.export(path, resilience)
+
+    def close(self):
+        "Libera recursos (jobs em segundo plano, conexões HTTP e cache de respostas da IA, cache de diretórios e histórico)."
+        if self.metrics is not None and self.metrics_export_path:
+            try:
+                self.export_metrics(self.metrics_export_path)
+            except OSError as e:
+                print(f"{Fore.YELLOW}Aviso: não foi possível exportar as métricas: {e}{Style.RESET_ALL}")
+        if self._jobs is not None:
+            self._jobs.shutdown()
+        if self._ai_executor is not None:
+            self._ai_executor.close()
+            if self._ai_executor.cache is not None:
+                self._ai_executor.cache.close()
+        self.executor.close()
+        if self.enhanced_mode:
+            self.input_handler.close()
 
     def run(self):
         "Loop principal do terminal."
@@ -641,14 +1264,19 @@ class TermIA:
 
         while self.running:
             try:
+                # Mostra resultados de jobs que terminaram em segundo plano
+                self.report_finished_jobs()
+
                 # Lê comando do usuário (com ou sem enhanced mode)
                 if self.enhanced_mode:
                     command = self.input_handler.get_input(self.get_prompt())
                 else:
                     command = input(self.get_prompt())
 
-                # Processa comando
-                self.process_command(command)
+                # Processa comando e registra no histórico com status e duração
+                started = time.time()
+                ok = self.process_command(command)
+                self._record_history(command, started, ok)
 
             except KeyboardInterrupt:
                 # Ctrl+C
@@ -662,6 +1290,89 @@ class TermIA:
                     import traceback
                     traceback.print_exc()
 
+    def _record_history(self, command: str, started: float, ok: bool):
+        """
+        Grava o comando no banco de histórico (apenas no modo enhanced).
+
+        Args:
+            command: Linha digitada
+            started: Momento em que o comando começou
+            ok: Se o comando terminou sem erros
+        """
+        command = command.strip()
+        if not command or not self.enhanced_mode:
+            return
+        try:
+            self.input_handler.record(command, started, time.time() - started, 0 if ok else 1)
+        except Exception as e:
+            if self.debug_mode:
+                print(f"{Fore.YELLOW}Aviso: não foi possível gravar o histórico: {e}{Style.RESET_ALL}")
+
+    def run_script(self, stream, stop_on_error: bool = False, status_stream=None) -> int:
+        """
+        Executa comandos lidos de um arquivo ou stdin, sem banner nem prompt.
+
+        As linhas são processadas uma a uma conforme são lidas, então a entrada
+        não precisa caber em memória. Linhas vazias e comentários (#) são ignorados.
+        O status de cada comando e o resumo final vão para status_stream
+        (stderr por padrão), mantendo stdout apenas com a saída dos comandos.
+
+        Args:
+            stream: Iterável de linhas (arquivo aberto, sys.stdin, lista)
+            stop_on_error: Se True, para no primeiro comando com erro
+            status_stream: Destino do status por comando e do resumo
+
+        Returns:
+            Código de saída: 0 se todos os comandos tiveram sucesso, 1 caso contrário
+        """
+        status_stream = status_stream or sys.stderr
+        total = failed = 0
+        start = time.perf_counter()
+
+        for lineno, line in enumerate(stream, 1):
+            command = line.strip()
+            if not command or command.startswith('#'):
+                continue
+
+            total += 1
+            cmd_start = time.perf_counter()
+            ok = self.process_command(command)
+            elapsed_ms = (time.perf_counter() - cmd_start) * 1000
+            if not ok:
+                failed += 1
+
+            sys.stdout.flush()
+            status = 'ok' if ok else 'ERRO'
+            status_stream.write(f"[{status}] linha {lineno}: {command} ({elapsed_ms:.2f} ms)\n")
+
+            if (not ok and stop_on_error) or not self.running:
+                break
+
+        # Resultados de jobs em segundo plano saem antes do resumo
+        jobs_failed = False
+        if self._jobs is not None and self._jobs.list_jobs():
+            self.last_command_failed = False
+            self.execute_jobs(JobsCommand(action='wait'))
+            jobs_failed = self.last_command_failed
+
+        elapsed = time.perf_counter() - start
+        throughput = total / elapsed if elapsed > 0 else 0.0
+        status_stream.write(
+            f"{total} comandos, {total - failed} ok, {failed} com erro "
+            f"em {elapsed:.3f} s ({throughput:.1f} comandos/s)\n"
+        )
+        status_stream.flush()
+        return 1 if failed or jobs_failed else 0
+
+
+def _get_option_value(option: str):
+    "Retorna o valor que segue uma opção na linha de comando (ou None)."
+    if option in sys.argv:
+        index = sys.argv.index(option)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return None
+
 
 def main():
     "Função principal."
@@ -676,9 +1387,12 @@ TermIA - Terminal Inteligente
 Uso: python main.py [opções]
 
 Opções:
-  --debug, -d    Ativa modo debug (mostra tokens e AST)
-  --help, -h     Mostra esta mensagem
-  --version, -v  Mostra versão
+  --debug, -d        Ativa modo debug (mostra tokens e AST)
+  --help, -h         Mostra esta mensagem
+  --version, -v      Mostra versão
+  --script ARQUIVO   Executa os comandos do arquivo (um por linha) e sai
+  --stdin            Executa os comandos lidos da entrada padrão e sai
+  --stop-on-error    Com --script/--stdin, para no primeiro erro
         """)
         sys.exit(0)
     
@@ -688,9 +1402,36 @@ Opções:
         print("Projeto de Compiladores - UNIFEI 2025")
         sys.exit(0)
     
+    # Modo script: sem banner, prompt, histórico em arquivo nem cores
+    script_path = _get_option_value('--script')
+    if '--script' in sys.argv and script_path is None:
+        print("Erro: --script requer o caminho de um arquivo")
+        sys.exit(2)
+
+    if script_path is not None or '--stdin' in sys.argv:
+        disable_colors()
+        terminal = TermIA(debug_mode=debug_mode, enhanced_mode=False)
+        stop_on_error = '--stop-on-error' in sys.argv
+        try:
+            if script_path is None:
+                sys.exit(terminal.run_script(sys.stdin, stop_on_error=stop_on_error))
+            try:
+                script = open(script_path, 'r', encoding='utf-8')
+            except OSError as e:
+                print(f"Erro ao abrir script: {e}")
+                sys.exit(2)
+            # Erros durante a execução não são erros de abertura do script
+            with script:
+                sys.exit(terminal.run_script(script, stop_on_error=stop_on_error))
+        finally:
+            terminal.close()
+
     # Cria e executa o terminal
     terminal = TermIA(debug_mode=debug_mode)
-    terminal.run()
+    try:
+        terminal.run()
+    finally:
+        terminal.close()
 
 
 if __name__ == '__main__':
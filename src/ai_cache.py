@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - AI Response Cache
+This module implements a two-tier (memory LRU + SQLite) cache for AI API responses.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from table_cache import cache_root_dir
+
+
+def make_cache_key(prompt: str, max_tokens: int, temperature: float, api_url: str) -> str:
+    """
+    Build the cache key for an API request.
+
+    Args:
+        prompt: Prompt sent to the AI
+        max_tokens: Maximum tokens in response
+        temperature: Response randomness
+        api_url: API endpoint URL
+
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = json.dumps([prompt, int(max_tokens), float(temperature), api_url], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for AI response caches.
+
+    Subclasses implement _get/_set; hit and miss counters are kept here so
+    every backend reports the same statistics. The cache is shared with the
+    background job threads, so the counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key (see make_cache_key)
+
+        Returns:
+            Cached response or None on miss/expiry
+        """
+        value = self._get(key)
+        self.record(value is not None)
+        return value
+
+    def record(self, hit: bool):
+        """
+        Count a hit or a miss, for lookups that bypass get().
+
+        Args:
+            hit: True for a hit, False for a miss
+        """
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def set(self, key: str, value: str):
+        """
+        Store a response.
+
+        Args:
+            key: Cache key (see make_cache_key)
+            value: Response content
+        """
+        self._set(key, value)
+
+    @abstractmethod
+    def clear(self):
+        """Remove all entries."""
+        pass
+
+    def close(self):
+        """Release resources held by the cache."""
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            Dictionary with hits, misses and hit_rate
+        """
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+        }
+
+    @abstractmethod
+    def _get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def _set(self, key: str, value: str):
+        pass
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-memory LRU cache with TTL.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 86400):
+        """
+        Initialize the memory cache.
+
+        Args:
+            max_entries: Maximum number of entries before LRU eviction
+            ttl: Entry lifetime in seconds
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            if time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: str):
+        self.put(key, value, time.time())
+
+    def put(self, key: str, value: str, created: float):
+        """
+        Store a response keeping its original creation time.
+
+        Args:
+            key: Cache key
+            value: Response content
+            created: Creation timestamp (used for TTL)
+        """
+        with self._lock:
+            self._entries[key] = (value, created)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResponseCache):
+    """
+    Persistent on-disk cache backed by SQLite, with TTL and LRU size limit.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 7 * 86400):
+        """
+        Initialize the SQLite cache.
+
+        Args:
+            path: Database file path
+            max_entries: Maximum number of entries before LRU eviction
+            ttl: Entry lifetime in seconds
+        """
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+        # Entries written through this connection are counted here, so the
+        # table is only counted again when the limit may have been crossed
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def lookup(self, key: str) -> Optional[tuple]:
+        """
+        Look up an entry without touching the hit/miss counters.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            (value, created) tuple or None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0], row[1]
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self.lookup(key)
+        return entry[0] if entry else None
+
+    def _set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if exists is None:
+                self._count += 1
+                if self._count > self.max_entries:
+                    self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Other processes may share the file: count again before deleting.
+        # The least recently used rows come from the index on accessed, so
+        # the table is not sorted
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                (excess,)
+            )
+            self._count = self.max_entries
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._count = 0
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache(ResponseCache):
+    """
+    Memory LRU in front of a persistent cache.
+
+    Disk hits are promoted to memory with their original creation time, so
+    the TTL is measured from when the response was first fetched.
+    """
+
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None):
+        """
+        Initialize the tiered cache.
+
+        Args:
+            memory: Memory tier
+            disk: Optional persistent tier
+        """
+        super().__init__()
+        self.memory = memory
+        self.disk = disk
+
+    def _get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        entry = self.disk.lookup(key)
+        self.disk.record(entry is not None)
+        if entry is None:
+            return None
+        self.memory.put(key, entry[0], entry[1])
+        return entry[0]
+
+    def _set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['memory'] = self.memory.stats()
+        stats['memory']['entries'] = len(self.memory)
+        if self.disk is not None:
+            stats['disk'] = self.disk.stats()
+            stats['disk']['entries'] = len(self.disk)
+        return stats
+
+
+def default_cache_path() -> str:
+    """
+    Return the default SQLite cache path, next to the parser tables
+    (see table_cache.cache_root_dir).
+    """
+    return os.path.join(cache_root_dir(), 'ai_responses.sqlite3')
+
+
+def create_response_cache(config: Optional[Dict[str, Any]] = None) -> Optional[ResponseCache]:
+    """
+    Build a response cache from the 'ai.cache' section of config.yaml.
+
+    Recognized keys: enabled, ttl, memory_entries, disk_entries, persistent, path.
+
+    Args:
+        config: Cache configuration (defaults are used for missing keys)
+
+    Returns:
+        Configured cache, or None if caching is disabled
+    """
+    config = config or {}
+    if not config.get('enabled', True):
+        return None
+
+    ttl = float(config.get('ttl', 86400))
+    memory = MemoryCache(max_entries=int(config.get('memory_entries', 256)), ttl=ttl)
+
+    disk = None
+    if config.get('persistent', True):
+        try:
+            disk = SQLiteCache(
+                config.get('path') or default_cache_path(),
+                max_entries=int(config.get('disk_entries', 10000)),
+                ttl=ttl
+            )
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: AI response cache will not persist: {e}")
+
+    return TieredCache(memory, disk)
@@ -4,10 +4,90 @@ TermIA - AI Command Executor
 This module implements AI-powered commands using external API.
 """
 
+import contextlib
+import itertools
 import json
 import os
-from typing import Dict, Any, Optional
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, Optional, Iterable, Iterator, List, Tuple
+from urllib.parse import urlencode
 import requests
+from requests.adapters import HTTPAdapter
+import command_metrics
+from ai_cache import ResponseCache, make_cache_key
+from ai_resilience import (RETRYABLE_STATUS, Backoff, CircuitBreaker, RetryBudget,
+                           circuit_breaker_for, parse_retry_after, shared_retry_budget)
+from code_chunker import CodeChunk, expand_code_paths, is_glob, split_code
+
+
+# Markdown cleanup rules, applied in order. All of them work on a single line,
+# so the same rules serve whole responses and streamed lines.
+MARKDOWN_RULES = [
+    # Remove bold/italic: **text** or *text* -> text
+    (re.compile(r'\*\*([^*]+)\*\*'), r'\1'),
+    (re.compile(r'\*([^*]+)\*'), r'\1'),
+    # Remove inline code: `code` -> code
+    (re.compile(r'`([^`]+)`'), r'\1'),
+    # Remove headers: ### Header -> Header
+    (re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE), r'\1'),
+    # Remove horizontal rules: --- or ***
+    (re.compile(r'^[\-*]{3,}$', re.MULTILINE), ''),
+    # Clean up markdown tables (simple approach: keep content, remove formatting)
+    # Remove table separators like |---|---|
+    (re.compile(r'^\|[\s\-:|]+\|$', re.MULTILINE), ''),
+    # Convert table rows to simple lines
+    (re.compile(r'^\|\s*(.+?)\s*\|$', re.MULTILINE), r'\1'),
+]
+
+# Replace multiple pipes with commas for readability
+PIPE_RULE = (re.compile(r'\s*\|\s*'), ' | ')
+PIPE_RULE_LINE = (re.compile(r'[ \t]*\|[ \t]*'), ' | ')
+
+BOT_MESSAGE_MARKER = "**Bot message:**"
+
+# The bot intent/message preamble opens the answer, so streamed text is only
+# held back while it starts like the preamble, for at most this many characters
+BOT_PREAMBLE_PREFIX = "**Bot "
+BOT_MARKER_LOOKAHEAD = 1024
+
+DEFAULT_API_URL = "https://api.ninja-apps.work/v1/chat/completions"
+
+# Language codes accepted by 'ia translate' and their names used in prompts
+LANGUAGE_NAMES = {
+    "pt": "portugues",
+    "en": "ingles",
+    "es": "espanhol",
+    "fr": "frances",
+    "de": "alemao",
+    "it": "italiano",
+    "ja": "japones",
+    "zh": "chines",
+    "ru": "russo",
+    "ar": "arabe"
+}
+
+# Rough characters-per-token ratio used to size translate batches and summary chunks
+CHARS_PER_TOKEN = 4
+
+# Progress callback for long commands: (stage, done, total)
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _metered_lines(lines: Iterator[str], record: 'command_metrics.CommandRecord') -> Iterator[str]:
+    """Pass streamed lines through, adding the time waited for each and their size to record."""
+    clock = time.perf_counter
+    while True:
+        started = clock()
+        line = next(lines, None)
+        record.add_time('network', clock() - started)
+        if line is None:
+            return
+        record.add('response_bytes', len(line) + 1)
+        yield line
 
 
 class AIException(Exception):
@@ -20,18 +100,102 @@ class AIExecutor:
     AI command executor that integrates with external AI API.
     """
 
-    def __init__(self, api_url: str = None, timeout: int = 120, max_retries: int = 3):
+    def __init__(self, api_url: str = None, timeout: int = 120, max_retries: int = 3,
+                 cache: Optional[ResponseCache] = None, pool_size: int = 4,
+                 idle_timeout: float = 60.0, summary_chunk_tokens: int = 2000,
+                 code_chunk_tokens: int = 1500, max_code_files: int = 50,
+                 deadline: float = 180.0, backoff: Optional[Backoff] = None,
+                 retry_budget: Optional[RetryBudget] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
         """
         Initialize the AI executor.
 
         Args:
             api_url: API endpoint URL (defaults to Ninja Apps API)
-            timeout: Request timeout in seconds
-            max_retries: Maximum number of retry attempts
+            timeout: Timeout of one attempt in seconds
+            max_retries: Maximum number of attempts per request
+            cache: Optional response cache (see ai_cache.create_response_cache)
+            pool_size: Maximum number of kept-alive connections to the API host
+            idle_timeout: Seconds without requests after which pooled connections are dropped
+            summary_chunk_tokens: Texts larger than this (estimated) are summarized chunk by chunk
+            code_chunk_tokens: Code larger than this (estimated) is explained chunk by chunk
+            max_code_files: Maximum files explained at once (directory or glob)
+            deadline: Seconds a request may take including retries, or a whole
+                command when run inside deadline()
+            backoff: Delays between attempts (default: Backoff())
+            retry_budget: Limit on retries (default: the process-wide budget)
+            circuit_breaker: Breaker of the endpoint (default: the process-wide
+                breaker of api_url)
         """
-        self.api_url = api_url or "https://api.ninja-apps.work/v1/chat/completions"
+        self.api_url = api_url or DEFAULT_API_URL
         self.timeout = timeout
         self.max_retries = max_retries
+        self.cache = cache
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.summary_chunk_tokens = summary_chunk_tokens
+        self.code_chunk_tokens = code_chunk_tokens
+        self.max_code_files = max_code_files
+        self.deadline_seconds = deadline
+        self.backoff = backoff or Backoff()
+        self.retry_budget = retry_budget or shared_retry_budget()
+        self.circuit_breaker = circuit_breaker or circuit_breaker_for(self.api_url)
+        self._local = threading.local()
+        self._metrics_lock = threading.Lock()
+        self.retries = 0
+        self.backoff_time = 0.0
+        self.deadlines_exceeded = 0
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._last_used = 0.0
+
+    # ==================== Connection Pool ====================
+
+    def _create_session(self) -> requests.Session:
+        """
+        Create an HTTP session with a keep-alive connection pool.
+
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _get_session(self) -> requests.Session:
+        """
+        Return the pooled session, recreating it if it sat idle too long.
+
+        Servers usually close idle keep-alive connections on their side; dropping
+        the pool after idle_timeout avoids paying for a failed reuse attempt.
+
+        Returns:
+            Pooled requests session
+        """
+        with self._session_lock:
+            now = time.monotonic()
+            if self._session is not None and now - self._last_used > self.idle_timeout:
+                self._session.close()
+                self._session = None
+            if self._session is None:
+                self._session = self._create_session()
+            self._last_used = now
+            return self._session
+
+    def close(self):
+        """Close pooled connections. The executor can still be used afterwards."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _clean_markdown(self, text: str) -> str:
         """
@@ -43,39 +207,67 @@ class AIExecutor:
         Returns:
             Cleaned plain text
         """
-        import re
-
-        # Remove bold/italic: **text** or *text* -> text
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
+        for pattern, replacement in MARKDOWN_RULES:
+            text = pattern.sub(replacement, text)
+        text = PIPE_RULE[0].sub(PIPE_RULE[1], text)
 
-        # Remove inline code: `code` -> code
-        text = re.sub(r'`([^`]+)`', r'\1', text)
+        # Remove multiple blank lines
+        text = re.sub(r'\n\n\n+', '\n\n', text)
 
-        # Remove headers: ### Header -> Header
-        text = re.sub(r'^#{1,6}\s+(.+)$', r'\1', text, flags=re.MULTILINE)
+        return text.strip()
 
-        # Remove horizontal rules: --- or ***
-        text = re.sub(r'^[\-*]{3,}$', '', text, flags=re.MULTILINE)
+    def _clean_markdown_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Clean markdown line by line as streamed chunks arrive.
 
-        # Clean up markdown tables (simple approach: keep content, remove formatting)
-        # Remove table separators like |---|---|
-        text = re.sub(r'^\|[\s\-:|]+\|$', '', text, flags=re.MULTILINE)
+        Partial lines are buffered until their newline arrives. Leading and
+        trailing blank lines are dropped and runs of blank lines are collapsed
+        to one, matching _clean_markdown on the full text.
 
-        # Convert table rows to simple lines
-        text = re.sub(r'^\|\s*(.+?)\s*\|$', r'\1', text, flags=re.MULTILINE)
+        Args:
+            chunks: Text fragments in arrival order
 
-        # Replace multiple pipes with commas for readability
-        text = re.sub(r'\s*\|\s*', ' | ', text)
+        Yields:
+            Cleaned lines (without trailing newline)
+        """
+        pending_blank = False
+        started = False
+        for line in self._split_lines(chunks):
+            for pattern, replacement in MARKDOWN_RULES:
+                line = pattern.sub(replacement, line)
+            line = PIPE_RULE_LINE[0].sub(PIPE_RULE_LINE[1], line).rstrip()
+
+            if not line.strip():
+                pending_blank = started
+                continue
+            if pending_blank:
+                yield ''
+                pending_blank = False
+            started = True
+            yield line
+
+    @staticmethod
+    def _split_lines(chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Regroup arbitrary text chunks into complete lines.
 
-        # Remove multiple blank lines
-        text = re.sub(r'\n\n\n+', '\n\n', text)
+        Args:
+            chunks: Text fragments in arrival order
 
-        return text.strip()
+        Yields:
+            Lines without the newline; the last line is yielded even if unterminated
+        """
+        buffer = ''
+        for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split('\n')
+            yield from lines
+        if buffer:
+            yield buffer
 
     def _call_api(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7) -> str:
         """
-        Make API call to AI service.
+        Make API call to AI service, answering from the response cache when possible.
 
         Args:
             prompt: The prompt/question to send to AI
@@ -88,58 +280,390 @@ class AIExecutor:
         Raises:
             AIException: If API call fails
         """
-        # Prepare request data
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(prompt, max_tokens, temperature, self.api_url)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        content = self._request(prompt, max_tokens, temperature)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    def _build_request_data(self, prompt: str, max_tokens: int, temperature: float,
+                            stream: bool = False) -> Dict[str, str]:
+        """
+        Build the form-encoded request body.
+
+        Args:
+            prompt: The prompt/question to send to AI
+            max_tokens: Maximum tokens in response
+            temperature: Response randomness (0.0-1.0)
+            stream: Ask the server for a streamed (server-sent events) response
+
+        Returns:
+            Form fields for the POST request
+        """
         data = {
             "messages": json.dumps([{"role": "user", "content": prompt}]),
             "max_tokens": str(max_tokens),
             "temperature": str(temperature)
         }
+        if stream:
+            data["stream"] = "true"
+        return data
+
+    @staticmethod
+    def _extract_content(result: Dict[str, Any]) -> str:
+        """
+        Extract the message content from a (non-streamed) API response.
+
+        Args:
+            result: Decoded JSON response
+
+        Returns:
+            AI response content
 
-        # Retry logic
-        last_error = None
-        for attempt in range(self.max_retries):
+        Raises:
+            AIException: If the response has no choices
+        """
+        if "choices" in result and len(result["choices"]) > 0:
+            content = result["choices"][0]["message"]["content"]
+
+            # Clean up the bot intent/message format if present
+            if BOT_MESSAGE_MARKER in content:
+                # Extract just the message part
+                parts = content.split(BOT_MESSAGE_MARKER)
+                if len(parts) > 1:
+                    return parts[1].strip()
+
+            return content
+        raise AIException("Invalid API response format")
+
+    # ==================== Resilience ====================
+
+    @contextlib.contextmanager
+    def deadline(self, seconds: Optional[float] = None):
+        """
+        Run a whole command under one deadline.
+
+        Every request sent by the current thread inside the block (and by
+        the chunk workers it starts), including retries and backoff, must
+        finish before the deadline. Nested blocks keep the earliest one.
+
+        Args:
+            seconds: Time allowed (default: the executor's deadline)
+        """
+        previous = getattr(self._local, 'deadline', None)
+        at = time.monotonic() + (self.deadline_seconds if seconds is None else seconds)
+        self._local.deadline = at if previous is None else min(previous, at)
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def _current_deadline(self) -> Optional[float]:
+        return getattr(self._local, 'deadline', None)
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        """
+        Return retry and circuit breaker statistics.
+
+        Returns:
+            Counters of this executor, plus those of its (possibly shared)
+            circuit breaker and retry budget
+        """
+        with self._metrics_lock:
+            stats: Dict[str, Any] = {
+                'retries': self.retries,
+                'backoff_time': self.backoff_time,
+                'deadlines_exceeded': self.deadlines_exceeded,
+            }
+        stats['circuit'] = self.circuit_breaker.stats()
+        stats['retry_budget'] = self.retry_budget.stats()
+        return stats
+
+    def _count(self, name: str, amount: float = 1):
+        with self._metrics_lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _post(self, data: Dict[str, str], stream: bool = False) -> requests.Response:
+        """
+        POST to the API, retrying on timeouts, network errors, 429 and 5xx.
+
+        Retries wait with exponential backoff and jitter (at least what the
+        server asks in Retry-After) and draw on the retry budget. Nothing is
+        sent while the circuit breaker is open, and each attempt's timeout
+        is cut to what is left of the deadline.
+
+        Args:
+            data: Form fields
+            stream: Keep the body unread so it can be consumed incrementally
+
+        Returns:
+            Successful HTTP response
+
+        Raises:
+            AIException: If the request fails, or cannot be retried in time
+        """
+        deadline = self._current_deadline()
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline_seconds
+        breaker = self.circuit_breaker
+        self.retry_budget.deposit()
+        record = command_metrics.current()
+        if record is not None:
+            request_bytes = len(urlencode(data))
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise AIException(
+                    f"AI service unavailable: {breaker.consecutive_failures} consecutive failures, "
+                    f"next attempt in {breaker.retry_in():.0f} s")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                breaker.release()
+                self._count('deadlines_exceeded')
+                raise AIException(f"AI API call failed: deadline of {self.deadline_seconds:g} s exceeded")
+
+            attempt += 1
+            retry_after = None
+            if record is not None:
+                record.add('requests')
+                record.add('request_bytes', request_bytes)
+            started = time.perf_counter()
             try:
-                response = requests.post(
+                response = self._get_session().post(
                     self.api_url,
                     data=data,
-                    timeout=self.timeout
+                    timeout=min(self.timeout, remaining),
+                    stream=stream
                 )
-                response.raise_for_status()
+            except requests.exceptions.Timeout:
+                last_error = f"Request timeout (attempt {attempt}/{self.max_retries})"
+            except requests.exceptions.RequestException as e:
+                last_error = f"API request failed: {e}"
+            except Exception as e:
+                breaker.release()
+                raise AIException(f"AI API call failed: Unexpected error: {e}")
+            else:
+                if response.status_code not in RETRYABLE_STATUS:
+                    # The service answered: a 4xx here is a problem of the request
+                    breaker.record_success()
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.HTTPError as e:
+                        response.close()
+                        raise AIException(f"AI API call failed: API request failed: {e}")
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                last_error = f"API request failed: HTTP {response.status_code} {response.reason}"
+                response.close()
+            finally:
+                if record is not None:
+                    record.add_time('network', time.perf_counter() - started)
+
+            breaker.record_failure()
+            if attempt >= self.max_retries:
+                raise AIException(f"AI API call failed after {attempt} attempts: {last_error}")
+            delay = self.backoff.delay(attempt - 1, retry_after)
+            if time.monotonic() + delay >= deadline:
+                self._count('deadlines_exceeded')
+                raise AIException(f"AI API call failed: deadline of {self.deadline_seconds:g} s "
+                                  f"exceeded after {attempt} attempts: {last_error}")
+            if not self.retry_budget.withdraw():
+                raise AIException(f"AI API call failed (retry budget exhausted): {last_error}")
+            self._count('retries')
+            self._count('backoff_time', delay)
+            if record is not None:
+                record.add('retries')
+                # Waiting for the service to recover counts as network time
+                record.add_time('network', delay)
+            time.sleep(delay)
+
+    def _request(self, prompt: str, max_tokens: int, temperature: float) -> str:
+        """
+        Send the request to the AI service and return the full response.
 
-                # Parse response
-                result = response.json()
+        Args:
+            prompt: The prompt/question to send to AI
+            max_tokens: Maximum tokens in response
+            temperature: Response randomness (0.0-1.0)
 
-                # Extract content from response
-                if "choices" in result and len(result["choices"]) > 0:
-                    content = result["choices"][0]["message"]["content"]
+        Returns:
+            AI response content
 
-                    # Clean up the bot intent/message format if present
-                    if "**Bot message:**" in content:
-                        # Extract just the message part
-                        parts = content.split("**Bot message:**")
-                        if len(parts) > 1:
-                            return parts[1].strip()
+        Raises:
+            AIException: If API call fails
+        """
+        response = self._post(self._build_request_data(prompt, max_tokens, temperature))
+        record = command_metrics.current()
+        if record is not None:
+            record.add('response_bytes', len(response.content))
+        try:
+            return self._extract_content(response.json())
+        except (json.JSONDecodeError, ValueError) as e:
+            raise AIException(f"Failed to parse API response: {e}")
+        except (KeyError, IndexError, TypeError) as e:
+            raise AIException(f"Invalid API response format: {e}")
+
+    def _call_api_stream(self, prompt: str, max_tokens: int = 500,
+                         temperature: float = 0.7) -> Iterator[str]:
+        """
+        Make a streaming API call, yielding text as it arrives.
 
-                    return content
-                else:
-                    raise AIException("Invalid API response format")
+        Cached responses are yielded in one piece. Servers that ignore the
+        stream flag and answer with a regular JSON body are handled too: the
+        whole content is yielded once it arrives.
 
-            except requests.exceptions.Timeout:
-                last_error = f"Request timeout (attempt {attempt + 1}/{self.max_retries})"
-                if attempt < self.max_retries - 1:
-                    continue
-            except requests.exceptions.RequestException as e:
-                last_error = f"API request failed: {e}"
-                if attempt < self.max_retries - 1:
-                    continue
-            except json.JSONDecodeError as e:
-                last_error = f"Failed to parse API response: {e}"
+        Args:
+            prompt: The prompt/question to send to AI
+            max_tokens: Maximum tokens in response
+            temperature: Response randomness (0.0-1.0)
+
+        Yields:
+            Response text fragments
+
+        Raises:
+            AIException: If API call fails
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(prompt, max_tokens, temperature, self.api_url)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        # The timeouts only bound each read: a server that keeps sending
+        # slowly is stopped by checking the deadline between lines
+        deadline = self._current_deadline()
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline_seconds
+        response = self._post(self._build_request_data(prompt, max_tokens, temperature, stream=True),
+                              stream=True)
+        parts = []
+        with response:
+            content_type = response.headers.get('Content-Type', '')
+            if 'text/event-stream' in content_type:
+                for piece in self._strip_bot_message(self._iter_sse_content(response, deadline)):
+                    parts.append(piece)
+                    yield piece
+            else:
+                # Non-streaming fallback
+                record = command_metrics.current()
+                if record is not None:
+                    started = time.perf_counter()
+                    record.add('response_bytes', len(response.content))
+                    record.add_time('network', time.perf_counter() - started)
+                try:
+                    content = self._extract_content(response.json())
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    raise AIException(f"Failed to parse API response: {e}")
+                parts.append(content)
+                yield content
+
+        if cache_key is not None:
+            self.cache.set(cache_key, ''.join(parts))
+
+    @staticmethod
+    def _strip_bot_message(pieces: Iterable[str]) -> Iterator[str]:
+        """
+        Streaming counterpart of the BOT_MESSAGE_MARKER cleanup in _extract_content.
+
+        Text that starts like the preamble (BOT_PREAMBLE_PREFIX) is held back
+        until the marker shows up or BOT_MARKER_LOOKAHEAD characters pass
+        without it; any other answer streams through unchanged. After the marker
+        only the message part is yielded, stripped and ending at a second
+        marker, like the non-streamed path.
+
+        Args:
+            pieces: Content fragments in arrival order
+
+        Yields:
+            Content fragments without the bot intent/message preamble
+        """
+        pieces = iter(pieces)
+        buffer = ''
+        for piece in pieces:
+            buffer += piece
+            if BOT_MESSAGE_MARKER in buffer:
                 break
-            except Exception as e:
-                last_error = f"Unexpected error: {e}"
+            head = buffer.lstrip()[:len(BOT_PREAMBLE_PREFIX)]
+            if not BOT_PREAMBLE_PREFIX.startswith(head) or len(buffer) > BOT_MARKER_LOOKAHEAD:
+                yield buffer
+                yield from pieces
+                return
+        else:
+            if buffer:
+                yield buffer
+            return
+
+        # Hold back a possibly split marker and trailing whitespace
+        hold = len(BOT_MESSAGE_MARKER) - 1
+        pending = ''
+        started = False
+        for piece in itertools.chain([buffer.split(BOT_MESSAGE_MARKER, 1)[1]], pieces):
+            pending += piece
+            if not started:
+                pending = pending.lstrip()
+            end = pending.find(BOT_MESSAGE_MARKER)
+            if end >= 0:
+                pending = pending[:end]
                 break
+            ready = len(pending[:-hold].rstrip()) if len(pending) > hold else 0
+            if ready:
+                yield pending[:ready]
+                pending = pending[ready:]
+                started = True
+        pending = pending.rstrip()
+        if pending:
+            yield pending
+
+    def _iter_sse_content(self, response: requests.Response,
+                          deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Decode a server-sent events body into content fragments.
 
-        raise AIException(f"AI API call failed after {self.max_retries} attempts: {last_error}")
+        Accepts OpenAI-style chunks ({"choices": [{"delta": {"content": ...}}]})
+        as well as full messages, and stops at "data: [DONE]".
+
+        Args:
+            response: Streamed HTTP response
+            deadline: time.monotonic() value after which the stream is abandoned
+
+        Yields:
+            Content fragments
+
+        Raises:
+            AIException: On an invalid chunk, or when the deadline passes
+        """
+        lines = response.iter_lines(decode_unicode=True)
+        record = command_metrics.current()
+        if record is not None:
+            lines = _metered_lines(lines, record)
+        for raw_line in lines:
+            if deadline is not None and time.monotonic() >= deadline:
+                response.close()
+                self._count('deadlines_exceeded')
+                raise AIException(f"AI API call failed: deadline of {self.deadline_seconds:g} s "
+                                  f"exceeded while streaming")
+            if not raw_line or not raw_line.startswith('data:'):
+                continue
+            payload = raw_line[5:].strip()
+            if payload == '[DONE]':
+                break
+            try:
+                event = json.loads(payload)
+                choice = event["choices"][0]
+            except (ValueError, KeyError, IndexError, TypeError):
+                raise AIException(f"Invalid streamed response chunk: {payload[:80]}")
+            piece = (choice.get("delta") or choice.get("message") or {}).get("content")
+            if piece:
+                yield piece
 
     # ==================== AI Commands ====================
 
@@ -153,6 +677,33 @@ class AIExecutor:
         Returns:
             AI response
         """
+        prompt, max_tokens = self._prepare_ia_ask(question)
+        response = self._call_api(prompt, max_tokens=max_tokens)
+        return self._clean_markdown(response)
+
+    def stream_ia_ask(self, question: str) -> Iterator[str]:
+        """
+        Streaming variant of execute_ia_ask.
+
+        Args:
+            question: Question to ask
+
+        Yields:
+            Cleaned response lines as they arrive
+        """
+        prompt, max_tokens = self._prepare_ia_ask(question)
+        return self._clean_markdown_stream(self._call_api_stream(prompt, max_tokens=max_tokens))
+
+    def _prepare_ia_ask(self, question: str) -> Tuple[str, int]:
+        """
+        Validate the question and build the 'ia ask' prompt.
+
+        Args:
+            question: Question to ask
+
+        Returns:
+            (prompt, max_tokens)
+        """
         if not question or question.strip() == "":
             raise AIException("Question cannot be empty")
 
@@ -175,36 +726,116 @@ IMPORTANTE: Responda em TEXTO PURO para exibicao em terminal.
 - Use apenas texto simples e listas com "•" ou "-"
 - Seja claro e direto"""
 
-        response = self._call_api(prompt, max_tokens=300)
-        return self._clean_markdown(response)
+        return prompt, 300
 
-    def execute_ia_summarize(self, text: str, length: str = "short") -> str:
+    def execute_ia_summarize(self, text: str, length: str = "short",
+                             progress: Optional[ProgressCallback] = None) -> str:
         """
         Execute 'ia summarize' command - summarize text.
 
+        Texts larger than summary_chunk_tokens are summarized with map-reduce
+        (see _map_reduce_summaries).
+
         Args:
             text: Text to summarize
             length: Summary length (short, medium, long)
+            progress: Optional callback called as chunks are summarized
 
         Returns:
             Summary of the text
         """
+        prompt, max_tokens = self._prepare_ia_summarize(text, length, progress)
+        response = self._call_api(prompt, max_tokens=max_tokens)
+        return self._clean_markdown(response)
+
+    def stream_ia_summarize(self, text: str, length: str = "short",
+                            progress: Optional[ProgressCallback] = None) -> Iterator[str]:
+        """
+        Streaming variant of execute_ia_summarize.
+
+        For large texts the chunk summaries are computed first; only the final
+        combined summary is streamed.
+
+        Args:
+            text: Text to summarize
+            length: Summary length (short, medium, long)
+            progress: Optional callback called as chunks are summarized
+
+        Yields:
+            Cleaned summary lines as they arrive
+        """
+        prompt, max_tokens = self._prepare_ia_summarize(text, length, progress)
+        return self._clean_markdown_stream(self._call_api_stream(prompt, max_tokens=max_tokens))
+
+    def execute_ia_summarize_file(self, filepath: str, length: str = "short",
+                                  progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Summarize the contents of a file (see execute_ia_summarize).
+
+        Args:
+            filepath: Path to a text file
+            length: Summary length (short, medium, long)
+            progress: Optional callback called as chunks are summarized
+
+        Returns:
+            Summary of the file
+        """
+        text = self._read_text_file(filepath)
+        prompt, max_tokens = self._prepare_ia_summarize(text, length, progress, validate=False)
+        response = self._call_api(prompt, max_tokens=max_tokens)
+        return self._clean_markdown(response)
+
+    def stream_ia_summarize_file(self, filepath: str, length: str = "short",
+                                 progress: Optional[ProgressCallback] = None) -> Iterator[str]:
+        """
+        Streaming variant of execute_ia_summarize_file.
+
+        Args:
+            filepath: Path to a text file
+            length: Summary length (short, medium, long)
+            progress: Optional callback called as chunks are summarized
+
+        Yields:
+            Cleaned summary lines as they arrive
+        """
+        text = self._read_text_file(filepath)
+        prompt, max_tokens = self._prepare_ia_summarize(text, length, progress, validate=False)
+        return self._clean_markdown_stream(self._call_api_stream(prompt, max_tokens=max_tokens))
+
+    def _prepare_ia_summarize(self, text: str, length: str,
+                              progress: Optional[ProgressCallback] = None,
+                              validate: bool = True) -> Tuple[str, int]:
+        """
+        Validate the text and build the 'ia summarize' prompt.
+
+        Large texts are first reduced to the concatenation of their chunk
+        summaries, which then goes into the regular prompt.
+
+        Args:
+            text: Text to summarize
+            length: Summary length (short, medium, long)
+            progress: Optional callback called as chunks are summarized
+            validate: Check for shell substitution (off for file contents)
+
+        Returns:
+            (prompt, max_tokens)
+        """
         if not text or text.strip() == "":
             raise AIException("Text to summarize cannot be empty")
 
         # Detect shell substitution attempts
-        if "$(cat" in text or "${cat" in text or "`cat" in text:
+        if validate and ("$(cat" in text or "${cat" in text or "`cat" in text):
             raise AIException(
                 "Shell substitution não é suportado no TermIA.\n"
                 "  TermIA é um terminal educacional focado em compiladores.\n\n"
                 "  Para resumir conteúdo de arquivo:\n"
-                "  1. Use 'cat' para ver o conteúdo\n"
-                "  2. Copie o texto\n"
-                "  3. Use: ia summarize \"texto copiado\" --length medium\n\n"
-                "  Ou considere usar ia ask para perguntas sobre arquivos:\n"
-                "  ia ask \"Resuma o conceito principal do README\""
+                "  • Use: ia summarize --file <arquivo> --length medium\n"
+                "  • Ou copie o texto e use: ia summarize \"texto copiado\""
             )
 
+        if len(text) > self.summary_chunk_tokens * CHARS_PER_TOKEN:
+            text = self._map_reduce_summaries(text, progress)
+
         # Map length to token counts
         length_tokens = {
             "short": 100,
@@ -236,22 +867,203 @@ IMPORTANTE: Responda em TEXTO PURO para terminal.
 - Use apenas texto simples e listas com "•" ou "-"
 - Organize em paragrafos claros"""
 
+        return prompt, max_tokens
+
+    def _map_reduce_summaries(self, text: str,
+                              progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Reduce a large text to the concatenation of its chunk summaries.
+
+        Chunks are summarized in parallel. While the joined summaries are
+        still larger than one chunk they are chunked and summarized again.
+        Each chunk summary goes through _call_api, so with a response cache
+        unchanged chunks of an edited file are not sent again.
+
+        Args:
+            text: Text to reduce
+            progress: Optional callback, called as progress(stage, done, total)
+                with stage 'chunks' for the first pass and 'combine' afterwards
+
+        Returns:
+            Joined chunk summaries, small enough for a single prompt
+        """
+        chunks = self._split_chunks(text, self.summary_chunk_tokens)
+        stage = 'chunks'
+        while True:
+            summaries = self._map_chunks(self._summarize_chunk, chunks, stage, progress)
+            joined = "\n\n".join(summaries)
+            if len(joined) <= self.summary_chunk_tokens * CHARS_PER_TOKEN:
+                return joined
+            next_chunks = self._split_chunks(joined, self.summary_chunk_tokens)
+            if len(next_chunks) >= len(chunks):
+                # Summaries are not getting smaller: stop instead of looping
+                return joined
+            chunks, stage = next_chunks, 'combine'
+
+    def _map_chunks(self, func: Callable[[Any], str], chunks: List[Any], stage: str,
+                    progress: Optional[ProgressCallback] = None) -> List[str]:
+        """
+        Apply an AI call to every chunk concurrently, keeping their order.
+
+        Args:
+            func: Function sending one chunk to the AI
+            chunks: Chunks to process
+            stage: Stage name passed to progress
+            progress: Optional progress callback
+
+        Returns:
+            One result per chunk
+        """
+        results: List[str] = [''] * len(chunks)
+        workers = max(1, min(self.pool_size, len(chunks)))
+        if progress:
+            progress(stage, 0, len(chunks))
+        deadline = self._current_deadline()
+        record = command_metrics.current()
+        if deadline is not None or record is not None:
+            # Workers run on other threads: carry the command's deadline and metrics over
+            func = self._in_command(func, deadline, record)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(func, chunk): i for i, chunk in enumerate(chunks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(stage, done, len(chunks))
+        return results
+
+    def _in_command(self, func: Callable[[Any], str], deadline: Optional[float],
+                    record: Optional['command_metrics.CommandRecord']) -> Callable[[Any], str]:
+        def run(chunk):
+            self._local.deadline = deadline
+            try:
+                with command_metrics.active(record):
+                    return func(chunk)
+            finally:
+                self._local.deadline = None
+        return run
+
+    def _summarize_chunk(self, chunk: str) -> str:
+        """
+        Summarize one chunk of a larger text.
+
+        The prompt depends only on the chunk, so the cached summary is reused
+        wherever the same chunk shows up again.
+
+        Args:
+            chunk: Text chunk
+
+        Returns:
+            Chunk summary
+        """
+        prompt = f"""Resuma o seguinte trecho de um documento maior, mantendo fatos, nomes e numeros importantes:
+
+{chunk}
+
+IMPORTANTE: Responda em TEXTO PURO, sem formatacao markdown."""
+        return self._clean_markdown(self._call_api(prompt, max_tokens=300, temperature=0.3))
+
+    @staticmethod
+    def _split_chunks(text: str, chunk_tokens: int) -> List[str]:
+        """
+        Split text into chunks of at most chunk_tokens (estimated), at paragraph boundaries.
+
+        Besides the size limit, a chunk also ends after a paragraph whose hash
+        is divisible by 4 once it is half full. Boundaries therefore depend on
+        the content around them, and an edit only changes the nearby chunks
+        instead of shifting every chunk after it.
+
+        Args:
+            text: Text to split
+            chunk_tokens: Maximum estimated tokens per chunk
+
+        Returns:
+            List of chunks
+        """
+        max_chars = chunk_tokens * CHARS_PER_TOKEN
+        min_chars = max_chars // 2
+
+        pieces = []
+        for paragraph in re.split(r'\n\s*\n', text):
+            paragraph = paragraph.strip()
+            # Paragraphs larger than a chunk are cut at a line break or space
+            while len(paragraph) > max_chars:
+                cut = paragraph.rfind('\n', 0, max_chars)
+                if cut <= 0:
+                    cut = paragraph.rfind(' ', 0, max_chars)
+                if cut <= 0:
+                    cut = max_chars
+                pieces.append(paragraph[:cut].strip())
+                paragraph = paragraph[cut:].strip()
+            if paragraph:
+                pieces.append(paragraph)
+
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+        for piece in pieces:
+            if current and size + len(piece) > max_chars:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 2
+            if size >= min_chars and zlib.crc32(piece.encode('utf-8')) % 4 == 0:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+        if current:
+            chunks.append("\n\n".join(current))
+        return chunks
+
+    def execute_ia_codeexplain(self, filepath: str,
+                               progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Execute 'ia codeexplain' command - explain code from a file, directory or glob.
+
+        Args:
+            filepath: Path to code file, directory or glob pattern
+            progress: Optional callback called as chunks are explained
+
+        Returns:
+            Explanation of the code
+        """
+        prompt, max_tokens = self._prepare_ia_codeexplain(filepath, progress)
         response = self._call_api(prompt, max_tokens=max_tokens)
         return self._clean_markdown(response)
 
-    def execute_ia_codeexplain(self, filepath: str) -> str:
+    def stream_ia_codeexplain(self, filepath: str,
+                              progress: Optional[ProgressCallback] = None) -> Iterator[str]:
         """
-        Execute 'ia codeexplain' command - explain code from file.
+        Streaming variant of execute_ia_codeexplain.
 
         Args:
-            filepath: Path to code file
+            filepath: Path to code file, directory or glob pattern
+            progress: Optional callback called as chunks are explained
+
+        Yields:
+            Cleaned explanation lines as they arrive
+        """
+        prompt, max_tokens = self._prepare_ia_codeexplain(filepath, progress)
+        return self._clean_markdown_stream(self._call_api_stream(prompt, max_tokens=max_tokens))
+
+    def _prepare_ia_codeexplain(self, filepath: str,
+                                progress: Optional[ProgressCallback] = None) -> Tuple[str, int]:
+        """
+        Read the code and build the 'ia codeexplain' prompt.
+
+        A single file that fits in code_chunk_tokens is sent whole. Larger
+        files, directories and globs are split at syntactic boundaries, the
+        chunks are explained concurrently and the final prompt merges the
+        chunk explanations.
+
+        Args:
+            filepath: Path to code file, directory or glob pattern
+            progress: Optional callback called as chunks are explained
 
         Returns:
-            Explanation of the code
+            (prompt, max_tokens)
         """
         # Check for common syntax mistakes
         suspicious_names = ['short', 'medium', 'long', 'pt', 'en', 'es', 'fr', 'de', 'it']
-        if filepath.lower() in suspicious_names:
+        if os.path.basename(filepath).lower() in suspicious_names and not os.path.exists(filepath):
             raise AIException(
                 f"'{filepath}' doesn't look like a file path.\n"
                 f"  Uso correto: ia codeexplain <arquivo>\n"
@@ -259,8 +1071,14 @@ IMPORTANTE: Responda em TEXTO PURO para terminal.
                 f"  NOTA: Use o caminho do arquivo, não uma string entre aspas!"
             )
 
-        # Read the file
-        if not os.path.exists(filepath):
+        if is_glob(filepath) or os.path.isdir(filepath):
+            try:
+                files = expand_code_paths(filepath, self.max_code_files)
+            except FileNotFoundError:
+                raise AIException(f"Nenhum arquivo de codigo encontrado em: {filepath}")
+            except ValueError as e:
+                raise AIException(f"Muitos arquivos ({e}). Use um caminho ou padrao mais especifico.")
+        elif not os.path.exists(filepath):
             # Provide helpful error message
             raise AIException(
                 f"Arquivo não encontrado: {filepath}\n"
@@ -270,23 +1088,75 @@ IMPORTANTE: Responda em TEXTO PURO para terminal.
                 f"  • Você não está usando aspas em volta do caminho\n"
                 f"  Exemplo correto: ia codeexplain main.py"
             )
+        else:
+            files = [filepath]
 
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                code = f.read()
-        except Exception as e:
-            raise AIException(f"Error reading file: {e}")
-
-        if not code.strip():
+        max_chars = self.code_chunk_tokens * CHARS_PER_TOKEN
+        if len(files) == 1:
+            # A glob or directory may resolve to a single file
+            path = files[0]
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    code = f.read(max_chars + 1)
+            except Exception as e:
+                raise AIException(f"Error reading file: {e}")
+            if not code.strip():
+                raise AIException("File is empty")
+            if len(code) <= max_chars:
+                return self._codeexplain_prompt(path, code), 500
+
+        chunks: List[Tuple[str, CodeChunk]] = []
+        for path in files:
+            try:
+                chunks.extend((path, chunk) for chunk in split_code(path, max_chars))
+            except UnicodeDecodeError:
+                # Binary files picked up by a directory or glob are skipped
+                if len(files) == 1:
+                    raise AIException(f"Error reading file: {path} is not a text file")
+            except OSError as e:
+                raise AIException(f"Error reading file: {e}")
+        if not chunks:
             raise AIException("File is empty")
 
-        # Limit code size to avoid token limits
-        if len(code) > 2000:
-            code = code[:2000] + "\n... (truncated)"
+        explanations = self._map_chunks(self._explain_chunk, chunks, 'explain', progress)
 
-        # Build prompt
+        base = os.path.dirname(os.path.commonpath(files))
+        parts = [
+            f"[{os.path.relpath(path, base)}, linhas {chunk.start}-{chunk.end}]\n{explanation}"
+            for (path, chunk), explanation in zip(chunks, explanations)
+        ]
+        merged = "\n\n".join(parts)
+        if len(merged) > self.summary_chunk_tokens * CHARS_PER_TOKEN:
+            merged = self._map_reduce_summaries(merged, progress)
+
+        subject = (f"do arquivo {os.path.relpath(files[0], base)}" if len(files) == 1
+                   else f"de {len(files)} arquivos")
+        prompt = f"""Abaixo estao explicacoes de partes do codigo {subject}. Escreva uma explicacao unica e coesa do que este codigo faz: objetivo geral, principais componentes e como eles se relacionam.
+
+{merged}
+
+IMPORTANTE: Responda em TEXTO PURO para exibicao em terminal.
+- NAO use tabelas markdown
+- NAO use formatacao markdown (**negrito**, *italico*, etc)
+- Use apenas texto simples, paragrafos e listas com "•" ou "-"
+- Seja claro e conciso"""
+
+        return prompt, 700
+
+    @staticmethod
+    def _codeexplain_prompt(filepath: str, code: str) -> str:
+        """
+        Build the prompt explaining a whole (small) file.
+
+        Args:
+            filepath: Path to code file
+            code: File contents
+
+        Returns:
+            Prompt
+        """
         file_extension = os.path.splitext(filepath)[1]
-        prompt = f"""Explique o seguinte codigo (arquivo {filepath}):
+        return f"""Explique o seguinte codigo (arquivo {filepath}):
 
 ```{file_extension}
 {code}
@@ -300,8 +1170,30 @@ IMPORTANTE: Responda em TEXTO PURO para exibicao em terminal.
 
 Forneça uma explicacao do que este codigo faz."""
 
-        response = self._call_api(prompt, max_tokens=500)
-        return self._clean_markdown(response)
+    def _explain_chunk(self, item: Tuple[str, CodeChunk]) -> str:
+        """
+        Explain one chunk of a larger file.
+
+        The prompt holds only the chunk text and the file extension, so the
+        response cache works as a content-hash cache: an unchanged chunk is
+        never sent again, even if the lines around it moved.
+
+        Args:
+            item: (file path, chunk)
+
+        Returns:
+            Chunk explanation
+        """
+        path, chunk = item
+        file_extension = os.path.splitext(path)[1]
+        prompt = f"""Explique de forma concisa o seguinte trecho de codigo, parte de um arquivo maior. Diga o que cada funcao ou classe faz:
+
+```{file_extension}
+{chunk.text}
+```
+
+IMPORTANTE: Responda em TEXTO PURO, sem formatacao markdown."""
+        return self._clean_markdown(self._call_api(prompt, max_tokens=400, temperature=0.3))
 
     def execute_ia_translate(self, text: str, target_language: str) -> str:
         """
@@ -314,6 +1206,107 @@ Forneça uma explicacao do que este codigo faz."""
         Returns:
             Translated text
         """
+        self._validate_translate_text(text)
+        target_lang_name = LANGUAGE_NAMES.get(target_language.lower(), target_language)
+
+        # Build prompt
+        prompt = f"Traduza o seguinte texto para {target_lang_name}:\n\n{text}\n\nResponda APENAS com a traducao, sem explicacoes adicionais."
+
+        response = self._call_api(prompt, max_tokens=300)
+        return self._clean_markdown(response)
+
+    def execute_ia_translate_batch(self, texts: List[str], target_language: str,
+                                   batch_tokens: int = 1000, batch_items: int = 40,
+                                   max_workers: Optional[int] = None) -> List[str]:
+        """
+        Translate many texts with as few API calls as possible.
+
+        Texts are packed into batches of at most batch_tokens (estimated) and
+        batch_items entries, each sent as one JSON-list request. Batches run
+        concurrently and results are returned in input order. A batch whose
+        answer cannot be matched item by item is split in half and retried.
+
+        Args:
+            texts: Texts to translate
+            target_language: Target language code (pt, en, es, fr, etc.)
+            batch_tokens: Estimated prompt tokens per request
+            batch_items: Maximum texts per request
+            max_workers: Concurrent requests (defaults to pool_size)
+
+        Returns:
+            Translated texts, in the same order as texts
+        """
+        if not texts:
+            raise AIException("Nothing to translate")
+        for text in texts:
+            self._validate_translate_text(text)
+
+        batches = self._pack_translate_batches(texts, batch_tokens, batch_items)
+        workers = min(max_workers or self.pool_size, len(batches))
+
+        results: List[str] = [''] * len(texts)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            futures = [
+                (batch, pool.submit(self._translate_batch, [texts[i] for i in batch], target_language))
+                for batch in batches
+            ]
+            for batch, future in futures:
+                for index, translation in zip(batch, future.result()):
+                    results[index] = translation
+        return results
+
+    def execute_ia_translate_file(self, filepath: str, target_language: str, **kwargs) -> List[str]:
+        """
+        Translate every non-empty line of a file (see execute_ia_translate_batch).
+
+        Args:
+            filepath: Path to a text file with one string per line
+            target_language: Target language code (pt, en, es, fr, etc.)
+            **kwargs: Batch options forwarded to execute_ia_translate_batch
+
+        Returns:
+            Translated lines, in file order
+        """
+        texts = [line.strip() for line in self._read_text_file(filepath).splitlines() if line.strip()]
+        return self.execute_ia_translate_batch(texts, target_language, **kwargs)
+
+    @staticmethod
+    def _read_text_file(filepath: str) -> str:
+        """
+        Read a UTF-8 text file given to an AI command.
+
+        Args:
+            filepath: Path to the file
+
+        Returns:
+            File contents
+
+        Raises:
+            AIException: If the file is missing, unreadable or empty
+        """
+        if not os.path.exists(filepath):
+            raise AIException(f"Arquivo não encontrado: {filepath}")
+        if os.path.isdir(filepath):
+            raise AIException(f"'{filepath}' é um diretório")
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except Exception as e:
+            raise AIException(f"Error reading file: {e}")
+        if not text.strip():
+            raise AIException("File is empty")
+        return text
+
+    def _validate_translate_text(self, text: str):
+        """
+        Reject empty texts and shell substitution attempts.
+
+        Args:
+            text: Text to translate
+
+        Raises:
+            AIException: If the text cannot be translated
+        """
         if not text or text.strip() == "":
             raise AIException("Text to translate cannot be empty")
 
@@ -327,36 +1320,112 @@ Forneça uma explicacao do que este codigo faz."""
                 "  • Exemplo: ia translate \"Hello World\" --to pt"
             )
 
-        # Map language codes to full names
-        language_names = {
-            "pt": "portugues",
-            "en": "ingles",
-            "es": "espanhol",
-            "fr": "frances",
-            "de": "alemao",
-            "it": "italiano",
-            "ja": "japones",
-            "zh": "chines",
-            "ru": "russo",
-            "ar": "arabe"
-        }
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Estimate how many tokens a text takes in a JSON list (quotes and comma included)."""
+        return len(text) // CHARS_PER_TOKEN + 2
 
-        target_lang_name = language_names.get(target_language.lower(), target_language)
+    def _pack_translate_batches(self, texts: List[str], batch_tokens: int,
+                                batch_items: int) -> List[List[int]]:
+        """
+        Group text indexes into consecutive batches within the token budget.
 
-        # Build prompt
-        prompt = f"Traduza o seguinte texto para {target_lang_name}:\n\n{text}\n\nResponda APENAS com a traducao, sem explicacoes adicionais."
+        A text larger than the budget gets a batch of its own.
 
-        response = self._call_api(prompt, max_tokens=300)
-        return self._clean_markdown(response)
+        Args:
+            texts: Texts to translate
+            batch_tokens: Estimated prompt tokens per batch
+            batch_items: Maximum texts per batch
+
+        Returns:
+            List of batches, each a list of indexes into texts
+        """
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for index, text in enumerate(texts):
+            tokens = self._estimate_tokens(text)
+            if current and (used + tokens > batch_tokens or len(current) >= batch_items):
+                batches.append(current)
+                current, used = [], 0
+            current.append(index)
+            used += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _translate_batch(self, texts: List[str], target_language: str) -> List[str]:
+        """
+        Translate a batch of texts in one request, splitting it on mismatched answers.
+
+        Args:
+            texts: Texts in this batch
+            target_language: Target language code
+
+        Returns:
+            Translated texts, in order
+        """
+        if len(texts) == 1:
+            return [self.execute_ia_translate(texts[0], target_language)]
+
+        target_lang_name = LANGUAGE_NAMES.get(target_language.lower(), target_language)
+        prompt = (
+            f"Traduza para {target_lang_name} cada item da lista JSON abaixo.\n\n"
+            f"{json.dumps(texts, ensure_ascii=False)}\n\n"
+            f"Responda APENAS com uma lista JSON de {len(texts)} strings, na mesma ordem, "
+            f"sem explicacoes adicionais."
+        )
+        tokens = sum(self._estimate_tokens(text) for text in texts)
+        response = self._call_api(prompt, max_tokens=min(4096, 2 * tokens + 100), temperature=0.3)
+
+        translations = self._parse_translate_batch(response, len(texts))
+        if translations is not None:
+            return translations
+
+        # The answer could not be matched item by item: split and retry
+        middle = len(texts) // 2
+        return (self._translate_batch(texts[:middle], target_language)
+                + self._translate_batch(texts[middle:], target_language))
+
+    @staticmethod
+    def _parse_translate_batch(response: str, expected: int) -> Optional[List[str]]:
+        """
+        Extract the JSON list of translations from a batch response.
+
+        Args:
+            response: Raw AI response
+            expected: Number of translations expected
+
+        Returns:
+            List of translations, or None if the response does not match
+        """
+        start, end = response.find('['), response.rfind(']')
+        if start < 0 or end < start:
+            return None
+        try:
+            items = json.loads(response[start:end + 1])
+        except ValueError:
+            return None
+        if not isinstance(items, list) or len(items) != expected:
+            return None
+        if not all(isinstance(item, str) for item in items):
+            return None
+        return [item.strip() for item in items]
 
 
 def main():
-    """Test function for AI executor."""
+    """
+    Test function for AI executor.
+
+    An optional command line argument sets the API URL, e.g. a local
+    benchmarks/mock_ai_server.py, to run the test offline.
+    """
+    import sys
     print("=" * 60)
     print("TESTE DO AI EXECUTOR - TermIA")
     print("=" * 60)
 
-    executor = AIExecutor()
+    executor = AIExecutor(api_url=sys.argv[1] if len(sys.argv) > 1 else None)
 
     # Test 1: ia ask
     print("\n[TEST 1] ia ask")
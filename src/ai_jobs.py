@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Background AI Jobs
+This module implements an asyncio-based engine that runs AI commands
+concurrently in the background while the prompt stays responsive.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
+
+
+class AIJob:
+    """
+    A single AI command running (or finished) in the background.
+    """
+
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    def __init__(self, job_id: int, description: str):
+        self.id = job_id
+        self.description = description
+        self.status = AIJob.RUNNING
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.reported = False
+        self._future: Optional[concurrent.futures.Future] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status != AIJob.RUNNING
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent running (so far, if still running)."""
+        return (self.finished or time.time()) - self.started
+
+    def __repr__(self) -> str:
+        return f"AIJob(id={self.id}, status={self.status}, {self.description!r})"
+
+
+class AIJobManager:
+    """
+    Runs AI calls as asyncio tasks on a background event loop.
+
+    The AI executor is synchronous (requests), so each job awaits its call
+    on a bounded thread pool; max_concurrency caps the number of requests
+    in flight. The loop thread is started lazily on the first submit.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_concurrency: Maximum number of AI calls running at the same time
+        """
+        self.max_concurrency = max_concurrency
+        self._jobs: "OrderedDict[int, AIJob]" = OrderedDict()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    # ==================== Event Loop ====================
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix='termia-ai'
+                )
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='termia-ai-loop', daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _run(self, job: AIJob, func: Callable, args: tuple):
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._pool, functools.partial(func, *args))
+        except asyncio.CancelledError:
+            self._finish(job, AIJob.CANCELLED)
+            raise
+        except Exception as e:
+            self._finish(job, AIJob.FAILED, error=e)
+        else:
+            self._finish(job, AIJob.DONE, result=result)
+
+    def _finish(self, job: AIJob, status: str, result: Any = None,
+                error: Optional[BaseException] = None) -> bool:
+        # cancel() runs on the caller's thread and _run on the loop thread:
+        # whichever ends the job first sets its final status
+        with self._lock:
+            if job.is_finished:
+                return False
+            job.result = result
+            job.error = error
+            job.status = status
+            job.finished = time.time()
+            return True
+
+    # ==================== Public API ====================
+
+    def submit(self, description: str, func: Callable, *args) -> AIJob:
+        """
+        Start a job in the background.
+
+        Args:
+            description: Text shown when listing the job
+            func: Blocking callable doing the AI request
+            *args: Arguments for func
+
+        Returns:
+            The new job
+        """
+        loop = self._ensure_loop()
+        with self._lock:
+            job = AIJob(self._next_id, description)
+            self._next_id += 1
+            self._jobs[job.id] = job
+        job._future = asyncio.run_coroutine_threadsafe(self._run(job, func, args), loop)
+        return job
+
+    def get(self, job_id: int) -> Optional[AIJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[AIJob]:
+        """Return all known jobs, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> AIJob:
+        """
+        Block until a job finishes.
+
+        Args:
+            job_id: Job id
+            timeout: Maximum seconds to wait (None waits forever)
+
+        Returns:
+            The finished job
+
+        Raises:
+            KeyError: If the job does not exist
+            TimeoutError: If the job is still running after timeout
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+        try:
+            job._future.result(timeout)
+        except concurrent.futures.CancelledError:
+            self._finish(job, AIJob.CANCELLED)
+        except concurrent.futures.TimeoutError:
+            raise TimeoutError(f"job {job_id} still running")
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a running job.
+
+        The HTTP request already in flight cannot be interrupted, but its
+        result is discarded and the job is marked cancelled right away.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            True if the job was running and is now cancelled
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+        if not self._finish(job, AIJob.CANCELLED):
+            return False
+        # Cancel from the loop thread: the task is then always created first,
+        # so its coroutine is awaited (and cancelled) rather than dropped
+        self._loop.call_soon_threadsafe(job._future.cancel)
+        return True
+
+    def forget(self, job_id: int):
+        """Drop a finished job from the list."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.is_finished:
+                del self._jobs[job_id]
+
+    def pop_unreported(self) -> List[AIJob]:
+        """
+        Return jobs that finished since the last call.
+
+        Returns:
+            Finished jobs not reported before
+        """
+        finished = []
+        with self._lock:
+            for job in self._jobs.values():
+                if job.is_finished and not job.reported:
+                    job.reported = True
+                    finished.append(job)
+        return finished
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self.list_jobs() if not job.is_finished)
+
+    async def _cancel_all(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self):
+        """Cancel running jobs and stop the background loop."""
+        for job in self.list_jobs():
+            if not job.is_finished:
+                self.cancel(job.id)
+        with self._lock:
+            loop, thread, pool = self._loop, self._thread, self._pool
+            self._loop = self._thread = self._pool = None
+        if loop is not None:
+            try:
+                asyncio.run_coroutine_threadsafe(self._cancel_all(), loop).result(timeout=1)
+            except Exception:
+                pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+            # A loop still blocked by a job cannot be closed; the daemon
+            # thread ends with the process
+            if not thread.is_alive():
+                loop.close()
+            pool.shutdown(wait=False)
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - AI Request Resilience
+This module implements the retry policy of the AI executor: exponential
+backoff with jitter, a process-wide retry budget that stops retries from
+multiplying load during an outage, and a circuit breaker per API endpoint
+that fails fast while the service is down.
+"""
+
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+# HTTP statuses worth retrying: the request may succeed later. Other 4xx
+# answers are final and do not count as failures of the service.
+RETRYABLE_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class Backoff(NamedTuple):
+    """
+    Exponential backoff with full jitter.
+
+    The delay before retry n (0-based) is uniform between 0 and
+    min(max_delay, base * multiplier ** n), so clients that failed together
+    do not retry together.
+    """
+    base: float = 0.5
+    max_delay: float = 30.0
+    multiplier: float = 2.0
+
+    def delay(self, retry: int, retry_after: Optional[float] = None,
+              rng: Callable[[], float] = random.random) -> float:
+        """
+        Seconds to wait before a retry.
+
+        Args:
+            retry: Number of retries already made for the request
+            retry_after: Delay asked by the server (Retry-After), which is a minimum
+            rng: Source of uniform numbers in [0, 1)
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_delay, self.base * self.multiplier ** retry)
+        delay = ceiling * rng()
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, in seconds or as an HTTP date
+
+    Returns:
+        Seconds to wait (never negative), or None if absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of the requests.
+
+    Every first attempt deposits `ratio` tokens and every retry withdraws
+    one, so when everything fails the retries settle at `ratio` times the
+    request rate instead of `max_retries` times. The bucket starts full,
+    which lets isolated failures be retried right away.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 10.0):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Retries allowed per request, in the long run
+            capacity: Maximum tokens saved up (retries allowed in a burst)
+        """
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = capacity
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def deposit(self):
+        """Account for a new request."""
+        with self._lock:
+            self.requests += 1
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """
+        Take the token of a retry.
+
+        Returns:
+            True if the retry may be sent
+        """
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries += 1
+                return True
+            self.exhausted += 1
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'tokens': self._tokens,
+                'requests': self.requests,
+                'retries': self.retries,
+                'exhausted': self.exhausted,
+            }
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one service.
+
+    closed: requests flow; `failure_threshold` consecutive failures open it.
+    open: requests are rejected without being sent until `cooldown` passes.
+    half_open: a single probe request is let through; its success closes
+    the circuit, its failure opens it again for another cooldown.
+
+    Transitions are counted per (from, to) pair in `transitions`.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the breaker (closed).
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open before a probe
+            clock: Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitBreaker.CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.transitions: Counter = Counter()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._check_cooldown()
+            return self._state
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 if not open)."""
+        with self._lock:
+            if self._state != CircuitBreaker.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - self._clock())
+
+    def allow(self) -> bool:
+        """
+        Ask whether a request may be sent. Every allowed request must be
+        followed by record_success, record_failure or release.
+
+        Returns:
+            False if the circuit rejects the request
+        """
+        with self._lock:
+            self._check_cooldown()
+            if self._state == CircuitBreaker.CLOSED:
+                return True
+            if self._state == CircuitBreaker.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        """The service answered."""
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            self._probing = False
+            if self._state != CircuitBreaker.CLOSED:
+                self._set_state(CircuitBreaker.CLOSED)
+
+    def record_failure(self):
+        """The service failed (timeout, network error, 5xx or 429)."""
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._probing = False
+            if self._state == CircuitBreaker.HALF_OPEN or (
+                    self._state == CircuitBreaker.CLOSED
+                    and self.consecutive_failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                self._set_state(CircuitBreaker.OPEN)
+
+    def release(self):
+        """The request ended without telling anything about the service."""
+        with self._lock:
+            self._probing = False
+
+    def _check_cooldown(self):
+        if self._state == CircuitBreaker.OPEN and self._clock() - self._opened_at >= self.cooldown:
+            self._set_state(CircuitBreaker.HALF_OPEN)
+
+    def _set_state(self, state: str):
+        self.transitions[f"{self._state}->{state}"] += 1
+        self._state = state
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._check_cooldown()
+            return {
+                'state': self._state,
+                'consecutive_failures': self.consecutive_failures,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'transitions': dict(self.transitions),
+            }
+
+
+# ==================== Process-wide instances ====================
+
+_shared_lock = threading.Lock()
+_retry_budget: Optional[RetryBudget] = None
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def shared_retry_budget() -> RetryBudget:
+    """Return the retry budget shared by every AI executor of the process."""
+    global _retry_budget
+    with _shared_lock:
+        if _retry_budget is None:
+            _retry_budget = RetryBudget()
+        return _retry_budget
+
+
+def circuit_breaker_for(api_url: str, **kwargs) -> CircuitBreaker:
+    """
+    Return the circuit breaker of an endpoint, shared by every AI executor of the process.
+
+    Args:
+        api_url: API endpoint URL
+        **kwargs: CircuitBreaker arguments, used when the breaker is created
+
+    Returns:
+        The endpoint's breaker
+    """
+    with _shared_lock:
+        breaker = _circuit_breakers.get(api_url)
+        if breaker is None:
+            breaker = _circuit_breakers[api_url] = CircuitBreaker(**kwargs)
+        return breaker
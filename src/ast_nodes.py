@@ -31,19 +31,37 @@ class OSCommand(ASTNode):
 class LSCommand(OSCommand):
     """Comando ls - listar arquivos."""
     
-    def __init__(self, options: Optional[str] = None, path: Optional[str] = None):
+    def __init__(self, options: Optional[str] = None, path: Optional[str] = None,
+                 max_depth: Optional[int] = None, limit: Optional[int] = None,
+                 offset: int = 0, pager: bool = False):
         self.options = options
         self.path = path or '.'
+        self.max_depth = max_depth
+        self.limit = limit
+        self.offset = offset
+        self.pager = pager
     
     def __repr__(self) -> str:
         opts = f" -{self.options}" if self.options else ""
+        if self.max_depth is not None:
+            opts += f" --max-depth {self.max_depth}"
+        if self.limit is not None:
+            opts += f" --limit {self.limit}"
+        if self.offset:
+            opts += f" --offset {self.offset}"
+        if self.pager:
+            opts += " --pager"
         return f"LSCommand({opts} {self.path})"
     
     def to_dict(self) -> dict:
         return {
             'type': 'LSCommand',
             'options': self.options,
-            'path': self.path
+            'path': self.path,
+            'max_depth': self.max_depth,
+            'limit': self.limit,
+            'offset': self.offset,
+            'pager': self.pager
         }
 
 
@@ -95,16 +113,19 @@ class PwdCommand(OSCommand):
 class CatCommand(OSCommand):
     """Comando cat - exibir conteúdo de arquivo."""
     
-    def __init__(self, filepath: str):
+    def __init__(self, filepath: str, number_lines: bool = False):
         self.filepath = filepath
+        self.number_lines = number_lines
     
     def __repr__(self) -> str:
-        return f"CatCommand({self.filepath})"
+        flag = " -n" if self.number_lines else ""
+        return f"CatCommand({flag} {self.filepath})" if flag else f"CatCommand({self.filepath})"
     
     def to_dict(self) -> dict:
         return {
             'type': 'CatCommand',
-            'filepath': self.filepath
+            'filepath': self.filepath,
+            'number_lines': self.number_lines
         }
 
 
@@ -132,20 +153,25 @@ class IAAskCommand(IACommand):
 
 
 class IASummarizeCommand(IACommand):
-    """Comando ia summarize - resumir texto."""
+    """Comando ia summarize - resumir texto ou arquivo (--file)."""
     
-    def __init__(self, text: str, length: str = 'short'):
-        self.text = text
+    def __init__(self, text: Optional[str] = None, length: str = 'short',
+                 filepath: Optional[str] = None):
+        self.text = text or ''
         self.length = length  # short, medium, long
+        self.filepath = filepath
     
     def __repr__(self) -> str:
+        if self.filepath:
+            return f"IASummarizeCommand(file={self.filepath}, length={self.length})"
         return f"IASummarizeCommand(text_len={len(self.text)}, length={self.length})"
     
     def to_dict(self) -> dict:
         return {
             'type': 'IASummarizeCommand',
             'text': self.text,
-            'length': self.length
+            'length': self.length,
+            'filepath': self.filepath
         }
 
 
@@ -183,6 +209,28 @@ class IATranslateCommand(IACommand):
         }
 
 
+class IABatchTranslateCommand(IACommand):
+    """Comando ia translate em lote - traduzir vários textos ou as linhas de um arquivo."""
+    
+    def __init__(self, target_language: str, texts: Optional[List[str]] = None,
+                 filepath: Optional[str] = None):
+        self.texts = texts or []
+        self.filepath = filepath
+        self.target_language = target_language
+    
+    def __repr__(self) -> str:
+        source = self.filepath if self.filepath else f"{len(self.texts)} textos"
+        return f"IABatchTranslateCommand({source}, to={self.target_language})"
+    
+    def to_dict(self) -> dict:
+        return {
+            'type': 'IABatchTranslateCommand',
+            'texts': self.texts,
+            'filepath': self.filepath,
+            'target_language': self.target_language
+        }
+
+
 # ==================== Comandos de Controle ====================
 
 class ControlCommand(ASTNode):
@@ -206,6 +254,24 @@ class HistoryCommand(ControlCommand):
         }
 
 
+class HistorySearchCommand(ControlCommand):
+    """Comando history search - busca aproximada no histórico."""
+    
+    def __init__(self, query: str, limit: int = 20):
+        self.query = query
+        self.limit = limit
+    
+    def __repr__(self) -> str:
+        return f"HistorySearchCommand(query='{self.query}')"
+    
+    def to_dict(self) -> dict:
+        return {
+            'type': 'HistorySearchCommand',
+            'query': self.query,
+            'limit': self.limit
+        }
+
+
 class ClearCommand(ControlCommand):
     """Comando clear - limpar tela."""
     
@@ -243,6 +309,65 @@ class ExitCommand(ControlCommand):
         return {'type': 'ExitCommand'}
 
 
+class JobsCommand(ControlCommand):
+    """Comando jobs - listar, aguardar ou cancelar comandos de IA em segundo plano."""
+    
+    def __init__(self, action: str = 'list', job_id: Optional[int] = None):
+        self.action = action
+        self.job_id = job_id
+    
+    def __repr__(self) -> str:
+        job = f" {self.job_id}" if self.job_id is not None else ""
+        return f"JobsCommand({self.action}{job})"
+    
+    def to_dict(self) -> dict:
+        return {
+            'type': 'JobsCommand',
+            'action': self.action,
+            'job_id': self.job_id
+        }
+
+
+class StatsCommand(ControlCommand):
+    """Comando stats - métricas de desempenho dos comandos executados."""
+    
+    def __init__(self, action: str = 'summary', count: Optional[int] = None,
+                 path: Optional[str] = None):
+        self.action = action
+        self.count = count
+        self.path = path
+    
+    def __repr__(self) -> str:
+        args = ''.join(f" {arg}" for arg in (self.count, self.path) if arg is not None)
+        return f"StatsCommand({self.action}{args})"
+    
+    def to_dict(self) -> dict:
+        return {
+            'type': 'StatsCommand',
+            'action': self.action,
+            'count': self.count,
+            'path': self.path
+        }
+
+
+# ==================== Execução em Segundo Plano ====================
+
+class BackgroundCommand(ASTNode):
+    """Comando seguido de '&' - executa em segundo plano como um job."""
+    
+    def __init__(self, command: ASTNode):
+        self.command = command
+    
+    def __repr__(self) -> str:
+        return f"BackgroundCommand({self.command} &)"
+    
+    def to_dict(self) -> dict:
+        return {
+            'type': 'BackgroundCommand',
+            'command': self.command.to_dict()
+        }
+
+
 # ==================== Utilitários ====================
 
 def print_ast(node: ASTNode, indent: int = 0) -> None:
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Code Chunker
+This module splits source files into chunks at syntactic boundaries
+(Python via the ast module, other languages by line heuristics) and expands
+directories and glob patterns into lists of source files.
+"""
+
+import ast
+import glob
+import os
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+
+# File extensions picked up when a directory is given
+CODE_EXTENSIONS = {
+    '.py', '.pyi', '.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.scala',
+    '.c', '.h', '.cc', '.cpp', '.hpp', '.cs', '.go', '.rs', '.rb', '.php',
+    '.swift', '.lua', '.sh', '.bash', '.sql', '.r', '.m', '.pl',
+}
+
+# Directories never descended into when a directory is given
+SKIPPED_DIRS = {'__pycache__', 'node_modules', 'venv', '.venv', 'env', 'build', 'dist'}
+
+# Lines that usually start a new top-level definition in non-Python code
+DEFINITION_START = re.compile(
+    r'^\s*(?:export\s+|public\s+|private\s+|protected\s+|static\s+|async\s+|pub\s+)*'
+    r'(?:def|class|function|func|fn|impl|struct|enum|interface|trait|module|namespace|type)\b'
+)
+
+
+class CodeChunk(NamedTuple):
+    """A contiguous block of source lines (1-based, inclusive)."""
+    start: int
+    end: int
+    text: str
+
+
+def is_glob(pattern: str) -> bool:
+    """Return True if pattern contains glob wildcards."""
+    return any(char in pattern for char in '*?[')
+
+
+def expand_code_paths(target: str, max_files: int = 50) -> List[str]:
+    """
+    Expand a file, directory or glob pattern into source files.
+
+    Directories are walked recursively, keeping files with a known code
+    extension and skipping hidden and build directories.
+
+    Args:
+        target: File path, directory path or glob pattern
+        max_files: Maximum number of files accepted
+
+    Returns:
+        Sorted list of file paths
+
+    Raises:
+        FileNotFoundError: If nothing matches
+        ValueError: If more than max_files files match
+    """
+    if is_glob(target):
+        files = [path for path in glob.glob(target, recursive=True) if os.path.isfile(path)]
+    elif os.path.isdir(target):
+        files = []
+        for root, dirs, names in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIPPED_DIRS)
+            for name in names:
+                if os.path.splitext(name)[1].lower() in CODE_EXTENSIONS:
+                    files.append(os.path.join(root, name))
+    elif os.path.isfile(target):
+        files = [target]
+    else:
+        files = []
+
+    if not files:
+        raise FileNotFoundError(target)
+    if len(files) > max_files:
+        raise ValueError(f"{len(files)} files match '{target}' (limit: {max_files})")
+    return sorted(files)
+
+
+def split_code(path: str, max_chars: int) -> List[CodeChunk]:
+    """
+    Split a source file into chunks of at most max_chars (when possible).
+
+    Python files are split at top-level statements (and inside large
+    classes, at methods) using the ast module. Other files, and Python files
+    that do not parse, are streamed line by line and split heuristically.
+
+    Args:
+        path: Source file path
+        max_chars: Target maximum chunk size
+
+    Returns:
+        Chunks in file order
+    """
+    if path.endswith(('.py', '.pyi')):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        try:
+            return split_python(source, max_chars)
+        except (SyntaxError, ValueError):
+            return list(split_lines(source.splitlines(keepends=True), max_chars))
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(split_lines(f, max_chars))
+
+
+def split_python(source: str, max_chars: int) -> List[CodeChunk]:
+    """
+    Split Python source at syntactic boundaries.
+
+    Args:
+        source: Python source code
+        max_chars: Target maximum chunk size
+
+    Returns:
+        Chunks in source order
+
+    Raises:
+        SyntaxError: If the source does not parse
+    """
+    lines = source.splitlines(keepends=True)
+    if not lines:
+        return []
+    tree = ast.parse(source)
+    spans = _node_spans(tree.body, 1, len(lines), lines, max_chars)
+    return _pack_spans(spans, lines, max_chars)
+
+
+def split_lines(lines: Iterable[str], max_chars: int) -> Iterator[CodeChunk]:
+    """
+    Split source lines heuristically, reading them one at a time.
+
+    Once a chunk is half full, it ends before a blank-line-separated
+    definition or top-level line; it always ends before exceeding max_chars.
+
+    Args:
+        lines: Source lines (a file object works)
+        max_chars: Target maximum chunk size
+
+    Yields:
+        Chunks in source order
+    """
+    current: List[str] = []
+    size = 0
+    start = 1
+    previous_blank = True
+    lineno = 0
+    for lineno, line in enumerate(lines, 1):
+        boundary = previous_blank and line.strip() and (
+            not line[0].isspace() or DEFINITION_START.match(line)
+        )
+        if current and (size + len(line) > max_chars or (boundary and size >= max_chars // 2)):
+            yield CodeChunk(start, lineno - 1, ''.join(current))
+            current, size, start = [], 0, lineno
+        current.append(line)
+        size += len(line)
+        previous_blank = not line.strip()
+    if current and ''.join(current).strip():
+        yield CodeChunk(start, lineno, ''.join(current))
+
+
+def _node_spans(nodes: List[ast.stmt], first: int, last: int, lines: List[str],
+                max_chars: int) -> List[Tuple[int, int]]:
+    """
+    Turn a statement list into line spans covering first..last.
+
+    Comments and blank lines before a statement belong to it. Classes larger
+    than max_chars are split into their header and their body statements.
+    """
+    spans: List[Tuple[int, int]] = []
+    position = first
+    for index, node in enumerate(nodes):
+        end = node.end_lineno if index < len(nodes) - 1 else last
+        size = sum(len(line) for line in lines[position - 1:end])
+        if isinstance(node, ast.ClassDef) and size > max_chars and node.body:
+            body_start = _start_line(node.body[0])
+            spans.append((position, body_start - 1))
+            spans.extend(_node_spans(node.body, body_start, end, lines, max_chars))
+        else:
+            spans.append((position, end))
+        position = end + 1
+    if position <= last:
+        spans.append((position, last))
+    return [(start, end) for start, end in spans if start <= end]
+
+
+def _start_line(node: ast.stmt) -> int:
+    """First line of a statement, decorators included."""
+    decorators = getattr(node, 'decorator_list', None) or []
+    return min([node.lineno] + [decorator.lineno for decorator in decorators])
+
+
+def _pack_spans(spans: List[Tuple[int, int]], lines: List[str], max_chars: int) -> List[CodeChunk]:
+    """Merge consecutive spans into chunks of at most max_chars; oversized spans are split by lines."""
+    chunks: List[CodeChunk] = []
+    start = end = None
+    size = 0
+    for span_start, span_end in spans:
+        span_size = sum(len(line) for line in lines[span_start - 1:span_end])
+        if start is not None and size + span_size > max_chars:
+            chunks.append(CodeChunk(start, end, ''.join(lines[start - 1:end])))
+            start = None
+        if span_size > max_chars:
+            for chunk in split_lines(lines[span_start - 1:span_end], max_chars):
+                offset = span_start - 1
+                chunks.append(CodeChunk(chunk.start + offset, chunk.end + offset, chunk.text))
+            continue
+        if start is None:
+            start, size = span_start, 0
+        end = span_end
+        size += span_size
+    if start is not None:
+        chunks.append(CodeChunk(start, end, ''.join(lines[start - 1:end])))
+    return [chunk for chunk in chunks if chunk.text.strip()]
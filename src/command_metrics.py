@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Command Metrics
+This module records how long each command line spends in every stage
+(lexing, parsing, execution, network, rendering), with the CPU time, the
+I/O counters of OS commands and the request sizes and retries of AI
+commands. The last records are kept in a ring buffer; cumulative totals
+per command are kept as well and can be exported in the Prometheus text
+format.
+"""
+
+import contextlib
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+
+# Stages of a command, in order. network and render happen during the
+# execution; 'execute' is the execution time left after them.
+STAGES = ('lex', 'parse', 'execute', 'network', 'render')
+
+# Quantiles reported by the Prometheus export (over the ring buffer)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# /proc/self/io fields and the counter names they are recorded as
+_PROC_IO_FIELDS = {
+    b'syscr': 'read_syscalls',
+    b'syscw': 'write_syscalls',
+    b'rchar': 'read_bytes',
+    b'wchar': 'written_bytes',
+}
+
+# The same counters read from /proc/self/io cover every thread of the process
+PROCESS_IO_COUNTERS = frozenset(_PROC_IO_FIELDS.values())
+
+_proc_io_available = True
+
+
+def read_io_counters() -> Optional[Dict[str, int]]:
+    """
+    Read the I/O counters of the process (Linux only).
+
+    read()/write() family system calls and the bytes they moved, from
+    /proc/self/io. They include every thread of the process.
+
+    Returns:
+        Counter name -> value, or None where /proc/self/io is not available
+    """
+    global _proc_io_available
+    if not _proc_io_available:
+        return None
+    try:
+        with open('/proc/self/io', 'rb') as f:
+            data = f.read()
+    except OSError:
+        _proc_io_available = False
+        return None
+    counters = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b':')
+        name = _PROC_IO_FIELDS.get(key)
+        if name is not None:
+            counters[name] = int(value)
+    return counters
+
+
+class CommandRecord:
+    """
+    Measurements of one command line.
+
+    Stage times are in seconds. Counters are free-form (read_syscalls,
+    output_chars, requests, retries, request_bytes...); AI requests made
+    by worker threads add to the same record, so updates are locked.
+    """
+
+    def __init__(self, line: str):
+        self.line = line
+        self.name: Optional[str] = None
+        self.started = time.time()
+        self.ok = True
+        self.total = 0.0
+        self.cpu = 0.0
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        """Add seconds to a stage."""
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add(self, counter: str, amount: int = 1):
+        """Add to a counter."""
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'line': self.line,
+            'name': self.name,
+            'started': self.started,
+            'ok': self.ok,
+            'total': self.total,
+            'cpu': self.cpu,
+            'stages': dict(self.stages),
+            'counters': dict(self.counters),
+        }
+
+    def __repr__(self) -> str:
+        return f"CommandRecord({self.name!r}, {self.total * 1000:.2f} ms, ok={self.ok})"
+
+
+# ==================== Current record ====================
+
+_local = threading.local()
+
+
+def current() -> Optional[CommandRecord]:
+    """Record of the command running on this thread, if any."""
+    return getattr(_local, 'record', None)
+
+
+@contextlib.contextmanager
+def active(record: Optional[CommandRecord]) -> Iterator[Optional[CommandRecord]]:
+    """
+    Make record the current one on this thread inside the block.
+
+    Args:
+        record: Record to report to (None to report to nothing)
+    """
+    previous = getattr(_local, 'record', None)
+    _local.record = record
+    try:
+        yield record
+    finally:
+        _local.record = previous
+
+
+class _MeteredWriter:
+    """Stand-in for sys.stdout that times writes and counts characters."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.time = 0.0
+        self.chars = 0
+
+    def write(self, text, _clock=time.perf_counter):
+        start = _clock()
+        result = self.stream.write(text)
+        self.time += _clock() - start
+        self.chars += len(text)
+        return result
+
+    def flush(self, _clock=time.perf_counter):
+        start = _clock()
+        self.stream.flush()
+        self.time += _clock() - start
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+# ==================== Recorder ====================
+
+class CommandSummary(NamedTuple):
+    """Statistics of one command name over the records in the ring buffer."""
+    name: str
+    count: int
+    errors: int
+    p50: float
+    p95: float
+    max: float
+    stages: Dict[str, float]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values (q from 0 to 1)."""
+    if not values:
+        return 0.0
+    rank = math.ceil(q * len(values))
+    return values[min(len(values), max(rank, 1)) - 1]
+
+
+class _Totals:
+    """Cumulative totals of one command name (never dropped from the buffer)."""
+
+    def __init__(self):
+        self.ok = 0
+        self.failed = 0
+        self.cpu = 0.0
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+
+class MetricsRecorder:
+    """
+    Ring buffer of command records, plus cumulative totals per command.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize the recorder.
+
+        Args:
+            capacity: Records kept; the oldest are dropped first
+        """
+        self.capacity = capacity
+        self._records: deque = deque(maxlen=capacity)
+        self._totals: Dict[str, _Totals] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def start(self, line: str) -> CommandRecord:
+        """Start the record of a command line (the total time counts from here)."""
+        return CommandRecord(line)
+
+    @contextlib.contextmanager
+    def measure(self, record: CommandRecord, io: bool = False) -> Iterator[CommandRecord]:
+        """
+        Measure the execution of a command.
+
+        Inside the block the record is the current one (AI requests report
+        network time, sizes and retries to it) and sys.stdout is wrapped to
+        time the rendering and count the characters written.
+
+        Args:
+            record: Record of the command
+            io: Also record the process I/O counters (for OS commands)
+        """
+        io_before = read_io_counters() if io else None
+        stdout = sys.stdout
+        writer = _MeteredWriter(stdout)
+        sys.stdout = writer
+        cpu = time.process_time()
+        start = time.perf_counter()
+        try:
+            with active(record):
+                yield record
+        finally:
+            elapsed = time.perf_counter() - start
+            record.cpu += time.process_time() - cpu
+            if sys.stdout is writer:
+                sys.stdout = stdout
+            if writer.time:
+                record.add_time('render', writer.time)
+            if writer.chars:
+                record.add('output_chars', writer.chars)
+            if io_before is not None:
+                io_after = read_io_counters() or io_before
+                for name, value in io_after.items():
+                    record.add(name, value - io_before.get(name, value))
+            # Chunk workers may overlap their requests, so network time can
+            # exceed the wall time of the execution
+            own = elapsed - record.stages.get('network', 0.0) - writer.time
+            record.add_time('execute', max(0.0, own))
+
+    def finish(self, record: CommandRecord, ok: bool):
+        """
+        Close a record and store it.
+
+        Args:
+            record: Record of the command
+            ok: Whether the command succeeded
+        """
+        record.total = time.perf_counter() - record._start
+        record.ok = ok
+        if record.name is None:
+            words = record.line.split()
+            record.name = words[0] if words else ''
+        with self._lock:
+            self._records.append(record)
+            totals = self._totals.get(record.name)
+            if totals is None:
+                totals = self._totals[record.name] = _Totals()
+            if ok:
+                totals.ok += 1
+            else:
+                totals.failed += 1
+            totals.cpu += record.cpu
+            stages = dict(record.stages, total=record.total)
+            for stage, seconds in stages.items():
+                totals.stages[stage] = totals.stages.get(stage, 0.0) + seconds
+            for counter, value in record.counters.items():
+                totals.counters[counter] = totals.counters.get(counter, 0) + value
+
+    def recent(self, count: Optional[int] = None) -> List[CommandRecord]:
+        """The last `count` records (all if None), oldest first."""
+        with self._lock:
+            records = list(self._records)
+        return records if count is None else records[-count:] if count > 0 else []
+
+    def clear(self):
+        """Drop the records and the totals."""
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+    def summary(self) -> List[CommandSummary]:
+        """
+        Statistics per command name over the ring buffer, slowest (p95) first.
+
+        Returns:
+            One summary per command name; stages are mean seconds
+        """
+        groups: Dict[str, List[CommandRecord]] = {}
+        for record in self.recent():
+            groups.setdefault(record.name, []).append(record)
+        summaries = []
+        for name, records in groups.items():
+            totals = sorted(record.total for record in records)
+            stages = {}
+            for stage in STAGES:
+                seconds = sum(record.stages.get(stage, 0.0) for record in records)
+                if any(stage in record.stages for record in records):
+                    stages[stage] = seconds / len(records)
+            summaries.append(CommandSummary(
+                name, len(records), sum(1 for record in records if not record.ok),
+                _percentile(totals, 0.5), _percentile(totals, 0.95), totals[-1], stages))
+        summaries.sort(key=lambda summary: summary.p95, reverse=True)
+        return summaries
+
+    # ==================== Prometheus ====================
+
+    def to_prometheus(self, resilience: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Format the metrics in the Prometheus text exposition format.
+
+        Counters and _sum/_count are cumulative; quantiles are computed
+        over the records in the ring buffer.
+
+        Args:
+            resilience: AIExecutor.resilience_stats(), if the AI executor was used
+
+        Returns:
+            Exposition text
+        """
+        with self._lock:
+            records = list(self._records)
+            totals = {name: self._totals[name] for name in sorted(self._totals)}
+        lines: List[str] = []
+
+        _header(lines, 'termia_commands_total', 'counter', 'Commands executed, by command and status.')
+        for name, total in totals.items():
+            lines.append(_sample('termia_commands_total', total.ok, command=name, status='ok'))
+            lines.append(_sample('termia_commands_total', total.failed, command=name, status='error'))
+
+        _header(lines, 'termia_command_duration_seconds', 'summary',
+                'Wall time of commands by stage (network and render are part of the execution).')
+        by_stage: Dict[tuple, List[float]] = {}
+        for record in records:
+            for stage, seconds in dict(record.stages, total=record.total).items():
+                by_stage.setdefault((record.name, stage), []).append(seconds)
+        for name, total in totals.items():
+            count = total.ok + total.failed
+            for stage in ('total',) + STAGES:
+                if stage not in total.stages:
+                    continue
+                values = sorted(by_stage.get((name, stage), ()))
+                for q in QUANTILES:
+                    lines.append(_sample('termia_command_duration_seconds', _percentile(values, q),
+                                         command=name, stage=stage, quantile=str(q)))
+                lines.append(_sample('termia_command_duration_seconds_sum', total.stages[stage],
+                                     command=name, stage=stage))
+                lines.append(_sample('termia_command_duration_seconds_count', count,
+                                     command=name, stage=stage))
+
+        _header(lines, 'termia_command_cpu_seconds_total', 'counter', 'CPU time of the process during commands.')
+        for name, total in totals.items():
+            lines.append(_sample('termia_command_cpu_seconds_total', total.cpu, command=name))
+
+        counter_names = sorted({counter for total in totals.values() for counter in total.counters})
+        for counter in counter_names:
+            metric = f'termia_command_{counter}_total'
+            scope = " (whole process, including background threads)" if counter in PROCESS_IO_COUNTERS else ""
+            _header(lines, metric, 'counter', f"Total {counter.replace('_', ' ')} of commands{scope}.")
+            for name, total in totals.items():
+                if counter in total.counters:
+                    lines.append(_sample(metric, total.counters[counter], command=name))
+
+        if resilience is not None:
+            _resilience_lines(lines, resilience)
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path: str, resilience: Optional[Dict[str, Any]] = None):
+        """
+        Write to_prometheus() to a file, atomically (for the node_exporter
+        textfile collector and similar readers).
+
+        Args:
+            path: Output file
+            resilience: AIExecutor.resilience_stats(), if available
+        """
+        text = self.to_prometheus(resilience)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmpfile = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmpfile, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmpfile)
+            raise
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _header(lines: List[str], metric: str, kind: str, text: str):
+    lines.append(f"# HELP {metric} {text}")
+    lines.append(f"# TYPE {metric} {kind}")
+
+
+def _sample(metric: str, value: float, **labels: str) -> str:
+    text = repr(float(value)) if isinstance(value, float) else str(value)
+    if not labels:
+        return f"{metric} {text}"
+    label_text = ','.join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+    return f"{metric}{{{label_text}}} {text}"
+
+
+def _resilience_lines(lines: List[str], stats: Dict[str, Any]):
+    circuit = stats['circuit']
+    _header(lines, 'termia_ai_circuit_state', 'gauge', 'Current state of the AI circuit breaker.')
+    for state in ('closed', 'open', 'half_open'):
+        lines.append(_sample('termia_ai_circuit_state', int(circuit['state'] == state), state=state))
+    _header(lines, 'termia_ai_circuit_transitions_total', 'counter', 'AI circuit breaker state changes.')
+    for transition, count in sorted(circuit['transitions'].items()):
+        lines.append(_sample('termia_ai_circuit_transitions_total', count, transition=transition))
+    _header(lines, 'termia_ai_circuit_rejected_total', 'counter', 'AI requests rejected by the open circuit.')
+    lines.append(_sample('termia_ai_circuit_rejected_total', circuit['rejected']))
+    _header(lines, 'termia_ai_retries_total', 'counter', 'AI requests retried.')
+    lines.append(_sample('termia_ai_retries_total', stats['retries']))
+    _header(lines, 'termia_ai_retry_budget_exhausted_total', 'counter',
+            'AI retries refused by the retry budget.')
+    lines.append(_sample('termia_ai_retry_budget_exhausted_total', stats['retry_budget']['exhausted']))
+    _header(lines, 'termia_ai_deadlines_exceeded_total', 'counter', 'AI commands stopped by their deadline.')
+    lines.append(_sample('termia_ai_deadlines_exceeded_total', stats['deadlines_exceeded']))
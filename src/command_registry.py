@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Command Registry
+This module maps AST node classes to the functions that execute them, and
+exception classes to the messages shown when they fail, so a command is
+dispatched with a single dictionary lookup and every command reports
+errors the same way.
+"""
+
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+# Signature of a command function: (terminal, ast node) -> None
+CommandFunc = Callable[[Any, Any], None]
+
+# Signature of an error formatter: (exception, command name) -> message
+ErrorFormatter = Callable[[BaseException, str], str]
+
+
+class CommandHandler(NamedTuple):
+    """How to execute one kind of AST node."""
+    func: CommandFunc
+    name: str
+
+
+class CommandRegistry:
+    """
+    Registry of command handlers keyed by AST node class.
+
+    Lookups are a dictionary access on the node's exact class. A subclass
+    of a registered class resolves to its closest registered base the
+    first time it is seen and is then cached under its own class.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[type, CommandHandler] = {}
+        self._inherited: Dict[type, Optional[CommandHandler]] = {}
+        self._error_formatters: Dict[type, ErrorFormatter] = {}
+        self._resolved_formatters: Dict[type, Optional[ErrorFormatter]] = {}
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __contains__(self, node_class: type) -> bool:
+        return self.get(node_class) is not None
+
+    def register(self, node_class: type, func: CommandFunc, name: Optional[str] = None):
+        """
+        Register the function that executes a kind of AST node.
+
+        Args:
+            node_class: AST node class
+            func: Called as func(terminal, ast)
+            name: Command name used in error messages (default: the class name)
+
+        Raises:
+            TypeError: If node_class is not a class
+        """
+        if not isinstance(node_class, type):
+            raise TypeError(f"node_class must be a class, got {node_class!r}")
+        self._handlers[node_class] = CommandHandler(func, name or node_class.__name__)
+        self._inherited.clear()
+
+    def command(self, node_class: type, name: Optional[str] = None) -> Callable[[CommandFunc], CommandFunc]:
+        """
+        Decorator form of register.
+
+        Args:
+            node_class: AST node class
+            name: Command name used in error messages
+
+        Returns:
+            Decorator that registers the function and returns it unchanged
+        """
+        def decorator(func: CommandFunc) -> CommandFunc:
+            self.register(node_class, func, name)
+            return func
+        return decorator
+
+    def unregister(self, node_class: type):
+        """Remove the handler of an AST node class, if any."""
+        self._handlers.pop(node_class, None)
+        self._inherited.clear()
+
+    def get(self, node_class: type) -> Optional[CommandHandler]:
+        """
+        Find the handler for an AST node class.
+
+        Args:
+            node_class: Class of the node to execute
+
+        Returns:
+            The handler, or None if the class (and its bases) are not registered
+        """
+        handler = self._handlers.get(node_class)
+        if handler is not None:
+            return handler
+        try:
+            return self._inherited[node_class]
+        except KeyError:
+            pass
+        handler = next((self._handlers[base] for base in node_class.__mro__[1:]
+                        if base in self._handlers), None)
+        self._inherited[node_class] = handler
+        return handler
+
+    def register_error(self, error_class: type, formatter: ErrorFormatter):
+        """
+        Register how errors of a class (and its subclasses) are shown.
+
+        The formatter of the closest registered base class is used.
+
+        Args:
+            error_class: Exception class
+            formatter: Called as formatter(error, command_name); returns the message
+        """
+        self._error_formatters[error_class] = formatter
+        self._resolved_formatters.clear()
+
+    def format_error(self, error: BaseException, name: str) -> str:
+        """
+        Build the message for an error raised by a command.
+
+        Args:
+            error: Exception raised by the command function
+            name: Command name of the handler
+
+        Returns:
+            Message from the registered formatter, or str(error) if none applies
+        """
+        error_class = type(error)
+        try:
+            formatter = self._resolved_formatters[error_class]
+        except KeyError:
+            formatter = next((self._error_formatters[base] for base in error_class.__mro__
+                              if base in self._error_formatters), None)
+            self._resolved_formatters[error_class] = formatter
+        if formatter is None:
+            return str(error)
+        return formatter(error, name)
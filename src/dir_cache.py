@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Directory Cache
+This module implements a shared cache of directory listings used by ls
+and tab completion. Entries are invalidated through Linux inotify when
+available, and by comparing the directory mtime otherwise.
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+# Without inotify, a listing taken this soon after the directory's mtime is
+# re-read on the next access: a change in the same mtime tick would otherwise
+# go unnoticed
+MTIME_SLACK = 1.0
+
+
+class DirItem(NamedTuple):
+    """One directory entry, as reported by scandir."""
+    name: str
+    is_dir: bool
+    is_symlink: bool
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry) -> 'DirItem':
+        # is_dir() follows symlinks; both calls use the type cached by scandir
+        # except for symlinks, which need one stat
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        return cls(entry.name, is_dir, entry.is_symlink())
+
+
+class DirListing(NamedTuple):
+    """A cached directory listing, sorted by name."""
+    path: str
+    items: Tuple[DirItem, ...]
+    names: Tuple[str, ...]
+
+
+class _CacheEntry:
+    __slots__ = ('listing', 'mtime_ns', 'stable', 'watch')
+
+    def __init__(self, listing: DirListing, mtime_ns: int, stable: bool, watch: Optional[int]):
+        self.listing = listing
+        self.mtime_ns = mtime_ns
+        self.stable = stable
+        self.watch = watch
+
+
+class _Inotify:
+    """Minimal ctypes binding to Linux inotify, read without blocking."""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, 'O_NONBLOCK') else 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    # Events that change the set of names in a directory
+    WATCH_MASK = (IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+                  IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+    _EVENT = struct.Struct('iIII')
+
+    def __init__(self):
+        self.fd = -1
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._rm_watch = libc.inotify_rm_watch
+        self._rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    def add_watch(self, path: str) -> Optional[int]:
+        wd = self._add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def rm_watch(self, wd: int):
+        self._rm_watch(self.fd, wd)
+
+    def read_events(self) -> List[Tuple[int, int]]:
+        """Return pending (watch descriptor, mask) pairs without blocking."""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+                events.append((wd, mask))
+                offset += self._EVENT.size + length
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __del__(self):
+        try:
+            self.close()
+        except OSError:
+            pass
+
+
+class DirectoryCache:
+    """
+    Thread-safe LRU cache of directory listings keyed by absolute path.
+
+    With inotify, a cached listing is reused without touching the filesystem
+    until an event reports a change. Without it (or when a watch cannot be
+    added, or max_watches directories are already watched), the directory is
+    stat'ed and the listing reused while its mtime is unchanged.
+    """
+
+    def __init__(self, max_items: int = 500000, use_inotify: bool = True,
+                 max_watches: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            max_items: Maximum number of entries kept across all directories
+            use_inotify: Use inotify for invalidation when the platform has it
+            max_watches: Maximum number of inotify watches held at once; they
+                count against the per-user fs.inotify.max_user_watches limit
+        """
+        self.max_items = max_items
+        self.max_watches = max_watches
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._watches: Dict[int, str] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self._inotify: Optional[_Inotify] = None
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    @property
+    def watch_count(self) -> int:
+        with self._lock:
+            return len(self._watches)
+
+    def listing(self, path: str) -> DirListing:
+        """
+        Return the listing of a directory, from the cache when still valid.
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Listing with items and names sorted by name
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        path = os.path.abspath(path)
+        listing = self.cached(path)
+        if listing is not None:
+            return listing
+        return self._load(path)
+
+    def cached(self, path: str) -> Optional[DirListing]:
+        """
+        Return the cached listing of a directory if it is still valid,
+        without reading the directory otherwise.
+
+        Args:
+            path: Directory path
+
+        Returns:
+            Listing sorted by name, or None if not cached or stale
+        """
+        path = os.path.abspath(path)
+        self._drain_events()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.watch is not None:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry.listing
+        if entry is not None and entry.stable:
+            try:
+                if os.stat(path).st_mtime_ns == entry.mtime_ns:
+                    with self._lock:
+                        self.hits += 1
+                    return entry.listing
+            except OSError:
+                pass
+        return None
+
+    def lookup(self, path: str) -> Optional[DirItem]:
+        """
+        Describe a path through its parent's cached listing.
+
+        Args:
+            path: File or directory path
+
+        Returns:
+            The entry, or None if the path does not exist
+        """
+        path = os.path.abspath(path)
+        parent, name = os.path.split(path)
+        if name:
+            try:
+                listing = self.listing(parent)
+            except OSError:
+                listing = None
+            if listing is not None:
+                index = bisect.bisect_left(listing.names, name)
+                if index < len(listing.names) and listing.names[index] == name:
+                    return listing.items[index]
+                return None
+        # Filesystem root or unreadable parent: ask the filesystem directly
+        if not os.path.lexists(path):
+            return None
+        return DirItem(name or path, os.path.isdir(path), os.path.islink(path))
+
+    def invalidate(self, path: str):
+        """Drop the cached listing of a directory."""
+        with self._lock:
+            self._drop(os.path.abspath(path))
+
+    def clear(self):
+        with self._lock:
+            for path in list(self._entries):
+                self._drop(path)
+
+    def close(self):
+        """Release the inotify descriptor; the cache keeps working on mtimes."""
+        self.clear()
+        with self._lock:
+            inotify, self._inotify = self._inotify, None
+        if inotify is not None:
+            inotify.close()
+
+    # ==================== Internals ====================
+
+    def _load(self, path: str) -> DirListing:
+        # The watch is added before reading, so changes made while the
+        # directory is being listed still invalidate the result
+        watch = self._inotify.add_watch(path) if self._can_watch(path) else None
+        started = time.time()
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                items = sorted((DirItem.from_entry(entry) for entry in it),
+                               key=lambda item: item.name)
+        except OSError:
+            if watch is not None:
+                self._release_watch(watch)
+            raise
+        listing = DirListing(path, tuple(items), tuple(item.name for item in items))
+        stable = started - mtime_ns / 1e9 >= MTIME_SLACK
+        with self._lock:
+            self.misses += 1
+            self._drop(path, keep_watch=watch)
+            if len(items) > self.max_items:
+                if watch is not None:
+                    self._release_watch(watch)
+                return listing
+            self._entries[path] = _CacheEntry(listing, mtime_ns, stable, watch)
+            if watch is not None:
+                self._watches[watch] = path
+            self._size += len(items)
+            while self._size > self.max_items and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+        return listing
+
+    def _can_watch(self, path: str) -> bool:
+        # Beyond max_watches, directories fall back to mtime validation; a
+        # reloaded directory gets its existing descriptor back
+        inotify = self._inotify
+        if inotify is None:
+            return False
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.watch is not None:
+                return True
+            return len(self._watches) < self.max_watches
+
+    def _drop(self, path: str, keep_watch: Optional[int] = None):
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return
+        self._size -= len(entry.listing.items)
+        # inotify returns the same descriptor when a directory is watched
+        # again, so a reloaded entry keeps its watch
+        if entry.watch is not None and entry.watch != keep_watch:
+            self._watches.pop(entry.watch, None)
+            self._release_watch(entry.watch)
+
+    def _release_watch(self, watch: int):
+        if self._inotify is not None:
+            self._inotify.rm_watch(watch)
+
+    def _drain_events(self):
+        if self._inotify is None:
+            return
+        events = self._inotify.read_events()
+        if not events:
+            return
+        with self._lock:
+            for wd, mask in events:
+                if mask & _Inotify.IN_Q_OVERFLOW:
+                    for path in list(self._entries):
+                        self._drop(path)
+                    continue
+                path = self._watches.get(wd)
+                if path is None:
+                    continue
+                if mask & _Inotify.IN_IGNORED:
+                    # The kernel already removed the watch
+                    self._watches.pop(wd, None)
+                    entry = self._entries.get(path)
+                    if entry is not None and entry.watch == wd:
+                        entry.watch = None
+                self._drop(path)
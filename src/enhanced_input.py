@@ -4,16 +4,35 @@ TermIA - Enhanced Input Handler
 This module provides autocomplete, syntax highlighting, and history features.
 """
 
+import bisect
+import itertools
 import os
-from typing import List, Iterable
+import re
+import sqlite3
+from typing import List, Iterable, Iterator, Optional, Sequence, Tuple
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import Completer, Completion
-from prompt_toolkit.history import FileHistory
+from prompt_toolkit.history import FileHistory, History
 from prompt_toolkit.lexers import PygmentsLexer
 from prompt_toolkit.styles import Style
 from pygments.lexer import RegexLexer, bygroups
 from pygments.token import Keyword, Name, String, Number, Operator, Comment, Text
 
+from dir_cache import DirectoryCache, DirListing
+from history_index import HistoryIndex, HistoryMatch
+from history_store import HistoryStore, iter_file_history_reversed, tail_file_history
+from plugins import PluginManager
+
+
+# Commands whose arguments are completed as paths
+PATH_COMMANDS = ('cat', 'cd', 'ls', 'mkdir')
+# Completions offered at most per keystroke, so huge directories stay responsive
+MAX_PATH_COMPLETIONS = 200
+# Sorts after any character, so prefix + _MAX_CHAR bounds all names with that prefix
+_MAX_CHAR = '\U0010ffff'
+# Most recent commands loaded for up-arrow navigation
+HISTORY_LOAD_LIMIT = 10000
+
 
 class TermIALexer(RegexLexer):
     """
@@ -31,7 +50,9 @@ class TermIALexer(RegexLexer):
             (r'\b(ia)\b', Keyword.Namespace),
             (r'\b(ask|summarize|codeexplain|translate)\b', Keyword.Type),
             # Control Commands
-            (r'\b(history|clear|help|exit)\b', Keyword.Builtin),
+            (r'\b(history|clear|help|jobs|stats|exit)\b', Keyword.Builtin),
+            # Background operator
+            (r'&', Keyword.Pseudo),
             # Options
             (r'--?\w+', Name.Attribute),
             # Strings
@@ -49,18 +70,47 @@ class TermIALexer(RegexLexer):
     }
 
 
+def lexer_for_plugins(plugins: Optional[PluginManager]) -> type:
+    """
+    Return the highlighting lexer, extended with the plugins' keywords.
+
+    Args:
+        plugins: Plugin manager (None for the built-in commands only)
+
+    Returns:
+        TermIALexer or a subclass that also highlights plugin commands
+    """
+    words = sorted(plugins.keywords()) if plugins is not None else []
+    if not words:
+        return TermIALexer
+    pattern = r'\b(%s)\b' % '|'.join(re.escape(word) for word in words)
+    return type('TermIAPluginLexer', (TermIALexer,), {
+        'tokens': {'root': [(pattern, Keyword.Reserved)] + TermIALexer.tokens['root']},
+    })
+
+
 class TermIACompleter(Completer):
     """
     Custom completer for TermIA commands with intelligent suggestions.
     """
 
-    def __init__(self):
-        """Initialize the completer with command definitions."""
+    def __init__(self, dir_cache: Optional[DirectoryCache] = None,
+                 plugins: Optional[PluginManager] = None):
+        """
+        Initialize the completer with command definitions.
+
+        Args:
+            dir_cache: Directory cache shared with the command executor
+            plugins: Plugin manager whose commands are completed too
+        """
+        self.dir_cache = dir_cache or DirectoryCache()
+        self._dir_names: Tuple[str, ...] = ()
+        self._dir_names_listing: Optional[DirListing] = None
         # Define all commands and their subcommands
         self.commands = {
             # OS Commands
             'ls': {
-                'options': ['-a', '-l', '-h', '-la', '-lh', '-lah'],
+                'options': ['-a', '-l', '-h', '-R', '-U', '-la', '-lh', '-lah', '--max-depth', '--limit', '--offset', '--pager'],
                 'description': 'List files and directories'
             },
             'cd': {
@@ -76,7 +126,7 @@ class TermIACompleter(Completer):
                 'description': 'Print working directory'
             },
             'cat': {
-                'options': [],
+                'options': ['-n'],
                 'description': 'Display file contents'
             },
             # IA Commands
@@ -86,8 +136,8 @@ class TermIACompleter(Completer):
             },
             # Control Commands
             'history': {
-                'options': [],
-                'description': 'Show command history'
+                'options': ['search'],
+                'description': 'Show or fuzzy-search command history'
             },
             'clear': {
                 'options': [],
@@ -97,11 +147,23 @@ class TermIACompleter(Completer):
                 'options': [],
                 'description': 'Show help'
             },
+            'jobs': {
+                'options': ['wait', 'cancel'],
+                'description': 'List, wait for or cancel background AI jobs'
+            },
+            'stats': {
+                'options': ['clear', '--export'],
+                'description': 'Show per-command performance metrics'
+            },
             'exit': {
                 'options': [],
                 'description': 'Exit TermIA'
             }
         }
+        if plugins is not None:
+            # Built-in commands keep their definitions
+            for name, info in plugins.completions().items():
+                self.commands.setdefault(name, info)
 
         # IA subcommands with their options
         self.ia_subcommands = {
@@ -109,15 +171,15 @@ class TermIACompleter(Completer):
                 'description': 'Ask a question to AI'
             },
             'summarize': {
-                'options': ['--length'],
-                'description': 'Summarize text'
+                'options': ['--length', '--file'],
+                'description': 'Summarize text (or a file)'
             },
             'codeexplain': {
                 'description': 'Explain code from file'
             },
             'translate': {
-                'options': ['--to'],
-                'description': 'Translate text'
+                'options': ['--to', '--file'],
+                'description': 'Translate text (or every line of a file)'
             }
         }
 
@@ -176,9 +238,15 @@ class TermIACompleter(Completer):
                     subcmd = words[1]
                     if subcmd in self.ia_subcommands:
                         current = words[-1] if not text.endswith(' ') else ''
+                        previous = words[-1] if text.endswith(' ') else words[-2]
+
+                        # Paths for codeexplain and --file
+                        if (subcmd == 'codeexplain' and len(words) + text.endswith(' ') == 3) \
+                                or previous == '--file':
+                            yield from self._suggest_files(current)
 
                         # For summarize --length
-                        if subcmd == 'summarize' and '--length' in words:
+                        elif subcmd == 'summarize' and '--length' in words:
                             for length in self.summary_lengths:
                                 if length.startswith(current):
                                     yield Completion(
@@ -223,50 +291,106 @@ class TermIACompleter(Completer):
                                 display=opt
                             )
 
-                # For commands that take filenames, suggest files
-                if cmd in ['cat', 'cd', 'ia'] and len(words) >= 2:
-                    self._suggest_files(current, complete_event, document)
+                # For commands that take paths, suggest files (only directories for cd/mkdir)
+                if (cmd in PATH_COMMANDS and (len(words) >= 2 or text.endswith(' '))
+                        and not current.startswith('-')):
+                    yield from self._suggest_files(current, dirs_only=cmd in ('cd', 'mkdir'))
 
-    def _suggest_files(self, prefix, complete_event, document):
+    def _suggest_files(self, prefix: str, dirs_only: bool = False) -> Iterator[Completion]:
         """
         Suggest files and directories based on current prefix.
 
+        Names come from the shared directory cache, already sorted, so the
+        matching range is found by binary search instead of a full scan.
+
         Args:
             prefix: Current word being typed
-            complete_event: Completion event
-            document: Current document
+            dirs_only: Suggest only directories
+
+        Yields:
+            Completion objects (directories end with '/')
         """
+        directory_part, file_prefix = os.path.split(prefix)
+        directory = os.path.expanduser(directory_part) if directory_part else '.'
         try:
-            # Determine directory to search
-            if '/' in prefix or '\\' in prefix:
-                directory = os.path.dirname(prefix) or '.'
-                file_prefix = os.path.basename(prefix)
-            else:
-                directory = '.'
-                file_prefix = prefix
-
-            # Expand ~ to home
-            directory = os.path.expanduser(directory)
-
-            # List files in directory
-            if os.path.isdir(directory):
-                for item in os.listdir(directory):
-                    if item.startswith(file_prefix):
-                        full_path = os.path.join(directory, item)
-                        is_dir = os.path.isdir(full_path)
-
-                        # Add trailing slash for directories
-                        display = item + '/' if is_dir else item
-
-                        yield Completion(
-                            item,
-                            start_position=-len(file_prefix),
-                            display=display,
-                            display_meta='directory' if is_dir else 'file'
-                        )
-        except (OSError, PermissionError):
-            # Silently ignore errors
-            pass
+            listing = self.dir_cache.listing(directory)
+        except OSError:
+            # Missing or unreadable directory: nothing to suggest
+            return
+
+        names = self._directory_names(listing) if dirs_only else listing.names
+        for count, index in enumerate(self._prefix_range(names, file_prefix)):
+            if count >= MAX_PATH_COMPLETIONS:
+                return
+            name = names[index]
+            is_dir = dirs_only or listing.items[index].is_dir
+            yield Completion(
+                name + '/' if is_dir else name,
+                start_position=-len(file_prefix),
+                display=name + '/' if is_dir else name,
+                display_meta='directory' if is_dir else 'file'
+            )
+
+    @staticmethod
+    def _prefix_range(names: Sequence[str], prefix: str) -> Iterable[int]:
+        """
+        Indexes of the sorted names that start with prefix.
+
+        Hidden names are only included when the prefix starts with '.'; since
+        they all start with '.', they form a single block that is skipped.
+        """
+        lo = bisect.bisect_left(names, prefix)
+        hi = bisect.bisect_left(names, prefix + _MAX_CHAR, lo)
+        if prefix:
+            return range(lo, hi)
+        hidden_lo = bisect.bisect_left(names, '.', lo, hi)
+        hidden_hi = bisect.bisect_left(names, '.' + _MAX_CHAR, hidden_lo, hi)
+        return itertools.chain(range(lo, hidden_lo), range(hidden_hi, hi))
+
+    def _directory_names(self, listing: DirListing) -> Tuple[str, ...]:
+        """Sorted subdirectory names of a listing, rebuilt only when the listing changes."""
+        if self._dir_names_listing is not listing:
+            self._dir_names = tuple(item.name for item in listing.items if item.is_dir)
+            self._dir_names_listing = listing
+        return self._dir_names
+
+
+class StoreHistory(History):
+    """
+    prompt_toolkit history backed by a HistoryStore.
+
+    Commands are written to the store by the terminal after they run, with
+    their status and duration, so store_string only keeps the in-memory list.
+    """
+
+    def __init__(self, store: HistoryStore, load_limit: int = HISTORY_LOAD_LIMIT):
+        super().__init__()
+        self.store = store
+        self.load_limit = load_limit
+
+    def load_history_strings(self) -> Iterable[str]:
+        return self.store.recent_commands(self.load_limit)
+
+    def store_string(self, string: str) -> None:
+        pass
+
+
+class TailFileHistory(FileHistory):
+    """
+    FileHistory that loads only the most recent commands at startup.
+
+    The file is read backwards from the end, so the first prompt does not
+    wait for the whole file to be parsed.
+    """
+
+    def __init__(self, filename: str, load_limit: int = HISTORY_LOAD_LIMIT):
+        super().__init__(filename)
+        self.load_limit = load_limit
+
+    def load_history_strings(self) -> Iterable[str]:
+        if not os.path.exists(self.filename):
+            return
+        yield from itertools.islice(iter_file_history_reversed(self.filename), self.load_limit)
 
 
 class EnhancedInputHandler:
@@ -274,12 +398,18 @@ class EnhancedInputHandler:
     Enhanced input handler with autocomplete, highlighting, and history.
     """
 
-    def __init__(self, history_file: str = '.termia_history'):
+    def __init__(self, history_file: str = '.termia_history',
+                 dir_cache: Optional[DirectoryCache] = None,
+                 history_db: Optional[str] = None,
+                 plugins: Optional[PluginManager] = None):
         """
         Initialize the enhanced input handler.
 
         Args:
-            history_file: Path to history file
+            history_file: Path to the plain-text history file, imported into the database
+            dir_cache: Directory cache shared with the command executor
+            history_db: Path to the history database (default: history_file + '.sqlite3')
+            plugins: Plugin manager whose commands are completed and highlighted
         """
         self.history_file = history_file
 
@@ -287,11 +417,29 @@ class EnhancedInputHandler:
         if not os.path.exists(history_file):
             open(history_file, 'a').close()
 
+        # Commands from the plain-text file (older versions, other tools) are
+        # imported once; later appends are picked up incrementally. If the
+        # database cannot be opened, the plain-text file is used directly.
+        self.history_store: Optional[HistoryStore] = None
+        try:
+            self.history_store = HistoryStore(history_db or history_file + '.sqlite3')
+            self.history_store.import_file_history(history_file)
+            history: History = StoreHistory(self.history_store)
+        except (sqlite3.Error, OSError):
+            if self.history_store is not None:
+                self.history_store.close()
+                self.history_store = None
+            history = TailFileHistory(history_file)
+
+        # Built on the first fuzzy search, then kept up to date
+        self._history_index: Optional[HistoryIndex] = None
+        self._indexed_id = 0
+
         # Create prompt session with all features
         self.session = PromptSession(
-            history=FileHistory(history_file),
-            completer=TermIACompleter(),
-            lexer=PygmentsLexer(TermIALexer),
+            history=history,
+            completer=TermIACompleter(dir_cache, plugins),
+            lexer=PygmentsLexer(lexer_for_plugins(plugins)),
             style=self._create_style(),
             complete_while_typing=True,
             enable_history_search=True,
@@ -346,21 +494,91 @@ class EnhancedInputHandler:
         Search command history for matching entries.
 
         Args:
-            query: Search query
+            query: Search query (every word must appear, as a word prefix)
 
         Returns:
-            List of matching history entries
+            List of matching history entries, oldest first
         """
         try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            # Filter lines that contain the query
-            matches = [line.strip() for line in lines if query.lower() in line.lower()]
-            return matches
+            if self.history_store is None:
+                matches = [command for command in iter_file_history_reversed(self.history_file)
+                           if query.lower() in command.lower()]
+                matches.reverse()
+                return matches
+            self.history_store.import_file_history(self.history_file)
+            return [entry.command for entry in self.history_store.search(query)]
         except Exception:
             return []
 
+    def rank_history(self, query: str, limit: int = 20) -> List[HistoryMatch]:
+        """
+        Fuzzy-search the command history.
+
+        Args:
+            query: Text to look for (small typos are tolerated)
+            limit: Maximum number of results
+
+        Returns:
+            Matches ranked by similarity and recency, best first
+        """
+        if self.history_store is None:
+            if self._history_index is None:
+                commands = list(iter_file_history_reversed(self.history_file))
+                commands.reverse()
+                self._history_index = HistoryIndex(commands)
+        else:
+            # Only the commands recorded since the last search are indexed
+            self.history_store.import_file_history(self.history_file)
+            rows = self.history_store.commands_since(self._indexed_id)
+            if rows:
+                if self._history_index is None:
+                    self._history_index = HistoryIndex(command for _, command in rows)
+                else:
+                    for _, command in rows:
+                        self._history_index.add(command)
+                self._indexed_id = rows[-1][0]
+            elif self._history_index is None:
+                self._history_index = HistoryIndex()
+        return self._history_index.search(query, limit)
+
+    def last_commands(self, n: int) -> List[str]:
+        """
+        Return the last n commands, oldest first.
+
+        Without the database, the plain-text file is read backwards from the
+        end, so the cost does not grow with the size of the file.
+
+        Args:
+            n: Number of commands
+
+        Returns:
+            Up to n command lines
+        """
+        if self.history_store is None:
+            return tail_file_history(self.history_file, n)
+        return [entry.command for entry in self.history_store.last(n)]
+
+    def record(self, command: str, started: float, duration: float, status: int):
+        """
+        Record an executed command in the history database.
+
+        Args:
+            command: Command line
+            started: Start timestamp
+            duration: Seconds the command took
+            status: Exit status (0 for success)
+        """
+        # Without the database, FileHistory has already appended the command
+        if self.history_store is not None:
+            self.history_store.add(command, started, duration, status)
+        elif self._history_index is not None:
+            self._history_index.add(command)
+
+    def close(self):
+        """Close the history database."""
+        if self.history_store is not None:
+            self.history_store.close()
+
 
 def main():
     """Test function for enhanced input handler."""
@@ -4,11 +4,57 @@ TermIA - Command Executor
 This module implements safe execution of operating system commands.
 """
 
+import codecs
+import heapq
+import itertools
+import operator
 import os
+import shutil
+import stat
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
-import yaml
+from typing import Optional, Dict, Any, Iterable, Iterator, List, NamedTuple
+
+from dir_cache import DirectoryCache, DirItem
+
+# cat reads files in fixed-size blocks, so memory use does not depend on file size
+CAT_BLOCK_SIZE = 64 * 1024
+# Bytes inspected to decide whether a file is binary
+BINARY_SNIFF_SIZE = 8192
+# Threads scanning subdirectories concurrently for ls -R
+LS_WALK_WORKERS = 8
+
+# 'rwxr-x---' style string for every value of the nine permission bits
+_PERMISSION_TRIPLETS = [
+    ('r' if bits & 4 else '-') + ('w' if bits & 2 else '-') + ('x' if bits & 1 else '-')
+    for bits in range(8)
+]
+PERMISSION_STRINGS = tuple(
+    _PERMISSION_TRIPLETS[mode >> 6] + _PERMISSION_TRIPLETS[(mode >> 3) & 7] + _PERMISSION_TRIPLETS[mode & 7]
+    for mode in range(0o1000)
+)
+
+
+def _format_size(size: int, human_readable: bool) -> str:
+    if not human_readable:
+        return str(size)
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024.0:
+            return f"{size:3.1f}{unit}"
+        size = size / 1024.0
+    return f"{size:3.1f}TB"
+
+
+class _ListingOptions(NamedTuple):
+    """How ls reads and prints each directory."""
+    show_hidden: bool
+    long_format: bool
+    human_readable: bool
+    sort: bool
+    offset: int
+    limit: Optional[int]
+    width: int
 
 
 class SecurityException(Exception):
@@ -21,15 +67,29 @@ class CommandExecutor:
     Operating system command executor with security checks.
     """
 
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", dir_cache: Optional[DirectoryCache] = None):
         self.current_dir = os.getcwd()
         self.config = self._load_config(config_path)
         self.safe_mode = self.config.get('security', {}).get('safe_mode', True)
         self.restricted_commands = self.config.get('security', {}).get('restricted_commands', [])
+        if dir_cache is None:
+            cache_config = self.config.get('dir_cache') or {}
+            dir_cache = DirectoryCache(
+                max_items=cache_config.get('max_items', 500000),
+                use_inotify=cache_config.get('inotify', True),
+                max_watches=cache_config.get('max_watches', 256),
+            )
+        # Shared with tab completion, so ls and completion list each directory once
+        self.dir_cache = dir_cache
+
+    def close(self):
+        self.dir_cache.close()
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         try:
             if os.path.exists(config_path):
+                # yaml is only imported when there is a config file to read
+                import yaml
                 with open(config_path, 'r', encoding='utf-8') as f:
                     return yaml.safe_load(f) or {}
         except Exception as e:
@@ -57,57 +117,154 @@ class CommandExecutor:
     def execute_pwd(self) -> str:
         return self.current_dir
 
-    def execute_ls(self, options: Optional[str] = None, path: str = '.') -> str:
+    def execute_ls(self, options: Optional[str] = None, path: str = '.',
+                   max_depth: Optional[int] = None, limit: Optional[int] = None,
+                   offset: int = 0) -> str:
+        return '\n'.join(self.stream_ls(options, path, max_depth, limit, offset))
+
+    def stream_ls(self, options: Optional[str] = None, path: str = '.',
+                  max_depth: Optional[int] = None, limit: Optional[int] = None,
+                  offset: int = 0) -> Iterator[str]:
         self._check_security('ls', path)
         target_path = self._resolve_path(path)
-        if not os.path.exists(target_path):
-            raise FileNotFoundError(f"ls: cannot access '{path}': No such file or directory")
-        if not os.path.isdir(target_path):
-            return os.path.basename(target_path)
-        show_hidden = options and 'a' in options
-        long_format = options and 'l' in options
-        human_readable = options and 'h' in options
+        listing = _ListingOptions(
+            show_hidden=bool(options and 'a' in options),
+            long_format=bool(options and 'l' in options),
+            human_readable=bool(options and 'h' in options),
+            sort=not (options and 'U' in options),
+            offset=offset,
+            limit=limit,
+            width=shutil.get_terminal_size((80, 24)).columns,
+        )
+        recursive = bool(options and 'R' in options) or max_depth is not None
         try:
-            entries = os.listdir(target_path)
+            items = self._scan_dir(target_path, listing)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"ls: cannot access '{path}': No such file or directory")
+        except NotADirectoryError:
+            return iter([os.path.basename(target_path)])
         except PermissionError:
             raise PermissionError(f"ls: cannot open directory '{path}': Permission denied")
-        if not show_hidden:
-            entries = [e for e in entries if not e.startswith('.')]
-        entries.sort()
-        if long_format:
-            output = []
-            for entry in entries:
-                entry_path = os.path.join(target_path, entry)
+        if not recursive:
+            return self._format_listing(target_path, items, listing)
+        return self._iter_ls_tree(path, target_path, list(items), listing, max_depth)
+
+    def _iter_ls_tree(self, path: str, target_path: str, items: List[DirItem],
+                      listing: _ListingOptions, max_depth: Optional[int]) -> Iterator[str]:
+        first = True
+        for display, dir_path, dir_items, error in self._walk_tree(path, target_path, items,
+                                                                    listing, max_depth):
+            if not first:
+                yield ''
+            first = False
+            yield f"{display}:"
+            if error is not None:
+                yield f"ls: cannot open directory '{display}': {error.strerror or error}"
+            else:
+                yield from self._format_listing(dir_path, dir_items, listing)
+
+    def _walk_tree(self, display: str, target_path: str, items: List[DirItem],
+                   listing: _ListingOptions, max_depth: Optional[int]):
+        # Subdirectories are scanned on the pool as soon as their parent is
+        # known, while sections are yielded in depth-first, sorted order
+        pool = ThreadPoolExecutor(max_workers=LS_WALK_WORKERS, thread_name_prefix='termia-ls')
+        done = Future()
+        done.set_result(items)
+        stack = [(display, target_path, 0, done)]
+        try:
+            while stack:
+                display, target_path, depth, future = stack.pop()
                 try:
-                    stat = os.stat(entry_path)
-                    file_type = 'd' if os.path.isdir(entry_path) else '-'
-                    mode = stat.st_mode
-                    perms = [
-                        'r' if mode & 0o400 else '-', 'w' if mode & 0o200 else '-', 'x' if mode & 0o100 else '-',
-                        'r' if mode & 0o040 else '-', 'w' if mode & 0o020 else '-', 'x' if mode & 0o010 else '-',
-                        'r' if mode & 0o004 else '-', 'w' if mode & 0o002 else '-', 'x' if mode & 0o001 else '-',
-                    ]
-                    perms_str = ''.join(perms)
-                    size = stat.st_size
-                    if human_readable:
-                        for unit in ['B', 'KB', 'MB', 'GB']:
-                            if size < 1024.0:
-                                size_str = f"{size:3.1f}{unit}"
-                                break
-                            size = size / 1024.0
-                    else:
-                        size_str = str(stat.st_size)
-                    line = f"{file_type}{perms_str} {size_str:>8} {entry}"
-                    output.append(line)
-                except (OSError, PermissionError):
-                    output.append(f"?????????? ? {entry}")
-            return '\n'.join(output)
+                    dir_items, error = future.result(), None
+                except OSError as e:
+                    dir_items, error = [], e
+                yield display, target_path, dir_items, error
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                # Symlinked directories are listed but not descended into, so
+                # a link back to an ancestor cannot make the walk loop forever
+                children = [
+                    (os.path.join(display, item.name), os.path.join(target_path, item.name),
+                     depth + 1, pool.submit(self._list_dir, os.path.join(target_path, item.name), listing))
+                    for item in dir_items
+                    if item.is_dir and not item.is_symlink
+                ]
+                stack.extend(reversed(children))
+        finally:
+            for _, _, _, future in stack:
+                future.cancel()
+            pool.shutdown(wait=False)
+
+    def _list_dir(self, target_path: str, listing: _ListingOptions) -> List[DirItem]:
+        return list(self._scan_dir(target_path, listing))
+
+    def _scan_dir(self, target_path: str, listing: _ListingOptions) -> Iterator[DirItem]:
+        # The directory is read here, so errors surface before iterating
+        stop = None if listing.limit is None else listing.offset + listing.limit
+        if not listing.sort:
+            # -U: directory order, entries flow straight from scandir without
+            # going through the cache, so memory does not grow with the directory
+            items = self._iter_entries(os.scandir(target_path))
+        elif stop is None:
+            items = iter(self.dir_cache.listing(target_path).items)
         else:
-            return '  '.join(entries)
+            cached = self.dir_cache.cached(target_path)
+            if cached is None:
+                # A window of an uncached directory is selected straight from
+                # scandir, keeping only offset + limit entries in memory; the
+                # cache is filled by the next full listing or completion
+                items = self._visible(self._iter_entries(os.scandir(target_path)), listing)
+                return iter(heapq.nsmallest(stop, items, key=operator.attrgetter('name'))[listing.offset:])
+            items = iter(cached.items)
+        return itertools.islice(self._visible(items, listing), listing.offset, stop)
+
+    @staticmethod
+    def _visible(items: Iterator[DirItem], listing: _ListingOptions) -> Iterator[DirItem]:
+        if listing.show_hidden:
+            return items
+        return (item for item in items if not item.name.startswith('.'))
+
+    @staticmethod
+    def _iter_entries(scandir_it) -> Iterator[DirItem]:
+        with scandir_it:
+            for entry in scandir_it:
+                yield DirItem.from_entry(entry)
+
+    def _format_listing(self, directory: str, items: Iterable[DirItem],
+                        listing: _ListingOptions) -> Iterator[str]:
+        if listing.long_format:
+            for item in items:
+                yield self._format_long_entry(directory, item, listing.human_readable)
+            return
+        # Short format: names separated by two spaces, wrapped at the terminal width
+        row: List[str] = []
+        row_width = 0
+        for item in items:
+            if row and row_width + 2 + len(item.name) > listing.width:
+                yield '  '.join(row)
+                row, row_width = [], 0
+            row_width += len(item.name) + (2 if row else 0)
+            row.append(item.name)
+        if row:
+            yield '  '.join(row)
+
+    @staticmethod
+    def _format_long_entry(directory: str, item: DirItem, human_readable: bool) -> str:
+        # The only per-entry syscall: sizes and modes are never cached
+        try:
+            st = os.stat(os.path.join(directory, item.name))
+            file_type = 'd' if stat.S_ISDIR(st.st_mode) else '-'
+            perms_str = PERMISSION_STRINGS[st.st_mode & 0o777]
+            size_str = _format_size(st.st_size, human_readable)
+            return f"{file_type}{perms_str} {size_str:>8} {item.name}"
+        except OSError:
+            return f"?????????? ? {item.name}"
 
     def execute_cd(self, path: str = '~') -> str:
         self._check_security('cd', path)
         target_path = self._resolve_path(path)
+        # Only checked here: the directory is listed (and cached) by the
+        # first ls or completion that needs it
         if not os.path.exists(target_path):
             raise FileNotFoundError(f"cd: {path}: No such file or directory")
         if not os.path.isdir(target_path):
@@ -116,6 +273,10 @@ class CommandExecutor:
             os.chdir(target_path)
             self.current_dir = os.getcwd()
             return f"Changed directory to: {self.current_dir}"
+        except FileNotFoundError:
+            raise FileNotFoundError(f"cd: {path}: No such file or directory")
+        except NotADirectoryError:
+            raise NotADirectoryError(f"cd: {path}: Not a directory")
         except PermissionError:
             raise PermissionError(f"cd: {path}: Permission denied")
 
@@ -138,7 +299,10 @@ class CommandExecutor:
         except OSError as e:
             raise OSError(f"mkdir: cannot create directory '{path}': {e}")
 
-    def execute_cat(self, filepath: str) -> str:
+    def execute_cat(self, filepath: str, number_lines: bool = False) -> str:
+        return ''.join(self.stream_cat(filepath, number_lines))
+
+    def stream_cat(self, filepath: str, number_lines: bool = False) -> Iterator[str]:
         self._check_security('cat', filepath)
         target_path = self._resolve_path(filepath)
         if not os.path.exists(target_path):
@@ -146,17 +310,52 @@ class CommandExecutor:
         if os.path.isdir(target_path):
             raise IsADirectoryError(f"cat: {filepath}: Is a directory")
         try:
-            with open(target_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return content
+            f = open(target_path, 'rb')
         except PermissionError:
             raise PermissionError(f"cat: {filepath}: Permission denied")
-        except UnicodeDecodeError:
-            try:
-                with open(target_path, 'rb') as f:
-                    content = f.read()
-                return f"<binary file, {len(content)} bytes>"
-            except Exception as e:
-                raise Exception(f"cat: error reading file: {e}")
         except Exception as e:
             raise Exception(f"cat: error reading file: {e}")
+        return self._iter_cat(f, target_path, number_lines)
+
+    def _iter_cat(self, f, target_path: str, number_lines: bool) -> Iterator[str]:
+        with f:
+            prefix = f.read(BINARY_SNIFF_SIZE)
+            if self._looks_binary(prefix):
+                yield f"<binary file, {os.stat(target_path).st_size} bytes>"
+                return
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            line_number = 0
+            at_line_start = True
+            block = prefix
+            while block:
+                text = decoder.decode(block)
+                if number_lines and text:
+                    numbered = []
+                    pieces = text.split('\n')
+                    for i, piece in enumerate(pieces):
+                        last = i == len(pieces) - 1
+                        if last and not piece:
+                            break
+                        if at_line_start:
+                            line_number += 1
+                            numbered.append(f"{line_number:6d}\t")
+                        numbered.append(piece if last else piece + '\n')
+                        at_line_start = not last
+                    text = ''.join(numbered)
+                if text:
+                    yield text
+                block = f.read(CAT_BLOCK_SIZE)
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+    @staticmethod
+    def _looks_binary(prefix: bytes) -> bool:
+        if b'\0' in prefix:
+            return True
+        try:
+            # The prefix may end in the middle of a multi-byte character
+            codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        except UnicodeDecodeError:
+            return True
+        return False
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - History Index
+This module implements an in-memory trigram index over the command history,
+used by `history search`. Commands are added as they are appended to the
+history, and searches rank matches by fuzzy similarity and recency.
+"""
+
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Fraction of the query trigrams a command must contain to match
+MIN_SIMILARITY = 0.5
+
+# Most recent candidates scored per search; keeps searches interactive on
+# very large histories
+MAX_CANDIDATES = 10000
+
+# Highest score a command can get from matching alone (the query at its start)
+MAX_MATCH_SCORE = 1.5
+
+# Fuzzy matches score up to this, below any verbatim match
+FUZZY_MAX_SCORE = 0.9
+
+# Weight of recency in the final score, and the number of commands after
+# which the recency bonus halves
+RECENCY_WEIGHT = 0.5
+RECENCY_HALF_LIFE = 1000
+
+# Compaction is skipped while the index holds fewer stale ids than this
+COMPACT_MIN = 1024
+
+
+class HistoryMatch(NamedTuple):
+    """One ranked search result."""
+    command: str
+    score: float
+
+
+def trigrams(text: str) -> Set[str]:
+    """Return the set of 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class HistoryIndex:
+    """
+    Trigram index of unique commands, newest last.
+
+    Each command is stored once, under the id of its latest occurrence:
+    adding a command again gives it a new id and leaves the old one stale.
+    Ids therefore grow with recency, so every posting list is sorted from
+    oldest to newest and the most recent candidates are its tail. Stale ids
+    are dropped by a compaction once they outnumber the live ones.
+    """
+
+    def __init__(self, commands: Iterable[str] = ()):
+        """
+        Build the index.
+
+        Args:
+            commands: Initial commands, oldest first
+        """
+        self._commands: List[str] = []
+        self._latest: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._stale = 0
+        # Only the latest occurrence of each command is indexed
+        latest: Dict[str, None] = {}
+        for command in commands:
+            command = command.strip()
+            if command:
+                latest.pop(command, None)
+                latest[command] = None
+        self._index_all(latest)
+
+    def __len__(self) -> int:
+        """Number of unique commands."""
+        return len(self._latest)
+
+    def add(self, command: str):
+        """
+        Append a command (the newest one).
+
+        Args:
+            command: Command line
+        """
+        command = command.strip()
+        if not command:
+            return
+        if command in self._latest:
+            self._stale += 1
+        doc = len(self._commands)
+        self._commands.append(command)
+        self._latest[command] = doc
+        for trigram in trigrams(command.lower()):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                postings = self._postings[trigram] = array('I')
+            postings.append(doc)
+        if self._stale > COMPACT_MIN and self._stale > len(self._latest):
+            self._compact()
+
+    def search(self, query: str, limit: int = 20) -> List[HistoryMatch]:
+        """
+        Find the commands that best match query.
+
+        Commands containing the query verbatim score highest, more so when
+        it starts a word or the command. Other commands match when they
+        contain at least MIN_SIMILARITY of the query's trigrams, so small
+        typos still find them. Recent commands get a bonus that halves every
+        RECENCY_HALF_LIFE commands.
+
+        Args:
+            query: Text to look for
+            limit: Maximum number of results
+
+        Returns:
+            Matches, best first
+        """
+        needle = query.strip().lower()
+        if not needle or limit <= 0:
+            return []
+        wanted = trigrams(needle)
+        best: List[Tuple[float, int, str]] = []
+        if not wanted:
+            # Queries shorter than a trigram only match as substrings
+            recent = range(len(self._commands) - 1, max(-1, len(self._commands) - 1 - MAX_CANDIDATES), -1)
+            self._collect(best, limit, needle, recent, MAX_MATCH_SCORE, self._verbatim_score)
+        else:
+            lists = sorted((self._postings.get(trigram, array('I')) for trigram in wanted), key=len)
+            # A verbatim match contains every query trigram, the rarest included
+            self._collect(best, limit, needle, reversed(lists[0]), MAX_MATCH_SCORE,
+                          self._verbatim_score)
+            # A command sharing `required` of the trigrams contains at least
+            # one of the (len - required + 1) rarest ones
+            required = max(1, math.ceil(len(wanted) * MIN_SIMILARITY))
+            docs = set()
+            for postings in lists[:len(wanted) - required + 1]:
+                docs.update(postings[-MAX_CANDIDATES:])
+            candidates = sorted(docs, reverse=True)[:MAX_CANDIDATES]
+            self._collect(best, limit, (needle, wanted), candidates, FUZZY_MAX_SCORE,
+                          self._fuzzy_score)
+        best.sort(reverse=True)
+        return [HistoryMatch(command, score) for score, _, command in best]
+
+    # ==================== Internals ====================
+
+    def _collect(self, best: List[Tuple[float, int, str]], limit: int, pattern,
+                 docs: Iterable[int], max_score: float, score_fn):
+        # Keeps the `limit` best (score, id, command) in the min-heap `best`;
+        # docs come newest first, so the scan stops once no remaining command
+        # could enter the heap even with the highest score
+        newest = len(self._commands) - 1
+        for doc in docs:
+            recency = RECENCY_WEIGHT * 0.5 ** ((newest - doc) / RECENCY_HALF_LIFE)
+            if len(best) == limit and best[0][0] >= max_score + recency:
+                break
+            command = self._commands[doc]
+            if self._latest[command] != doc:
+                continue
+            score = score_fn(pattern, command.lower())
+            if score is None:
+                continue
+            item = (score + recency, doc, command)
+            if len(best) < limit:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+    @staticmethod
+    def _verbatim_score(needle: str, text: str) -> Optional[float]:
+        position = text.find(needle)
+        if position < 0:
+            return None
+        if position == 0:
+            return MAX_MATCH_SCORE
+        return 1.25 if not text[position - 1].isalnum() else 1.0
+
+    @staticmethod
+    def _fuzzy_score(pattern: Tuple[str, Set[str]], text: str) -> Optional[float]:
+        needle, wanted = pattern
+        shared = sum(1 for trigram in wanted if trigram in text)
+        similarity = shared / len(wanted)
+        if similarity < MIN_SIMILARITY or (shared == len(wanted) and needle in text):
+            # Verbatim matches were already scored by the first pass
+            return None
+        return FUZZY_MAX_SCORE * similarity
+
+    def _index_all(self, unique_commands: Iterable[str]):
+        # Bulk version of add for distinct, stripped commands, oldest first
+        postings_by_trigram = self._postings
+        for command in unique_commands:
+            doc = len(self._commands)
+            self._commands.append(command)
+            self._latest[command] = doc
+            text = command.lower()
+            for trigram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                postings = postings_by_trigram.get(trigram)
+                if postings is None:
+                    postings = postings_by_trigram[trigram] = array('I')
+                postings.append(doc)
+
+    def _compact(self):
+        # Renumber the live commands in recency order and rebuild the postings
+        live = [command for command, _ in sorted(self._latest.items(), key=lambda item: item[1])]
+        self._commands = []
+        self._latest = {}
+        self._postings = {}
+        self._stale = 0
+        self._index_all(live)
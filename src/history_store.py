@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - History Store
+This module implements the command history database: a SQLite table of
+commands with start time, duration and exit status, plus an FTS5 index for
+full-text search. Plain-text history files (prompt_toolkit's FileHistory
+format) are imported incrementally.
+"""
+
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Bytes read per step when scanning a history file backwards from the end
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+class HistoryEntry(NamedTuple):
+    """One command from the history."""
+    id: int
+    command: str
+    started: float
+    duration: Optional[float]
+    status: Optional[int]
+
+
+class HistoryStore:
+    """
+    Command history backed by SQLite.
+
+    Entries are keyed by an increasing id, so the last N commands are read
+    straight from the primary key index. When the SQLite build has FTS5,
+    searches go through a full-text index kept in sync by triggers;
+    otherwise they fall back to a LIKE scan.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the history database.
+
+        Args:
+            path: Database file path (':memory:' for a temporary store)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # Several terminals may share the same history file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS commands ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " command TEXT NOT NULL,"
+            " started REAL NOT NULL,"
+            " duration REAL,"
+            " status INTEGER)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.has_fts = self._create_fts()
+        self._conn.commit()
+
+    def _create_fts(self) -> bool:
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS commands_fts USING fts5("
+                " command, content='commands', content_rowid='id')"
+            )
+        except sqlite3.OperationalError:
+            return False
+        self._conn.executescript(
+            "CREATE TRIGGER IF NOT EXISTS commands_ai AFTER INSERT ON commands BEGIN"
+            "  INSERT INTO commands_fts (rowid, command) VALUES (new.id, new.command);"
+            " END;"
+            "CREATE TRIGGER IF NOT EXISTS commands_ad AFTER DELETE ON commands BEGIN"
+            "  INSERT INTO commands_fts (commands_fts, rowid, command)"
+            "  VALUES ('delete', old.id, old.command);"
+            " END;"
+        )
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+
+    def add(self, command: str, started: Optional[float] = None,
+            duration: Optional[float] = None, status: Optional[int] = None) -> int:
+        """
+        Record a command.
+
+        Args:
+            command: Command line
+            started: Start timestamp (defaults to now)
+            duration: Seconds the command took
+            status: Exit status (0 for success)
+
+        Returns:
+            Id of the new entry
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO commands (command, started, duration, status) VALUES (?, ?, ?, ?)",
+                (command, time.time() if started is None else started, duration, status)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def last(self, n: int) -> List[HistoryEntry]:
+        """
+        Return the last n commands, oldest first.
+
+        Args:
+            n: Number of commands
+
+        Returns:
+            Up to n entries
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, command, started, duration, status FROM commands"
+                " ORDER BY id DESC LIMIT ?", (max(n, 0),)
+            ).fetchall()
+        return [HistoryEntry(*row) for row in reversed(rows)]
+
+    def recent_commands(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Return command lines newest first.
+
+        Args:
+            limit: Maximum number of commands (None for all)
+
+        Returns:
+            Command lines, most recent first
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT command FROM commands ORDER BY id DESC LIMIT ?",
+                (-1 if limit is None else limit,)
+            ).fetchall()
+        return [command for (command,) in rows]
+
+    def commands_since(self, last_id: int = 0) -> List[Tuple[int, str]]:
+        """
+        Return the commands recorded after a given id, oldest first.
+
+        Args:
+            last_id: Id of the last command already seen (0 for all)
+
+        Returns:
+            (id, command) pairs
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, command FROM commands WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+
+    def search(self, query: str, limit: int = 100) -> List[HistoryEntry]:
+        """
+        Find commands containing every word of query.
+
+        With FTS5, each word matches as a word prefix ('ls' finds 'ls -la');
+        queries without letters or digits are matched as substrings.
+
+        Args:
+            query: Words to look for
+            limit: Maximum number of entries (the most recent ones)
+
+        Returns:
+            Matching entries, oldest first
+        """
+        words = re.findall(r'\w+', query)
+        with self._lock:
+            if self.has_fts and words:
+                match = ' '.join('"{}"*'.format(word.replace('"', '""')) for word in words)
+                rows = self._conn.execute(
+                    "SELECT c.id, c.command, c.started, c.duration, c.status"
+                    " FROM commands_fts JOIN commands c ON c.id = commands_fts.rowid"
+                    " WHERE commands_fts MATCH ? ORDER BY c.id DESC LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+            else:
+                pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                rows = self._conn.execute(
+                    "SELECT id, command, started, duration, status FROM commands"
+                    " WHERE command LIKE ? ESCAPE '\\' ORDER BY id DESC LIMIT ?",
+                    (pattern, limit)
+                ).fetchall()
+        return [HistoryEntry(*row) for row in reversed(rows)]
+
+    def import_file_history(self, path: str) -> int:
+        """
+        Import commands appended to a plain-text history file since the last import.
+
+        Understands prompt_toolkit's FileHistory format ('# <timestamp>' lines
+        followed by '+<line>' lines) as well as one command per line. The byte
+        offset already imported is remembered per file.
+
+        Args:
+            path: History file path
+
+        Returns:
+            Number of commands imported
+        """
+        key = 'import:' + os.path.abspath(path)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return 0
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        offset = int(row[0]) if row else 0
+        if size < offset:
+            # The file was truncated or replaced: read it again from the start
+            offset = 0
+        if size == offset:
+            return 0
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # Only complete lines are imported; a partial last line waits for the next call
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return 0
+        entries = list(parse_file_history(data[:end].decode('utf-8', errors='replace')))
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO commands (command, started, duration, status) VALUES (?, ?, NULL, NULL)",
+                entries
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(offset + end))
+            )
+            self._conn.commit()
+        return len(entries)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def parse_file_history(text: str) -> Iterator[Tuple[str, float]]:
+    """
+    Parse plain-text history into (command, timestamp) pairs.
+
+    Args:
+        text: History file contents
+
+    Yields:
+        Commands in file order; entries without a timestamp get the current time
+    """
+    now = time.time()
+    started = now
+    lines: List[str] = []
+    for line in text.splitlines():
+        if line.startswith('+'):
+            lines.append(line[1:])
+            continue
+        if lines:
+            yield '\n'.join(lines), started
+            lines = []
+            started = now
+        if line.startswith('#'):
+            started = _parse_timestamp(line[1:].strip(), now)
+        elif line.strip():
+            yield line.strip(), now
+    if lines:
+        yield '\n'.join(lines), started
+
+
+def _parse_timestamp(text: str, default: float) -> float:
+    try:
+        return datetime.strptime(text, '%Y-%m-%d %H:%M:%S.%f').timestamp()
+    except ValueError:
+        return default
+
+
+def iter_file_history_reversed(path: str, block_size: int = TAIL_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield the commands of a plain-text history file, newest first.
+
+    The file is read backwards from the end in fixed-size blocks, so the
+    cost depends on how many commands are consumed, not on the file size.
+    Uses the same format rules as parse_file_history.
+
+    Args:
+        path: History file path
+        block_size: Bytes read per step
+
+    Yields:
+        Commands, most recent first
+    """
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        carry = b''
+        group: List[str] = []
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + carry).split(b'\n')
+            # The first piece may be the end of a line that starts in an
+            # earlier block; it is completed on the next step
+            carry = lines.pop(0) if position > 0 else b''
+            for raw in reversed(lines):
+                line = raw.decode('utf-8', errors='replace').rstrip('\r')
+                if line.startswith('+'):
+                    group.append(line[1:])
+                    continue
+                if group:
+                    yield '\n'.join(reversed(group))
+                    group = []
+                if line.strip() and not line.startswith('#'):
+                    yield line.strip()
+        if group:
+            yield '\n'.join(reversed(group))
+
+
+def tail_file_history(path: str, n: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """
+    Return the last n commands of a plain-text history file, oldest first.
+
+    Args:
+        path: History file path
+        n: Number of commands
+        block_size: Bytes read per step
+
+    Returns:
+        Up to n commands (an empty list if the file does not exist)
+    """
+    try:
+        commands = list(itertools.islice(iter_file_history_reversed(path, block_size), max(n, 0)))
+    except FileNotFoundError:
+        return []
+    commands.reverse()
+    return commands
@@ -6,6 +6,7 @@ para tokenizar comandos do TermIA.
 
 import ply.lex as lex
 from typing import Optional
+from table_cache import TableCache, get_default_cache
 
 
 class TermIALexer:
@@ -35,6 +36,8 @@ class TermIALexer:
         'CLEAR',
         'HELP',
         'EXIT',
+        'JOBS',
+        'STATS',
         
         # Opções e argumentos
         'OPTION_SHORT',      # -a, -l, -p
@@ -44,12 +47,14 @@ class TermIALexer:
         'STRING',            # "texto entre aspas"
         'NUMBER',            # 123
         'PATH',              # /home/user, ./file, ../dir
+        'GLOB',              # src/*.py, tests/test_?.py
         'IDENTIFIER',        # nome_arquivo, variavel
         
         # Símbolos especiais
         'DOT',               # .
         'DOTDOT',            # ..
         'TILDE',             # ~
+        'AMPERSAND',         # & (executa em segundo plano)
     )
 
     # Palavras reservadas (keywords)
@@ -73,19 +78,42 @@ class TermIALexer:
         'clear': 'CLEAR',
         'help': 'HELP',
         'exit': 'EXIT',
+        'jobs': 'JOBS',
+        'stats': 'STATS',
     }
 
     # Caracteres ignorados (espaços e tabs)
     t_ignore = ' \t'
 
-    def __init__(self):
-        "Inicializa o lexer"
+    def __init__(self, table_cache: Optional[TableCache] = None, plugins=None):
+        """
+        Inicializa o lexer.
+
+        Args:
+            table_cache: Cache das tabelas (padrão: o cache do processo)
+            plugins: PluginManager cujas palavras reservadas são acrescentadas
+        """
         self.lexer: Optional[lex.Lexer] = None
+        self.table_cache = table_cache or get_default_cache()
+        if plugins is not None:
+            self._add_plugin_keywords(plugins.keywords())
         self.build()
 
+    def _add_plugin_keywords(self, keywords: dict):
+        "Acrescenta as palavras reservadas dos plugins (as nativas têm prioridade)"
+        keywords = {word: token for word, token in keywords.items() if word not in self.reserved}
+        if not keywords:
+            return
+        self.reserved = {**self.reserved, **keywords}
+        new_tokens = sorted(set(keywords.values()) - set(self.tokens))
+        self.tokens = tuple(self.tokens) + tuple(new_tokens)
+
     def build(self, **kwargs):
-        "Constrói o lexer"
-        self.lexer = lex.lex(module=self, **kwargs)
+        "Constrói o lexer (reaproveitando as tabelas em cache quando não há opções extras)"
+        if kwargs:
+            self.lexer = lex.lex(module=self, **kwargs)
+        else:
+            self.lexer = self.table_cache.lexer_for(self)
 
     def t_LONG_OPTION(self, t):
         r'--[a-zA-Z][a-zA-Z0-9_-]+'
@@ -108,11 +136,11 @@ class TermIALexer:
         t.value = t.value.replace('\\t', '\t')  # Processa escape de tab
         return t
 
-    def t_NUMBER(self, t):
-        r'\d+'
-        t.value = int(t.value)
+    def t_GLOB(self, t):
+        r'[a-zA-Z0-9_./~-]*[*?][a-zA-Z0-9_./~*?-]*'
+        # Padrão com curingas (* ou ?), usado por ia codeexplain
         return t
-    
+
     def t_PATH(self, t):
         r'(/[a-zA-Z0-9_./~-]+|~/[a-zA-Z0-9_./~-]*|\./[a-zA-Z0-9_./~-]*|\.\./[a-zA-Z0-9_./~-]*|[a-zA-Z0-9_-]+/[a-zA-Z0-9_./~-]*)'
         
@@ -125,6 +153,12 @@ class TermIALexer:
         # ./ e ../ tbm
         return t
 
+    # Depois de PATH, para que '2024/termia' seja um caminho
+    def t_NUMBER(self, t):
+        r'\d+'
+        t.value = int(t.value)
+        return t
+
     def t_DOTDOT(self, t):
         r'\.\.(?!/)'
         return t
@@ -137,6 +171,10 @@ class TermIALexer:
         r'~(?!/)'
         return t
 
+    def t_AMPERSAND(self, t):
+        r'&'
+        return t
+
 
     def t_IDENTIFIER(self, t):
         r'[a-zA-Z_][a-zA-Z0-9_.-]*'
@@ -219,11 +257,15 @@ def main():
         'ia ask "Qual é a capital da França?"',
         'ia summarize "Lorem ipsum dolor sit amet" --length medium',
         'ia codeexplain main.py',
+        'ia codeexplain src/*.py',
         'ia translate "Hello World" --to pt',
         'history 10',
         'clear',
         'help ls',
         'exit',
+        'ia ask "O que é Python?" &',
+        'jobs wait 1',
+        'stats --export metricas.prom',
         'cd ~/',
         'cd ./',
         'cd ../',
@@ -4,35 +4,107 @@ Este módulo implementa o parser usando PLY (Python Lex-Yacc)
 para analisar a sintaxe dos comandos do TermIA.
 """
 
+import time
 import ply.yacc as yacc
+from typing import Dict, Optional
 from lexer import TermIALexer
+from table_cache import TableCache, get_default_cache
 from ast_nodes import (
     # OS Commands
     LSCommand, CDCommand, MkdirCommand, PwdCommand, CatCommand,
     # IA Commands
     IAAskCommand, IASummarizeCommand, IACodeExplainCommand, IATranslateCommand,
+    IABatchTranslateCommand,
     # Control Commands
-    HistoryCommand, ClearCommand, HelpCommand, ExitCommand
+    HistoryCommand, HistorySearchCommand, ClearCommand, HelpCommand, ExitCommand, JobsCommand,
+    StatsCommand,
+    # Execução em segundo plano
+    BackgroundCommand
 )
 
 
+# Opções longas do ls: as que recebem um número e as que não recebem valor
+LS_SHORT_FLAGS = 'alhRU'
+LS_NUMBER_OPTIONS = ('max-depth', 'limit', 'offset')
+LS_FLAG_OPTIONS = ('pager',)
+LS_USAGE = "ls [-alhRU] [--max-depth N] [--limit N] [--offset M] [--pager] [caminho]"
+SUMMARIZE_USAGE = 'ia summarize "<texto>" [--length <tamanho>]  ou  ia summarize --file <arquivo> [--length <tamanho>]'
+TRANSLATE_USAGE = 'ia translate "<texto>"... --to <idioma>  ou  ia translate --file <arquivo> --to <idioma>'
+
+
+def _plugin_command(p):
+    "command : plugin_command"
+    p[0] = p[1]
+
+
+def _plugin_command_name(tokens):
+    "Cria a produção de command_name com os tokens dos plugins."
+    def p_command_name_plugin(p):
+        p[0] = p[1]
+    p_command_name_plugin.__doc__ = 'command_name : ' + '\n | '.join(tokens)
+    return p_command_name_plugin
+
+
+class _TokenList:
+    "Entrega ao PLY tokens já lidos, como se fosse o lexer."
+    
+    def __init__(self, tokens: list):
+        self._tokens = iter(tokens)
+    
+    def token(self):
+        return next(self._tokens, None)
+
+
 class TermIAParser:
     """
     Analisador sintático para o TermIA.
     Constrói uma AST (Abstract Syntax Tree) a partir dos tokens.
     """
     
-    def __init__(self):
-        "Inicializa o parser"
-        self.lexer = TermIALexer()
+    # Símbolo inicial explícito: as produções dos plugins não podem mudá-lo
+    start = 'command'
+    
+    def __init__(self, table_cache: Optional[TableCache] = None, plugins=None):
+        """
+        Inicializa o parser.
+        
+        Args:
+            table_cache: Cache das tabelas (padrão: o cache do processo)
+            plugins: PluginManager cujas produções entram na gramática
+        """
+        self.table_cache = table_cache or get_default_cache()
+        self.lexer = TermIALexer(table_cache=self.table_cache, plugins=plugins)
         self.tokens = self.lexer.tokens
         self.parser = None
+        # Marcado por p_error: a AST recuperada após um erro não é executada
+        self.had_error = False
+        if plugins is not None:
+            self._add_plugin_productions(plugins.production_functions())
         self.build()
     
+    def _add_plugin_productions(self, functions: dict):
+        """
+        Acrescenta as produções dos plugins à gramática.
+        
+        Elas entram como atributos da instância, então fazem parte da
+        assinatura da gramática e das tabelas em cache como as nativas.
+        """
+        if not functions:
+            return
+        for name, function in functions.items():
+            setattr(self, name, function)
+        self.p_command_plugin = _plugin_command
+        # As palavras reservadas dos plugins também valem em 'help <comando>'
+        plugin_tokens = [token for token in self.tokens if token not in TermIALexer.tokens]
+        if plugin_tokens:
+            self.p_command_name_plugin = _plugin_command_name(plugin_tokens)
+    
     def build(self, **kwargs):
-        "Constrói o parser"
-        # Suppress PLY output by setting debug=0 and write_tables=1
-        self.parser = yacc.yacc(module=self, debug=False, write_tables=True, **kwargs)
+        "Constrói o parser (as tabelas LALR vêm do cache quando não há opções extras)"
+        if kwargs:
+            self.parser = yacc.yacc(module=self, debug=False, write_tables=False, **kwargs)
+        else:
+            self.parser = self.table_cache.parser_for(self)
     
     # ==================== Regra Inicial ====================
     
@@ -42,6 +114,10 @@ class TermIAParser:
                    | control_command"""
         p[0] = p[1]
     
+    def p_command_background(self, p):
+        "command : ia_command AMPERSAND"
+        p[0] = BackgroundCommand(command=p[1]) if p[1] is not None else None
+    
     # ==================== Comandos do SO ====================
     
     def p_os_command(self, p):
@@ -55,21 +131,71 @@ class TermIAParser:
     # --- Comando LS ---
     
     def p_ls_command_full(self, p):
-        "ls_command : LS OPTION_SHORT path"
-        p[0] = LSCommand(options=p[2], path=p[3])
+        "ls_command : LS ls_options path"
+        p[0] = LSCommand(path=p[3], **p[2]) if p[2] is not None else None
     
     def p_ls_command_with_path(self, p):
         "ls_command : LS path"
         p[0] = LSCommand(path=p[2])
     
     def p_ls_command_with_option(self, p):
-        "ls_command : LS OPTION_SHORT"
-        p[0] = LSCommand(options=p[2])
+        "ls_command : LS ls_options"
+        p[0] = LSCommand(**p[2]) if p[2] is not None else None
     
     def p_ls_command_simple(self, p):
         "ls_command : LS"
         p[0] = LSCommand()
     
+    def p_ls_options(self, p):
+        """ls_options : ls_options ls_option
+                      | ls_option"""
+        # Junta as flags curtas (-l -a equivale a -la) e as opções longas;
+        # None indica uma opção inválida, já reportada
+        if len(p) == 3:
+            if p[1] is None or p[2] is None:
+                p[0] = None
+                return
+            options = dict(p[1])
+            option = p[2]
+        else:
+            options = {}
+            option = p[1]
+            if option is None:
+                p[0] = None
+                return
+        if 'options' in option:
+            option = {'options': (options.get('options') or '') + option['options']}
+        options.update(option)
+        p[0] = options
+    
+    def p_ls_option_short(self, p):
+        "ls_option : OPTION_SHORT"
+        unknown = ''.join(flag for flag in p[1] if flag not in LS_SHORT_FLAGS)
+        if unknown:
+            self._option_error(p, f"opção '-{unknown[0]}' desconhecida para 'ls'", LS_USAGE)
+            return
+        p[0] = {'options': p[1]}
+    
+    def p_ls_option_long(self, p):
+        "ls_option : LONG_OPTION NUMBER"
+        # ls --max-depth <n> | --limit <n> | --offset <n>
+        if p[1] in LS_NUMBER_OPTIONS:
+            p[0] = {p[1].replace('-', '_'): p[2]}
+        elif p[1] in LS_FLAG_OPTIONS:
+            self._option_error(p, f"opção '--{p[1]}' de 'ls' não recebe valor", LS_USAGE)
+        else:
+            self._option_error(p, f"opção '--{p[1]}' desconhecida para 'ls'", LS_USAGE)
+    
+    def p_ls_option_flag(self, p):
+        "ls_option : LONG_OPTION"
+        # ls --pager: pausa a cada tela
+        if p[1] in LS_FLAG_OPTIONS:
+            p[0] = {p[1]: True}
+        elif p[1] in LS_NUMBER_OPTIONS:
+            self._option_error(p, f"opção '--{p[1]}' de 'ls' requer um número", LS_USAGE)
+        else:
+            self._option_error(p, f"opção '--{p[1]}' desconhecida para 'ls'", LS_USAGE)
+    
     # --- Comando CD ---
     
     def p_cd_command_with_path(self, p):
@@ -99,6 +225,14 @@ class TermIAParser:
     
     # --- Comando CAT ---
     
+    def p_cat_command_with_option(self, p):
+        "cat_command : CAT OPTION_SHORT path"
+        # -n é a única opção do cat
+        if set(p[2]) != {'n'}:
+            self._option_error(p, f"opção '-{p[2]}' desconhecida para 'cat'", "cat [-n] <arquivo>")
+            return
+        p[0] = CatCommand(filepath=p[3], number_lines=True)
+    
     def p_cat_command(self, p):
         "cat_command : CAT path"
         p[0] = CatCommand(filepath=p[2])
@@ -127,32 +261,75 @@ class TermIAParser:
     def p_ia_summarize_with_length(self, p):
         "ia_summarize : SUMMARIZE STRING LONG_OPTION IDENTIFIER"
         # Verifica se a opção é --length
-        if p[3] == 'length':
-            length = p[4]
-        else:
-            length = 'short'
-        p[0] = IASummarizeCommand(text=p[2], length=length)
+        if p[3] != 'length':
+            self._option_error(p, f"opção '--{p[3]}' desconhecida para 'ia summarize'", SUMMARIZE_USAGE)
+            return
+        p[0] = IASummarizeCommand(text=p[2], length=p[4])
     
     def p_ia_summarize_simple(self, p):
         "ia_summarize : SUMMARIZE STRING"
         p[0] = IASummarizeCommand(text=p[2])
     
+    def p_ia_summarize_file_with_length(self, p):
+        "ia_summarize : SUMMARIZE LONG_OPTION path LONG_OPTION IDENTIFIER"
+        # ia summarize --file <arquivo> --length <tamanho>
+        unknown = p[2] if p[2] != 'file' else p[4] if p[4] != 'length' else None
+        if unknown is not None:
+            self._option_error(p, f"opção '--{unknown}' desconhecida para 'ia summarize'", SUMMARIZE_USAGE)
+            return
+        p[0] = IASummarizeCommand(filepath=p[3], length=p[5])
+    
+    def p_ia_summarize_file(self, p):
+        "ia_summarize : SUMMARIZE LONG_OPTION path"
+        if p[2] != 'file':
+            self._option_error(p, f"opção '--{p[2]}' desconhecida para 'ia summarize'", SUMMARIZE_USAGE)
+            return
+        p[0] = IASummarizeCommand(filepath=p[3])
+    
     # --- IA Code Explain ---
     
     def p_ia_codeexplain(self, p):
         "ia_codeexplain : CODEEXPLAIN path"
         p[0] = IACodeExplainCommand(filepath=p[2])
     
+    def p_ia_codeexplain_glob(self, p):
+        "ia_codeexplain : CODEEXPLAIN GLOB"
+        p[0] = IACodeExplainCommand(filepath=p[2])
+    
     # --- IA Translate ---
     
     def p_ia_translate(self, p):
         "ia_translate : TRANSLATE STRING LONG_OPTION IDENTIFIER"
         # Verifica se a opção é --to
-        if p[3] == 'to':
-            target_lang = p[4]
+        if p[3] != 'to':
+            self._option_error(p, f"opção '--{p[3]}' desconhecida para 'ia translate'", TRANSLATE_USAGE)
+            return
+        p[0] = IATranslateCommand(text=p[2], target_language=p[4])
+    
+    def p_ia_translate_batch(self, p):
+        "ia_translate : TRANSLATE string_list LONG_OPTION IDENTIFIER"
+        # Vários textos entre aspas: traduzidos em lote
+        if p[3] != 'to':
+            self._option_error(p, f"opção '--{p[3]}' desconhecida para 'ia translate'", TRANSLATE_USAGE)
+            return
+        p[0] = IABatchTranslateCommand(target_language=p[4], texts=p[2])
+    
+    def p_ia_translate_file(self, p):
+        "ia_translate : TRANSLATE LONG_OPTION path LONG_OPTION IDENTIFIER"
+        # ia translate --file <arquivo> --to <idioma>: uma linha por texto
+        unknown = p[2] if p[2] != 'file' else p[4] if p[4] != 'to' else None
+        if unknown is not None:
+            self._option_error(p, f"opção '--{unknown}' desconhecida para 'ia translate'", TRANSLATE_USAGE)
+            return
+        p[0] = IABatchTranslateCommand(target_language=p[5], filepath=p[3])
+    
+    def p_string_list(self, p):
+        """string_list : string_list STRING
+                       | STRING STRING"""
+        if isinstance(p[1], list):
+            p[0] = p[1] + [p[2]]
         else:
-            target_lang = 'en'
-        p[0] = IATranslateCommand(text=p[2], target_language=target_lang)
+            p[0] = [p[1], p[2]]
     
     # ==================== Comandos de Controle ====================
     
@@ -160,7 +337,9 @@ class TermIAParser:
         """control_command : history_command
                            | clear_command
                            | help_command
-                           | exit_command"""
+                           | exit_command
+                           | jobs_command
+                           | stats_command"""
         p[0] = p[1]
     
     # --- History ---
@@ -173,6 +352,42 @@ class TermIAParser:
         "history_command : HISTORY"
         p[0] = HistoryCommand()
     
+    def p_history_command_search(self, p):
+        "history_command : HISTORY IDENTIFIER search_query"
+        if p[2] != 'search':
+            print(f"Erro de sintaxe: subcomando '{p[2]}' desconhecido para 'history'")
+            print(f"  Uso: history [n]  ou  history search <texto>")
+            p[0] = None
+            return
+        p[0] = HistorySearchCommand(query=p[3])
+    
+    def p_search_query(self, p):
+        """search_query : search_query search_term
+                        | search_term"""
+        if len(p) == 3:
+            p[0] = p[1] + ' ' + p[2]
+        else:
+            p[0] = p[1]
+    
+    def p_search_term(self, p):
+        """search_term : command_name
+                       | STRING
+                       | PATH
+                       | GLOB
+                       | NUMBER
+                       | DOT
+                       | DOTDOT
+                       | TILDE"""
+        p[0] = str(p[1])
+    
+    def p_search_term_short_option(self, p):
+        "search_term : OPTION_SHORT"
+        p[0] = '-' + p[1]
+    
+    def p_search_term_long_option(self, p):
+        "search_term : LONG_OPTION"
+        p[0] = '--' + p[1]
+    
     # --- Clear ---
     
     def p_clear_command(self, p):
@@ -195,6 +410,47 @@ class TermIAParser:
         "exit_command : EXIT"
         p[0] = ExitCommand()
     
+    # --- Jobs ---
+    
+    def p_jobs_command_with_id(self, p):
+        "jobs_command : JOBS IDENTIFIER NUMBER"
+        p[0] = JobsCommand(action=p[2], job_id=p[3])
+    
+    def p_jobs_command_with_action(self, p):
+        "jobs_command : JOBS IDENTIFIER"
+        p[0] = JobsCommand(action=p[2])
+    
+    def p_jobs_command_simple(self, p):
+        "jobs_command : JOBS"
+        p[0] = JobsCommand()
+    
+    # --- Stats ---
+    
+    def p_stats_command_with_count(self, p):
+        "stats_command : STATS NUMBER"
+        p[0] = StatsCommand(action='recent', count=p[2])
+    
+    def p_stats_command_clear(self, p):
+        "stats_command : STATS CLEAR"
+        p[0] = StatsCommand(action='clear')
+    
+    def p_stats_command_with_action(self, p):
+        "stats_command : STATS IDENTIFIER"
+        p[0] = StatsCommand(action=p[2])
+    
+    def p_stats_command_export(self, p):
+        "stats_command : STATS LONG_OPTION path"
+        if p[2] != 'export':
+            print(f"Erro de sintaxe: opção '--{p[2]}' desconhecida para 'stats'")
+            print(f"  Uso: stats [n | clear | --export <arquivo>]")
+            p[0] = None
+            return
+        p[0] = StatsCommand(action='export', path=p[3])
+    
+    def p_stats_command_simple(self, p):
+        "stats_command : STATS"
+        p[0] = StatsCommand()
+    
     # ==================== Regras Auxiliares ====================
     
     def p_path(self, p):
@@ -220,11 +476,19 @@ class TermIAParser:
                         | CLEAR
                         | HELP
                         | EXIT
+                        | JOBS
+                        | STATS
                         | IDENTIFIER"""
         p[0] = p[1]
     
     # ==================== Tratamento de Erros ====================
     
+    def _option_error(self, p, message: str, usage: str):
+        "Reporta uma opção inválida; a regra resulta em None e o comando não é executado."
+        print(f"Erro de sintaxe: {message}")
+        print(f"  Uso: {usage}")
+        p[0] = None
+    
     def p_error(self, p):
         "Tratamento de erro sintático."
         if p:
@@ -234,28 +498,32 @@ class TermIAParser:
                 print(f"  Uso: mkdir <diretório>  ou  mkdir -p <diretório>")
             elif p.type == 'CAT':
                 print(f"Erro de sintaxe: comando 'cat' requer um arquivo")
-                print(f"  Uso: cat <arquivo>")
+                print(f"  Uso: cat [-n] <arquivo>")
             else:
                 print(f"Erro de sintaxe no token '{p.value}' (tipo: {p.type}) na posição {p.lexpos}")
             # Tenta recuperar do erro descartando o token
+            self.had_error = True
             self.parser.errok()
         else:
+            self.had_error = True
             print("Erro de sintaxe: comando incompleto")
             print("  Digite 'help' para ver os comandos disponíveis")
     
     # ==================== Métodos Públicos ====================
     
-    def parse(self, text: str, debug: bool = False):
+    def parse(self, text: str, debug: bool = False, timings: Optional[Dict[str, float]] = None):
         """
         Analisa um comando e retorna a AST.
         
         Args:
             text: String contendo o comando a ser analisado
             debug: Se True, imprime informações de debug
+            timings: Se informado, recebe os segundos gastos em 'lex' e 'parse'
             
         Returns:
             Nó raiz da AST ou None em caso de erro
         """
+        self.had_error = False
         try:
             # Primeiro tokeniza
             self.lexer.lexer.input(text)
@@ -271,10 +539,20 @@ class TermIAParser:
                 # Reset lexer para parsing
                 self.lexer.lexer.input(text)
             
+            if timings is not None:
+                # Tokeniza a linha inteira antes, para medir o lexer e o parser separadamente
+                start = time.perf_counter()
+                tokens = self.lexer.tokenize_to_list(text)
+                lexed = time.perf_counter()
+                result = self.parser.parse(lexer=_TokenList(tokens), debug=debug)
+                timings['lex'] = lexed - start
+                timings['parse'] = time.perf_counter() - lexed
+                return None if self.had_error else result
+            
             # Depois faz parsing
             result = self.parser.parse(text, lexer=self.lexer.lexer, debug=debug)
             
-            return result
+            return None if self.had_error else result
             
         except Exception as e:
             print(f"Erro ao fazer parsing: {e}")
@@ -313,6 +591,10 @@ def main():
         # Comandos de SO
         'ls',
         'ls -la',
+        'ls -R src',
+        'ls -lR --max-depth 2 .',
+        'ls -U --limit 100 --offset 200 /var/log',
+        'ls --pager -l',
         'ls /home/user',
         'ls ./home/user',
         'ls ..',
@@ -324,21 +606,39 @@ def main():
         'mkdir -p projects/2024/termia',
         'pwd',
         'cat README.md',
+        'cat -n README.md',
         
         # Comandos de IA
         'ia ask "O que é Python?"',
         'ia summarize "Lorem ipsum dolor sit amet"',
         'ia summarize "texto longo aqui" --length medium',
+        'ia summarize --file README.md --length long',
         'ia codeexplain main.py',
+        'ia codeexplain src/*.py',
         'ia translate "Hello World" --to pt',
+        'ia translate "Open" "Save" "Close" --to pt',
+        'ia translate --file strings.txt --to es',
         
         # Comandos de controle
         'history',
         'history 20',
+        'history search git commit',
+        'history search "ls -la" src',
         'clear',
         'help',
         'help ls',
         'exit',
+        
+        # Segundo plano
+        'ia ask "O que é Python?" &',
+        'jobs',
+        'jobs wait 1',
+        'jobs cancel 2',
+        
+        # Métricas
+        'stats',
+        'stats 20',
+        'stats --export metricas.prom',
     ]
     
     print("=" * 70)
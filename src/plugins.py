@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""
+TermIA - Plugins
+This module implements the plugin API. A plugin is one class declaring a
+command's keywords, grammar productions, AST handlers, completion metadata
+and help text. Plugins are discovered through the 'termia.plugins' entry
+point group; their declarations are cached in a manifest, so later starts
+build the lexer, parser tables and completer without importing any plugin
+code. A plugin module is imported the first time one of its productions is
+used.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+# Entry point group scanned for plugins
+ENTRY_POINT_GROUP = 'termia.plugins'
+
+# Increment whenever the manifest format changes
+MANIFEST_VERSION = 1
+
+
+class PluginError(Exception):
+    """Raised when a plugin cannot be loaded."""
+    pass
+
+
+class CommandPlugin:
+    """
+    Base class for TermIA plugins.
+
+    Subclasses declare, in one place:
+
+    - name: unique plugin name
+    - keywords: reserved words and their token types, e.g. {'echo': 'ECHO'}
+    - p_* methods: PLY productions, documented like TermIAParser's; new
+      commands are added as alternatives of the 'plugin_command' nonterminal
+    - commands(): (AST node class, handler, name) triples; handlers are
+      called as handler(terminal, ast)
+    - completions: completer metadata per keyword, e.g.
+      {'echo': {'options': ['-n'], 'description': 'Print text'}}
+    - help: help text per command name
+    """
+
+    name: str = ''
+    keywords: Dict[str, str] = {}
+    completions: Dict[str, dict] = {}
+    help: Dict[str, str] = {}
+
+    def commands(self) -> Iterable[Tuple[type, Callable[[Any, Any], None], str]]:
+        """Return the (node class, handler, name) triples to register."""
+        return ()
+
+    def productions(self) -> List[Tuple[str, str]]:
+        """Return the (method name, production) pairs of the p_* methods."""
+        return [(name, getattr(self, name).__doc__ or '') for name in sorted(dir(self))
+                if name.startswith('p_') and name != 'p_error' and callable(getattr(self, name))]
+
+
+class PluginSpec(NamedTuple):
+    """What the lexer, parser and completer need from a plugin, without importing it."""
+    name: str
+    entry_point: Optional[str]
+    keywords: Dict[str, str]
+    productions: Tuple[Tuple[str, str], ...]
+    completions: Dict[str, dict]
+    help: Dict[str, str]
+
+    @classmethod
+    def from_plugin(cls, plugin: CommandPlugin, entry_point: Optional[str] = None) -> 'PluginSpec':
+        if not plugin.name:
+            raise PluginError(f"{type(plugin).__name__} has no name")
+        return cls(plugin.name, entry_point, dict(plugin.keywords),
+                   tuple(plugin.productions()), dict(plugin.completions), dict(plugin.help))
+
+    def to_json(self) -> dict:
+        return self._asdict()
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'PluginSpec':
+        return cls(data['name'], data['entry_point'], data['keywords'],
+                   tuple(tuple(item) for item in data['productions']),
+                   data['completions'], data['help'])
+
+
+def _iter_entry_points() -> list:
+    from importlib import metadata
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        return list(entry_points.select(group=ENTRY_POINT_GROUP))
+    # Python < 3.10 returns a dict of groups
+    return list(entry_points.get(ENTRY_POINT_GROUP, ()))
+
+
+def _environment_key(disabled: Iterable[str]) -> str:
+    # Installing, upgrading or removing a distribution changes the mtime of
+    # its sys.path directory, which is all the manifest has to notice
+    parts = [sys.version]
+    for path in sys.path:
+        try:
+            parts.append(f"{path}:{os.stat(path or '.').st_mtime_ns}")
+        except OSError:
+            continue
+    parts.append(','.join(sorted(disabled)))
+    return '\n'.join(parts)
+
+
+def _instantiate(obj) -> CommandPlugin:
+    plugin = obj() if isinstance(obj, type) else obj
+    if not isinstance(plugin, CommandPlugin):
+        raise PluginError(f"{obj!r} is not a CommandPlugin")
+    return plugin
+
+
+class PluginManager:
+    """
+    Discovers plugins and loads them on first use.
+
+    Objects that depend on plugins (the terminal's command registry) are
+    notified through on_load when a plugin is actually imported.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, disabled: Sequence[str] = ()):
+        """
+        Initialize the manager.
+
+        Args:
+            cache_dir: Directory of the manifest (None to always scan entry points)
+            disabled: Plugin or entry point names to ignore
+        """
+        self.cache_dir = cache_dir
+        self.disabled = set(disabled)
+        self.errors: List[str] = []
+        self._specs: Dict[str, PluginSpec] = {}
+        self._loaded: Dict[str, CommandPlugin] = {}
+        self._listeners: List[Callable[[CommandPlugin], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    @property
+    def manifest_path(self) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        return os.path.join(self.cache_dir, 'plugins_manifest.json')
+
+    @property
+    def specs(self) -> List[PluginSpec]:
+        return list(self._specs.values())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    # ==================== Discovery ====================
+
+    def add(self, plugin: CommandPlugin):
+        """
+        Register a plugin object directly (already imported, so loaded now).
+
+        Args:
+            plugin: Plugin instance or class
+        """
+        plugin = _instantiate(plugin)
+        if plugin.name in self.disabled:
+            return
+        self._specs[plugin.name] = PluginSpec.from_plugin(plugin)
+        self._set_loaded(plugin)
+
+    def discover(self):
+        """
+        Find the plugins installed through entry points.
+
+        The declarations come from the manifest while the installed
+        distributions are unchanged; otherwise every plugin is imported
+        once to rebuild it. Plugins that fail to import are reported in
+        self.errors and skipped.
+        """
+        key = _environment_key(self.disabled)
+        manifest = self._read_manifest()
+        if manifest is not None and manifest.get('key') == key:
+            for data in manifest['plugins']:
+                spec = PluginSpec.from_json(data)
+                self._specs.setdefault(spec.name, spec)
+            return
+
+        specs = []
+        for entry_point in _iter_entry_points():
+            if entry_point.name in self.disabled:
+                continue
+            try:
+                plugin = _instantiate(entry_point.load())
+                spec = PluginSpec.from_plugin(plugin, entry_point.name)
+            except Exception as e:
+                self.errors.append(f"{entry_point.name}: {e}")
+                continue
+            if spec.name in self.disabled:
+                continue
+            specs.append(spec)
+            self._specs.setdefault(spec.name, spec)
+            self._set_loaded(plugin)
+        self._write_manifest(key, specs)
+
+    def _read_manifest(self) -> Optional[dict]:
+        path = self.manifest_path
+        if path is None:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != MANIFEST_VERSION:
+            return None
+        return manifest
+
+    def _write_manifest(self, key: str, specs: List[PluginSpec]):
+        path = self.manifest_path
+        if path is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmpfile = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'key': key,
+                           'plugins': [spec.to_json() for spec in specs]}, f)
+            os.replace(tmpfile, path)
+        except OSError:
+            pass
+
+    # ==================== Loading ====================
+
+    def on_load(self, callback: Callable[[CommandPlugin], None]):
+        """
+        Call callback with every plugin as it is loaded (and now for those already loaded).
+
+        Args:
+            callback: Called as callback(plugin)
+        """
+        self._listeners.append(callback)
+        for plugin in list(self._loaded.values()):
+            callback(plugin)
+
+    def load(self, name: str) -> CommandPlugin:
+        """
+        Import a plugin, if not done yet.
+
+        Args:
+            name: Plugin name
+
+        Returns:
+            The plugin instance
+
+        Raises:
+            PluginError: If the plugin is unknown, fails to import or no
+                longer matches its cached declarations
+        """
+        plugin = self._loaded.get(name)
+        if plugin is not None:
+            return plugin
+        spec = self._specs.get(name)
+        if spec is None or spec.entry_point is None:
+            raise PluginError(f"unknown plugin '{name}'")
+        entry_point = next((ep for ep in _iter_entry_points() if ep.name == spec.entry_point), None)
+        if entry_point is None:
+            raise PluginError(f"plugin '{name}' is no longer installed")
+        try:
+            plugin = _instantiate(entry_point.load())
+        except PluginError:
+            raise
+        except Exception as e:
+            raise PluginError(f"cannot load plugin '{name}': {e}") from e
+        fresh = PluginSpec.from_plugin(plugin, spec.entry_point)
+        if (fresh.keywords, fresh.productions) != (spec.keywords, spec.productions):
+            # The grammar built from the manifest no longer matches the code
+            self._remove_manifest()
+            raise PluginError(f"plugin '{name}' changed since it was cached; restart TermIA")
+        self._set_loaded(plugin)
+        return plugin
+
+    def _set_loaded(self, plugin: CommandPlugin):
+        self._loaded[plugin.name] = plugin
+        for callback in self._listeners:
+            callback(plugin)
+
+    def _remove_manifest(self):
+        path = self.manifest_path
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ==================== Declarations ====================
+
+    def keywords(self) -> Dict[str, str]:
+        """Reserved words of all plugins and their token types (first plugin wins)."""
+        keywords: Dict[str, str] = {}
+        for spec in self._specs.values():
+            for word, token in spec.keywords.items():
+                keywords.setdefault(word, token)
+        return keywords
+
+    def production_functions(self) -> Dict[str, Callable]:
+        """
+        Build the parser functions of all plugin productions.
+
+        Each one carries the production as its docstring, so PLY builds
+        (and the table cache hashes) the grammar from it, and imports the
+        plugin the first time the parser reduces by it.
+
+        Returns:
+            Attribute name (p_plugin_<plugin>_<method>) -> function taking p
+        """
+        functions = {}
+        for spec in self._specs.values():
+            for method, doc in spec.productions:
+                attr = re.sub(r'\W', '_', f"p_plugin_{spec.name}_{method[2:]}")
+                functions[attr] = self._production(spec.name, method, doc, attr)
+        return functions
+
+    def _production(self, plugin_name: str, method: str, doc: str, attr: str) -> Callable:
+        bound: List[Callable] = []
+
+        def production(p):
+            if not bound:
+                bound.append(getattr(self.load(plugin_name), method))
+            bound[0](p)
+
+        production.__doc__ = doc
+        production.__name__ = attr
+        return production
+
+    def completions(self) -> Dict[str, dict]:
+        """Completer metadata of all plugins, per keyword."""
+        completions: Dict[str, dict] = {}
+        for spec in self._specs.values():
+            for word, info in spec.completions.items():
+                completions.setdefault(word, info)
+        return completions
+
+    def help_text(self, command: str) -> Optional[str]:
+        """Help text a plugin declares for a command, if any."""
+        for spec in self._specs.values():
+            if command in spec.help:
+                return spec.help[command]
+        return None
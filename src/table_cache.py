@@ -0,0 +1,255 @@
+"""
+TermIA - Cache de Tabelas do Lexer e do Parser
+Este módulo gera as tabelas do PLY uma única vez e as guarda em um diretório
+de cache versionado, indexado por um hash da gramática. Nas próximas
+inicializações as tabelas são carregadas diretamente, sem a reflexão e a
+validação que `lex.lex()` e `yacc.yacc()` fazem a cada construção.
+"""
+
+import hashlib
+import importlib.util
+import os
+import tempfile
+from typing import Optional
+
+# O PLY é importado apenas ao montar um lexer ou parser: o diretório do cache
+# (usado também pelo manifesto dos plugins) não depende dele
+
+
+# Incrementar sempre que o formato dos arquivos em cache mudar
+CACHE_FORMAT_VERSION = 1
+
+
+class _AttrDict:
+    """
+    Expõe os atributos de um objeto como um dicionário somente-leitura.
+
+    O PLY resolve as funções das tabelas pelo nome (`fdict[nome]`), então basta
+    um `getattr` por regra usada em vez de varrer `dir()` do módulo inteiro.
+    """
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self._obj, name)
+        except AttributeError:
+            raise KeyError(name)
+
+
+def _iter_members(obj, prefix: str):
+    """Itera (nome, valor) dos atributos de classe e instância com o prefixo dado."""
+    seen = {}
+    for klass in reversed(type(obj).__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith(prefix):
+                seen[name] = value
+    for name, value in vars(obj).items():
+        if name.startswith(prefix):
+            seen[name] = value
+    return sorted(seen.items())
+
+
+def grammar_signature(obj, prefixes=('t_', 'p_')) -> str:
+    """
+    Calcula o hash da gramática de um lexer ou parser.
+
+    Considera a lista de tokens, as palavras reservadas, as expressões regulares
+    (`t_*`, com a ordem de definição) e as produções (`p_*`), além das versões
+    do PLY e do formato do cache. Qualquer alteração na gramática gera uma assinatura nova.
+
+    Args:
+        obj: Objeto com as definições da gramática (TermIALexer ou TermIAParser)
+        prefixes: Prefixos dos membros que fazem parte da gramática
+
+    Returns:
+        Assinatura hexadecimal da gramática
+    """
+    import ply
+    import ply.lex as lex
+    import ply.yacc as yacc
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_FORMAT_VERSION}|{ply.__version__}|{lex.__tabversion__}|{yacc.__tabversion__}".encode())
+    digest.update(repr(tuple(getattr(obj, 'tokens', ()))).encode())
+    digest.update(repr(sorted(getattr(obj, 'reserved', {}).items())).encode())
+    digest.update(repr(getattr(obj, 'precedence', ())).encode())
+    digest.update(repr(getattr(obj, 'start', None)).encode())
+    for prefix in prefixes:
+        for name, value in _iter_members(obj, prefix):
+            doc = getattr(value, '__doc__', None) if callable(value) else value
+            # O PLY testa as regras-função na ordem em que foram definidas
+            line = getattr(getattr(value, '__code__', None), 'co_firstlineno', None)
+            digest.update(f"{name}@{line}={doc!r};".encode())
+    return digest.hexdigest()[:16]
+
+
+def cache_root_dir() -> str:
+    """
+    Retorna o diretório raiz dos caches do TermIA.
+
+    Usa `TERMIA_CACHE_DIR` se definido, senão `$XDG_CACHE_HOME/termia` ou
+    `~/.cache/termia`.
+    """
+    base = os.environ.get('TERMIA_CACHE_DIR')
+    if not base:
+        xdg = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        base = os.path.join(xdg, 'termia')
+    return base
+
+
+def default_cache_dir() -> str:
+    "Retorna o diretório padrão do cache de tabelas, dentro de cache_root_dir()."
+    return os.path.join(cache_root_dir(), 'tables', f"v{CACHE_FORMAT_VERSION}")
+
+
+class TableCache:
+    """
+    Cache em disco das tabelas de lexer e parser do PLY.
+
+    Cada gramática é guardada em arquivos nomeados pela sua assinatura, então
+    mudar a gramática invalida o cache automaticamente. Falhas de escrita
+    (diretório somente-leitura, disco cheio) não são fatais: as tabelas são
+    apenas reconstruídas na próxima vez.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+
+    def lextab_path(self, signature: str) -> str:
+        return os.path.join(self.cache_dir, f"lextab_{signature}.py")
+
+    def parsetab_path(self, signature: str) -> str:
+        return os.path.join(self.cache_dir, f"parsetab_{signature}.pickle")
+
+    # ==================== Lexer ====================
+
+    def lexer_for(self, module) -> 'lex.Lexer':
+        """
+        Retorna um lexer para o módulo, carregando as tabelas do cache se existirem.
+
+        Args:
+            module: Objeto com as regras `t_*` (ex: TermIALexer)
+
+        Returns:
+            Lexer do PLY pronto para uso
+        """
+        signature = grammar_signature(module, prefixes=('t_',))
+        lexer = self._load_lexer(module, signature)
+        if lexer is not None:
+            return lexer
+
+        import ply.lex as lex
+        lexer = lex.lex(module=module)
+        self._store_lexer(lexer, signature)
+        return lexer
+
+    def _load_lexer(self, module, signature: str) -> Optional['lex.Lexer']:
+        path = self.lextab_path(signature)
+        if not os.path.exists(path):
+            return None
+        import ply.lex as lex
+        try:
+            spec = importlib.util.spec_from_file_location(f"termia_lextab_{signature}", path)
+            lextab = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(lextab)
+            lexer = lex.Lexer()
+            lexer.readtab(lextab, _AttrDict(module))
+            return lexer
+        except Exception:
+            # Arquivo corrompido ou de outra versão do PLY: reconstrói
+            return None
+
+    def _store_lexer(self, lexer: 'lex.Lexer', signature: str):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmpdir:
+                lexer.writetab('lextab', tmpdir)
+                os.replace(os.path.join(tmpdir, 'lextab.py'), self.lextab_path(signature))
+        except OSError:
+            pass
+
+    # ==================== Parser ====================
+
+    def parser_for(self, module) -> 'yacc.LRParser':
+        """
+        Retorna um parser LALR para o módulo, carregando as tabelas do cache se existirem.
+
+        Args:
+            module: Objeto com as produções `p_*` e a lista `tokens` (ex: TermIAParser)
+
+        Returns:
+            Parser do PLY pronto para uso
+        """
+        signature = grammar_signature(module)
+        parser = self._load_parser(module, signature)
+        if parser is not None:
+            return parser
+        return self._build_parser(module, signature)
+
+    def _load_parser(self, module, signature: str) -> Optional['yacc.LRParser']:
+        path = self.parsetab_path(signature)
+        if not os.path.exists(path):
+            return None
+        import ply.yacc as yacc
+        try:
+            table = yacc.LRTable()
+            table.read_pickle(path)
+            table.bind_callables(_AttrDict(module))
+            return yacc.LRParser(table, getattr(module, 'p_error', None))
+        except Exception:
+            return None
+
+    def _build_parser(self, module, signature: str) -> 'yacc.LRParser':
+        import ply.yacc as yacc
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            writable = os.access(self.cache_dir, os.W_OK)
+        except OSError:
+            writable = False
+        if not writable:
+            return yacc.yacc(module=module, debug=False, write_tables=False)
+
+        # O yacc tenta ler o picklefile antes de escrever, então o nome
+        # temporário não pode existir ainda
+        tmpfile = os.path.join(self.cache_dir, f".parsetab_{signature}.{os.getpid()}.tmp")
+        try:
+            parser = yacc.yacc(module=module, debug=False, picklefile=tmpfile)
+            if os.path.exists(tmpfile):
+                os.replace(tmpfile, self.parsetab_path(signature))
+            return parser
+        finally:
+            if os.path.exists(tmpfile):
+                os.remove(tmpfile)
+
+    # ==================== Manutenção ====================
+
+    def clear(self) -> int:
+        """
+        Remove todas as tabelas em cache (e o manifesto dos plugins).
+
+        Returns:
+            Quantidade de arquivos removidos
+        """
+        removed = 0
+        if not os.path.isdir(self.cache_dir):
+            return removed
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(('lextab_', 'parsetab_', 'plugins_')):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+
+_default_cache: Optional[TableCache] = None
+
+
+def get_default_cache() -> TableCache:
+    "Retorna o cache de tabelas compartilhado pelo processo."
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TableCache()
+    return _default_cache
@@ -0,0 +1,138 @@
+"""
+Testes para a tradução em lote (ia translate com vários textos ou --file).
+Este módulo usa um servidor HTTP local que traduz listas JSON adicionando um prefixo.
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai_executor import AIExecutor, AIException  # type: ignore
+
+
+class TranslateHandler(BaseHTTPRequestHandler):
+    """Responde pedidos em lote com uma lista JSON e pedidos simples com texto."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        prompt = json.loads(form['messages'][0])[0]['content']
+        self.server.prompts.append(prompt)
+
+        start, end = prompt.find('['), prompt.rfind(']')
+        if start >= 0:
+            items = json.loads(prompt[start:end + 1])
+            if self.server.drop_item and len(items) > 1:
+                items = items[:-1]
+            content = "```json\n" + json.dumps([f"tr:{item}" for item in items]) + "\n```"
+        else:
+            text = prompt.split('\n\n')[1]
+            content = f"tr:{text}"
+
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture que sobe o servidor de tradução local."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), TranslateHandler)
+    server.prompts = []
+    server.drop_item = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def executor(server):
+    """Fixture que cria um AIExecutor apontando para o servidor local."""
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    with AIExecutor(api_url=url) as executor:
+        yield executor
+
+
+class TestBatchTranslate:
+    """Classe de testes da tradução em lote."""
+
+    def test_single_request_for_small_batch(self, executor, server):
+        """Testa que textos pequenos vão em uma única requisição."""
+        texts = [f"texto {i}" for i in range(30)]
+        result = executor.execute_ia_translate_batch(texts, 'en')
+        assert result == [f"tr:{text}" for text in texts]
+        assert len(server.prompts) == 1
+
+    def test_fan_out_keeps_order(self, executor, server):
+        """Testa que vários lotes concorrentes são remontados na ordem original."""
+        texts = [f"texto numero {i}" for i in range(100)]
+        result = executor.execute_ia_translate_batch(texts, 'en', batch_tokens=50)
+        assert result == [f"tr:{text}" for text in texts]
+        assert 1 < len(server.prompts) < len(texts)
+
+    def test_mismatched_answer_is_split(self, executor, server):
+        """Testa que um lote com resposta incompleta é dividido e refeito."""
+        server.drop_item = True
+        texts = ["um", "dois", "tres", "quatro"]
+        result = executor.execute_ia_translate_batch(texts, 'en')
+        assert result == [f"tr:{text}" for text in texts]
+
+    def test_translate_file(self, executor, tmp_path):
+        """Testa a tradução das linhas de um arquivo, ignorando linhas vazias."""
+        strings = tmp_path / "strings.txt"
+        strings.write_text("Abrir\n\nSalvar\nFechar\n", encoding='utf-8')
+        result = executor.execute_ia_translate_file(str(strings), 'en')
+        assert result == ["tr:Abrir", "tr:Salvar", "tr:Fechar"]
+
+    def test_invalid_text_rejected(self, executor, server):
+        """Testa que um texto inválido impede o lote antes de qualquer requisição."""
+        with pytest.raises(AIException):
+            executor.execute_ia_translate_batch(["ok", "$(whoami)"], 'en')
+        assert server.prompts == []
+
+
+class TestPacking:
+    """Testes do agrupamento de textos em lotes."""
+
+    @pytest.fixture
+    def executor(self):
+        return AIExecutor()
+
+    def test_respects_token_budget(self, executor):
+        """Testa que nenhum lote passa do orçamento de tokens."""
+        texts = ["x" * 40] * 10
+        batches = executor._pack_translate_batches(texts, batch_tokens=30, batch_items=100)
+        for batch in batches:
+            assert sum(executor._estimate_tokens(texts[i]) for i in batch) <= 30
+        assert [i for batch in batches for i in batch] == list(range(10))
+
+    def test_large_text_gets_own_batch(self, executor):
+        """Testa que um texto maior que o orçamento fica sozinho."""
+        texts = ["a", "b" * 1000, "c"]
+        assert executor._pack_translate_batches(texts, 50, 10) == [[0], [1], [2]]
+
+    def test_respects_item_limit(self, executor):
+        """Testa o limite de itens por lote."""
+        batches = executor._pack_translate_batches(["a"] * 5, 1000, 2)
+        assert batches == [[0, 1], [2, 3], [4]]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
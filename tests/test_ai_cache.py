@@ -0,0 +1,232 @@
+"""
+Testes para o cache de respostas de IA do TermIA.
+Este módulo testa os níveis em memória (LRU) e em disco (SQLite) do cache.
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Adiciona o diretório src e a raiz do projeto ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ai_cache import (  # type: ignore
+    MemoryCache, ResponseCache, SQLiteCache, TieredCache, make_cache_key, create_response_cache,
+    default_cache_path
+)
+from ai_executor import AIExecutor  # type: ignore
+
+
+class TestResponseCache:
+    """Testes da classe base de cache."""
+
+    def test_missing_override_fails_at_instantiation(self):
+        """Testa que um backend incompleto falha ao ser criado, não no primeiro acesso."""
+        class NoClearCache(ResponseCache):
+            def _get(self, key):
+                return None
+
+            def _set(self, key, value):
+                pass
+
+        with pytest.raises(TypeError):
+            NoClearCache()
+        with pytest.raises(TypeError):
+            ResponseCache()
+
+    def test_counters_are_thread_safe(self):
+        """Testa que acessos de várias threads não perdem contagens."""
+        import threading
+
+        class DictCache(ResponseCache):
+            def __init__(self):
+                super().__init__()
+                self.data = {'a': '1'}
+
+            def _get(self, key):
+                return self.data.get(key)
+
+            def _set(self, key, value):
+                self.data[key] = value
+
+            def clear(self):
+                self.data.clear()
+
+        # Trocas de thread frequentes expõem incrementos não atômicos
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            cache = DictCache()
+
+            def worker():
+                for _ in range(5000):
+                    cache.get('a')
+                    cache.get('b')
+
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        assert (cache.hits, cache.misses) == (40000, 40000)
+
+
+class TestMemoryCache:
+    """Classe de testes para o MemoryCache."""
+
+    def test_hit_and_miss_counters(self):
+        """Testa contadores de acerto e falha."""
+        cache = MemoryCache()
+        assert cache.get('a') is None
+        cache.set('a', 'resposta')
+        assert cache.get('a') == 'resposta'
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self):
+        """Testa que a entrada menos usada é descartada."""
+        cache = MemoryCache(max_entries=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        cache.get('a')
+        cache.set('c', '3')
+        assert cache.get('b') is None
+        assert cache.get('a') == '1'
+        assert cache.get('c') == '3'
+
+    def test_ttl_expiry(self):
+        """Testa que entradas expiradas não são retornadas."""
+        cache = MemoryCache(ttl=0.01)
+        cache.set('a', '1')
+        time.sleep(0.02)
+        assert cache.get('a') is None
+
+
+class TestSQLiteCache:
+    """Classe de testes para o SQLiteCache."""
+
+    def test_persists_between_instances(self, tmp_path):
+        """Testa que respostas sobrevivem a uma nova instância."""
+        path = str(tmp_path / 'cache.sqlite3')
+        SQLiteCache(path).set('a', 'resposta')
+        assert SQLiteCache(path).get('a') == 'resposta'
+
+    def test_size_limit(self, tmp_path):
+        """Testa o limite de entradas."""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), max_entries=3)
+        for i in range(5):
+            cache.set(str(i), str(i))
+        assert len(cache) == 3
+
+    def test_eviction_only_above_limit(self, tmp_path):
+        """Testa que a limpeza por LRU só roda quando o limite é ultrapassado."""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), max_entries=10)
+        statements = []
+        cache._conn.set_trace_callback(statements.append)
+        for i in range(10):
+            cache.set(str(i), str(i))
+        cache.set('0', 'de novo')
+        assert not any(sql.startswith('DELETE') for sql in statements)
+        cache.get('1')
+        cache.set('10', '10')
+        assert sum(sql.startswith('DELETE') for sql in statements) == 1
+        assert len(cache) == 10
+        # A menos usada recentemente é a '2': a '0' foi regravada e a '1' lida
+        assert cache.get('2') is None
+        assert cache.get('0') == 'de novo'
+        assert cache.get('1') == '1'
+        cache.close()
+
+    def test_ttl_expiry(self, tmp_path):
+        """Testa que entradas expiradas são removidas."""
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite3'), ttl=0.01)
+        cache.set('a', '1')
+        time.sleep(0.02)
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+
+class TestTieredCache:
+    """Classe de testes para o TieredCache."""
+
+    def test_disk_hit_promotes_to_memory(self, tmp_path):
+        """Testa que um acerto em disco é copiado para a memória."""
+        path = str(tmp_path / 'cache.sqlite3')
+        SQLiteCache(path).set('a', 'resposta')
+
+        cache = TieredCache(MemoryCache(), SQLiteCache(path))
+        assert cache.get('a') == 'resposta'
+        assert cache.get('a') == 'resposta'
+        stats = cache.stats()
+        assert stats['hits'] == 2
+        assert stats['disk']['hits'] == 1
+        assert stats['memory']['hits'] == 1
+
+    def test_terminal_close_closes_disk(self, tmp_path):
+        """Testa que fechar o terminal fecha a conexão do cache em disco."""
+        import sqlite3
+        from main import TermIA  # type: ignore
+        cache = TieredCache(MemoryCache(), SQLiteCache(str(tmp_path / 'cache.sqlite3')))
+        terminal = TermIA(enhanced_mode=False)
+        terminal._ai_executor = AIExecutor(cache=cache)
+        terminal.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            cache.disk.set('a', '1')
+
+    def test_create_disabled(self):
+        """Testa que o cache pode ser desativado pela configuração."""
+        assert create_response_cache({'enabled': False}) is None
+
+    def test_default_path_follows_cache_dir(self, tmp_path, monkeypatch):
+        """Testa que o cache em disco fica no mesmo diretório raiz das tabelas."""
+        monkeypatch.delenv('TERMIA_CACHE_DIR', raising=False)
+        monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+        assert default_cache_path() == str(tmp_path / 'xdg' / 'termia' / 'ai_responses.sqlite3')
+        monkeypatch.setenv('TERMIA_CACHE_DIR', str(tmp_path / 'termia'))
+        assert default_cache_path() == str(tmp_path / 'termia' / 'ai_responses.sqlite3')
+
+    def test_create_memory_only(self):
+        """Testa cache apenas em memória."""
+        cache = create_response_cache({'persistent': False})
+        assert cache.disk is None
+
+
+class TestAIExecutorCache:
+    """Testes da integração do cache com o AIExecutor."""
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        """Fixture que cria um AIExecutor com cache e sem acesso à rede."""
+        executor = AIExecutor(cache=MemoryCache())
+        calls = []
+
+        def fake_request(prompt, max_tokens, temperature):
+            calls.append(prompt)
+            return f"resposta {len(calls)}"
+
+        monkeypatch.setattr(executor, '_request', fake_request)
+        executor.calls = calls
+        return executor
+
+    def test_identical_prompt_is_cached(self, executor):
+        """Testa que o mesmo prompt não gera nova requisição."""
+        first = executor.execute_ia_translate("Hello", "pt")
+        second = executor.execute_ia_translate("Hello", "pt")
+        assert first == second
+        assert len(executor.calls) == 1
+
+    def test_key_includes_parameters(self, executor):
+        """Testa que parâmetros diferentes geram chaves diferentes."""
+        assert make_cache_key('p', 100, 0.7, 'url') != make_cache_key('p', 200, 0.7, 'url')
+        assert make_cache_key('p', 100, 0.7, 'url') != make_cache_key('p', 100, 0.7, 'outra')
+        executor._call_api('p', max_tokens=100)
+        executor._call_api('p', max_tokens=200)
+        assert len(executor.calls) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,89 @@
+"""
+Testes para o pool de conexões HTTP do AIExecutor.
+Este módulo usa um servidor HTTP local para verificar o reuso de conexões (keep-alive).
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai_executor import AIExecutor  # type: ignore
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Responde como a API de IA e conta as conexões TCP abertas."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Fixture que sobe um servidor HTTP local."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def api_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+
+
+class TestConnectionPool:
+    """Classe de testes para o pool de conexões."""
+
+    def test_connections_are_reused(self, stub_server):
+        """Testa que requisições seguidas usam a mesma conexão."""
+        with AIExecutor(api_url=api_url(stub_server)) as executor:
+            for _ in range(5):
+                assert executor._call_api("oi") == "ok"
+        assert stub_server.connections == 1
+
+    def test_idle_timeout_drops_pool(self, stub_server):
+        """Testa que o pool é recriado depois do tempo ocioso."""
+        executor = AIExecutor(api_url=api_url(stub_server), idle_timeout=0)
+        executor._call_api("um")
+        executor._last_used -= 1
+        executor._call_api("dois")
+        executor.close()
+        assert stub_server.connections == 2
+
+    def test_close_is_idempotent(self, stub_server):
+        """Testa que close pode ser chamado várias vezes e o executor continua usável."""
+        executor = AIExecutor(api_url=api_url(stub_server))
+        executor._call_api("um")
+        executor.close()
+        executor.close()
+        assert executor._session is None
+        assert executor._call_api("dois") == "ok"
+        executor.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,239 @@
+"""
+Testes para a execução de comandos de IA em segundo plano (jobs).
+Este módulo testa o AIJobManager e os comandos '&' e 'jobs' do TermIA.
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+import io
+import threading
+import time
+
+# Adiciona a raiz do projeto e o diretório src ao path
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from ai_jobs import AIJob, AIJobManager  # type: ignore
+from ai_executor import AIException  # type: ignore
+from main import TermIA  # type: ignore
+
+
+def slow_echo(text, delay=0.2):
+    time.sleep(delay)
+    return text
+
+
+def failing(_text):
+    raise AIException("API indisponível")
+
+
+@pytest.fixture
+def manager():
+    """Fixture que cria um gerenciador de jobs e o encerra no fim."""
+    manager = AIJobManager(max_concurrency=4)
+    yield manager
+    manager.shutdown()
+
+
+class TestAIJobManager:
+    """Classe de testes para o AIJobManager."""
+
+    def test_submit_and_wait(self, manager):
+        """Testa que o resultado fica disponível após wait."""
+        job = manager.submit('eco', slow_echo, 'ola', 0.01)
+        assert manager.wait(job.id).result == 'ola'
+        assert job.status == AIJob.DONE
+
+    def test_jobs_run_concurrently(self, manager):
+        """Testa que vários jobs rodam ao mesmo tempo."""
+        start = time.perf_counter()
+        jobs = [manager.submit(f'eco {i}', slow_echo, i, 0.3) for i in range(4)]
+        results = [manager.wait(job.id).result for job in jobs]
+        assert results == [0, 1, 2, 3]
+        assert time.perf_counter() - start < 1.0
+
+    def test_max_concurrency(self):
+        """Testa que max_concurrency limita as chamadas simultâneas."""
+        manager = AIJobManager(max_concurrency=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def track(_):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+
+        jobs = [manager.submit('t', track, i) for i in range(6)]
+        for job in jobs:
+            manager.wait(job.id)
+        manager.shutdown()
+        assert max(peak) == 2
+
+    def test_lookups_take_the_lock(self, manager):
+        """Testa que get, wait e cancel consultam os jobs sob o lock do gerenciador."""
+        job = manager.submit('eco', slow_echo, 'ola', 0.01)
+        manager.wait(job.id)
+        results = []
+        calls = [manager.get, manager.wait, manager.cancel]
+        threads = [threading.Thread(target=lambda call=call: results.append(call(job.id)))
+                   for call in calls]
+        with manager._lock:
+            for thread in threads:
+                thread.start()
+            time.sleep(0.1)
+            assert results == []
+        for thread in threads:
+            thread.join(1)
+        assert len(results) == 3
+
+    def test_failure_is_recorded(self, manager):
+        """Testa que exceções ficam registradas no job."""
+        job = manager.wait(manager.submit('falha', failing, 'x').id)
+        assert job.status == AIJob.FAILED
+        assert isinstance(job.error, AIException)
+
+    def test_cancel(self, manager):
+        """Testa o cancelamento de um job em execução."""
+        job = manager.submit('lento', slow_echo, 'x', 1.0)
+        assert manager.cancel(job.id) is True
+        assert job.status == AIJob.CANCELLED
+        assert manager.wait(job.id).status == AIJob.CANCELLED
+        assert manager.cancel(job.id) is False
+
+    def test_cancel_after_call_returned(self, manager):
+        """Testa que cancelar um job cuja chamada já terminou não vira 'done' depois."""
+        entered = threading.Event()
+        go = threading.Event()
+        returned = threading.Event()
+        loop_blocked = threading.Event()
+        release_loop = threading.Event()
+
+        def quick(text):
+            entered.set()
+            go.wait()
+            returned.set()
+            return text
+
+        def block_loop():
+            loop_blocked.set()
+            release_loop.wait()
+
+        job = manager.submit('rapido', quick, 'x')
+        entered.wait(5)
+        # A chamada termina no pool enquanto o loop está ocupado, então o
+        # job ainda não viu o resultado quando é cancelado
+        manager._loop.call_soon_threadsafe(block_loop)
+        loop_blocked.wait(5)
+        go.set()
+        returned.wait(5)
+        time.sleep(0.05)
+        assert manager.cancel(job.id) is True
+        release_loop.set()
+        assert manager.wait(job.id, timeout=5).status == AIJob.CANCELLED
+        time.sleep(0.05)
+        assert job.status == AIJob.CANCELLED
+        assert job.result is None
+
+    def test_shutdown_with_blocked_loop(self):
+        """Testa que o encerramento não falha com o loop ainda ocupado."""
+        manager = AIJobManager()
+        release_loop = threading.Event()
+        loop = manager._ensure_loop()
+        thread = manager._thread
+        loop.call_soon_threadsafe(release_loop.wait)
+        try:
+            manager.shutdown()
+            assert not loop.is_closed()
+        finally:
+            release_loop.set()
+        # Depois de liberado, o loop termina o que ficou pendente e é fechado aqui
+        thread.join(5)
+        pending = asyncio.all_tasks(loop)
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+    def test_wait_timeout(self, manager):
+        """Testa que wait com timeout não bloqueia para sempre."""
+        job = manager.submit('lento', slow_echo, 'x', 1.0)
+        with pytest.raises(TimeoutError):
+            manager.wait(job.id, timeout=0.01)
+
+    def test_unknown_job(self, manager):
+        """Testa erro para job inexistente."""
+        with pytest.raises(KeyError):
+            manager.wait(42)
+
+    def test_pop_unreported(self, manager):
+        """Testa que cada job terminado é reportado uma única vez."""
+        job = manager.submit('eco', slow_echo, 'ola', 0.01)
+        manager.wait(job.id)
+        assert manager.pop_unreported() == [job]
+        assert manager.pop_unreported() == []
+
+
+class TestBackgroundCommands:
+    """Testes dos comandos '&' e 'jobs' no TermIA."""
+
+    @pytest.fixture
+    def terminal(self):
+        """Fixture que cria um TermIA com a IA substituída por funções locais."""
+        terminal = TermIA(enhanced_mode=False)
+        terminal.ai_executor.execute_ia_ask = lambda question: slow_echo(f"resposta: {question}", 0.05)
+        yield terminal
+        terminal.close()
+
+    def test_background_returns_immediately(self, terminal, capsys):
+        """Testa que o prompt volta antes da resposta da IA."""
+        terminal.ai_executor.execute_ia_ask = lambda question: slow_echo(question, 1.0)
+        start = time.perf_counter()
+        assert terminal.process_command('ia ask "pergunta" &')
+        assert time.perf_counter() - start < 0.5
+        assert '[1] ia ask "pergunta"' in capsys.readouterr().out
+
+    def test_jobs_wait_prints_result(self, terminal, capsys):
+        """Testa que jobs wait mostra o resultado."""
+        terminal.process_command('ia ask "um" &')
+        terminal.process_command('ia ask "dois" &')
+        assert terminal.process_command('jobs wait')
+        out = capsys.readouterr().out
+        assert 'resposta: um' in out
+        assert 'resposta: dois' in out
+        assert terminal.jobs.list_jobs() == []
+
+    def test_jobs_wait_failed(self, terminal, capsys):
+        """Testa que um job com erro marca o comando jobs wait como falho."""
+        terminal.ai_executor.execute_ia_ask = failing
+        terminal.process_command('ia ask "x" &')
+        assert not terminal.process_command('jobs wait 1')
+        assert 'API indisponível' in capsys.readouterr().out
+
+    def test_jobs_unknown_action(self, terminal):
+        """Testa ação desconhecida do comando jobs."""
+        assert not terminal.process_command('jobs stop')
+
+    def test_report_finished_jobs(self, terminal, capsys):
+        """Testa que jobs terminados são exibidos antes do próximo prompt."""
+        terminal.process_command('ia ask "um" &')
+        terminal.jobs.wait(1)
+        terminal.report_finished_jobs()
+        assert 'resposta: um' in capsys.readouterr().out
+        assert terminal.jobs.list_jobs() == []
+
+    def test_script_waits_for_jobs(self, terminal, capsys):
+        """Testa que o modo script aguarda os jobs antes do resumo."""
+        status = io.StringIO()
+        code = terminal.run_script(['ia ask "um" &\n', 'pwd\n'], status_stream=status)
+        assert code == 0
+        assert 'resposta: um' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,167 @@
+"""
+Testes para o servidor de IA local e o gerador de carga.
+Este módulo testa a latência, os erros, os timeouts, o streaming e a
+gravação/reprodução do MockAIServer, e o relatório do gerador de carga
+contra o AIExecutor, sem acesso à rede.
+"""
+
+import pytest
+import sys
+import os
+import json
+import time
+
+# Adiciona os diretórios src e benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from ai_executor import AIExecutor, AIException  # type: ignore
+from ai_resilience import Backoff, CircuitBreaker, RetryBudget  # type: ignore
+from mock_ai_server import MockAIServer, load_recording  # type: ignore
+from ai_load import percentile, run_load  # type: ignore
+
+
+def make_executor(server, **kwargs):
+    """Cria um AIExecutor sem cache apontando para o servidor local."""
+    kwargs.setdefault('max_retries', 1)
+    kwargs.setdefault('backoff', Backoff(base=0.01))
+    kwargs.setdefault('circuit_breaker', CircuitBreaker())
+    kwargs.setdefault('retry_budget', RetryBudget())
+    return AIExecutor(api_url=server.url, cache=None, **kwargs)
+
+
+class TestMockAIServer:
+    """Classe de testes para o MockAIServer."""
+
+    def test_reply(self):
+        """Testa que o servidor responde no formato da API."""
+        with MockAIServer(reply="Paris") as server:
+            with make_executor(server) as executor:
+                assert executor.execute_ia_ask("Qual a capital da França?") == "Paris"
+        assert server.requests == 1
+
+    def test_latency(self):
+        """Testa que a latência configurada atrasa a resposta."""
+        with MockAIServer(reply="ok", latency=0.1) as server:
+            with make_executor(server) as executor:
+                started = time.perf_counter()
+                executor.execute_ia_ask("oi")
+                assert time.perf_counter() - started >= 0.1
+
+    def test_errors(self):
+        """Testa a taxa de erros e o cabeçalho Retry-After."""
+        import requests
+        with MockAIServer(error_rate=1.0, error_status=503) as server:
+            with make_executor(server, max_retries=2) as executor:
+                with pytest.raises(AIException, match="503"):
+                    executor.execute_ia_ask("oi")
+        assert server.requests == 2
+        assert server.errors == 2
+        with MockAIServer(error_rate=1.0, error_status=429, retry_after=2) as server:
+            response = requests.post(server.url, data={'messages': '[]'})
+            assert response.status_code == 429
+            assert response.headers['Retry-After'] == '2'
+
+    def test_error_rate_is_reproducible(self):
+        """Testa que a mesma semente gera a mesma sequência de erros."""
+        outcomes = []
+        for _ in range(2):
+            run = []
+            with MockAIServer(reply="ok", error_rate=0.5, seed=7) as server:
+                with make_executor(server) as executor:
+                    for _ in range(10):
+                        try:
+                            executor.execute_ia_ask("oi")
+                            run.append(True)
+                        except AIException:
+                            run.append(False)
+            outcomes.append(run)
+        assert outcomes[0] == outcomes[1]
+        assert True in outcomes[0] and False in outcomes[0]
+
+    def test_timeout(self):
+        """Testa que uma requisição sem resposta esgota o timeout do cliente."""
+        with MockAIServer(timeout_rate=1.0) as server:
+            with make_executor(server, timeout=0.2) as executor:
+                started = time.perf_counter()
+                with pytest.raises(AIException, match="timeout"):
+                    executor.execute_ia_ask("oi")
+                # O servidor é parado sem esperar os 30 s da requisição presa
+                assert time.perf_counter() - started < 5
+        assert server.timeouts == 1
+
+    def test_streaming(self):
+        """Testa a resposta em eventos e a reutilização da conexão."""
+        reply = "linha um\nlinha dois\nlinha três\n"
+        with MockAIServer(reply=reply, chunk_size=5) as server:
+            with make_executor(server) as executor:
+                pieces = list(executor._call_api_stream("oi"))
+                assert len(pieces) > 1
+                assert ''.join(pieces) == reply
+                assert list(executor.stream_ia_ask("oi")) == ["linha um", "linha dois", "linha três"]
+
+    def test_record_and_replay(self, tmp_path):
+        """Testa gravar as respostas do servidor real e reproduzi-las offline."""
+        recording = str(tmp_path / 'sessao.jsonl')
+        with MockAIServer(reply="resposta gravada") as upstream:
+            with MockAIServer(record=recording, upstream=upstream.url) as recorder:
+                with make_executor(recorder) as executor:
+                    assert executor.execute_ia_ask("Pergunta 1") == "resposta gravada"
+                    assert list(executor.stream_ia_ask("Pergunta 2")) == ["resposta gravada"]
+        assert len(load_recording(recording)) == 2
+
+        with MockAIServer(reply="outra", replay=recording) as server:
+            with make_executor(server) as executor:
+                assert executor.execute_ia_ask("Pergunta 1") == "resposta gravada"
+                with pytest.raises(AIException):
+                    executor.execute_ia_ask("Pergunta não gravada")
+
+    def test_invalid_modes(self, tmp_path):
+        """Testa as combinações inválidas de gravação e reprodução."""
+        with pytest.raises(ValueError):
+            MockAIServer(record=str(tmp_path / 'x.jsonl'))
+        with pytest.raises(ValueError):
+            MockAIServer(record='a', upstream='http://x', replay='b')
+
+
+class TestLoadGenerator:
+    """Testes do gerador de carga."""
+
+    def test_percentile(self):
+        """Testa o percentil com interpolação linear."""
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 50) == pytest.approx(2.5)
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 100) == 4.0
+        assert percentile([], 99) == 0.0
+
+    def test_concurrent_sessions(self):
+        """Testa que as sessões rodam em paralelo e o relatório soma tudo."""
+        with MockAIServer(reply="ok", latency=0.05) as server:
+            report = run_load(server.url, sessions=4, requests_per_session=5, max_retries=1)
+        assert report.requests == 20
+        assert report.succeeded == 20
+        assert report.failed == 0
+        # Em série seriam 20 x 50 ms
+        assert report.duration < 0.9
+        p = report.percentiles()
+        assert 0.05 <= p['p50'] <= p['p95'] <= p['p99']
+        assert report.throughput > 0
+        data = report.to_json()
+        assert json.loads(json.dumps(data))['latency']['p99'] == pytest.approx(p['p99'])
+
+    def test_errors_and_streaming(self):
+        """Testa a contagem de erros e o tempo até o primeiro trecho."""
+        with MockAIServer(reply="a\nb\n" * 20, error_rate=0.5, seed=3) as server:
+            # Um circuito aberto rejeitaria o resto das requisições
+            report = run_load(server.url, sessions=2, requests_per_session=10, stream=True,
+                              max_retries=1, executor_options={
+                                  'circuit_breaker': CircuitBreaker(failure_threshold=1000)})
+        assert report.succeeded + report.failed == 20
+        assert 0 < report.failed < 20
+        assert len(report.first_chunk) == report.succeeded
+        assert 'failed' in report.format()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
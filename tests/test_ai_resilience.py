@@ -0,0 +1,327 @@
+"""
+Testes para as novas tentativas do AIExecutor.
+Este módulo testa o backoff com jitter, o Retry-After, o prazo total, o
+orçamento de novas tentativas e o circuit breaker, contra servidores locais.
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona os diretórios src e benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import ai_executor  # type: ignore
+from ai_executor import AIExecutor, AIException  # type: ignore
+from ai_resilience import (Backoff, CircuitBreaker, RetryBudget,  # type: ignore
+                           circuit_breaker_for, parse_retry_after)
+from mock_ai_server import MockAIServer  # type: ignore
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Responde com os status da lista do servidor, em ordem (200 quando ela acaba)."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        with self.server.lock:
+            self.server.requests += 1
+            status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        body = json.dumps({"choices": [{"message": {"content": "ok"}}]}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def scripted_server():
+    """Fixture que sobe um servidor HTTP local com respostas programadas."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    server.script = []
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Registra as esperas entre tentativas sem esperar de fato."""
+    calls = []
+    monkeypatch.setattr(ai_executor.time, 'sleep', calls.append)
+    return calls
+
+
+def make_executor(url, **kwargs):
+    """Cria um AIExecutor sem cache, com disjuntor e orçamento próprios."""
+    kwargs.setdefault('circuit_breaker', CircuitBreaker())
+    kwargs.setdefault('retry_budget', RetryBudget())
+    return AIExecutor(api_url=url, cache=None, **kwargs)
+
+
+class FakeClock:
+    """Relógio controlado pelo teste."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBackoff:
+    """Testes da espera entre tentativas."""
+
+    def test_exponential_ceiling(self):
+        """Testa que o teto da espera dobra até o limite."""
+        backoff = Backoff(base=0.5, max_delay=3.0)
+        assert [backoff.delay(n, rng=lambda: 1.0) for n in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+    def test_jitter(self):
+        """Testa que a espera é sorteada entre zero e o teto."""
+        backoff = Backoff(base=1.0)
+        assert backoff.delay(2, rng=lambda: 0.25) == 1.0
+        delays = {backoff.delay(3) for _ in range(20)}
+        assert len(delays) > 1
+        assert all(0 <= delay <= 8.0 for delay in delays)
+
+    def test_retry_after_is_a_minimum(self):
+        """Testa que o Retry-After do servidor é respeitado."""
+        backoff = Backoff(base=0.5)
+        assert backoff.delay(0, retry_after=5.0, rng=lambda: 1.0) == 5.0
+        assert backoff.delay(4, retry_after=1.0, rng=lambda: 1.0) == 8.0
+
+    def test_parse_retry_after(self):
+        """Testa o cabeçalho em segundos e como data HTTP."""
+        assert parse_retry_after('3') == 3.0
+        assert parse_retry_after('-1') == 0.0
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('amanhã') is None
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        later = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 60))
+        assert 55 <= parse_retry_after(later) <= 60
+
+
+class TestRetryBudget:
+    """Testes do orçamento de novas tentativas."""
+
+    def test_burst_then_ratio(self):
+        """Testa a reserva inicial e a reposição proporcional às requisições."""
+        budget = RetryBudget(ratio=0.5, capacity=2)
+        assert budget.withdraw() and budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+        assert budget.stats() == {'tokens': 0.0, 'requests': 2, 'retries': 3, 'exhausted': 2}
+
+    def test_capacity(self):
+        """Testa que os tokens não passam da capacidade."""
+        budget = RetryBudget(ratio=1, capacity=3)
+        for _ in range(10):
+            budget.deposit()
+        assert budget.stats()['tokens'] == 3
+
+
+class TestCircuitBreaker:
+    """Testes do circuit breaker."""
+
+    def test_opens_after_consecutive_failures(self):
+        """Testa que só falhas seguidas abrem o circuito."""
+        breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+        for _ in range(2):
+            breaker.record_failure()
+        breaker.record_success()
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker.rejected == 1
+
+    def test_half_open_probe(self):
+        """Testa a sonda única após o resfriamento e o fechamento no sucesso."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 4
+        assert breaker.retry_in() == 6
+        assert not breaker.allow()
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.stats()['transitions'] == {
+            'closed->open': 1, 'open->half_open': 1, 'half_open->closed': 1}
+
+    def test_failed_probe_reopens(self):
+        """Testa que a falha da sonda abre o circuito por mais um resfriamento."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_in() == 10
+        assert breaker.transitions['half_open->open'] == 1
+
+    def test_shared_per_endpoint(self):
+        """Testa que executores do mesmo endpoint compartilham o disjuntor."""
+        url = 'http://127.0.0.1:9/teste-compartilhado'
+        first = AIExecutor(api_url=url, cache=None)
+        second = AIExecutor(api_url=url, cache=None)
+        assert first.circuit_breaker is second.circuit_breaker is circuit_breaker_for(url)
+        assert first.retry_budget is second.retry_budget
+
+
+class TestRetries:
+    """Testes das novas tentativas do AIExecutor."""
+
+    def test_retries_server_errors(self, scripted_server, sleeps):
+        """Testa que 5xx e 429 são repetidos com backoff."""
+        scripted_server.script = [(503, {}), (429, {}), (200, {})]
+        executor = make_executor(scripted_server.url, backoff=Backoff(base=1.0, max_delay=2.0))
+        assert executor.execute_ia_ask("oi") == "ok"
+        assert scripted_server.requests == 3
+        assert len(sleeps) == 2
+        assert sleeps[0] <= 1.0 and sleeps[1] <= 2.0
+        stats = executor.resilience_stats()
+        assert stats['retries'] == 2
+        assert stats['circuit']['state'] == CircuitBreaker.CLOSED
+
+    def test_retry_after(self, scripted_server, sleeps):
+        """Testa que a espera pedida pelo servidor é respeitada."""
+        scripted_server.script = [(503, {'Retry-After': '7'})]
+        executor = make_executor(scripted_server.url)
+        assert executor.execute_ia_ask("oi") == "ok"
+        assert sleeps == [7.0]
+
+    def test_client_errors_are_not_retried(self, scripted_server, sleeps):
+        """Testa que um 4xx falha na hora e não conta contra o serviço."""
+        scripted_server.script = [(400, {})]
+        executor = make_executor(scripted_server.url)
+        with pytest.raises(AIException, match="400"):
+            executor.execute_ia_ask("oi")
+        assert scripted_server.requests == 1
+        assert sleeps == []
+        assert executor.circuit_breaker.consecutive_failures == 0
+
+    def test_gives_up_after_max_retries(self, scripted_server, sleeps):
+        """Testa a mensagem após esgotar as tentativas."""
+        scripted_server.script = [(500, {})] * 3
+        executor = make_executor(scripted_server.url, max_retries=3)
+        with pytest.raises(AIException, match="after 3 attempts: API request failed: HTTP 500"):
+            executor.execute_ia_ask("oi")
+        assert len(sleeps) == 2
+
+    def test_retry_budget(self, scripted_server, sleeps):
+        """Testa que sem orçamento a requisição falha sem nova tentativa."""
+        scripted_server.script = [(503, {})] * 2
+        executor = make_executor(scripted_server.url, retry_budget=RetryBudget(ratio=0, capacity=0))
+        with pytest.raises(AIException, match="retry budget exhausted"):
+            executor.execute_ia_ask("oi")
+        assert scripted_server.requests == 1
+        assert executor.retry_budget.exhausted == 1
+
+    def test_retry_after_beyond_deadline(self, scripted_server, sleeps):
+        """Testa que uma espera maior que o prazo encerra o comando na hora."""
+        scripted_server.script = [(503, {'Retry-After': '600'})]
+        executor = make_executor(scripted_server.url, deadline=30)
+        with pytest.raises(AIException, match="deadline"):
+            executor.execute_ia_ask("oi")
+        assert sleeps == []
+        assert executor.resilience_stats()['deadlines_exceeded'] == 1
+
+    def test_circuit_breaker_fails_fast(self, scripted_server, sleeps):
+        """Testa que o circuito aberto rejeita requisições sem acessar a rede."""
+        scripted_server.script = [(502, {})] * 2
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+        executor = make_executor(scripted_server.url, circuit_breaker=breaker)
+        with pytest.raises(AIException):
+            executor.execute_ia_ask("oi")
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(AIException, match="unavailable"):
+            executor.execute_ia_ask("oi")
+        assert scripted_server.requests == 2
+        assert breaker.rejected >= 1
+
+
+class TestDeadline:
+    """Testes do prazo total dos comandos, com o servidor de IA local."""
+
+    def test_attempt_timeout_is_cut_to_deadline(self):
+        """Testa que o prazo vale mesmo com timeout por tentativa maior."""
+        with MockAIServer(timeout_rate=1.0) as server:
+            executor = make_executor(server.url, timeout=60, max_retries=5, deadline=0.5,
+                                     backoff=Backoff(base=0.05))
+            started = time.perf_counter()
+            with pytest.raises(AIException):
+                executor.execute_ia_ask("oi")
+            assert time.perf_counter() - started < 2
+
+    def test_command_deadline_covers_all_requests(self):
+        """Testa que o prazo de um comando vale para todas as suas requisições."""
+        with MockAIServer(reply="ok", latency=0.2) as server:
+            executor = make_executor(server.url, deadline=0.5)
+            executor.execute_ia_ask("oi")
+            executor.execute_ia_ask("oi")
+            with executor.deadline():
+                executor.execute_ia_ask("oi")
+                with pytest.raises(AIException, match="deadline"):
+                    executor.execute_ia_ask("oi")
+                    executor.execute_ia_ask("oi")
+
+    def test_deadline_reaches_chunk_workers(self, monkeypatch):
+        """Testa que os resumos por partes herdam o prazo do comando."""
+        executor = make_executor('http://127.0.0.1:9/nao-usado', summary_chunk_tokens=50)
+        seen = []
+
+        def fake_request(prompt, max_tokens, temperature):
+            seen.append(executor._current_deadline())
+            return "resumo"
+        monkeypatch.setattr(executor, '_request', fake_request)
+        with executor.deadline(100):
+            expected = executor._current_deadline()
+            executor.execute_ia_summarize("palavra " * 500)
+        assert len(seen) > 1
+        assert set(seen) == {expected}
+        assert executor._current_deadline() is None
+
+    def test_open_circuit_with_mock_server(self):
+        """Testa a abertura do circuito com erros simulados pelo servidor local."""
+        with MockAIServer(error_rate=1.0, error_status=503) as server:
+            breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+            executor = make_executor(server.url, max_retries=2, circuit_breaker=breaker,
+                                     backoff=Backoff(base=0.01))
+            for _ in range(3):
+                with pytest.raises(AIException):
+                    executor.execute_ia_ask("oi")
+        assert server.requests == 3
+        assert breaker.stats()['transitions'] == {'closed->open': 1}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
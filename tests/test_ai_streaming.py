@@ -0,0 +1,196 @@
+"""
+Testes para o modo streaming dos comandos de IA do TermIA.
+Este módulo usa um servidor HTTP local que responde com server-sent events ou JSON.
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai_executor import AIExecutor  # type: ignore
+from ai_cache import MemoryCache  # type: ignore
+
+
+RESPONSE = "# Titulo\n\nPrimeira **linha**\nsegunda `linha`\n"
+BOT_RESPONSE = "**Bot intent:** responder\n**Bot message:**\n" + RESPONSE
+
+
+class StreamingHandler(BaseHTTPRequestHandler):
+    """Responde em SSE quando o cliente pede stream e o servidor suporta."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        self.server.requests.append(form)
+        response = getattr(self.server, 'response', RESPONSE)
+
+        if self.server.supports_stream and form.get('stream') == ['true']:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            for i in range(0, len(response), 4):
+                chunk = {"choices": [{"delta": {"content": response[i:i + 4]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(getattr(self.server, 'chunk_delay', 0))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+
+        body = json.dumps({"choices": [{"message": {"content": response}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(params=[True, False], ids=['sse', 'fallback'])
+def server(request):
+    """Fixture que sobe um servidor com e sem suporte a streaming."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StreamingHandler)
+    server.supports_stream = request.param
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_executor(server, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    return AIExecutor(api_url=url, **kwargs)
+
+
+class TestStreaming:
+    """Classe de testes do streaming."""
+
+    def test_stream_matches_non_streaming(self, server):
+        """Testa que o texto em streaming é igual ao da resposta completa."""
+        with make_executor(server) as executor:
+            streamed = list(executor.stream_ia_ask("Pergunta"))
+            full = executor.execute_ia_ask("Pergunta")
+        assert '\n'.join(streamed) == full
+        assert streamed[0] == 'Titulo'
+
+    def test_stream_strips_bot_message(self, server):
+        """Testa que o preâmbulo "**Bot message:**" é removido também em streaming."""
+        server.response = BOT_RESPONSE
+        with make_executor(server, cache=MemoryCache()) as executor:
+            streamed = list(executor.stream_ia_ask("Pergunta"))
+            cached = list(executor.stream_ia_ask("Pergunta"))
+            full = executor.execute_ia_ask("Pergunta")
+        assert '\n'.join(streamed) == full
+        assert streamed == cached
+        assert streamed[0] == 'Titulo'
+
+    def test_stream_flag_sent(self, server):
+        """Testa que o pedido de streaming é enviado ao servidor."""
+        with make_executor(server) as executor:
+            list(executor.stream_ia_summarize("Texto longo", "short"))
+        assert server.requests[0]['stream'] == ['true']
+
+    def test_stream_populates_cache(self, server):
+        """Testa que a resposta completa vai para o cache ao fim do streaming."""
+        with make_executor(server, cache=MemoryCache()) as executor:
+            first = list(executor.stream_ia_ask("Pergunta"))
+            second = list(executor.stream_ia_ask("Pergunta"))
+        assert first == second
+        assert len(server.requests) == 1
+
+    def test_slow_stream_stops_at_deadline(self, server):
+        """Testa que um servidor que envia devagar é interrompido pelo prazo total."""
+        from ai_executor import AIException  # type: ignore
+        if not server.supports_stream:
+            pytest.skip("apenas para respostas em streaming")
+        # Cada chunk chega antes do timeout de leitura, mas a resposta inteira passa do prazo
+        server.chunk_delay = 0.05
+        with make_executor(server, timeout=5, deadline=0.3) as executor:
+            started = time.monotonic()
+            with pytest.raises(AIException, match="deadline"):
+                list(executor.stream_ia_ask("Pergunta"))
+            assert time.monotonic() - started < 1
+            assert executor.resilience_stats()['deadlines_exceeded'] == 1
+
+    def test_validation_is_eager(self, server):
+        """Testa que erros de validação acontecem antes de iterar."""
+        from ai_executor import AIException  # type: ignore
+        with make_executor(server) as executor:
+            with pytest.raises(AIException):
+                executor.stream_ia_ask("")
+
+
+class TestStripBotMessage:
+    """Testes da remoção do preâmbulo do bot em streaming."""
+
+    def test_marker_split_across_chunks(self):
+        """Testa o marcador quebrado entre chunks."""
+        chunks = ['**Bot intent:** x\n**Bot ', 'mess', 'age:** ', ' Ola', ' mundo  \n']
+        assert ''.join(AIExecutor._strip_bot_message(chunks)) == 'Ola mundo'
+
+    def test_text_after_second_marker_dropped(self):
+        """Testa que o texto termina no segundo marcador, como na resposta completa."""
+        chunks = ['**Bot message:** a', 'b **Bot message:** c']
+        assert ''.join(AIExecutor._strip_bot_message(chunks)) == 'ab'
+
+    def test_without_marker_unchanged(self):
+        """Testa que respostas sem marcador passam inalteradas."""
+        chunks = ['  resposta ', 'sem marcador\n']
+        assert ''.join(AIExecutor._strip_bot_message(chunks)) == ''.join(chunks)
+
+    def test_streams_after_lookahead(self):
+        """Testa que um preâmbulo sem marcador é liberado após a janela de busca."""
+        from ai_executor import BOT_MARKER_LOOKAHEAD  # type: ignore
+
+        def chunks():
+            yield '**Bot intent:** ' + 'x' * BOT_MARKER_LOOKAHEAD
+            raise AssertionError("leitura além da janela")
+
+        assert next(AIExecutor._strip_bot_message(chunks())).endswith('x' * BOT_MARKER_LOOKAHEAD)
+
+    def test_plain_answer_not_held_back(self):
+        """Testa que respostas sem preâmbulo são repassadas sem esperar."""
+        def chunks():
+            yield '**Bo'
+            yield 'ld** texto'
+            raise AssertionError("chunk retido")
+
+        stripped = AIExecutor._strip_bot_message(chunks())
+        assert next(stripped) == '**Bold** texto'
+
+
+class TestCleanMarkdownStream:
+    """Testes da limpeza de markdown linha a linha."""
+
+    @pytest.fixture
+    def executor(self):
+        return AIExecutor()
+
+    def test_lines_split_across_chunks(self, executor):
+        """Testa linhas quebradas no meio de chunks."""
+        chunks = ['**neg', 'rito** a\n', '## Tit', 'ulo\nfim']
+        assert list(executor._clean_markdown_stream(chunks)) == ['negrito a', 'Titulo', 'fim']
+
+    def test_blank_lines_collapsed(self, executor):
+        """Testa que linhas em branco extras são removidas."""
+        text = "\n\na\n\n\n\nb\n\n"
+        assert '\n'.join(executor._clean_markdown_stream([text])) == executor._clean_markdown(text)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
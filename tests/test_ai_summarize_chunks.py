@@ -0,0 +1,157 @@
+"""
+Testes para o resumo map-reduce de textos e arquivos grandes.
+Este módulo usa um servidor HTTP local que responde com resumos curtos.
+"""
+
+import pytest
+import sys
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ai_executor import AIExecutor, AIException  # type: ignore
+from ai_cache import MemoryCache  # type: ignore
+
+
+class SummaryHandler(BaseHTTPRequestHandler):
+    """Resume cada trecho em uma frase curta e conta os pedidos."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        prompt = json.loads(form['messages'][0])[0]['content']
+        self.server.prompts.append(prompt)
+
+        if 'trecho' in prompt:
+            content = f"parte com {len(prompt)} caracteres"
+        else:
+            content = "resumo final"
+
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture que sobe o servidor local."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SummaryHandler)
+    server.prompts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_executor(server, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    return AIExecutor(api_url=url, summary_chunk_tokens=100, **kwargs)
+
+
+def make_document(paragraphs=60):
+    return "\n\n".join(f"Paragrafo {i}: " + "conteudo relevante " * 8 for i in range(paragraphs)).replace(" \n", "\n").strip()
+
+
+def chunk_prompts(server):
+    return [prompt for prompt in server.prompts if 'trecho' in prompt]
+
+
+class TestMapReduceSummary:
+    """Classe de testes do resumo em partes."""
+
+    def test_small_text_single_request(self, server):
+        """Testa que textos pequenos continuam com uma única requisição."""
+        with make_executor(server) as executor:
+            assert executor.execute_ia_summarize("Texto curto.") == "resumo final"
+        assert len(server.prompts) == 1
+
+    def test_large_text_is_chunked(self, server):
+        """Testa que textos grandes são resumidos por partes e depois combinados."""
+        with make_executor(server) as executor:
+            assert executor.execute_ia_summarize(make_document(), "medium") == "resumo final"
+        assert len(chunk_prompts(server)) > 1
+        assert 'trecho' not in server.prompts[-1]
+        assert 'parte com' in server.prompts[-1]
+
+    def test_progress_reported(self, server):
+        """Testa que o progresso chega até o total de partes."""
+        calls = []
+        with make_executor(server) as executor:
+            executor.execute_ia_summarize(make_document(), progress=lambda *args: calls.append(args))
+        finished = [(stage, total) for stage, done, total in calls if done == total]
+        assert calls[0][:2] == ('chunks', 0)
+        assert finished[0][0] == 'chunks'
+        assert sum(total for _, total in finished) == len(chunk_prompts(server))
+
+    def test_summarize_file_reuses_cached_chunks(self, server, tmp_path):
+        """Testa que só as partes alteradas são reenviadas depois de uma edição pequena."""
+        document = tmp_path / "doc.txt"
+        document.write_text(make_document(), encoding='utf-8')
+        with make_executor(server, cache=MemoryCache()) as executor:
+            executor.execute_ia_summarize_file(str(document))
+            first = len(chunk_prompts(server))
+
+            edited = make_document().replace("Paragrafo 30:", "Paragrafo 30 (revisado):")
+            document.write_text(edited, encoding='utf-8')
+            executor.execute_ia_summarize_file(str(document))
+            resent = len(chunk_prompts(server)) - first
+        assert 1 <= resent <= 2
+        assert resent < first
+
+    def test_stream_large_file(self, server, tmp_path):
+        """Testa o streaming do resumo final de um arquivo grande."""
+        document = tmp_path / "doc.txt"
+        document.write_text(make_document(), encoding='utf-8')
+        with make_executor(server) as executor:
+            assert list(executor.stream_ia_summarize_file(str(document))) == ["resumo final"]
+
+    def test_missing_file(self, server):
+        """Testa erro para arquivo inexistente."""
+        with make_executor(server) as executor:
+            with pytest.raises(AIException):
+                executor.execute_ia_summarize_file("nao_existe_12345.txt")
+
+
+class TestSplitChunks:
+    """Testes da divisão do texto em partes."""
+
+    def test_chunks_respect_size(self):
+        """Testa que nenhuma parte passa do limite."""
+        chunks = AIExecutor._split_chunks(make_document(), 100)
+        assert all(len(chunk) <= 100 * 4 for chunk in chunks)
+
+    def test_no_content_lost(self):
+        """Testa que todos os parágrafos aparecem, em ordem."""
+        text = make_document(20)
+        chunks = AIExecutor._split_chunks(text, 100)
+        assert "\n\n".join(chunks) == text
+
+    def test_long_paragraph_is_cut(self):
+        """Testa que um parágrafo maior que o limite é cortado."""
+        chunks = AIExecutor._split_chunks("palavra " * 500, 50)
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 200 for chunk in chunks)
+
+    def test_edit_changes_few_chunks(self):
+        """Testa que editar um parágrafo altera poucas partes."""
+        before = AIExecutor._split_chunks(make_document(), 100)
+        after = AIExecutor._split_chunks(make_document().replace("Paragrafo 5:", "Paragrafo 5 editado:"), 100)
+        assert len(set(after) - set(before)) <= 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
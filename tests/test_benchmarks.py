@@ -0,0 +1,132 @@
+"""
+Testes para a suíte de benchmarks do TermIA.
+Este módulo testa o harness (calibração, registro de casos, JSON e
+comparação entre execuções) e roda a suíte inteira em escala mínima,
+offline, contra o servidor de IA local.
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Adiciona o diretório benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+import harness  # type: ignore
+from harness import (BenchmarkResult, Context, SkipBenchmark, Suite, compare,  # type: ignore
+                     load_results, regressions, save_results, time_call)
+
+
+def make_result(name, median):
+    """Cria um resultado com três amostras em torno da mediana."""
+    return BenchmarkResult(name, 'grupo', 'calls', 1, 10, [median * 0.9, median, median * 1.1])
+
+
+class TestHarness:
+    """Classe de testes do harness de benchmarks."""
+
+    def test_time_call_calibrates_loop_count(self):
+        """Testa que o número de chamadas cresce até a amostra durar min_time."""
+        calls = []
+        number, samples = time_call(lambda: calls.append(1), repeat=3, min_time=0.01)
+        assert number > 1
+        assert len(samples) == 3
+        assert all(sample > 0 for sample in samples)
+        assert len(calls) >= 3 * number
+
+    def test_single_call_without_min_time(self):
+        """Testa que min_time=0 faz uma chamada por amostra."""
+        number, samples = time_call(lambda: None, repeat=2, min_time=0)
+        assert number == 1
+        assert len(samples) == 2
+
+    def test_suite_runs_selected_cases(self):
+        """Testa o registro, a seleção por padrão e os casos pulados."""
+        suite = Suite()
+
+        @suite.benchmark('texto.upper', unit='chars')
+        def upper(context):
+            text = 'a' * context.size(1000)
+            return (lambda: text.upper()), len(text)
+
+        @suite.benchmark('texto.skip')
+        def skipped(context):
+            raise SkipBenchmark('dependência ausente')
+
+        @suite.benchmark('outro.noop')
+        def noop(context):
+            return lambda: None
+
+        with pytest.raises(ValueError):
+            suite.benchmark('outro.noop')(noop)
+
+        lines = []
+        with Context(scale=0.5) as context:
+            results = suite.run(context, ['^texto'], repeat=2, min_time=0, progress=lines.append)
+        assert [result.name for result in results] == ['texto.upper']
+        assert results[0].ops == 500
+        assert results[0].group == 'texto'
+        assert any('skipped' in line for line in lines)
+
+    def test_context_cleanup(self):
+        """Testa os valores compartilhados e a limpeza no fim da execução."""
+        cleaned = []
+        with Context() as context:
+            workdir = context.workdir
+            assert context.shared('x', lambda: [1]) is context.shared('x', lambda: [2])
+            context.on_cleanup(lambda: cleaned.append('a'))
+            context.on_cleanup(lambda: cleaned.append('b'))
+        assert cleaned == ['b', 'a']
+        assert not os.path.exists(workdir)
+
+    def test_results_round_trip(self, tmp_path):
+        """Testa que os resultados gravados em JSON são lidos de volta."""
+        path = str(tmp_path / 'resultados' / 'run.json')
+        results = [make_result('lexer.tokenize', 0.002)]
+        save_results(path, results, scale=1.0)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['version'] == harness.RESULTS_VERSION
+        assert data['metadata'] == {'scale': 1.0}
+        assert data['results'][0]['median'] == pytest.approx(0.002)
+        assert load_results(path) == results
+
+    def test_compare_flags_regressions(self):
+        """Testa que só os casos mais lentos que o limite são regressões."""
+        baseline = [make_result('a', 1.0), make_result('b', 1.0), make_result('removido', 1.0)]
+        current = [make_result('a', 1.05), make_result('b', 1.5), make_result('novo', 1.0)]
+        comparisons = compare(baseline, current)
+        assert [item.name for item in comparisons] == ['a', 'b']
+        assert [item.name for item in regressions(comparisons, 1.10)] == ['b']
+        assert comparisons[1].ratio == pytest.approx(1.5)
+
+
+class TestSuite:
+    """Testes da suíte de benchmarks do TermIA."""
+
+    def test_full_suite_runs_offline(self, tmp_path, capsys):
+        """Testa que todos os casos rodam (em escala mínima) e geram o JSON."""
+        import run_benchmarks  # type: ignore
+        from bench_termia import suite  # type: ignore
+        output = str(tmp_path / 'run.json')
+        cwd = os.getcwd()
+        code = run_benchmarks.main(['--scale', '0.001', '--repeat', '1', '--min-time', '0',
+                                    '-o', output])
+        assert code == 0
+        assert os.getcwd() == cwd
+        names = {result.name for result in load_results(output)}
+        expected = set(suite.cases)
+        pytest.importorskip('prompt_toolkit')
+        assert names == expected
+
+        # Comparar com a própria execução não acusa regressões grandes
+        code = run_benchmarks.main(['-k', 'lexer', '--repeat', '1', '--min-time', '0',
+                                    '-o', str(tmp_path / 'run2.json'), '--compare', output,
+                                    '--threshold', '1000'])
+        assert code == 0
+        assert 'Compared with' in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
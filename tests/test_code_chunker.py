@@ -0,0 +1,219 @@
+"""
+Testes para a divisão de código em partes e para o ia codeexplain em partes.
+Este módulo testa o code_chunker e usa um servidor HTTP local no lugar da API.
+"""
+
+import pytest
+import sys
+import os
+import json
+import textwrap
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from code_chunker import expand_code_paths, split_code, split_lines, split_python  # type: ignore
+from ai_executor import AIExecutor, AIException  # type: ignore
+from ai_cache import MemoryCache  # type: ignore
+
+
+def make_module(functions=40):
+    """Gera um módulo Python com várias funções e uma classe."""
+    parts = ['"""Modulo de teste."""\n\nimport os\n']
+    for i in range(functions):
+        parts.append(textwrap.dedent(f'''
+            def funcao_{i}(valor):
+                """Retorna o valor somado a {i}."""
+                resultado = valor + {i}
+                return resultado
+            '''))
+    parts.append(textwrap.dedent('''
+        class Exemplo:
+            """Classe de exemplo."""
+
+            def metodo(self):
+                return 1
+        '''))
+    return ''.join(parts)
+
+
+class TestCodeChunker:
+    """Classe de testes da divisão de código."""
+
+    def test_python_chunks_cover_source(self):
+        """Testa que as partes, juntas, reproduzem o arquivo."""
+        source = make_module()
+        chunks = split_python(source, 500)
+        assert ''.join(chunk.text for chunk in chunks) == source
+        assert len(chunks) > 1
+
+    def test_python_chunks_at_function_boundaries(self):
+        """Testa que nenhuma função é cortada ao meio."""
+        for chunk in split_python(make_module(), 500)[1:]:
+            assert chunk.text.lstrip('\n').startswith(('def ', 'class '))
+
+    def test_large_class_split_at_methods(self):
+        """Testa que uma classe grande é dividida nos métodos."""
+        methods = ''.join(f"    def m{i}(self):\n        return {i}\n\n" for i in range(50))
+        source = f"class Grande:\n{methods}"
+        chunks = split_python(source, 300)
+        assert len(chunks) > 1
+        assert ''.join(chunk.text for chunk in chunks) == source
+
+    def test_line_numbers(self):
+        """Testa que as linhas de cada parte batem com o arquivo."""
+        source = make_module()
+        lines = source.splitlines(keepends=True)
+        for chunk in split_python(source, 500):
+            assert ''.join(lines[chunk.start - 1:chunk.end]) == chunk.text
+
+    def test_generic_split(self):
+        """Testa a divisão heurística de outras linguagens."""
+        source = ''.join(f"function f{i}() {{\n  return {i};\n}}\n\n" for i in range(100))
+        chunks = list(split_lines(source.splitlines(keepends=True), 400))
+        assert ''.join(chunk.text for chunk in chunks) == source
+        assert all(len(chunk.text) <= 400 for chunk in chunks)
+        assert all(chunk.text.startswith('function') for chunk in chunks)
+
+    def test_invalid_python_falls_back(self, tmp_path):
+        """Testa que Python inválido usa a divisão heurística."""
+        path = tmp_path / "quebrado.py"
+        path.write_text("def f(:\n    pass\n" * 100)
+        chunks = split_code(str(path), 300)
+        assert ''.join(chunk.text for chunk in chunks) == path.read_text()
+
+    def test_expand_directory_and_glob(self, tmp_path):
+        """Testa a expansão de diretórios e padrões glob."""
+        (tmp_path / "a.py").write_text("x = 1\n")
+        (tmp_path / "b.js").write_text("let x = 1;\n")
+        (tmp_path / "notas.txt").write_text("texto\n")
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "c.py").write_text("y = 2\n")
+        names = [os.path.basename(p) for p in expand_code_paths(str(tmp_path))]
+        assert names == ['a.py', 'b.js']
+        assert len(expand_code_paths(str(tmp_path / "*.txt"))) == 1
+        with pytest.raises(FileNotFoundError):
+            expand_code_paths(str(tmp_path / "*.go"))
+        with pytest.raises(ValueError):
+            expand_code_paths(str(tmp_path), max_files=1)
+
+
+class ExplainHandler(BaseHTTPRequestHandler):
+    """Explica cada trecho com uma frase curta e conta os pedidos."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        prompt = json.loads(form['messages'][0])[0]['content']
+        self.server.prompts.append(prompt)
+        content = "trecho explicado" if 'trecho de codigo' in prompt else "explicacao final"
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    """Fixture que sobe o servidor local."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ExplainHandler)
+    server.prompts = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_executor(server, **kwargs):
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    return AIExecutor(api_url=url, code_chunk_tokens=100, **kwargs)
+
+
+def chunk_prompts(server):
+    return [prompt for prompt in server.prompts if 'trecho de codigo' in prompt]
+
+
+class TestChunkedCodeExplain:
+    """Testes do ia codeexplain em partes."""
+
+    def test_small_file_single_request(self, server, tmp_path):
+        """Testa que arquivos pequenos vão inteiros em uma requisição."""
+        path = tmp_path / "pequeno.py"
+        path.write_text("x = 1\n")
+        with make_executor(server) as executor:
+            assert executor.execute_ia_codeexplain(str(path)) == "explicacao final"
+        assert len(server.prompts) == 1
+        assert "x = 1" in server.prompts[0]
+
+    def test_large_file_not_truncated(self, server, tmp_path):
+        """Testa que todo o arquivo é enviado, em partes."""
+        path = tmp_path / "grande.py"
+        path.write_text(make_module())
+        with make_executor(server) as executor:
+            executor.execute_ia_codeexplain(str(path))
+        sent = ''.join(chunk_prompts(server))
+        assert "def funcao_0(" in sent
+        assert "class Exemplo" in sent
+        assert "grande.py, linhas 1-" in server.prompts[-1]
+
+    def test_edit_resends_only_changed_chunks(self, server, tmp_path):
+        """Testa que só as partes alteradas são reenviadas."""
+        path = tmp_path / "grande.py"
+        path.write_text(make_module())
+        with make_executor(server, cache=MemoryCache()) as executor:
+            executor.execute_ia_codeexplain(str(path))
+            first = len(chunk_prompts(server))
+            path.write_text(make_module().replace("resultado = valor + 7", "resultado = valor + 70"))
+            executor.execute_ia_codeexplain(str(path))
+            resent = len(chunk_prompts(server)) - first
+        assert resent == 1
+        assert first > 1
+
+    def test_directory(self, server, tmp_path):
+        """Testa a explicação de um diretório inteiro."""
+        (tmp_path / "a.py").write_text("def a():\n    return 1\n")
+        (tmp_path / "b.py").write_text("def b():\n    return 2\n")
+        progress = []
+        with make_executor(server) as executor:
+            executor.execute_ia_codeexplain(str(tmp_path), progress=lambda *args: progress.append(args))
+        assert len(chunk_prompts(server)) == 2
+        assert "de 2 arquivos" in server.prompts[-1]
+        assert progress[-1] == ('explain', 2, 2)
+
+    def test_directory_with_one_file(self, server, tmp_path):
+        """Testa um diretório com um único arquivo de código."""
+        (tmp_path / "unico.py").write_text("def unico():\n    return 1\n")
+        with make_executor(server) as executor:
+            assert executor.execute_ia_codeexplain(str(tmp_path)) == "explicacao final"
+        assert len(server.prompts) == 1
+        assert "def unico():" in server.prompts[0]
+
+    def test_glob_with_one_match(self, server, tmp_path):
+        """Testa um padrão que encontra um único arquivo."""
+        (tmp_path / "unico.py").write_text("x = 1\n")
+        (tmp_path / "notas.txt").write_text("nada\n")
+        with make_executor(server) as executor:
+            assert executor.execute_ia_codeexplain(str(tmp_path / "*.py")) == "explicacao final"
+        assert len(server.prompts) == 1
+        assert "x = 1" in server.prompts[0]
+
+    def test_glob_without_matches(self, server, tmp_path):
+        """Testa erro para um padrão sem arquivos."""
+        with make_executor(server) as executor:
+            with pytest.raises(AIException):
+                executor.execute_ia_codeexplain(str(tmp_path / "*.rs"))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
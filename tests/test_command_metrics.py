@@ -0,0 +1,317 @@
+"""
+Testes para as métricas por comando.
+Este módulo testa o MetricsRecorder (buffer circular, resumo e percentis),
+a medição da saída e da E/S, a exportação no formato do Prometheus, as
+métricas das requisições à IA e o comando stats no terminal.
+"""
+
+import pytest
+import sys
+import os
+import io
+
+# Adiciona os diretórios src e benchmarks ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import command_metrics  # type: ignore
+from command_metrics import MetricsRecorder, read_io_counters  # type: ignore
+from ai_executor import AIExecutor, AIException  # type: ignore
+from ai_resilience import Backoff, CircuitBreaker, RetryBudget  # type: ignore
+from mock_ai_server import MockAIServer  # type: ignore
+
+
+def record_command(recorder, line, total, ok=True, **stages):
+    """Grava um registro com tempo total e etapas fixos."""
+    record = recorder.start(line)
+    for stage, seconds in stages.items():
+        record.add_time(stage, seconds)
+    recorder.finish(record, ok)
+    record.total = total
+    return record
+
+
+def make_executor(server, **kwargs):
+    """Cria um AIExecutor sem cache apontando para o servidor local."""
+    kwargs.setdefault('max_retries', 1)
+    kwargs.setdefault('backoff', Backoff(base=0.01))
+    kwargs.setdefault('circuit_breaker', CircuitBreaker())
+    kwargs.setdefault('retry_budget', RetryBudget())
+    return AIExecutor(api_url=server.url, cache=None, **kwargs)
+
+
+class TestMetricsRecorder:
+    """Classe de testes para o MetricsRecorder."""
+
+    def test_ring_buffer(self):
+        """Testa que só os últimos registros ficam no buffer."""
+        recorder = MetricsRecorder(capacity=3)
+        for number in range(5):
+            recorder.finish(recorder.start(f"ls dir{number}"), True)
+        assert len(recorder) == 3
+        assert [record.line for record in recorder.recent()] == ["ls dir2", "ls dir3", "ls dir4"]
+        assert [record.line for record in recorder.recent(2)] == ["ls dir3", "ls dir4"]
+        assert recorder.recent(0) == []
+
+    def test_finish(self):
+        """Testa o nome padrão, o status e o tempo total."""
+        recorder = MetricsRecorder()
+        record = recorder.start("cat arquivo.txt")
+        recorder.finish(record, False)
+        assert record.name == "cat"
+        assert record.ok is False
+        assert record.total > 0
+
+    def test_summary(self):
+        """Testa o resumo por comando, ordenado pelo p95."""
+        recorder = MetricsRecorder()
+        for number in range(1, 21):
+            record_command(recorder, "ls", number / 1000, lex=0.001)
+        record_command(recorder, "cat x", 0.5, ok=False, network=0.2)
+        cat, ls = recorder.summary()
+        assert (cat.name, cat.count, cat.errors) == ("cat", 1, 1)
+        assert cat.stages == {'network': 0.2}
+        assert (ls.name, ls.count, ls.errors) == ("ls", 20, 0)
+        assert ls.p50 == pytest.approx(0.010)
+        assert ls.p95 == pytest.approx(0.019)
+        assert ls.max == pytest.approx(0.020)
+        assert ls.stages == {'lex': pytest.approx(0.001)}
+
+    def test_percentile(self):
+        """Testa o percentil pelo posto mais próximo."""
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert command_metrics._percentile(values, 0.5) == 2.0
+        assert command_metrics._percentile(values, 0.99) == 4.0
+        assert command_metrics._percentile(values, 0.0) == 1.0
+        assert command_metrics._percentile([], 0.5) == 0.0
+
+    def test_clear(self):
+        """Testa que clear apaga registros e totais."""
+        recorder = MetricsRecorder()
+        record_command(recorder, "pwd", 0.001)
+        recorder.clear()
+        assert len(recorder) == 0
+        assert recorder.summary() == []
+        assert 'termia_commands_total{' not in recorder.to_prometheus()
+
+
+class TestMeasure:
+    """Testes da medição da execução de um comando."""
+
+    def test_render_and_output(self, monkeypatch):
+        """Testa que a saída é medida e o sys.stdout restaurado."""
+        stream = io.StringIO()
+        monkeypatch.setattr(sys, 'stdout', stream)
+        recorder = MetricsRecorder()
+        record = recorder.start("help")
+        with recorder.measure(record):
+            assert command_metrics.current() is record
+            print("olá")
+        assert sys.stdout is stream
+        assert command_metrics.current() is None
+        assert stream.getvalue() == "olá\n"
+        assert record.counters['output_chars'] == 4
+        assert record.stages['render'] > 0
+        assert record.stages['execute'] >= 0
+
+    def test_restores_stdout_on_error(self, monkeypatch):
+        """Testa que uma exceção não deixa o sys.stdout trocado."""
+        stream = io.StringIO()
+        monkeypatch.setattr(sys, 'stdout', stream)
+        recorder = MetricsRecorder()
+        record = recorder.start("cat")
+        with pytest.raises(ValueError):
+            with recorder.measure(record):
+                raise ValueError("falhou")
+        assert sys.stdout is stream
+        assert 'execute' in record.stages
+
+    @pytest.mark.skipif(read_io_counters() is None, reason="requer /proc/self/io")
+    def test_io_counters(self, tmp_path):
+        """Testa as chamadas de sistema e os bytes de E/S."""
+        path = tmp_path / "dados.bin"
+        recorder = MetricsRecorder()
+        record = recorder.start("cat dados.bin")
+        with recorder.measure(record, io=True):
+            with open(path, 'wb', buffering=0) as f:
+                f.write(b'x' * 4096)
+            with open(path, 'rb', buffering=0) as f:
+                f.read()
+        assert record.counters['write_syscalls'] >= 1
+        assert record.counters['read_syscalls'] >= 1
+        assert record.counters['written_bytes'] >= 4096
+        assert record.counters['read_bytes'] >= 4096
+
+    def test_no_io_counters_by_default(self):
+        """Testa que os contadores de E/S só são lidos quando pedidos."""
+        recorder = MetricsRecorder()
+        record = recorder.start("pwd")
+        with recorder.measure(record):
+            pass
+        assert 'read_syscalls' not in record.counters
+
+
+class TestPrometheus:
+    """Testes da exportação no formato texto do Prometheus."""
+
+    def test_format(self):
+        """Testa contadores, quantis e etapas."""
+        recorder = MetricsRecorder()
+        record = recorder.start("ls -l")
+        record.add_time('lex', 0.001)
+        record.add('read_syscalls', 7)
+        recorder.finish(record, True)
+        recorder.finish(recorder.start("cat x"), False)
+        text = recorder.to_prometheus()
+        assert '# TYPE termia_commands_total counter' in text
+        assert 'termia_commands_total{command="ls",status="ok"} 1' in text
+        assert 'termia_commands_total{command="cat",status="error"} 1' in text
+        assert '# TYPE termia_command_duration_seconds summary' in text
+        assert 'termia_command_duration_seconds_count{command="ls",stage="lex"} 1' in text
+        assert 'termia_command_duration_seconds{command="ls",stage="lex",quantile="0.5"} 0.001' in text
+        assert 'termia_command_read_syscalls_total{command="ls"} 7' in text
+        assert ('# HELP termia_command_read_syscalls_total Total read syscalls of commands '
+                '(whole process, including background threads).') in text
+        assert text.endswith('\n')
+
+    def test_label_escaping(self):
+        """Testa o escape de aspas e barras nos rótulos."""
+        recorder = MetricsRecorder()
+        record = recorder.start('x')
+        record.name = 'a"b\\c'
+        recorder.finish(record, True)
+        assert 'command="a\\"b\\\\c"' in recorder.to_prometheus()
+
+    def test_resilience(self):
+        """Testa as métricas do circuit breaker e das novas tentativas."""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        budget = RetryBudget()
+        budget.withdraw()
+        stats = {'retries': 2, 'deadlines_exceeded': 1,
+                 'circuit': breaker.stats(), 'retry_budget': budget.stats()}
+        text = MetricsRecorder().to_prometheus(stats)
+        assert 'termia_ai_circuit_state{state="open"} 1' in text
+        assert 'termia_ai_circuit_transitions_total{transition="closed->open"} 1' in text
+        assert 'termia_ai_retries_total 2' in text
+        assert 'termia_ai_deadlines_exceeded_total 1' in text
+
+    def test_export(self, tmp_path):
+        """Testa a gravação do arquivo."""
+        recorder = MetricsRecorder()
+        record_command(recorder, "pwd", 0.001)
+        path = tmp_path / "metricas.prom"
+        recorder.export(str(path))
+        assert path.read_text(encoding='utf-8') == recorder.to_prometheus()
+        assert os.listdir(tmp_path) == ["metricas.prom"]
+
+
+class TestAIRequestMetrics:
+    """Testes das métricas das requisições à IA."""
+
+    def test_request(self):
+        """Testa requisições, bytes e tempo de rede."""
+        record = command_metrics.CommandRecord('ia ask "oi"')
+        with MockAIServer(reply="Paris") as server:
+            with make_executor(server) as executor:
+                with command_metrics.active(record):
+                    executor.execute_ia_ask("Qual a capital da França?")
+        assert record.counters['requests'] == 1
+        assert record.counters['request_bytes'] > len("Qual a capital da França?")
+        assert record.counters['response_bytes'] > len("Paris")
+        assert 'retries' not in record.counters
+        assert record.stages['network'] > 0
+
+    def test_retries(self):
+        """Testa que as novas tentativas são contadas."""
+        record = command_metrics.CommandRecord('ia ask "oi"')
+        with MockAIServer(error_rate=1.0, error_status=503) as server:
+            with make_executor(server, max_retries=3) as executor:
+                with command_metrics.active(record):
+                    with pytest.raises(AIException):
+                        executor.execute_ia_ask("oi")
+        assert record.counters['requests'] == 3
+        assert record.counters['retries'] == 2
+
+    def test_streaming(self):
+        """Testa os bytes recebidos em streaming."""
+        record = command_metrics.CommandRecord('ia ask "oi"')
+        with MockAIServer(reply="uma resposta em partes") as server:
+            with make_executor(server) as executor:
+                with command_metrics.active(record):
+                    assert ''.join(executor.stream_ia_ask("oi")).strip()
+        assert record.counters['requests'] == 1
+        assert record.counters['response_bytes'] > len("uma resposta em partes")
+        assert record.stages['network'] > 0
+
+    def test_without_record(self):
+        """Testa que nada é medido fora de um comando."""
+        with MockAIServer(reply="ok") as server:
+            with make_executor(server) as executor:
+                assert executor.execute_ia_ask("oi") == "ok"
+        assert command_metrics.current() is None
+
+
+class TestStatsCommand:
+    """Testes do comando stats no terminal."""
+
+    @pytest.fixture
+    def terminal(self):
+        """Fixture que cria um TermIA sem prompt_toolkit nem plugins."""
+        from main import TermIA  # type: ignore
+        from plugins import PluginManager  # type: ignore
+        return TermIA(enhanced_mode=False, plugins=PluginManager())
+
+    def test_records_commands(self, terminal):
+        """Testa que os comandos são medidos por etapa."""
+        assert terminal.process_command("pwd")
+        terminal.process_command("cat arquivo_que_nao_existe.txt")
+        pwd, cat = terminal.metrics.recent()
+        assert (pwd.name, pwd.ok) == ("pwd", True)
+        assert {'lex', 'parse', 'execute'} <= set(pwd.stages)
+        assert (cat.name, cat.ok) == ("cat", False)
+
+    def test_summary_and_recent(self, terminal, capsys):
+        """Testa a saída de stats e de stats <n>."""
+        terminal.process_command("pwd")
+        capsys.readouterr()
+        assert terminal.process_command("stats")
+        out = capsys.readouterr().out
+        assert "pwd" in out and "p95" in out
+        assert terminal.process_command("stats 1")
+        out = capsys.readouterr().out
+        assert "stats" in out and "lex" in out
+
+    def test_io_counters_labeled_process_wide(self, terminal, capsys):
+        """Testa que stats <n> indica que os contadores de E/S são do processo inteiro."""
+        if not os.path.exists('/proc/self/io'):
+            pytest.skip("/proc/self/io não disponível")
+        terminal.process_command("pwd")
+        capsys.readouterr()
+        assert terminal.process_command("stats 2")
+        assert "syscalls de leitura do processo" in capsys.readouterr().out
+
+    def test_clear(self, terminal, capsys):
+        """Testa stats clear."""
+        terminal.process_command("pwd")
+        terminal.process_command("stats clear")
+        assert [record.name for record in terminal.metrics.recent()] == ["stats"]
+
+    def test_export(self, terminal, tmp_path):
+        """Testa stats --export."""
+        path = tmp_path / "metricas.prom"
+        terminal.process_command("pwd")
+        assert terminal.process_command(f"stats --export {path}")
+        assert 'termia_commands_total{command="pwd",status="ok"} 1' in path.read_text(encoding='utf-8')
+
+    def test_disabled(self, terminal, capsys):
+        """Testa o aviso com as métricas desligadas."""
+        terminal.metrics = None
+        assert terminal.process_command("pwd")
+        terminal.process_command("stats")
+        assert "desativadas" in capsys.readouterr().out
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,168 @@
+"""
+Testes para o registro de comandos do TermIA.
+Este módulo testa o registro e a busca de handlers por classe de nó da AST,
+as mensagens de erro por tipo de exceção e o despacho feito pelo TermIA.
+"""
+
+import pytest
+import sys
+import os
+
+# Adiciona a raiz do projeto e o diretório src ao path
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+from command_registry import CommandRegistry  # type: ignore
+from ast_nodes import ASTNode, LSCommand, PwdCommand  # type: ignore
+from executor import SecurityException  # type: ignore
+from main import TermIA  # type: ignore
+
+
+class EchoCommand(ASTNode):
+    """Nó de AST usado nos testes."""
+
+    def __init__(self, text=''):
+        self.text = text
+
+    def __repr__(self):
+        return f"EchoCommand({self.text})"
+
+    def to_dict(self):
+        return {'type': 'EchoCommand', 'text': self.text}
+
+
+class LoudEchoCommand(EchoCommand):
+    """Subclasse de um nó registrado."""
+
+
+class TestCommandRegistry:
+    """Classe de testes para o CommandRegistry."""
+
+    def test_register_and_get(self):
+        """Testa o registro e a busca pela classe exata do nó."""
+        registry = CommandRegistry()
+        func = lambda terminal, ast: None  # noqa: E731
+        registry.register(EchoCommand, func, 'echo')
+        handler = registry.get(EchoCommand)
+        assert handler.func is func
+        assert handler.name == 'echo'
+        assert EchoCommand in registry
+        assert registry.get(PwdCommand) is None
+        assert len(registry) == 1
+
+    def test_decorator_and_default_name(self):
+        """Testa o registro por decorador, com o nome da classe como padrão."""
+        registry = CommandRegistry()
+
+        @registry.command(EchoCommand)
+        def run_echo(terminal, ast):
+            return None
+
+        assert registry.get(EchoCommand).func is run_echo
+        assert registry.get(EchoCommand).name == 'EchoCommand'
+
+    def test_subclass_uses_base_handler(self):
+        """Testa que uma subclasse usa o handler da classe base mais próxima."""
+        registry = CommandRegistry()
+        registry.register(EchoCommand, lambda terminal, ast: None, 'echo')
+        assert registry.get(LoudEchoCommand).name == 'echo'
+        registry.register(LoudEchoCommand, lambda terminal, ast: None, 'loud')
+        assert registry.get(LoudEchoCommand).name == 'loud'
+        registry.unregister(LoudEchoCommand)
+        assert registry.get(LoudEchoCommand).name == 'echo'
+
+    def test_register_requires_class(self):
+        """Testa que só classes podem ser registradas."""
+        with pytest.raises(TypeError):
+            CommandRegistry().register('EchoCommand', lambda terminal, ast: None)
+
+    def test_format_error_uses_closest_class(self):
+        """Testa que a mensagem vem da classe de exceção registrada mais próxima."""
+        registry = CommandRegistry()
+        registry.register_error(Exception, lambda e, name: f"falha em {name}: {e}")
+        registry.register_error(OSError, lambda e, name: f"os: {e}")
+        assert registry.format_error(ValueError('x'), 'echo') == 'falha em echo: x'
+        assert registry.format_error(FileNotFoundError('y'), 'echo') == 'os: y'
+        assert CommandRegistry().format_error(ValueError('z'), 'echo') == 'z'
+
+
+class TestTerminalDispatch:
+    """Testes do despacho de comandos pelo TermIA."""
+
+    @pytest.fixture
+    def terminal(self):
+        """Fixture que cria um TermIA sem prompt_toolkit."""
+        return TermIA(enhanced_mode=False)
+
+    def test_builtin_commands_registered(self, terminal):
+        """Testa que os comandos nativos estão no registro."""
+        assert terminal.commands.get(PwdCommand).name == 'pwd'
+
+    def test_custom_command(self, terminal, capsys):
+        """Testa que um comando novo é executado sem alterar o TermIA."""
+        terminal.commands.register(EchoCommand, lambda t, ast: print(ast.text), 'echo')
+        terminal.execute_ast(EchoCommand('olá'))
+        assert capsys.readouterr().out == 'olá\n'
+        assert not terminal.last_command_failed
+
+    def test_uniform_error_rendering(self, terminal, capsys):
+        """Testa que os erros dos comandos são exibidos conforme o tipo da exceção."""
+        def fail(error):
+            def run(t, ast):
+                raise error
+            return run
+
+        expected = [
+            (RuntimeError('quebrou'), 'Erro ao executar echo: quebrou'),
+            (FileNotFoundError("echo: x: No such file or directory"), 'echo: x: No such file or directory'),
+            (SecurityException('bloqueado'), '⚠ Erro de Segurança: bloqueado'),
+        ]
+        for error, message in expected:
+            terminal.last_command_failed = False
+            terminal.commands.register(EchoCommand, fail(error), 'echo')
+            terminal.execute_ast(EchoCommand())
+            assert message in capsys.readouterr().out
+            assert terminal.last_command_failed
+
+    def test_os_command_error_messages(self, terminal, capsys, tmp_path):
+        """Testa as mensagens de erro de cada comando de SO."""
+        (tmp_path / 'arquivo').write_text('')
+        expected = [
+            (f'ls {tmp_path}/nada', f"ls: cannot access '{tmp_path}/nada': No such file or directory"),
+            (f'cd {tmp_path}/nada', f"cd: {tmp_path}/nada: No such file or directory"),
+            (f'cd {tmp_path}/arquivo', f"cd: {tmp_path}/arquivo: Not a directory"),
+            (f'mkdir {tmp_path}/arquivo', f"mkdir: cannot create directory '{tmp_path}/arquivo': File exists"),
+            (f'cat {tmp_path}/nada', f"cat: {tmp_path}/nada: No such file or directory"),
+            (f'cat {tmp_path}', f"cat: {tmp_path}: Is a directory"),
+        ]
+        for command, message in expected:
+            terminal.process_command(command)
+            out = capsys.readouterr().out
+            assert message in out, command
+            if not message.startswith('Erro'):
+                assert 'Erro ao executar' not in out, command
+
+    def test_builtin_os_error_is_not_shell_style(self, terminal, capsys, monkeypatch):
+        """Testa que erros de SO que o comando não descreve mantêm o nome do comando."""
+        def fail(error):
+            def run(*args, **kwargs):
+                raise error
+            return run
+
+        monkeypatch.setattr(terminal.executor, 'execute_pwd', fail(FileNotFoundError("removido")))
+        terminal.execute_ast(PwdCommand())
+        assert 'Erro ao executar pwd: removido' in capsys.readouterr().out
+        monkeypatch.setattr(terminal.executor, 'stream_ls', fail(NotADirectoryError("não é diretório")))
+        terminal.execute_ast(LSCommand())
+        assert 'Erro ao executar ls: não é diretório' in capsys.readouterr().out
+
+    def test_unknown_command(self, terminal, capsys):
+        """Testa a mensagem para nós sem handler registrado."""
+        terminal.execute_ast(EchoCommand())
+        assert 'tipo de comando desconhecido: EchoCommand' in capsys.readouterr().out
+        assert terminal.last_command_failed
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,172 @@
+"""
+Testes para o cache de listagens de diretório do TermIA.
+Este módulo testa a invalidação por inotify e por mtime, o limite de entradas
+e o uso do cache pelo ls e pelo cd.
+"""
+
+import pytest
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dir_cache import DirectoryCache, DirItem  # type: ignore
+from executor import CommandExecutor  # type: ignore
+
+
+def make_old(path):
+    """Recua o mtime do diretório, para que a listagem seja considerada estável."""
+    os.utime(path, (1000000000, 1000000000))
+
+
+@pytest.fixture(params=[True, False], ids=['inotify', 'mtime'])
+def cache(request):
+    """Fixture que cria um cache com e sem inotify."""
+    cache = DirectoryCache(use_inotify=request.param)
+    if request.param and not cache.uses_inotify:
+        pytest.skip("inotify não disponível")
+    yield cache
+    cache.close()
+
+
+class TestDirectoryCache:
+    """Classe de testes para o DirectoryCache."""
+
+    def test_listing_is_sorted_and_cached(self, cache, tmp_path):
+        """Testa que a listagem vem ordenada e a segunda leitura usa o cache."""
+        for name in ['b', 'a', 'c']:
+            (tmp_path / name).write_text('')
+        (tmp_path / 'dir').mkdir()
+        make_old(tmp_path)
+        first = cache.listing(str(tmp_path))
+        second = cache.listing(str(tmp_path))
+        assert first.names == ('a', 'b', 'c', 'dir')
+        assert first.items[3] == DirItem('dir', True, False)
+        assert second is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_change_invalidates(self, cache, tmp_path):
+        """Testa que criar e apagar arquivos invalida a listagem."""
+        (tmp_path / 'a').write_text('')
+        make_old(tmp_path)
+        assert cache.listing(str(tmp_path)).names == ('a',)
+        (tmp_path / 'b').write_text('')
+        assert cache.listing(str(tmp_path)).names == ('a', 'b')
+        (tmp_path / 'a').unlink()
+        assert cache.listing(str(tmp_path)).names == ('b',)
+
+    def test_recent_mtime_is_not_trusted(self, tmp_path):
+        """Testa que, sem inotify, um diretório recém-alterado é relido."""
+        cache = DirectoryCache(use_inotify=False)
+        cache.listing(str(tmp_path))
+        cache.listing(str(tmp_path))
+        assert cache.hits == 0
+
+    def test_errors_are_raised(self, cache, tmp_path):
+        """Testa os erros de caminho inexistente e de arquivo."""
+        (tmp_path / 'arquivo').write_text('')
+        with pytest.raises(FileNotFoundError):
+            cache.listing(str(tmp_path / 'nada'))
+        with pytest.raises(NotADirectoryError):
+            cache.listing(str(tmp_path / 'arquivo'))
+
+    def test_max_items_evicts_oldest(self, tmp_path):
+        """Testa que o limite de entradas descarta os diretórios mais antigos."""
+        cache = DirectoryCache(max_items=5, use_inotify=False)
+        for name in ['um', 'dois']:
+            (tmp_path / name).mkdir()
+            for i in range(3):
+                (tmp_path / name / f"f{i}").write_text('')
+            make_old(tmp_path / name)
+        cache.listing(str(tmp_path / 'um'))
+        cache.listing(str(tmp_path / 'dois'))
+        cache.listing(str(tmp_path / 'um'))
+        assert cache.misses == 3
+
+    def test_watch_count_is_bounded(self, tmp_path):
+        """Testa que o número de watches do inotify fica limitado e os demais usam o mtime."""
+        cache = DirectoryCache(max_watches=3)
+        if not cache.uses_inotify:
+            pytest.skip("inotify não disponível")
+        for i in range(10):
+            (tmp_path / f"d{i}").mkdir()
+            make_old(tmp_path / f"d{i}")
+        for i in range(10):
+            cache.listing(str(tmp_path / f"d{i}"))
+        assert cache.watch_count == 3
+        # Reler um diretório vigiado não gasta outro watch
+        cache.invalidate(str(tmp_path / 'd0'))
+        cache.listing(str(tmp_path / 'd0'))
+        assert cache.watch_count == 3
+        # Sem watch, a listagem continua em cache e é invalidada pelo mtime
+        assert cache.listing(str(tmp_path / 'd9')) is cache.listing(str(tmp_path / 'd9'))
+        (tmp_path / 'd9' / 'novo').write_text('')
+        assert cache.listing(str(tmp_path / 'd9')).names == ('novo',)
+        cache.close()
+
+    def test_lookup(self, cache, tmp_path):
+        """Testa a consulta de um caminho pela listagem do diretório pai."""
+        (tmp_path / 'sub').mkdir()
+        assert cache.lookup(str(tmp_path / 'sub')).is_dir
+        assert cache.lookup(str(tmp_path / 'nada')) is None
+        assert cache.lookup('/').is_dir
+
+
+class TestSharedCache:
+    """Testes do cache compartilhado pelo executor."""
+
+    def test_cd_does_not_list(self, tmp_path):
+        """Testa que cd não lista o diretório e que o ls seguinte preenche o cache."""
+        (tmp_path / 'arquivo').write_text('')
+        make_old(tmp_path)
+        executor = CommandExecutor()
+        original_dir = os.getcwd()
+        try:
+            executor.execute_cd(str(tmp_path))
+            assert executor.dir_cache.misses == 0
+            assert executor.execute_ls() == 'arquivo'
+            assert executor.execute_ls() == 'arquivo'
+            assert executor.dir_cache.misses == 1
+            assert executor.dir_cache.hits == 1
+        finally:
+            os.chdir(original_dir)
+            executor.close()
+
+    def test_ls_limit_is_bounded(self, tmp_path, monkeypatch):
+        """Testa que ls --limit num diretório fora do cache guarda só a janela pedida."""
+        import executor as executor_module  # type: ignore
+        for i in range(50):
+            (tmp_path / f"arq{i:02d}").write_text('')
+        (tmp_path / '.oculto').write_text('')
+        make_old(tmp_path)
+        kept = []
+        nsmallest = executor_module.heapq.nsmallest
+        monkeypatch.setattr(executor_module.heapq, 'nsmallest',
+                            lambda n, items, key: kept.append(n) or nsmallest(n, items, key=key))
+        executor = CommandExecutor()
+        try:
+            assert executor.execute_ls(path=str(tmp_path), limit=3, offset=10) == 'arq10  arq11  arq12'
+            assert kept == [13]
+            assert executor.dir_cache.cached(str(tmp_path)) is None
+            # Com a listagem no cache, a janela sai dela
+            executor.execute_ls(path=str(tmp_path))
+            assert executor.execute_ls(options='a', path=str(tmp_path), limit=2) == '.oculto  arq00'
+            assert kept == [13]
+            assert executor.dir_cache.misses == 1
+        finally:
+            executor.close()
+
+    def test_cd_errors(self, tmp_path):
+        """Testa as mensagens de erro do cd com o cache."""
+        (tmp_path / 'arquivo').write_text('')
+        executor = CommandExecutor()
+        with pytest.raises(FileNotFoundError):
+            executor.execute_cd(str(tmp_path / 'nada'))
+        with pytest.raises(NotADirectoryError):
+            executor.execute_cd(str(tmp_path / 'arquivo'))
+        executor.close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -90,6 +90,72 @@ class TestTermIACompleter:
         cd_found = any(c.text == 'cd' for c in completions)
         assert cd_found
 
+    def _texts(self, completer, text):
+        from prompt_toolkit.document import Document
+        return [c.text for c in completer.get_completions(Document(text), None)]
+
+    def test_autocomplete_files(self, completer, tmp_path):
+        """Testa que cat, ls e ia codeexplain sugerem arquivos e diretórios."""
+        (tmp_path / 'main.py').write_text('')
+        (tmp_path / 'manual.txt').write_text('')
+        (tmp_path / 'mapas').mkdir()
+        (tmp_path / 'outro.py').write_text('')
+        expected = ['main.py', 'manual.txt', 'mapas/']
+        assert self._texts(completer, f"cat {tmp_path}/ma") == expected
+        assert self._texts(completer, f"ls -l {tmp_path}/ma") == expected
+        assert self._texts(completer, f"ia codeexplain {tmp_path}/ma") == expected
+        assert self._texts(completer, f"ia summarize --file {tmp_path}/o") == ['outro.py']
+
+    def test_autocomplete_directories_only(self, completer, tmp_path):
+        """Testa que cd e mkdir sugerem apenas diretórios."""
+        (tmp_path / 'dados.txt').write_text('')
+        (tmp_path / 'docs').mkdir()
+        assert self._texts(completer, f"cd {tmp_path}/d") == ['docs/']
+        assert self._texts(completer, f"mkdir -p {tmp_path}/d") == ['docs/']
+
+    def test_autocomplete_hidden_files(self, completer, tmp_path):
+        """Testa que arquivos ocultos só aparecem quando o prefixo começa com '.'."""
+        for name in ['.oculto', 'a', '_b']:
+            (tmp_path / name).write_text('')
+        assert self._texts(completer, f"cat {tmp_path}/") == ['_b', 'a']
+        assert self._texts(completer, f"cat {tmp_path}/.") == ['.oculto']
+
+    def test_autocomplete_large_directory(self, completer, tmp_path, monkeypatch):
+        """Testa que completar num diretório com 50 mil entradas não percorre a listagem."""
+        from collections.abc import Sequence
+        from prompt_toolkit.document import Document
+        from enhanced_input import MAX_PATH_COMPLETIONS  # type: ignore
+
+        class CountingNames(Sequence):
+            """Nomes que contam os acessos e não podem ser percorridos inteiros."""
+            def __init__(self, names):
+                self.names = names
+                self.reads = 0
+            def __len__(self):
+                return len(self.names)
+            def __getitem__(self, index):
+                self.reads += 1
+                return self.names[index]
+            def __iter__(self):
+                raise AssertionError("a listagem inteira foi percorrida")
+
+        for i in range(50000):
+            open(os.path.join(str(tmp_path), f"arquivo_{i:05d}.log"), 'w').close()
+        # mtime antigo: sem inotify, a listagem também fica no cache
+        os.utime(str(tmp_path), (1000000000, 1000000000))
+        cache = completer.dir_cache
+        names = CountingNames(cache.listing(str(tmp_path)).names)
+        listing = cache.listing
+        monkeypatch.setattr(cache, 'listing', lambda path: listing(path)._replace(names=names))
+
+        doc = Document(f"cat {tmp_path}/arquivo_1234")
+        assert len(list(completer.get_completions(doc, None))) == 10
+        # Busca binária (~2 x log2(50000)) mais os 10 nomes sugeridos
+        assert names.reads < 60
+        doc = Document(f"cat {tmp_path}/arquivo_")
+        assert len(list(completer.get_completions(doc, None))) == MAX_PATH_COMPLETIONS
+        assert cache.misses == 1
+
 
 class TestTermIALexer:
     """Classe de testes para o TermIALexer (syntax highlighting)."""
@@ -216,6 +282,54 @@ class TestEnhancedInputHandler:
         assert isinstance(results, list)
         assert 'ls -la' in results
 
+    def test_history_record_and_search(self, test_history_file):
+        """Testa que comandos gravados com status e duração aparecem na busca."""
+        try:
+            handler = EnhancedInputHandler(test_history_file)
+        except Exception:
+            pytest.skip("Console not available for PromptSession")
+
+        handler.record('cat notas.txt', 1000.0, 0.25, 1)
+        assert handler.search_history('notas') == ['cat notas.txt']
+        entry = handler.history_store.last(1)[0]
+        assert (entry.duration, entry.status) == (0.25, 1)
+        assert os.path.exists(test_history_file + '.sqlite3')
+        handler.close()
+
+    def test_history_without_database(self, test_history_file, tmp_path):
+        """Testa o uso direto do arquivo de histórico quando o banco não abre."""
+        (tmp_path / 'arquivo').write_text('')
+        with open(test_history_file, 'w', encoding='utf-8') as f:
+            f.write("\n# 2024-01-02 10:00:00.000000\n+ls -la\n")
+            f.write("\n# 2024-01-02 10:00:01.000000\n+cat notas.txt\n")
+        try:
+            handler = EnhancedInputHandler(test_history_file,
+                                           history_db=str(tmp_path / 'arquivo' / 'h.sqlite3'))
+        except Exception:
+            pytest.skip("Console not available for PromptSession")
+
+        assert handler.history_store is None
+        assert handler.last_commands(1) == ['cat notas.txt']
+        assert handler.search_history('NOTAS') == ['cat notas.txt']
+        assert list(handler.session.history.load_history_strings()) == ['cat notas.txt', 'ls -la']
+        handler.close()
+
+    def test_rank_history(self, test_history_file):
+        """Testa a busca aproximada, que acompanha os comandos gravados depois."""
+        try:
+            handler = EnhancedInputHandler(test_history_file)
+        except Exception:
+            pytest.skip("Console not available for PromptSession")
+
+        handler.record('git commit -m "inicial"', 1000.0, 0.1, 0)
+        handler.record('git status', 1001.0, 0.1, 0)
+        assert [m.command for m in handler.rank_history('git comit')] == ['git commit -m "inicial"']
+        handler.record('git commit --amend', 1002.0, 0.1, 0)
+        assert [m.command for m in handler.rank_history('git commit')] == [
+            'git commit --amend', 'git commit -m "inicial"'
+        ]
+        handler.close()
+
     def test_history_search_multiple_matches(self, test_history_file):
         """Testa busca no histórico com múltiplas correspondências."""
         # Cria handler (pode falhar se não houver console)
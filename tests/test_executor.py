@@ -53,6 +53,93 @@ class TestCommandExecutor:
         result = executor.execute_ls(path=test_dir)
         assert isinstance(result, str)
 
+    def test_ls_long_listing(self, executor, tmp_path):
+        """Testa o formato longo com tipo, permissões e tamanho."""
+        (tmp_path / 'b.txt').write_text('12345')
+        (tmp_path / 'a').mkdir()
+        (tmp_path / '.oculto').write_text('x')
+        os.chmod(tmp_path / 'b.txt', 0o640)
+        lines = executor.execute_ls(options='l', path=str(tmp_path)).split('\n')
+        assert len(lines) == 2
+        assert lines[0].startswith('d') and lines[0].endswith(' a')
+        assert lines[1] == f"-rw-r----- {'5':>8} b.txt"
+
+    def test_ls_hidden_and_sorted(self, executor, tmp_path):
+        """Testa a ordenação e a opção -a."""
+        for name in ['c', 'a', '.b']:
+            (tmp_path / name).write_text('')
+        assert executor.execute_ls(path=str(tmp_path)) == 'a  c'
+        assert executor.execute_ls(options='a', path=str(tmp_path)) == '.b  a  c'
+
+    def test_ls_recursive_order(self, executor, tmp_path):
+        """Testa que ls -R lista os subdiretórios em ordem determinística."""
+        for sub in ['b/d', 'a/c', 'a/.oculto']:
+            (tmp_path / sub).mkdir(parents=True)
+        (tmp_path / 'a' / 'c' / 'f.txt').write_text('')
+        (tmp_path / 'z.txt').write_text('')
+        result = executor.execute_ls(options='R', path=str(tmp_path))
+        root = str(tmp_path)
+        assert result.split('\n') == [
+            f"{root}:", 'a  b  z.txt', '',
+            f"{root}/a:", 'c', '',
+            f"{root}/a/c:", 'f.txt', '',
+            f"{root}/b:", 'd', '',
+            f"{root}/b/d:",
+        ]
+
+    def test_ls_max_depth(self, executor, tmp_path):
+        """Testa que --max-depth limita a descida e implica -R."""
+        (tmp_path / 'a' / 'b' / 'c').mkdir(parents=True)
+        result = executor.execute_ls(path=str(tmp_path), max_depth=1)
+        headers = [line for line in result.split('\n') if line.endswith(':')]
+        assert headers == [f"{tmp_path}:", f"{tmp_path}/a:"]
+
+    def test_ls_recursive_skips_symlinked_dirs(self, executor, tmp_path):
+        """Testa que links para diretórios não são percorridos."""
+        (tmp_path / 'real').mkdir()
+        try:
+            os.symlink(str(tmp_path), str(tmp_path / 'real' / 'loop'))
+        except (OSError, NotImplementedError):
+            pytest.skip("symlinks não suportados")
+        result = executor.execute_ls(options='R', path=str(tmp_path))
+        assert result.count(':\n') == 2
+        assert 'loop' in result
+
+    def test_ls_recursive_is_lazy(self, executor, tmp_path):
+        """Testa que ls -R entrega o primeiro diretório antes de terminar a árvore."""
+        (tmp_path / 'a').mkdir()
+        lines = executor.stream_ls(options='R', path=str(tmp_path))
+        assert next(lines) == f"{tmp_path}:"
+        lines.close()
+
+    def test_ls_limit_and_offset(self, executor, tmp_path):
+        """Testa --limit e --offset com e sem ordenação."""
+        names = [f"f{i:03d}" for i in range(50)]
+        for name in reversed(names):
+            (tmp_path / name).write_text('')
+        result = executor.execute_ls(options='l', path=str(tmp_path), limit=3, offset=10)
+        assert [line.split()[-1] for line in result.split('\n')] == names[10:13]
+        unsorted = executor.execute_ls(options='lU', path=str(tmp_path), limit=5, offset=45)
+        assert len(unsorted.split('\n')) == 5
+        assert executor.execute_ls(path=str(tmp_path), offset=50) == ''
+
+    def test_ls_wraps_at_terminal_width(self, executor, tmp_path, monkeypatch):
+        """Testa que o formato curto quebra as linhas na largura do terminal."""
+        monkeypatch.setenv('COLUMNS', '20')
+        for i in range(10):
+            (tmp_path / f"arquivo{i}").write_text('')
+        lines = list(executor.stream_ls(path=str(tmp_path)))
+        assert len(lines) > 1
+        assert all(len(line) <= 20 for line in lines)
+        assert '  '.join(lines).split() == [f"arquivo{i}" for i in range(10)]
+
+    def test_permission_table(self):
+        """Testa a tabela de permissões contra stat.filemode."""
+        import stat
+        from executor import PERMISSION_STRINGS  # type: ignore
+        for mode in range(0o1000):
+            assert PERMISSION_STRINGS[mode] == stat.filemode(stat.S_IFREG | mode)[1:]
+
     def test_mkdir_simple(self, executor):
         """Testa mkdir simples."""
         test_dir = 'test_dir_mkdir'
@@ -114,6 +201,39 @@ class TestCommandExecutor:
             # Cleanup
             os.remove(test_file)
 
+    def test_cat_numbered_lines(self, executor, tmp_path, monkeypatch):
+        """Testa cat -n com linhas quebradas entre blocos."""
+        import executor as executor_module
+        monkeypatch.setattr(executor_module, 'CAT_BLOCK_SIZE', 5)
+        test_file = tmp_path / 'linhas.txt'
+        test_file.write_text('primeira\nsegunda\n\nultima', encoding='utf-8')
+        result = executor.execute_cat(str(test_file), number_lines=True)
+        assert result == '     1\tprimeira\n     2\tsegunda\n     3\t\n     4\tultima'
+
+    def test_cat_binary_file(self, executor, tmp_path):
+        """Testa que arquivos binários mostram só o tamanho."""
+        test_file = tmp_path / 'dados.bin'
+        test_file.write_bytes(bytes(range(256)) * 100)
+        assert executor.execute_cat(str(test_file)) == '<binary file, 25600 bytes>'
+
+    def test_cat_streams_in_blocks(self, executor, tmp_path):
+        """Testa que o cat lê o arquivo em blocos de tamanho fixo."""
+        import executor as executor_module
+        test_file = tmp_path / 'grande.log'
+        line = 'ação registrada no log\n'
+        test_file.write_text(line * 20000, encoding='utf-8')
+        blocks = list(executor.stream_cat(str(test_file)))
+        assert len(blocks) > 1
+        assert max(len(block.encode('utf-8')) for block in blocks) <= executor_module.CAT_BLOCK_SIZE
+        assert ''.join(blocks) == line * 20000
+
+    def test_cat_errors_are_eager(self, executor, tmp_path):
+        """Testa que erros aparecem antes de iterar."""
+        with pytest.raises(FileNotFoundError):
+            executor.stream_cat('arquivo_inexistente_12345.txt')
+        with pytest.raises(IsADirectoryError):
+            executor.stream_cat(str(tmp_path))
+
     def test_cd_simple(self, executor):
         """Testa comando cd."""
         original_dir = executor.execute_pwd()
@@ -0,0 +1,97 @@
+"""
+Testes para o índice de busca do histórico do TermIA.
+Este módulo testa a busca aproximada por trigramas, a ordenação por
+semelhança e recência e o desempenho em históricos grandes.
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import history_index  # type: ignore
+from history_index import HistoryIndex, trigrams  # type: ignore
+
+
+def commands(matches):
+    """Devolve só os comandos de uma lista de resultados."""
+    return [match.command for match in matches]
+
+
+class TestHistoryIndex:
+    """Classe de testes para o HistoryIndex."""
+
+    def test_trigrams(self):
+        """Testa a decomposição em trigramas."""
+        assert trigrams('ls -l') == {'ls ', 's -', ' -l'}
+        assert trigrams('ls') == set()
+
+    def test_verbatim_match(self):
+        """Testa que o texto exato é encontrado sem diferenciar maiúsculas."""
+        index = HistoryIndex(['cat README.md', 'ls -la', 'pwd'])
+        assert commands(index.search('readme')) == ['cat README.md']
+
+    def test_typo_tolerance(self):
+        """Testa que pequenos erros de digitação ainda encontram o comando."""
+        index = HistoryIndex(['git commit -m "inicial"', 'git status', 'ls'])
+        assert commands(index.search('git comit')) == ['git commit -m "inicial"']
+        assert index.search('xyzw') == []
+
+    def test_verbatim_ranks_above_fuzzy(self):
+        """Testa que o texto exato vem antes de correspondências aproximadas."""
+        index = HistoryIndex(['docker run', 'ls', 'docker ru'])
+        assert commands(index.search('docker run')) == ['docker run', 'docker ru']
+
+    def test_word_start_ranks_higher(self):
+        """Testa que o texto no início do comando ou de uma palavra pontua mais."""
+        index = HistoryIndex(['cat main.py', 'domain', 'main.py'])
+        assert commands(index.search('main')) == ['main.py', 'cat main.py', 'domain']
+
+    def test_recency_breaks_ties(self):
+        """Testa que, com a mesma semelhança, o comando mais recente vem antes."""
+        index = HistoryIndex(['ls src', 'ls tests'])
+        assert commands(index.search('ls')) == ['ls tests', 'ls src']
+        index.add('ls src')
+        assert commands(index.search('ls')) == ['ls src', 'ls tests']
+
+    def test_duplicates_appear_once(self):
+        """Testa que comandos repetidos aparecem uma única vez."""
+        index = HistoryIndex(['pwd', 'ls', 'pwd', 'ls', 'pwd'])
+        assert len(index) == 2
+        assert commands(index.search('pwd')) == ['pwd']
+
+    def test_incremental_add_and_compaction(self, monkeypatch):
+        """Testa comandos adicionados aos poucos, inclusive após a compactação."""
+        monkeypatch.setattr(history_index, 'COMPACT_MIN', 4)
+        index = HistoryIndex()
+        for i in range(50):
+            index.add(f"echo {i % 5}")
+        index.add('echo novo')
+        assert len(index) == 6
+        assert commands(index.search('echo', limit=3)) == ['echo novo', 'echo 4', 'echo 3']
+
+    def test_limit(self):
+        """Testa o limite de resultados."""
+        index = HistoryIndex([f"ls {i}" for i in range(100)])
+        assert commands(index.search('ls', limit=3)) == ['ls 99', 'ls 98', 'ls 97']
+        assert index.search('ls', limit=0) == []
+        assert index.search('   ') == []
+
+    def test_large_history_is_interactive(self):
+        """Testa buscas em 500 mil comandos, inclusive de um comando antigo."""
+        index = HistoryIndex(f"vim src/mod_{i}.py" if i % 2 else f"git commit -am 'v{i}'"
+                             for i in range(500000))
+        for query in ['mod_123.py', 'git comit', 'vim mdo_4999', 'py']:
+            started = time.perf_counter()
+            matches = index.search(query)
+            elapsed = time.perf_counter() - started
+            assert matches
+            assert elapsed < 0.2, f"busca por '{query}' levou {elapsed:.3f} s"
+        assert index.search('mod_123.py')[0].command == 'vim src/mod_123.py'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,163 @@
+"""
+Testes para o banco de histórico de comandos do TermIA.
+Este módulo testa a gravação com status e duração, a leitura dos últimos
+comandos, a busca por texto e a importação do formato do FileHistory.
+"""
+
+import pytest
+import sys
+import os
+import random
+import time
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from history_store import HistoryStore, parse_file_history, tail_file_history  # type: ignore
+
+
+FILE_HISTORY = (
+    "\n# 2024-01-02 10:00:00.000000\n+ls -la\n"
+    "\n# 2024-01-02 10:00:05.500000\n+ia ask \"Qual a capital?\"\n"
+    "\n# 2024-01-02 10:01:00.000000\n+cat README.md\n"
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture que cria um banco de histórico temporário."""
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    yield store
+    store.close()
+
+
+class TestHistoryStore:
+    """Classe de testes para o HistoryStore."""
+
+    def test_add_and_last(self, store):
+        """Testa que last devolve os n últimos comandos em ordem cronológica."""
+        for i in range(20):
+            store.add(f"cmd {i}", started=1000.0 + i, duration=0.5, status=i % 2)
+        last = store.last(3)
+        assert [entry.command for entry in last] == ['cmd 17', 'cmd 18', 'cmd 19']
+        assert last[-1].started == 1019.0
+        assert last[-1].duration == 0.5
+        assert last[-1].status == 1
+        assert len(store) == 20
+
+    def test_recent_commands(self, store):
+        """Testa a lista do mais recente para o mais antigo (usada pelo prompt)."""
+        for command in ['a', 'b', 'c']:
+            store.add(command)
+        assert store.recent_commands() == ['c', 'b', 'a']
+        assert store.recent_commands(2) == ['c', 'b']
+
+    def test_search_words(self, store):
+        """Testa a busca por palavras (prefixos) no índice de texto."""
+        for command in ['ls -la', 'cat README.md', 'ls src', 'pwd']:
+            store.add(command)
+        assert [entry.command for entry in store.search('ls')] == ['ls -la', 'ls src']
+        assert [entry.command for entry in store.search('READ')] == ['cat README.md']
+        assert [entry.command for entry in store.search('ls src')] == ['ls src']
+        assert store.search('inexistente') == []
+
+    def test_search_without_words(self, store):
+        """Testa que buscas só com símbolos usam substring."""
+        store.add('ls -la')
+        store.add('pwd')
+        assert [entry.command for entry in store.search('-l')] == ['ls -la']
+        assert [entry.command for entry in store.search('%')] == []
+
+    def test_search_without_fts(self, store):
+        """Testa a busca quando o SQLite não tem FTS5."""
+        store.has_fts = False
+        store.add('ia ask "oi"')
+        store.add('ls')
+        assert [entry.command for entry in store.search('ask')] == ['ia ask "oi"']
+
+    def test_search_limit_keeps_most_recent(self, store):
+        """Testa que o limite mantém as correspondências mais recentes."""
+        for i in range(10):
+            store.add(f"ls {i}")
+        assert [entry.command for entry in store.search('ls', limit=2)] == ['ls 8', 'ls 9']
+
+
+class TestFileHistoryImport:
+    """Testes da importação do formato texto do FileHistory."""
+
+    def test_parse_file_history(self):
+        """Testa a leitura de timestamps, comandos de várias linhas e linhas simples."""
+        text = FILE_HISTORY + "\n# 2024-01-02 10:02:00.000000\n+linha um\n+linha dois\nsimples\n"
+        entries = list(parse_file_history(text))
+        assert [command for command, _ in entries] == [
+            'ls -la', 'ia ask "Qual a capital?"', 'cat README.md', 'linha um\nlinha dois', 'simples'
+        ]
+        assert entries[1][1] - entries[0][1] == pytest.approx(5.5)
+
+    def test_import_is_incremental(self, store, tmp_path):
+        """Testa que só as linhas novas são importadas a cada chamada."""
+        history_file = tmp_path / 'history.txt'
+        history_file.write_text(FILE_HISTORY, encoding='utf-8')
+        assert store.import_file_history(str(history_file)) == 3
+        assert store.import_file_history(str(history_file)) == 0
+        with open(history_file, 'a', encoding='utf-8') as f:
+            f.write("\n# 2024-01-02 10:05:00.000000\n+pwd\n")
+        assert store.import_file_history(str(history_file)) == 1
+        assert [entry.command for entry in store.last(2)] == ['cat README.md', 'pwd']
+
+    def test_import_waits_for_complete_lines(self, store, tmp_path):
+        """Testa que uma linha incompleta no fim do arquivo não é importada."""
+        history_file = tmp_path / 'history.txt'
+        history_file.write_text("ls\npw", encoding='utf-8')
+        assert store.import_file_history(str(history_file)) == 1
+        with open(history_file, 'a', encoding='utf-8') as f:
+            f.write("d\n")
+        assert store.import_file_history(str(history_file)) == 1
+        assert store.recent_commands() == ['pwd', 'ls']
+
+    def test_import_missing_file(self, store, tmp_path):
+        """Testa que um arquivo inexistente não importa nada."""
+        assert store.import_file_history(str(tmp_path / 'nada.txt')) == 0
+
+
+
+class TestTailFileHistory:
+    """Testes da leitura do fim do arquivo de histórico."""
+
+    def test_matches_full_parse(self, tmp_path):
+        """Testa que a leitura de trás para frente concorda com a leitura completa."""
+        rng = random.Random(0)
+        parts = []
+        for i in range(200):
+            if rng.random() < 0.8:
+                lines = ''.join(f"+cmd {i} ação {j}\n" for j in range(rng.randint(1, 3)))
+                parts.append(f"\n# 2024-01-02 10:00:00.000000\n{lines}")
+            else:
+                parts.append(f"simples {i}\n")
+        text = ''.join(parts)
+        history_file = tmp_path / 'history.txt'
+        history_file.write_text(text, encoding='utf-8')
+        expected = [command for command, _ in parse_file_history(text)]
+        # Blocos pequenos cortam linhas e caracteres UTF-8 ao meio
+        for block_size in (1, 5, 64, 4096):
+            for n in (0, 1, 7, 500):
+                assert tail_file_history(str(history_file), n, block_size) == (expected[-n:] if n else [])
+
+    def test_missing_file(self, tmp_path):
+        """Testa que um arquivo inexistente não tem comandos."""
+        assert tail_file_history(str(tmp_path / 'nada.txt'), 10) == []
+
+    def test_cost_does_not_depend_on_file_size(self, tmp_path):
+        """Testa que ler os últimos comandos de um arquivo grande é imediato."""
+        history_file = tmp_path / 'history.txt'
+        entry = "\n# 2024-01-02 10:00:00.000000\n+ls -la\n"
+        history_file.write_text(entry * 300000 + "\n# 2024-01-02 10:00:00.000000\n+pwd\n",
+                                encoding='utf-8')
+        started = time.perf_counter()
+        last = tail_file_history(str(history_file), 10)
+        elapsed = time.perf_counter() - started
+        assert last == ['ls -la'] * 9 + ['pwd']
+        assert elapsed < 0.05
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
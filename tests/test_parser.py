@@ -14,7 +14,8 @@ from parser import TermIAParser
 from ast_nodes import (
     LSCommand, CDCommand, MkdirCommand, PwdCommand, CatCommand,
     IAAskCommand, IASummarizeCommand, IACodeExplainCommand, IATranslateCommand,
-    HistoryCommand, ClearCommand, HelpCommand, ExitCommand
+    IABatchTranslateCommand, HistoryCommand, HistorySearchCommand, ClearCommand, HelpCommand, ExitCommand, JobsCommand, StatsCommand,
+    BackgroundCommand
 )
 
 
@@ -56,6 +57,46 @@ class TestTermIAParser:
         assert ast.options == 'lah'
         assert ast.path == '/var/log'
 
+    def test_ls_recursive_with_max_depth(self, parser):
+        """Testa ls -R com --max-depth e flags separadas."""
+        ast = parser.parse("ls -l -R --max-depth 2 src")
+        assert isinstance(ast, LSCommand)
+        assert ast.options == 'lR'
+        assert ast.max_depth == 2
+        assert ast.path == 'src'
+        assert ast.to_dict()['max_depth'] == 2
+
+    def test_ls_limit_offset_pager(self, parser):
+        """Testa ls com --limit, --offset e --pager."""
+        ast = parser.parse("ls -U --limit 10 --offset 20 --pager /tmp")
+        assert isinstance(ast, LSCommand)
+        assert ast.options == 'U'
+        assert (ast.limit, ast.offset, ast.pager) == (10, 20, True)
+        assert ast.path == '/tmp'
+
+    def test_ls_invalid_long_options(self, parser, capsys):
+        """Testa que opções longas inválidas do ls são rejeitadas."""
+        assert parser.parse("ls --limt 5") is None
+        assert "opção '--limt' desconhecida para 'ls'" in capsys.readouterr().out
+        assert parser.parse("ls -l --bogus /tmp") is None
+        assert "opção '--bogus' desconhecida para 'ls'" in capsys.readouterr().out
+        assert parser.parse("ls --limit") is None
+        assert "'--limit' de 'ls' requer um número" in capsys.readouterr().out
+        assert parser.parse("ls --max-depth src") is None
+        assert "'--max-depth' de 'ls' requer um número" in capsys.readouterr().out
+        assert parser.parse("ls --pager 3") is None
+        assert "Uso: ls" in capsys.readouterr().out
+
+    def test_ls_invalid_short_options(self, parser, capsys):
+        """Testa que flags curtas desconhecidas do ls são rejeitadas."""
+        assert parser.parse("ls -z") is None
+        assert "opção '-z' desconhecida para 'ls'" in capsys.readouterr().out
+        assert parser.parse("ls -lz /tmp") is None
+        assert "opção '-z' desconhecida para 'ls'" in capsys.readouterr().out
+        assert parser.parse("ls -la -x") is None
+        assert "Uso: ls" in capsys.readouterr().out
+        assert parser.parse("ls -alhRU").options == 'alhRU'
+
     def test_cd_with_path(self, parser):
         """Testa cd com caminho."""
         ast = parser.parse("cd /home/user")
@@ -111,6 +152,20 @@ class TestTermIAParser:
         assert isinstance(ast, CatCommand)
         assert ast.filepath == '/etc/hosts'
 
+    def test_cat_numbered(self, parser):
+        """Testa cat -n."""
+        ast = parser.parse("cat -n README.md")
+        assert isinstance(ast, CatCommand)
+        assert ast.filepath == "README.md"
+        assert ast.number_lines is True
+
+    def test_cat_invalid_option(self, parser, capsys):
+        """Testa que opções do cat diferentes de -n são rejeitadas."""
+        assert parser.parse("cat -x README.md") is None
+        assert "opção '-x' desconhecida para 'cat'" in capsys.readouterr().out
+        assert parser.parse("cat -zq README.md") is None
+        assert "Uso: cat [-n] <arquivo>" in capsys.readouterr().out
+
     # ========== Testes de Comandos de IA ==========
 
     def test_ia_ask(self, parser):
@@ -142,6 +197,17 @@ class TestTermIAParser:
         assert ast.text == text
         assert ast.length == 'medium'
 
+    def test_ia_summarize_invalid_options(self, parser, capsys):
+        """Testa que opções desconhecidas do ia summarize são rejeitadas."""
+        assert parser.parse('ia summarize --bogus notas.txt') is None
+        assert "opção '--bogus' desconhecida para 'ia summarize'" in capsys.readouterr().out
+        assert parser.parse('ia summarize --file notas.txt --size long') is None
+        assert "opção '--size' desconhecida para 'ia summarize'" in capsys.readouterr().out
+        assert parser.parse('ia summarize "texto" --tamanho long') is None
+        assert "Uso: ia summarize" in capsys.readouterr().out
+        ast = parser.parse('ia summarize --file notas.txt --length long')
+        assert (ast.filepath, ast.length) == ('notas.txt', 'long')
+
     def test_ia_summarize_long(self, parser):
         """Testa ia summarize com length long."""
         text = "Texto longo aqui"
@@ -174,6 +240,32 @@ class TestTermIAParser:
         assert isinstance(ast, IATranslateCommand)
         assert ast.target_language == 'es'
 
+    def test_ia_translate_batch(self, parser):
+        """Testa ia translate com vários textos."""
+        ast = parser.parse('ia translate "Abrir" "Salvar" "Fechar" --to en')
+        assert isinstance(ast, IABatchTranslateCommand)
+        assert ast.texts == ["Abrir", "Salvar", "Fechar"]
+        assert ast.target_language == 'en'
+
+    def test_ia_translate_invalid_options(self, parser, capsys):
+        """Testa que opções desconhecidas do ia translate são rejeitadas."""
+        assert parser.parse('ia translate --bogus x.txt --to pt') is None
+        assert "opção '--bogus' desconhecida para 'ia translate'" in capsys.readouterr().out
+        assert parser.parse('ia translate --file x.txt --from pt') is None
+        assert "opção '--from' desconhecida para 'ia translate'" in capsys.readouterr().out
+        assert parser.parse('ia translate "Abrir" "Salvar" --para en') is None
+        assert "opção '--para' desconhecida" in capsys.readouterr().out
+        assert parser.parse('ia translate "Hello" --from pt') is None
+        assert "Uso: ia translate" in capsys.readouterr().out
+        assert parser.parse('ia translate "Hello" --from pt &') is None
+
+    def test_ia_translate_file(self, parser):
+        """Testa ia translate --file."""
+        ast = parser.parse('ia translate --file ui/strings.txt --to pt')
+        assert isinstance(ast, IABatchTranslateCommand)
+        assert ast.filepath == 'ui/strings.txt'
+        assert ast.target_language == 'pt'
+
     # ========== Testes de Comandos de Controle ==========
 
     def test_history_simple(self, parser):
@@ -194,6 +286,21 @@ class TestTermIAParser:
         assert isinstance(ast, HistoryCommand)
         assert ast.count == 100
 
+    def test_history_search(self, parser):
+        """Testa history search com várias palavras, opções e caminhos."""
+        ast = parser.parse('history search git comit')
+        assert isinstance(ast, HistorySearchCommand)
+        assert ast.query == 'git comit'
+        ast = parser.parse('history search ls -la --max-depth 2 ./src')
+        assert ast.query == 'ls -la --max-depth 2 ./src'
+        ast = parser.parse('history search "cat README.md"')
+        assert ast.query == 'cat README.md'
+
+    def test_history_search_invalid(self, parser):
+        """Testa history com subcomando desconhecido ou sem texto."""
+        assert parser.parse('history procura ls') is None
+        assert parser.parse('history search') is None
+
     def test_clear(self, parser):
         """Testa comando clear."""
         ast = parser.parse("clear")
@@ -222,6 +329,55 @@ class TestTermIAParser:
         ast = parser.parse("exit")
         assert isinstance(ast, ExitCommand)
 
+    def test_jobs_simple(self, parser):
+        """Testa comando jobs."""
+        ast = parser.parse("jobs")
+        assert isinstance(ast, JobsCommand)
+        assert ast.action == 'list'
+        assert ast.job_id is None
+
+    def test_jobs_wait_with_id(self, parser):
+        """Testa jobs wait com id."""
+        ast = parser.parse("jobs wait 3")
+        assert isinstance(ast, JobsCommand)
+        assert ast.action == 'wait'
+        assert ast.job_id == 3
+
+    def test_stats_simple(self, parser):
+        """Testa comando stats."""
+        ast = parser.parse("stats")
+        assert isinstance(ast, StatsCommand)
+        assert ast.action == 'summary'
+
+    def test_stats_recent(self, parser):
+        """Testa stats com número de comandos."""
+        ast = parser.parse("stats 5")
+        assert isinstance(ast, StatsCommand)
+        assert ast.action == 'recent'
+        assert ast.count == 5
+
+    def test_stats_clear_and_export(self, parser):
+        """Testa stats clear e stats --export."""
+        assert parser.parse("stats clear").action == 'clear'
+        ast = parser.parse("stats --export metricas.prom")
+        assert ast.action == 'export'
+        assert ast.path == "metricas.prom"
+        assert parser.parse("stats --json x") is None
+
+    def test_parse_timings(self, parser):
+        """Testa os tempos de análise léxica e sintática."""
+        timings = {}
+        ast = parser.parse("ls -la /tmp", timings=timings)
+        assert isinstance(ast, LSCommand)
+        assert timings['lex'] > 0 and timings['parse'] > 0
+
+    def test_ia_background(self, parser):
+        """Testa comando de IA em segundo plano."""
+        ast = parser.parse('ia ask "O que é Python?" &')
+        assert isinstance(ast, BackgroundCommand)
+        assert isinstance(ast.command, IAAskCommand)
+        assert ast.command.question == "O que é Python?"
+
     # ========== Testes de Casos Complexos ==========
 
     def test_complex_ls(self, parser):
@@ -0,0 +1,218 @@
+"""
+Testes para a API de plugins do TermIA.
+Este módulo testa a descoberta por entry points, o manifesto em cache, o
+carregamento no primeiro uso e a integração com lexer, parser, registro de
+comandos e autocomplete.
+"""
+
+import pytest
+import sys
+import os
+
+# Adiciona a raiz do projeto e o diretório src ao path
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+import plugins  # type: ignore
+from plugins import CommandPlugin, PluginError, PluginManager  # type: ignore
+from ast_nodes import ASTNode, LSCommand, HelpCommand  # type: ignore
+from parser import TermIAParser  # type: ignore
+from table_cache import TableCache  # type: ignore
+
+
+class EchoCommand(ASTNode):
+    """Nó de AST do plugin de teste."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"EchoCommand({self.text})"
+
+    def to_dict(self):
+        return {'type': 'EchoCommand', 'text': self.text}
+
+
+class EchoPlugin(CommandPlugin):
+    """Plugin de teste: echo "<texto>" e echo <caminho>."""
+
+    name = 'echo'
+    keywords = {'echo': 'ECHO', 'ls': 'LS_PLUGIN'}
+    completions = {'echo': {'options': ['-n'], 'description': 'Print text'}}
+    help = {'echo': 'echo "<texto>"\n  Mostra o texto'}
+
+    def p_echo_string(self, p):
+        "plugin_command : ECHO STRING"
+        p[0] = EchoCommand(p[2])
+
+    def p_echo_path(self, p):
+        "plugin_command : ECHO path"
+        p[0] = EchoCommand(p[2])
+
+    def commands(self):
+        return [(EchoCommand, self.run_echo, 'echo')]
+
+    def run_echo(self, terminal, ast):
+        print(f"echo: {ast.text}")
+
+
+class BrokenPlugin(CommandPlugin):
+    """Plugin sem nome, rejeitado na descoberta."""
+
+
+class FakeEntryPoint:
+    """Entry point que conta quantas vezes o plugin foi importado."""
+
+    def __init__(self, name, obj):
+        self.name = name
+        self.obj = obj
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        return self.obj
+
+
+@pytest.fixture
+def entry_points(monkeypatch):
+    """Fixture que substitui os entry points instalados por um plugin de teste."""
+    points = [FakeEntryPoint('echo', EchoPlugin)]
+    monkeypatch.setattr(plugins, '_iter_entry_points', lambda: list(points))
+    return points
+
+
+class TestPluginManager:
+    """Classe de testes para o PluginManager."""
+
+    def test_discover_caches_manifest(self, entry_points, tmp_path):
+        """Testa que, com o manifesto, os plugins não são importados ao iniciar."""
+        first = PluginManager(cache_dir=str(tmp_path))
+        first.discover()
+        assert entry_points[0].loads == 1
+        assert os.path.exists(first.manifest_path)
+
+        second = PluginManager(cache_dir=str(tmp_path))
+        second.discover()
+        assert entry_points[0].loads == 1
+        assert not second.is_loaded('echo')
+        assert second.keywords()['echo'] == 'ECHO'
+        assert second.help_text('echo').startswith('echo')
+
+    def test_environment_change_rescans(self, entry_points, tmp_path, monkeypatch):
+        """Testa que instalar ou remover pacotes invalida o manifesto."""
+        PluginManager(cache_dir=str(tmp_path)).discover()
+        monkeypatch.setattr(plugins, '_environment_key', lambda disabled: 'outro ambiente')
+        PluginManager(cache_dir=str(tmp_path)).discover()
+        assert entry_points[0].loads == 2
+
+    def test_broken_and_disabled_plugins(self, entry_points, tmp_path):
+        """Testa que plugins inválidos são relatados e os desativados ignorados."""
+        entry_points.append(FakeEntryPoint('quebrado', BrokenPlugin))
+        manager = PluginManager(cache_dir=str(tmp_path))
+        manager.discover()
+        assert len(manager) == 1
+        assert manager.errors and manager.errors[0].startswith('quebrado')
+
+        disabled = PluginManager(cache_dir=str(tmp_path), disabled=['echo'])
+        disabled.discover()
+        assert len(disabled) == 0
+
+    def test_changed_plugin_is_detected(self, entry_points, tmp_path):
+        """Testa que um plugin alterado depois do manifesto não é usado."""
+        PluginManager(cache_dir=str(tmp_path)).discover()
+
+        class ChangedPlugin(EchoPlugin):
+            def p_echo_string(self, p):
+                "plugin_command : ECHO STRING STRING"
+
+        entry_points[0].obj = ChangedPlugin
+        manager = PluginManager(cache_dir=str(tmp_path))
+        manager.discover()
+        with pytest.raises(PluginError):
+            manager.load('echo')
+        assert not os.path.exists(manager.manifest_path)
+
+
+class TestPluginGrammar:
+    """Testes da integração dos plugins com o lexer e o parser."""
+
+    def test_plugin_commands_parse_lazily(self, entry_points, tmp_path):
+        """Testa que o plugin só é importado quando sua produção é usada."""
+        PluginManager(cache_dir=str(tmp_path)).discover()
+        manager = PluginManager(cache_dir=str(tmp_path))
+        manager.discover()
+        parser = TermIAParser(table_cache=TableCache(str(tmp_path / 'tables')), plugins=manager)
+
+        assert isinstance(parser.parse('ls -la'), LSCommand)
+        assert entry_points[0].loads == 1
+        ast = parser.parse('echo "olá"')
+        assert isinstance(ast, EchoCommand)
+        assert ast.text == 'olá'
+        assert entry_points[0].loads == 2
+        assert parser.parse('echo src/').text == 'src/'
+
+    def test_builtin_keywords_win(self):
+        """Testa que um plugin não redefine palavras reservadas nativas."""
+        manager = PluginManager()
+        manager.add(EchoPlugin)
+        parser = TermIAParser(plugins=manager)
+        assert parser.lexer.reserved['ls'] == 'LS'
+        assert 'LS_PLUGIN' not in parser.tokens
+        assert isinstance(parser.parse('ls'), LSCommand)
+
+    def test_help_accepts_plugin_command(self):
+        """Testa que 'help <comando do plugin>' é reconhecido pelo parser."""
+        manager = PluginManager()
+        manager.add(EchoPlugin)
+        ast = TermIAParser(plugins=manager).parse('help echo')
+        assert isinstance(ast, HelpCommand)
+        assert ast.command == 'echo'
+
+    def test_tables_are_cached_with_plugins(self, tmp_path):
+        """Testa que a gramática com plugins também vai para o cache de tabelas."""
+        manager = PluginManager()
+        manager.add(EchoPlugin)
+        cache = TableCache(str(tmp_path))
+        TermIAParser(table_cache=cache, plugins=manager)
+        files = sorted(os.listdir(tmp_path))
+        assert any(name.startswith('parsetab_') for name in files)
+        TermIAParser(table_cache=cache, plugins=manager)
+        assert sorted(os.listdir(tmp_path)) == files
+        # A gramática sem plugins tem outra assinatura
+        TermIAParser(table_cache=cache)
+        assert len(os.listdir(tmp_path)) > len(files)
+
+
+class TestPluginIntegration:
+    """Testes dos plugins no terminal e no autocomplete."""
+
+    def test_terminal_runs_plugin_command(self, capsys):
+        """Testa que o comando do plugin é executado e tem ajuda."""
+        from main import TermIA  # type: ignore
+        manager = PluginManager()
+        manager.add(EchoPlugin)
+        terminal = TermIA(enhanced_mode=False, plugins=manager)
+        assert terminal.process_command('echo "oi"')
+        assert 'echo: oi' in capsys.readouterr().out
+        terminal.process_command('help echo')
+        assert 'Mostra o texto' in capsys.readouterr().out
+
+    def test_completer_and_highlighting(self):
+        """Testa as sugestões e o destaque de sintaxe dos comandos do plugin."""
+        pytest.importorskip('prompt_toolkit')
+        from enhanced_input import TermIACompleter, TermIALexer, lexer_for_plugins  # type: ignore
+        manager = PluginManager()
+        manager.add(EchoPlugin)
+        completer = TermIACompleter(plugins=manager)
+        assert completer.commands['echo']['description'] == 'Print text'
+        assert completer.commands['ls']['description'] == 'List files and directories'
+        lexer = lexer_for_plugins(manager)()
+        tokens = list(lexer.get_tokens('echo "oi"'))
+        assert tokens[0][1] == 'echo'
+        assert 'Keyword' in str(tokens[0][0])
+        assert lexer_for_plugins(None) is TermIALexer
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,111 @@
+"""
+Testes para o modo script (--script / --stdin) do TermIA.
+Este módulo testa a execução não interativa de comandos usando pytest.
+"""
+
+import pytest
+import sys
+import os
+import io
+
+# Adiciona a raiz do projeto e o diretório src ao path
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+sys.path.insert(0, os.path.join(ROOT_DIR, 'src'))
+sys.path.insert(0, ROOT_DIR)
+
+import main  # type: ignore
+from main import TermIA  # type: ignore
+
+
+class TestScriptMode:
+    """Classe de testes para TermIA.run_script."""
+
+    @pytest.fixture
+    def terminal(self):
+        """Fixture que cria um TermIA sem prompt_toolkit."""
+        return TermIA(enhanced_mode=False)
+
+    def test_all_commands_ok(self, terminal, capsys):
+        """Testa script em que todos os comandos têm sucesso."""
+        status = io.StringIO()
+        code = terminal.run_script(['pwd\n', 'help ls\n'], status_stream=status)
+        assert code == 0
+        report = status.getvalue()
+        assert report.count('[ok]') == 2
+        assert '2 comandos, 2 ok, 0 com erro' in report
+
+    def test_skips_blank_lines_and_comments(self, terminal):
+        """Testa que linhas vazias e comentários são ignorados."""
+        status = io.StringIO()
+        terminal.run_script(['\n', '# comentario\n', 'pwd\n'], status_stream=status)
+        assert '1 comandos' in status.getvalue()
+
+    def test_error_sets_exit_code(self, terminal):
+        """Testa que um comando com erro gera código de saída 1."""
+        status = io.StringIO()
+        code = terminal.run_script(['cat arquivo_inexistente_12345.txt\n', 'pwd\n'], status_stream=status)
+        assert code == 1
+        assert '[ERRO] linha 1' in status.getvalue()
+        assert '2 comandos, 1 ok, 1 com erro' in status.getvalue()
+
+    def test_stop_on_error(self, terminal):
+        """Testa que stop_on_error interrompe no primeiro erro."""
+        status = io.StringIO()
+        code = terminal.run_script(['mkdir\n', 'pwd\n'], stop_on_error=True, status_stream=status)
+        assert code == 1
+        assert '1 comandos' in status.getvalue()
+
+    def test_recovered_syntax_error_fails(self, tmp_path, monkeypatch, capsys):
+        """Testa que um erro de sintaxe recuperado pelo parser conta como erro e não executa."""
+        (tmp_path / 'a').mkdir()
+        (tmp_path / 'a' / 'dentro.txt').write_text('x')
+        monkeypatch.chdir(tmp_path)
+        terminal = TermIA(enhanced_mode=False)
+        status = io.StringIO()
+        code = terminal.run_script(['ls a f.txt\n', 'pwd\n'], stop_on_error=True, status_stream=status)
+        assert code == 1
+        assert '[ERRO] linha 1' in status.getvalue()
+        assert '1 comandos, 0 ok, 1 com erro' in status.getvalue()
+        assert 'dentro.txt' not in capsys.readouterr().out
+
+    def test_script_open_error(self, tmp_path, monkeypatch, capsys):
+        """Testa a mensagem e o código de saída quando o script não abre."""
+        # disable_colors troca sys.stdout e os globais de cor para o resto da sessão
+        monkeypatch.setattr(main, 'disable_colors', lambda: None)
+        monkeypatch.setattr(sys, 'argv', ['main.py', '--script', str(tmp_path / 'nao_existe.txt')])
+        with pytest.raises(SystemExit) as exit_info:
+            main.main()
+        assert exit_info.value.code == 2
+        assert 'Erro ao abrir script' in capsys.readouterr().out
+
+    def test_error_while_running_is_not_open_error(self, tmp_path, monkeypatch, capsys):
+        """Testa que um OSError durante a execução não é relatado como erro ao abrir."""
+        script = tmp_path / 'script.txt'
+        script.write_text('pwd\n', encoding='utf-8')
+
+        def failing_run_script(self, stream, stop_on_error=False, status_stream=None):
+            raise OSError("falha durante a execução")
+
+        monkeypatch.setattr(main, 'disable_colors', lambda: None)
+        monkeypatch.setattr(TermIA, 'run_script', failing_run_script)
+        monkeypatch.setattr(sys, 'argv', ['main.py', '--script', str(script)])
+        with pytest.raises(OSError, match="durante a execução"):
+            main.main()
+        assert 'Erro ao abrir script' not in capsys.readouterr().out
+
+    def test_exit_stops_script(self, terminal):
+        """Testa que exit encerra o script."""
+        status = io.StringIO()
+        terminal.run_script(['exit\n', 'pwd\n'], status_stream=status)
+        assert '1 comandos' in status.getvalue()
+        assert terminal.running is False
+
+    def test_process_command_returns_status(self, terminal):
+        """Testa o valor de retorno de process_command."""
+        assert terminal.process_command('pwd') is True
+        assert terminal.process_command('cat arquivo_inexistente_12345.txt') is False
+        assert terminal.process_command('') is True
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,81 @@
+"""
+Testes do tempo de inicialização do TermIA.
+Este módulo mede o tempo até o terminal estar pronto para o primeiro comando
+e verifica que as dependências pesadas só são importadas no primeiro uso.
+Cada medição roda em um processo novo, para que nenhum módulo já importado
+pelos outros testes influencie o resultado.
+"""
+
+import pytest
+import sys
+import os
+import json
+import subprocess
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Tempo máximo entre o início do import de main e o TermIA pronto, em segundos
+# (antes do carregamento sob demanda era cerca de 0,3 s)
+STARTUP_BUDGET = 0.2
+
+# Módulos que não devem ser importados antes do primeiro comando
+HEAVY_MODULES = ('requests', 'yaml', 'prompt_toolkit', 'pygments', 'ply', 'asyncio', 'ai_executor')
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+import main
+terminal = main.TermIA(enhanced_mode=False)
+elapsed = time.perf_counter() - started
+loaded = {{'startup': [m for m in {modules!r} if m in sys.modules]}}
+for command in {commands!r}:
+    if command == 'ai_executor':
+        terminal.ai_executor
+    else:
+        terminal.process_command(command)
+    loaded[command] = [m for m in {modules!r} if m in sys.modules]
+terminal.close()
+print(json.dumps({{'elapsed': elapsed, 'loaded': loaded}}))
+'''
+
+
+def run_startup(tmp_path, commands=()) -> dict:
+    """Inicia o TermIA em um processo novo e devolve o tempo e os módulos importados."""
+    script = STARTUP_SCRIPT.format(root=ROOT_DIR, modules=HEAVY_MODULES, commands=list(commands))
+    env = dict(os.environ, TERMIA_CACHE_DIR=str(tmp_path / 'cache'))
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup:
+    """Classe de testes da inicialização."""
+
+    def test_startup_budget(self, tmp_path):
+        """Testa que o terminal fica pronto dentro do orçamento de tempo."""
+        # O melhor de três execuções descarta ruído da máquina
+        best = min(run_startup(tmp_path)['elapsed'] for _ in range(3))
+        assert best < STARTUP_BUDGET, f"inicialização levou {best * 1000:.0f} ms"
+
+    def test_heavy_modules_not_loaded_at_startup(self, tmp_path):
+        """Testa que parser, IA, yaml e prompt_toolkit não são importados ao iniciar."""
+        assert run_startup(tmp_path)['loaded']['startup'] == []
+
+    def test_modules_loaded_on_first_use(self, tmp_path):
+        """Testa que cada dependência é importada pelo primeiro comando que a usa."""
+        loaded = run_startup(tmp_path, ['pwd', 'ai_executor'])['loaded']
+        assert 'ply' in loaded['pwd']
+        assert 'requests' not in loaded['pwd']
+        assert 'requests' in loaded['ai_executor']
+        assert 'prompt_toolkit' not in loaded['ai_executor']
+
+    def test_yaml_loaded_only_with_config(self, tmp_path):
+        """Testa que o yaml só é importado quando existe config.yaml."""
+        (tmp_path / 'config.yaml').write_text('security:\n  safe_mode: true\n', encoding='utf-8')
+        assert run_startup(tmp_path)['loaded']['startup'] == ['yaml']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
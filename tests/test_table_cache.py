@@ -0,0 +1,116 @@
+"""
+Testes para o cache de tabelas do lexer e do parser do TermIA.
+Este módulo verifica a geração, o reaproveitamento e a invalidação das tabelas.
+"""
+
+import pytest
+import sys
+import os
+
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from table_cache import TableCache, grammar_signature  # type: ignore
+from lexer import TermIALexer  # type: ignore
+from parser import TermIAParser  # type: ignore
+from ast_nodes import LSCommand, IATranslateCommand  # type: ignore
+
+
+class TestTableCache:
+    """Classe de testes para o TableCache."""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Fixture que cria um cache em diretório temporário."""
+        return TableCache(str(tmp_path / 'tables'))
+
+    def test_first_build_writes_tables(self, cache):
+        """Testa que a primeira construção grava as tabelas no cache."""
+        parser = TermIAParser(table_cache=cache)
+        files = os.listdir(cache.cache_dir)
+        assert any(f.startswith('lextab_') for f in files)
+        assert any(f.startswith('parsetab_') for f in files)
+        assert isinstance(parser.parse("ls -la /tmp"), LSCommand)
+
+    def test_second_build_loads_from_cache(self, cache, monkeypatch):
+        """Testa que a segunda construção não chama lex.lex nem yacc.yacc."""
+        TermIAParser(table_cache=cache)
+
+        import ply.lex
+        import ply.yacc
+
+        def fail(*args, **kwargs):
+            raise AssertionError("tabelas deveriam vir do cache")
+
+        monkeypatch.setattr(ply.lex, 'lex', fail)
+        monkeypatch.setattr(ply.yacc, 'yacc', fail)
+
+        parser = TermIAParser(table_cache=cache)
+        ast = parser.parse('ia translate "Hello" --to pt')
+        assert isinstance(ast, IATranslateCommand)
+        assert ast.target_language == 'pt'
+
+    def test_cached_lexer_tokenizes(self, cache):
+        """Testa que o lexer carregado do cache gera os mesmos tokens."""
+        fresh = [(t.type, t.value) for t in TermIALexer(table_cache=cache).tokenize_to_list('cd ~/abc')]
+        cached = [(t.type, t.value) for t in TermIALexer(table_cache=cache).tokenize_to_list('cd ~/abc')]
+        assert fresh == cached == [('CD', 'cd'), ('PATH', '~/abc')]
+
+    def test_signature_changes_with_grammar(self):
+        """Testa que alterar uma regra muda a assinatura da gramática."""
+
+        class ChangedParser(TermIAParser):
+            def p_pwd_command(self, p):
+                "pwd_command : PWD IDENTIFIER"
+                p[0] = None
+
+        base = TermIAParser.__new__(TermIAParser)
+        base.tokens = TermIALexer.tokens
+        changed = ChangedParser.__new__(ChangedParser)
+        changed.tokens = TermIALexer.tokens
+        assert grammar_signature(base) != grammar_signature(changed)
+
+    def test_signature_changes_with_rule_order(self):
+        """Testa que reordenar regras-função do lexer muda a assinatura."""
+
+        class NumberFirst(TermIALexer):
+            def t_NUMBER(self, t):
+                r'\d+'
+                return t
+
+            def t_PATH(self, t):
+                r'[a-z0-9]+/[a-z0-9]*'
+                return t
+
+        class PathFirst(TermIALexer):
+            def t_PATH(self, t):
+                r'[a-z0-9]+/[a-z0-9]*'
+                return t
+
+            def t_NUMBER(self, t):
+                r'\d+'
+                return t
+
+        number_first = NumberFirst.__new__(NumberFirst)
+        path_first = PathFirst.__new__(PathFirst)
+        assert grammar_signature(number_first, ('t_',)) != grammar_signature(path_first, ('t_',))
+
+    def test_corrupt_table_is_rebuilt(self, cache):
+        """Testa que uma tabela corrompida é ignorada e reconstruída."""
+        TermIAParser(table_cache=cache)
+        for name in os.listdir(cache.cache_dir):
+            with open(os.path.join(cache.cache_dir, name), 'w') as f:
+                f.write('garbage')
+
+        parser = TermIAParser(table_cache=cache)
+        assert isinstance(parser.parse("ls"), LSCommand)
+
+    def test_clear(self, cache):
+        """Testa a limpeza do cache."""
+        TermIAParser(table_cache=cache)
+        assert cache.clear() == 2
+        assert cache.clear() == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])